@@ -0,0 +1,34 @@
+"""Per-pool scrape readiness settings
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '002'
+down_revision: Union[str, None] = '001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'pools',
+        sa.Column('ready_timeout_seconds', sa.Integer(), nullable=True, server_default='15')
+    )
+    op.add_column(
+        'pools',
+        sa.Column('block_resources', sa.Boolean(), nullable=True, server_default=sa.false())
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('pools', 'block_resources')
+    op.drop_column('pools', 'ready_timeout_seconds')
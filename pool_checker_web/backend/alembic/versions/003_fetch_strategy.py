@@ -0,0 +1,33 @@
+"""Per-pool fetch strategy
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '003'
+down_revision: Union[str, None] = '002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'pools',
+        sa.Column('fetch_strategy', sa.String(length=20), nullable=True, server_default='selenium')
+    )
+    op.add_column('pools', sa.Column('data_url', sa.Text(), nullable=True))
+    op.add_column('pools', sa.Column('json_path', sa.String(length=200), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('pools', 'json_path')
+    op.drop_column('pools', 'data_url')
+    op.drop_column('pools', 'fetch_strategy')
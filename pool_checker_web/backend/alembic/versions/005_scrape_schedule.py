@@ -0,0 +1,31 @@
+"""Per-pool scrape schedule
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '005'
+down_revision: Union[str, None] = '004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'pools',
+        sa.Column('next_scrape_at', sa.DateTime(timezone=True), nullable=True)
+    )
+    op.create_index('ix_pools_next_scrape_at', 'pools', ['next_scrape_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_pools_next_scrape_at', table_name='pools')
+    op.drop_column('pools', 'next_scrape_at')
@@ -0,0 +1,56 @@
+"""Adaptive scrape scheduling
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '006'
+down_revision: Union[str, None] = '005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'pools',
+        sa.Column('adaptive_scheduling', sa.Boolean(), nullable=True, server_default=sa.false())
+    )
+    op.add_column(
+        'pools',
+        sa.Column('min_scrape_interval_minutes', sa.Integer(), nullable=True, server_default='5')
+    )
+    op.add_column(
+        'pools',
+        sa.Column('max_scrape_interval_minutes', sa.Integer(), nullable=True, server_default='30')
+    )
+
+    op.create_table(
+        'pool_change_profiles',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('pool_id', sa.Integer(), nullable=False),
+        sa.Column('weekday', sa.Integer(), nullable=False),
+        sa.Column('slot', sa.Integer(), nullable=False),
+        sa.Column('change_rate', sa.Float(), nullable=False),
+        sa.Column('samples', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['pool_id'], ['pools.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('pool_id', 'weekday', 'slot', name='uq_change_profile_pool_slot')
+    )
+    op.create_index(op.f('ix_pool_change_profiles_id'), 'pool_change_profiles', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_pool_change_profiles_id'), table_name='pool_change_profiles')
+    op.drop_table('pool_change_profiles')
+    op.drop_column('pools', 'max_scrape_interval_minutes')
+    op.drop_column('pools', 'min_scrape_interval_minutes')
+    op.drop_column('pools', 'adaptive_scheduling')
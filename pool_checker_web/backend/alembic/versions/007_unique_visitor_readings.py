@@ -0,0 +1,42 @@
+"""Unique visitor readings per pool and timestamp
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '007'
+down_revision: Union[str, None] = '006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Keep the oldest row of any duplicated reading
+    op.execute(
+        """
+        DELETE FROM visitor_records a
+        USING visitor_records b
+        WHERE a.pool_id = b.pool_id
+          AND a.timestamp = b.timestamp
+          AND a.id > b.id
+        """
+    )
+    op.drop_index('ix_visitor_pool_timestamp', table_name='visitor_records')
+    op.create_index(
+        'ix_visitor_pool_timestamp', 'visitor_records', ['pool_id', 'timestamp'], unique=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_visitor_pool_timestamp', table_name='visitor_records')
+    op.create_index(
+        'ix_visitor_pool_timestamp', 'visitor_records', ['pool_id', 'timestamp'], unique=False
+    )
@@ -0,0 +1,50 @@
+"""Hourly visitor rollups
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-17
+
+Populate the table with scripts/backfill_rollups.py after upgrading.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '008'
+down_revision: Union[str, None] = '007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'visitor_hourly_rollups',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('pool_id', sa.Integer(), nullable=False),
+        sa.Column('local_date', sa.Date(), nullable=False),
+        sa.Column('hour', sa.Integer(), nullable=False),
+        sa.Column('weekday', sa.String(length=10), nullable=False),
+        sa.Column('reading_count', sa.Integer(), nullable=False),
+        sa.Column('visitor_sum', sa.BigInteger(), nullable=False),
+        sa.Column('visitor_min', sa.Integer(), nullable=False),
+        sa.Column('visitor_max', sa.Integer(), nullable=False),
+        sa.Column('visitor_sum_squares', sa.BigInteger(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['pool_id'], ['pools.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('pool_id', 'local_date', 'hour', name='uq_hourly_rollup_pool_hour')
+    )
+    op.create_index(op.f('ix_visitor_hourly_rollups_id'), 'visitor_hourly_rollups', ['id'], unique=False)
+    op.create_index(
+        'ix_hourly_rollup_pool_weekday', 'visitor_hourly_rollups', ['pool_id', 'weekday'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_hourly_rollup_pool_weekday', table_name='visitor_hourly_rollups')
+    op.drop_index(op.f('ix_visitor_hourly_rollups_id'), table_name='visitor_hourly_rollups')
+    op.drop_table('visitor_hourly_rollups')
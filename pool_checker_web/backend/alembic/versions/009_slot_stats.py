@@ -0,0 +1,46 @@
+"""Online per-slot visitor statistics
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-17
+
+Populate the table with scripts/backfill_rollups.py after upgrading.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '009'
+down_revision: Union[str, None] = '008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'pool_slot_stats',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('pool_id', sa.Integer(), nullable=False),
+        sa.Column('weekday', sa.Integer(), nullable=False),
+        sa.Column('slot', sa.Integer(), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.Column('mean', sa.Float(), nullable=False),
+        sa.Column('m2', sa.Float(), nullable=False),
+        sa.Column('decayed_sum', sa.Float(), nullable=False),
+        sa.Column('decayed_weight', sa.Float(), nullable=False),
+        sa.Column('decayed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['pool_id'], ['pools.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('pool_id', 'weekday', 'slot', name='uq_slot_stats_pool_slot')
+    )
+    op.create_index(op.f('ix_pool_slot_stats_id'), 'pool_slot_stats', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_pool_slot_stats_id'), table_name='pool_slot_stats')
+    op.drop_table('pool_slot_stats')
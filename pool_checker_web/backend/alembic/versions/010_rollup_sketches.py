@@ -0,0 +1,28 @@
+"""Quantile sketches in hourly rollups
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-17
+
+Existing rollups get their sketches from scripts/backfill_rollups.py.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '010'
+down_revision: Union[str, None] = '009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('visitor_hourly_rollups', sa.Column('visitor_sketch', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('visitor_hourly_rollups', 'visitor_sketch')
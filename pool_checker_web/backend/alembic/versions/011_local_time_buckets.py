@@ -0,0 +1,60 @@
+"""Pool-local time bucket columns on visitor records
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-17
+
+Existing rows are backfilled from their pool's timezone.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '011'
+down_revision: Union[str, None] = '010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('visitor_records', sa.Column('local_date', sa.Date(), nullable=True))
+    op.add_column('visitor_records', sa.Column('local_hour', sa.SmallInteger(), nullable=True))
+    op.add_column('visitor_records', sa.Column('local_minute', sa.SmallInteger(), nullable=True))
+    op.add_column('visitor_records', sa.Column('iso_weekday', sa.SmallInteger(), nullable=True))
+
+    op.execute(
+        """
+        UPDATE visitor_records AS v
+        SET local_date = l.local_time::date,
+            local_hour = extract(hour FROM l.local_time),
+            local_minute = extract(hour FROM l.local_time) * 60 + extract(minute FROM l.local_time),
+            iso_weekday = extract(isodow FROM l.local_time)
+        FROM (
+            SELECT r.id, r.timestamp AT TIME ZONE COALESCE(p.timezone, 'CET') AS local_time
+            FROM visitor_records r
+            JOIN pools p ON p.id = r.pool_id
+        ) AS l
+        WHERE v.id = l.id
+        """
+    )
+
+    op.create_index(
+        'ix_visitor_pool_local_date', 'visitor_records', ['pool_id', 'local_date', 'local_minute'], unique=False
+    )
+    op.create_index(
+        'ix_visitor_pool_weekday_minute', 'visitor_records', ['pool_id', 'iso_weekday', 'local_minute'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_visitor_pool_weekday_minute', table_name='visitor_records')
+    op.drop_index('ix_visitor_pool_local_date', table_name='visitor_records')
+    op.drop_column('visitor_records', 'iso_weekday')
+    op.drop_column('visitor_records', 'local_minute')
+    op.drop_column('visitor_records', 'local_hour')
+    op.drop_column('visitor_records', 'local_date')
@@ -0,0 +1,44 @@
+"""Minute-of-day baseline curves per pool weekday
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-17
+
+Populate the table with scripts/backfill_rollups.py after upgrading.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '012'
+down_revision: Union[str, None] = '011'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'pool_baseline_curves',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('pool_id', sa.Integer(), nullable=False),
+        sa.Column('weekday', sa.Integer(), nullable=False),
+        sa.Column('start_minute', sa.Integer(), nullable=False),
+        sa.Column('cum_sum', sa.Text(), nullable=False),
+        sa.Column('cum_count', sa.Text(), nullable=False),
+        sa.Column('cum_min', sa.Text(), nullable=False),
+        sa.Column('cum_max', sa.Text(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['pool_id'], ['pools.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('pool_id', 'weekday', name='uq_baseline_curve_pool_weekday')
+    )
+    op.create_index(op.f('ix_pool_baseline_curves_id'), 'pool_baseline_curves', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_pool_baseline_curves_id'), table_name='pool_baseline_curves')
+    op.drop_table('pool_baseline_curves')
@@ -0,0 +1,32 @@
+"""Per-pool marker for rollups that cover the whole history
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-17
+
+Existing pools are marked as not backfilled; scripts/backfill_rollups.py
+marks each pool it rebuilds. Pools created later start out backfilled.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '013'
+down_revision: Union[str, None] = '012'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'pools', sa.Column('rollups_backfilled', sa.Boolean(), nullable=False, server_default=sa.false())
+    )
+    op.alter_column('pools', 'rollups_backfilled', server_default=sa.true())
+
+
+def downgrade() -> None:
+    op.drop_column('pools', 'rollups_backfilled')
@@ -1,13 +1,18 @@
 from typing import List, Optional
 from datetime import date
-from fastapi import APIRouter, Depends, Query, HTTPException, status
+from fastapi import APIRouter, Depends, Query, HTTPException, Response, status
 from sqlalchemy.orm import Session
 
 from app.db.database import get_db
+from app.db.redis import get_redis
 from app.schemas.analytics import (
-    WeekdayAverage, HeatmapData, DailySummary, TrendData, WeekdayAverageUpToNow
+    WeekdayAverage, HeatmapData, DailySummary, TrendData, WeekdayAverageUpToNow, SlotStatsHeatmap,
+    PercentileHeatmapData, PercentileBands, NowVsTypical, BestTimes, AnalyticsBundle, PoolComparison
 )
-from app.services.analytics_service import AnalyticsService
+from app.services.analytics_service import BUNDLE_SECTIONS, AnalyticsService
+from app.services.analytics_cache_service import AnalyticsCacheService
+from app.services.best_time_service import BestTimeService, minute_of_day
+from app.services.slot_stats_service import KIND_RECENT, KIND_TYPICAL, SlotStatsService
 from app.services.pool_service import PoolService
 from app.core.security import get_current_user
 from app.models.user import User
@@ -15,41 +20,126 @@ from app.models.user import User
 router = APIRouter(prefix="/analytics", tags=["Analytics"])
 
 
+def serve_snapshot(response: Response, db: Session, pool_id: int, view: str, **params):
+    """Serve an analytics view from its Redis snapshot, with freshness headers.
+
+    Unknown pools compute no view and get a 404; snapshot hits need no query.
+    """
+    snapshot = AnalyticsCacheService(db, get_redis()).get(pool_id, view, **params)
+    if snapshot.data is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Pool not found"
+        )
+    response.headers.update(snapshot.headers())
+    return snapshot.data
+
+
+def check_bundle_params(sections: Optional[List[str]], period: str) -> None:
+    unknown = sorted(set(sections or []) - set(BUNDLE_SECTIONS))
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown sections: {', '.join(unknown)}"
+        )
+    if period not in ["weekly", "monthly"]:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Period must be 'weekly' or 'monthly'"
+        )
+
+
 @router.get("/weekday-averages", response_model=List[WeekdayAverage])
 def get_weekday_averages(
+    response: Response,
     pool_id: int = Query(..., description="Pool ID"),
+    start_date: Optional[date] = Query(None, description="Start date (YYYY-MM-DD)"),
+    end_date: Optional[date] = Query(None, description="End date (YYYY-MM-DD)"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get average visitor counts by weekday and hour for a pool."""
-    # Verify pool exists
-    pool_service = PoolService(db)
-    if not pool_service.get_by_id(pool_id):
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Pool not found"
-        )
-
-    analytics = AnalyticsService(db)
-    return analytics.get_weekday_averages(pool_id)
+    return serve_snapshot(
+        response, db, pool_id, "weekday_averages", start_date=start_date, end_date=end_date
+    )
 
 
 @router.get("/heatmap", response_model=HeatmapData)
 def get_heatmap_data(
+    response: Response,
     pool_id: int = Query(..., description="Pool ID"),
+    start_date: Optional[date] = Query(None, description="Start date (YYYY-MM-DD)"),
+    end_date: Optional[date] = Query(None, description="End date (YYYY-MM-DD)"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get heatmap data (weekday x hour) for a pool."""
-    analytics = AnalyticsService(db)
-    data = analytics.get_heatmap_data(pool_id)
+    return serve_snapshot(response, db, pool_id, "heatmap", start_date=start_date, end_date=end_date)
+
 
+@router.get("/heatmap/percentile", response_model=PercentileHeatmapData)
+def get_percentile_heatmap(
+    response: Response,
+    pool_id: int = Query(..., description="Pool ID"),
+    percentile: float = Query(90, ge=0, le=100, description="Percentile of visitors per cell"),
+    start_date: Optional[date] = Query(None, description="Start date (YYYY-MM-DD)"),
+    end_date: Optional[date] = Query(None, description="End date (YYYY-MM-DD)"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get a visitor percentile per weekday and hour (p90: how busy a bad day gets)."""
+    return serve_snapshot(
+        response, db, pool_id, "percentile_heatmap",
+        percentile=percentile, start_date=start_date, end_date=end_date
+    )
+
+
+@router.get("/percentile-bands", response_model=PercentileBands)
+def get_percentile_bands(
+    response: Response,
+    pool_id: int = Query(..., description="Pool ID"),
+    weekday: Optional[str] = Query(None, description="Filter by weekday"),
+    start_date: Optional[date] = Query(None, description="Start date (YYYY-MM-DD)"),
+    end_date: Optional[date] = Query(None, description="End date (YYYY-MM-DD)"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get p10/p25/p50/p75/p90 visitors per hour for a pool."""
+    return serve_snapshot(
+        response, db, pool_id, "percentile_bands",
+        weekday=weekday, start_date=start_date, end_date=end_date
+    )
+
+
+@router.get("/heatmap/typical", response_model=SlotStatsHeatmap)
+def get_typical_heatmap(
+    pool_id: int = Query(..., description="Pool ID"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get the all-time mean visitors per weekday and time slot, from online statistics."""
+    data = SlotStatsService(db).get_heatmap(pool_id, KIND_TYPICAL)
     if not data:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Pool not found"
         )
+    return data
+
 
+@router.get("/heatmap/recent", response_model=SlotStatsHeatmap)
+def get_recent_heatmap(
+    pool_id: int = Query(..., description="Pool ID"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get recency-weighted visitors per weekday and time slot, with their trend against typical."""
+    data = SlotStatsService(db).get_heatmap(pool_id, KIND_RECENT)
+    if not data:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Pool not found"
+        )
     return data
 
 
@@ -76,8 +166,11 @@ def get_daily_summary(
 
 @router.get("/trends", response_model=TrendData)
 def get_trends(
+    response: Response,
     pool_id: int = Query(..., description="Pool ID"),
     period: str = Query("weekly", description="Period type: 'weekly' or 'monthly'"),
+    start_date: Optional[date] = Query(None, description="Start date (YYYY-MM-DD)"),
+    end_date: Optional[date] = Query(None, description="End date (YYYY-MM-DD)"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -88,8 +181,36 @@ def get_trends(
             detail="Period must be 'weekly' or 'monthly'"
         )
 
+    return serve_snapshot(
+        response, db, pool_id, "trends", period=period, start_date=start_date, end_date=end_date
+    )
+
+
+@router.get("/peak-hours")
+def get_peak_hours(
+    response: Response,
+    pool_id: int = Query(..., description="Pool ID"),
+    weekday: Optional[str] = Query(None, description="Filter by weekday"),
+    start_date: Optional[date] = Query(None, description="Start date (YYYY-MM-DD)"),
+    end_date: Optional[date] = Query(None, description="End date (YYYY-MM-DD)"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get peak hours analysis for a pool."""
+    return serve_snapshot(
+        response, db, pool_id, "peak_hours", weekday=weekday, start_date=start_date, end_date=end_date
+    )
+
+
+@router.get("/weekday-average-now", response_model=WeekdayAverageUpToNow)
+def get_weekday_average_up_to_now(
+    pool_id: int = Query(..., description="Pool ID"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get average visitor count for current weekday up to current time of day."""
     analytics = AnalyticsService(db)
-    data = analytics.get_trends(pool_id, period)
+    data = analytics.get_weekday_average_up_to_now(pool_id)
 
     if not data:
         raise HTTPException(
@@ -100,35 +221,79 @@ def get_trends(
     return data
 
 
-@router.get("/peak-hours")
-def get_peak_hours(
+@router.get("/bundle", response_model=AnalyticsBundle)
+def get_analytics_bundle(
     pool_id: int = Query(..., description="Pool ID"),
-    weekday: Optional[str] = Query(None, description="Filter by weekday"),
+    sections: Optional[List[str]] = Query(
+        None, description=f"Sections to include (repeat the parameter; default: all of {', '.join(BUNDLE_SECTIONS)})"
+    ),
+    period: str = Query("weekly", description="Trend period type: 'weekly' or 'monthly'"),
+    weekday: Optional[str] = Query(None, description="Filter the peak hours by weekday"),
+    start_date: Optional[date] = Query(None, description="Start date (YYYY-MM-DD)"),
+    end_date: Optional[date] = Query(None, description="End date (YYYY-MM-DD)"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get peak hours analysis for a pool."""
-    # Verify pool exists
-    pool_service = PoolService(db)
-    if not pool_service.get_by_id(pool_id):
+    """Get several analytics views of a pool in one response."""
+    check_bundle_params(sections, period)
+
+    analytics = AnalyticsService(db)
+    data = analytics.get_bundle(pool_id, sections, period, weekday, start_date, end_date)
+
+    if not data:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Pool not found"
         )
 
+    return data
+
+
+@router.get("/bundles", response_model=List[AnalyticsBundle])
+def get_analytics_bundles(
+    pool_ids: List[int] = Query(..., description="Pool IDs (repeat the parameter)"),
+    sections: Optional[List[str]] = Query(
+        None, description=f"Sections to include (repeat the parameter; default: all of {', '.join(BUNDLE_SECTIONS)})"
+    ),
+    period: str = Query("weekly", description="Trend period type: 'weekly' or 'monthly'"),
+    weekday: Optional[str] = Query(None, description="Filter the peak hours by weekday"),
+    start_date: Optional[date] = Query(None, description="Start date (YYYY-MM-DD)"),
+    end_date: Optional[date] = Query(None, description="End date (YYYY-MM-DD)"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get the analytics bundle of several pools, with the rollups of all pools queried together.
+
+    Pools that do not exist are left out.
+    """
+    check_bundle_params(sections, period)
     analytics = AnalyticsService(db)
-    return analytics.get_peak_hours(pool_id, weekday)
+    return analytics.get_bundles(pool_ids, sections, period, weekday, start_date, end_date)
 
 
-@router.get("/weekday-average-now", response_model=WeekdayAverageUpToNow)
-def get_weekday_average_up_to_now(
+@router.get("/compare", response_model=PoolComparison)
+def compare_pools(
+    pool_ids: List[int] = Query(..., description="Pool IDs (repeat the parameter)"),
+    weekday: Optional[str] = Query(None, description="Filter the hourly averages by weekday"),
+    start_date: Optional[date] = Query(None, description="Start date (YYYY-MM-DD)"),
+    end_date: Optional[date] = Query(None, description="End date (YYYY-MM-DD)"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Compare pools: heatmaps and hourly averages aligned on one weekday x hour grid."""
+    analytics = AnalyticsService(db)
+    return analytics.compare_pools(pool_ids, weekday, start_date, end_date)
+
+
+@router.get("/now-vs-typical", response_model=NowVsTypical)
+def get_now_vs_typical(
     pool_id: int = Query(..., description="Pool ID"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get average visitor count for current weekday up to current time of day."""
+    """Compare the latest visitor count with what is typical for this weekday and time."""
     analytics = AnalyticsService(db)
-    data = analytics.get_weekday_average_up_to_now(pool_id)
+    data = analytics.get_now_vs_typical(pool_id)
 
     if not data:
         raise HTTPException(
@@ -137,3 +302,30 @@ def get_weekday_average_up_to_now(
         )
 
     return data
+
+
+@router.get("/best-times", response_model=BestTimes)
+def get_best_times(
+    pool_ids: List[int] = Query(..., description="Pool IDs (repeat the parameter)"),
+    start_time: str = Query("06:00", description="Earliest start (HH:MM)"),
+    end_time: str = Query("23:00", description="Latest end (HH:MM)"),
+    duration_minutes: int = Query(90, ge=15, le=1440, description="Length of the visit"),
+    days: int = Query(7, ge=1, le=7, description="Days to consider, from today"),
+    limit: int = Query(5, ge=1, le=50, description="Number of windows to return"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Find the quietest windows to swim across pools, e.g. 90 minutes between 17:00 and 21:00."""
+    try:
+        first_minute, end_minute = minute_of_day(start_time), minute_of_day(end_time)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Times must be HH:MM between 00:00 and 23:59"
+        )
+    if end_minute - first_minute < duration_minutes:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="The time range is shorter than the duration"
+        )
+    return BestTimeService(db).find_quietest(pool_ids, start_time, end_time, duration_minutes, days, limit)
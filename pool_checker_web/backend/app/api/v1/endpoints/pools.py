@@ -1,11 +1,17 @@
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+import redis
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 
 from app.db.database import get_db
+from app.db.redis import get_redis
 from app.schemas.pool import PoolCreate, PoolUpdate, PoolResponse, PoolWithStats
+from app.schemas.scrape import CircuitBreakerStatus, ScrapeTimingSummary, SchedulerStatsSummary
 from app.services.pool_service import PoolService
 from app.services.visitor_service import VisitorService
+from app.services.scrape_metrics_service import ScrapeMetricsService
+from app.services.scheduler_stats_service import SchedulerStatsService
+from app.services.circuit_breaker_service import CircuitBreakerService
 from app.core.security import get_current_user, get_current_active_superuser
 from app.models.user import User
 
@@ -24,6 +30,37 @@ def list_pools(
     return service.get_all_with_stats()
 
 
+@router.get("/scheduler-stats", response_model=SchedulerStatsSummary)
+def get_scheduler_stats(
+    days: int = Query(7, ge=1, le=35),
+    current_user: User = Depends(get_current_user)
+):
+    """Get adaptive scheduling decisions and the scrapes they saved."""
+    try:
+        return SchedulerStatsService(get_redis()).get_summary(days)
+    except redis.RedisError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Scheduler stats are unavailable"
+        )
+
+
+@router.get("/circuit-breakers", response_model=List[CircuitBreakerStatus])
+def list_circuit_breakers(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get the scrape circuit breaker of every active pool."""
+    pool_ids = [pool.id for pool in PoolService(db).get_active()]
+    try:
+        return CircuitBreakerService(get_redis()).get_statuses(pool_ids)
+    except redis.RedisError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Circuit breakers are unavailable"
+        )
+
+
 @router.get("/{pool_id}", response_model=PoolWithStats)
 def get_pool(
     pool_id: int,
@@ -165,3 +202,74 @@ def trigger_scrape(
         "task_id": task.id,
         "pool_id": pool_id
     }
+
+
+@router.get("/{pool_id}/scrape-timings", response_model=ScrapeTimingSummary)
+def get_scrape_timings(
+    pool_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get per-phase scrape timings for a pool (for tuning readiness timeouts)."""
+    service = PoolService(db)
+    if not service.get_by_id(pool_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Pool not found"
+        )
+
+    try:
+        return ScrapeMetricsService(get_redis()).get_summary(pool_id)
+    except redis.RedisError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Scrape metrics are unavailable"
+        )
+
+
+@router.get("/{pool_id}/circuit-breaker", response_model=CircuitBreakerStatus)
+def get_circuit_breaker(
+    pool_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get a pool's scrape circuit breaker and its last failure reason."""
+    service = PoolService(db)
+    if not service.get_by_id(pool_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Pool not found"
+        )
+
+    try:
+        return CircuitBreakerService(get_redis()).get(pool_id).to_status(pool_id)
+    except redis.RedisError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Circuit breakers are unavailable"
+        )
+
+
+@router.post("/{pool_id}/circuit-breaker/reset", response_model=CircuitBreakerStatus)
+def reset_circuit_breaker(
+    pool_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_superuser)
+):
+    """Close a pool's circuit breaker so it is scraped again right away (admin only)."""
+    service = PoolService(db)
+    if not service.get_by_id(pool_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Pool not found"
+        )
+
+    try:
+        breakers = CircuitBreakerService(get_redis())
+        breakers.reset(pool_id)
+        return breakers.get(pool_id).to_status(pool_id)
+    except redis.RedisError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Circuit breakers are unavailable"
+        )
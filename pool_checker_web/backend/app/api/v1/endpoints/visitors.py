@@ -1,13 +1,15 @@
 from typing import List, Optional
 from datetime import date
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from app.db.database import get_db
 from app.schemas.visitor import (
     VisitorRecordResponse, VisitorRecordFilter, LatestVisitorResponse, PaginatedVisitorResponse
 )
-from app.services.visitor_service import VisitorService
+from app.services.export_service import ExportService
+from app.services.visitor_service import InvalidCursor, VisitorService
 from app.core.security import get_current_user
 from app.models.user import User
 
@@ -16,26 +18,88 @@ router = APIRouter(prefix="/visitors", tags=["Visitors"])
 
 @router.get("", response_model=List[VisitorRecordResponse])
 def list_visitors(
+    response: Response,
     pool_id: Optional[int] = Query(None, description="Filter by pool ID"),
     start_date: Optional[date] = Query(None, description="Start date (YYYY-MM-DD)"),
     end_date: Optional[date] = Query(None, description="End date (YYYY-MM-DD)"),
     weekday: Optional[str] = Query(None, description="Filter by weekday (e.g., Monday)"),
+    start_hour: Optional[int] = Query(None, ge=0, le=23, description="From this hour (pool-local)"),
+    end_hour: Optional[int] = Query(None, ge=0, le=23, description="Up to and including this hour (pool-local)"),
     limit: int = Query(100, ge=1, le=10000, description="Max records to return"),
-    offset: int = Query(0, ge=0, description="Number of records to skip"),
+    offset: int = Query(0, ge=0, description="Number of records to skip (ignored with a cursor)"),
+    cursor: Optional[str] = Query(None, description="Cursor of the next page, from the previous page"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get visitor records with filters."""
+    """Get visitor records with filters, newest first.
+
+    The X-Next-Cursor header holds the cursor of the next page, if there is one.
+    """
     service = VisitorService(db)
     filters = VisitorRecordFilter(
         pool_id=pool_id,
         start_date=start_date,
         end_date=end_date,
         weekday=weekday,
+        start_hour=start_hour,
+        end_hour=end_hour,
         limit=limit,
-        offset=offset
+        offset=offset,
+        cursor=cursor
+    )
+    try:
+        records, next_cursor = service.get_page(filters)
+    except InvalidCursor:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return records
+
+
+@router.get("/export")
+def export_visitors(
+    pool_id: Optional[int] = Query(None, description="Filter by pool ID"),
+    pool_ids: Optional[List[int]] = Query(None, description="Filter by several pools (repeat the parameter)"),
+    start_date: Optional[date] = Query(None, description="Start date (YYYY-MM-DD)"),
+    end_date: Optional[date] = Query(None, description="End date (YYYY-MM-DD)"),
+    weekday: Optional[str] = Query(None, description="Filter by weekday (e.g., Monday)"),
+    start_hour: Optional[int] = Query(None, ge=0, le=23, description="From this hour (pool-local)"),
+    end_hour: Optional[int] = Query(None, ge=0, le=23, description="Up to and including this hour (pool-local)"),
+    format: str = Query(
+        "csv", pattern="^(csv|ndjson|parquet|arrow)$",
+        description="File format: 'csv', 'ndjson', 'parquet' or 'arrow' (Arrow IPC file)"
+    ),
+    gzip: bool = Query(False, description="Compress a csv or ndjson file with gzip"),
+    current_user: User = Depends(get_current_user)
+):
+    """Stream all matching visitor records as a file, oldest first, without a row limit.
+
+    Parquet and Arrow files have typed columns and one row group per month.
+    """
+    if not ExportService.available(format):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"The {format} format needs pyarrow, which is not installed"
+        )
+
+    filters = VisitorRecordFilter(
+        pool_id=pool_id,
+        pool_ids=pool_ids,
+        start_date=start_date,
+        end_date=end_date,
+        weekday=weekday,
+        start_hour=start_hour,
+        end_hour=end_hour
+    )
+    service = ExportService()
+    return StreamingResponse(
+        service.stream(filters, format, gzip),
+        media_type=service.media_type(format, gzip),
+        headers={"Content-Disposition": f'attachment; filename="{service.filename(filters, format, gzip)}"'}
     )
-    return service.get_filtered(filters)
 
 
 @router.get("/latest", response_model=List[LatestVisitorResponse])
@@ -77,19 +141,35 @@ def get_visitors_paginated(
     start_date: Optional[date] = Query(None, description="Start date (YYYY-MM-DD)"),
     end_date: Optional[date] = Query(None, description="End date (YYYY-MM-DD)"),
     weekday: Optional[str] = Query(None, description="Filter by weekday (e.g., Monday)"),
+    start_hour: Optional[int] = Query(None, ge=0, le=23, description="From this hour (pool-local)"),
+    end_hour: Optional[int] = Query(None, ge=0, le=23, description="Up to and including this hour (pool-local)"),
     limit: int = Query(50, ge=1, le=1000, description="Max records to return"),
-    offset: int = Query(0, ge=0, description="Number of records to skip"),
+    offset: int = Query(0, ge=0, description="Number of records to skip (ignored with a cursor)"),
+    cursor: Optional[str] = Query(None, description="Cursor of the next page, from the previous page"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get visitor records with pagination info (for raw data view)."""
+    """Get visitor records with pagination info (for raw data view).
+
+    Follow next_cursor for constant-time deep pages; the total comes from
+    the hourly rollups instead of counting the records.
+    """
     service = VisitorService(db)
     filters = VisitorRecordFilter(
         pool_id=pool_id,
         start_date=start_date,
         end_date=end_date,
         weekday=weekday,
+        start_hour=start_hour,
+        end_hour=end_hour,
         limit=limit,
-        offset=offset
+        offset=offset,
+        cursor=cursor
     )
-    return service.get_paginated(filters)
+    try:
+        return service.get_paginated(filters)
+    except InvalidCursor:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
@@ -9,6 +9,7 @@ class Settings(BaseSettings):
 
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
+    REDIS_SOCKET_TIMEOUT_SECONDS: float = 2.0
 
     # JWT Settings
     SECRET_KEY: str = "your_super_secret_key_here_change_in_production"
@@ -28,6 +29,102 @@ class Settings(BaseSettings):
     API_V1_PREFIX: str = "/api/v1"
     PROJECT_NAME: str = "Pool Visitor Tracker"
 
+    # Scraper browser pool (per worker process)
+    BROWSER_POOL_SIZE: int = 1
+    BROWSER_MAX_PAGES: int = 50
+    BROWSER_MAX_RSS_MB: int = 600
+    BROWSER_LEASE_TIMEOUT_SECONDS: int = 60
+
+    # Scraper readiness polling and timing history
+    SCRAPE_READY_POLL_SECONDS: float = 0.25
+    SCRAPE_TIMING_HISTORY: int = 200
+
+    # Browserless HTTP fetching
+    SCRAPE_USER_AGENT: str = "Mozilla/5.0 (X11; Linux x86_64) PoolVisitorTracker/1.0"
+    HTTP_FETCH_TIMEOUT_SECONDS: float = 10.0
+    HTTP_FETCH_MAX_CONNECTIONS: int = 20
+    HTTP_FETCH_MAX_KEEPALIVE: int = 10
+    DISCOVERY_COOLDOWN_MINUTES: int = 60
+
+    # Batched scraping: "per_page" queues one task per fetch group,
+    # "batched" scrapes up to SCRAPE_BATCH_SIZE pools concurrently per task
+    SCRAPE_DISPATCH_MODE: str = "per_page"
+    SCRAPE_BATCH_SIZE: int = 50
+    SCRAPE_BATCH_CONCURRENCY: int = 20
+    SCRAPE_BATCH_PER_HOST: int = 4
+    SCRAPE_BATCH_TABS_PER_BROWSER: int = 6
+    SCRAPE_BATCH_DEADLINE_SECONDS: float = 180.0
+
+    # Scheduler: dispatch_due_pools runs every minute and queues pools due within the lookahead
+    SCHEDULER_LOOKAHEAD_SECONDS: int = 60
+
+    # Adaptive scheduling: aim for about SCHEDULER_TARGET_CHANGE visitors of change
+    # between scrapes, learned from SCHEDULER_PROFILE_WEEKS of visitor records
+    SCHEDULER_TARGET_CHANGE: float = 5.0
+    SCHEDULER_PROFILE_WEEKS: int = 6
+    SCHEDULER_PROFILE_SLOT_MINUTES: int = 30
+    SCHEDULER_MAX_READING_GAP_MINUTES: int = 90
+    SCHEDULER_DECISION_HISTORY: int = 500
+
+    # Scrape ingest: "stream" queues readings in a Redis stream that is written
+    # to visitor_records in batches, "local" buffers them in the worker process,
+    # "direct" writes each reading from the scrape task
+    SCRAPE_INGEST_MODE: str = "stream"
+    SCRAPE_INGEST_STREAM: str = "scrape:readings"
+    SCRAPE_INGEST_STREAM_MAXLEN: int = 100000
+    SCRAPE_INGEST_BATCH_SIZE: int = 500
+    SCRAPE_INGEST_MAX_LATENCY_SECONDS: float = 5.0
+    SCRAPE_INGEST_CLAIM_IDLE_SECONDS: int = 60
+    SCRAPE_INGEST_RETRY_SECONDS: float = 10.0
+
+    # Per-pool circuit breaker: open after BREAKER_FAILURE_THRESHOLD consecutive
+    # failed scrapes, probe again after a cooldown that doubles up to the max
+    BREAKER_FAILURE_THRESHOLD: int = 5
+    BREAKER_BASE_COOLDOWN_MINUTES: int = 10
+    BREAKER_MAX_COOLDOWN_MINUTES: int = 360
+
+    # Analytics snapshots in Redis. New readings patch them within seconds when
+    # ANALYTICS_REALTIME_UPDATES is on; refresh_analytics_cache rebuilds them
+    # every 15 minutes, and the TTL covers missed refreshes
+    ANALYTICS_SNAPSHOT_TTL_SECONDS: int = 10800
+    ANALYTICS_REALTIME_UPDATES: bool = True
+
+    # Online per-slot statistics; rerun scripts/backfill_rollups.py after
+    # changing the slot size
+    ONLINE_STATS_SLOT_MINUTES: int = 60
+    ONLINE_STATS_HALF_LIFE_DAYS: float = 28.0
+
+    # Quantile sketches of the hourly rollups: higher compression keeps more
+    # centroids (more accurate percentiles, larger rows)
+    QUANTILE_SKETCH_COMPRESSION: int = 100
+
+    # Opening hours analytics consider (local hours, inclusive) and the
+    # minute-of-day baseline curves; rerun scripts/backfill_rollups.py after
+    # changing the hours. "Now vs typical" compares the latest reading with
+    # the typical visitors of a window around now and calls the pool busier
+    # or quieter beyond BASELINE_BUSY_RATIO either way
+    ANALYTICS_OPEN_HOUR: int = 6
+    ANALYTICS_CLOSE_HOUR: int = 22
+    BASELINE_WINDOW_MINUTES: int = 30
+    BASELINE_BUSY_RATIO: float = 1.25
+
+    # Best-time-to-swim index: expected crowd per slot from the baseline
+    # curves, kept in memory per API process; reloaded when new readings are
+    # stored, or after the TTL while Redis is unavailable
+    BEST_TIME_SLOT_MINUTES: int = 15
+    BEST_TIME_INDEX_TTL_SECONDS: int = 300
+
+    # Analytics engine: "sql" aggregates the hourly rollups in the database,
+    # "numpy" keeps each pool's readings in memory and aggregates them with
+    # vectorized operations (falls back to "sql" if NumPy is not installed)
+    ANALYTICS_ENGINE: str = "sql"
+    ANALYTICS_ENGINE_RELOAD_SECONDS: int = 3600
+
+    # Columnar store: per-pool column files appended by the ingest path and
+    # memory-mapped by the numpy analytics engine instead of loading history
+    # from the database ("" disables it; share the directory between services)
+    COLUMN_STORE_DIR: str = ""
+
     # Admin
     ADMIN_EMAIL: str = "admin@example.com"
     ADMIN_USERNAME: str = "admin"
@@ -0,0 +1,18 @@
+import redis
+
+from app.config import settings
+
+_client = None
+
+
+def get_redis() -> redis.Redis:
+    """Get the shared Redis client (lazily connected, safe across forks)."""
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(
+            settings.REDIS_URL,
+            decode_responses=True,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+            socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS
+        )
+    return _client
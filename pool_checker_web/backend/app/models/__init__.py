@@ -1,5 +1,12 @@
 from app.models.user import User
 from app.models.pool import Pool
 from app.models.visitor import VisitorRecord
+from app.models.change_profile import PoolChangeProfile
+from app.models.rollup import VisitorHourlyRollup
+from app.models.slot_stats import PoolSlotStats
+from app.models.baseline import PoolBaselineCurve
 
-__all__ = ["User", "Pool", "VisitorRecord"]
+__all__ = [
+    "User", "Pool", "VisitorRecord", "PoolChangeProfile", "VisitorHourlyRollup", "PoolSlotStats",
+    "PoolBaselineCurve"
+]
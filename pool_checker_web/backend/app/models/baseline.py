@@ -0,0 +1,30 @@
+from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.sql import func
+
+from app.db.database import Base
+
+
+class PoolBaselineCurve(Base):
+    """Cumulative visitor statistics of a pool weekday, minute by minute.
+
+    Each curve is a JSON array with one entry per minute from start_minute
+    (the opening hour) to the closing hour: the sum, count, minimum and
+    maximum of all readings up to and including that minute of the day.
+    Any range of the day then takes two lookups.
+    """
+
+    __tablename__ = "pool_baseline_curves"
+
+    id = Column(Integer, primary_key=True, index=True)
+    pool_id = Column(Integer, ForeignKey("pools.id", ondelete="CASCADE"), nullable=False)
+    weekday = Column(Integer, nullable=False)  # 0 = Monday, in the pool's timezone
+    start_minute = Column(Integer, nullable=False)  # minute of day of the first entry
+    cum_sum = Column(Text, nullable=False)
+    cum_count = Column(Text, nullable=False)
+    cum_min = Column(Text, nullable=False)  # null until the first reading
+    cum_max = Column(Text, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("pool_id", "weekday", name="uq_baseline_curve_pool_weekday"),
+    )
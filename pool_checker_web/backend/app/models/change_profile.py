@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.sql import func
+
+from app.db.database import Base
+
+
+class PoolChangeProfile(Base):
+    """How fast a pool's count typically changes in one weekday time slot."""
+
+    __tablename__ = "pool_change_profiles"
+
+    id = Column(Integer, primary_key=True, index=True)
+    pool_id = Column(Integer, ForeignKey("pools.id", ondelete="CASCADE"), nullable=False)
+    weekday = Column(Integer, nullable=False)  # 0 = Monday, in the pool's timezone
+    slot = Column(Integer, nullable=False)  # index of the SCHEDULER_PROFILE_SLOT_MINUTES slot
+    change_rate = Column(Float, nullable=False)  # mean absolute change, visitors per minute
+    samples = Column(Integer, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("pool_id", "weekday", "slot", name="uq_change_profile_pool_slot"),
+    )
@@ -16,6 +16,19 @@ class Pool(Base):
     scrape_start_time = Column(String(5), default="05:50")
     scrape_end_time = Column(String(5), default="22:10")
     scrape_interval_minutes = Column(Integer, default=10)
+    adaptive_scheduling = Column(Boolean, default=False)
+    min_scrape_interval_minutes = Column(Integer, default=5)
+    max_scrape_interval_minutes = Column(Integer, default=30)
+    ready_timeout_seconds = Column(Integer, default=15)
+    block_resources = Column(Boolean, default=False)
+    fetch_strategy = Column(String(20), default="selenium")
+    data_url = Column(Text, nullable=True)
+    json_path = Column(String(200), nullable=True)
+    endpoint_discovered_at = Column(DateTime(timezone=True), nullable=True)
+    next_scrape_at = Column(DateTime(timezone=True), nullable=True, index=True)
+    # Whether the hourly rollups count all of the pool's records (false for
+    # history stored before them, until scripts/backfill_rollups.py runs)
+    rollups_backfilled = Column(Boolean, nullable=False, default=True)
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
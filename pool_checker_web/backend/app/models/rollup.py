@@ -0,0 +1,30 @@
+from sqlalchemy import (
+    Column, Integer, BigInteger, String, Text, Date, DateTime, ForeignKey, Index, UniqueConstraint
+)
+from sqlalchemy.sql import func
+
+from app.db.database import Base
+
+
+class VisitorHourlyRollup(Base):
+    """Aggregated visitor readings of one pool-local hour, kept up to date at ingest."""
+
+    __tablename__ = "visitor_hourly_rollups"
+
+    id = Column(Integer, primary_key=True, index=True)
+    pool_id = Column(Integer, ForeignKey("pools.id", ondelete="CASCADE"), nullable=False)
+    local_date = Column(Date, nullable=False)  # in the pool's timezone
+    hour = Column(Integer, nullable=False)  # 0-23, in the pool's timezone
+    weekday = Column(String(10), nullable=False)  # e.g. "Monday", as in visitor_records
+    reading_count = Column(Integer, nullable=False)
+    visitor_sum = Column(BigInteger, nullable=False)
+    visitor_min = Column(Integer, nullable=False)
+    visitor_max = Column(Integer, nullable=False)
+    visitor_sum_squares = Column(BigInteger, nullable=False)
+    visitor_sketch = Column(Text)  # QuantileSketch JSON, merged across hours for percentiles
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("pool_id", "local_date", "hour", name="uq_hourly_rollup_pool_hour"),
+        Index("ix_hourly_rollup_pool_weekday", "pool_id", "weekday"),
+    )
@@ -0,0 +1,31 @@
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.sql import func
+
+from app.db.database import Base
+
+
+class PoolSlotStats(Base):
+    """Running visitor statistics of one weekday time slot, updated reading by reading.
+
+    count/mean/m2 are Welford's running mean and sum of squared deviations.
+    decayed_sum/decayed_weight hold an exponentially time-weighted mean as
+    of decayed_at, so recent weeks count more than old ones.
+    """
+
+    __tablename__ = "pool_slot_stats"
+
+    id = Column(Integer, primary_key=True, index=True)
+    pool_id = Column(Integer, ForeignKey("pools.id", ondelete="CASCADE"), nullable=False)
+    weekday = Column(Integer, nullable=False)  # 0 = Monday, in the pool's timezone
+    slot = Column(Integer, nullable=False)  # index of the ONLINE_STATS_SLOT_MINUTES slot
+    count = Column(Integer, nullable=False, default=0)
+    mean = Column(Float, nullable=False, default=0.0)
+    m2 = Column(Float, nullable=False, default=0.0)
+    decayed_sum = Column(Float, nullable=False, default=0.0)
+    decayed_weight = Column(Float, nullable=False, default=0.0)
+    decayed_at = Column(DateTime(timezone=True))  # time the decayed sums refer to
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("pool_id", "weekday", "slot", name="uq_slot_stats_pool_slot"),
+    )
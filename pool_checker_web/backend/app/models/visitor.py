@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+from sqlalchemy import Column, Integer, SmallInteger, String, Date, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -14,6 +14,11 @@ class VisitorRecord(Base):
     weekday = Column(String(10), nullable=False)
     visitor_count = Column(Integer, nullable=False)
     week_number = Column(Integer)
+    # Buckets in the pool's timezone, set on insert so filters need no per-row conversion
+    local_date = Column(Date)
+    local_hour = Column(SmallInteger)
+    local_minute = Column(SmallInteger)  # minute of the day
+    iso_weekday = Column(SmallInteger)  # 1 = Monday
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationship to pool
@@ -21,6 +26,9 @@ class VisitorRecord(Base):
 
     # Composite indexes for common queries
     __table_args__ = (
-        Index("ix_visitor_pool_timestamp", "pool_id", "timestamp"),
+        # Unique so batched ingest can skip readings it already stored
+        Index("ix_visitor_pool_timestamp", "pool_id", "timestamp", unique=True),
         Index("ix_visitor_pool_weekday", "pool_id", "weekday"),
+        Index("ix_visitor_pool_local_date", "pool_id", "local_date", "local_minute"),
+        Index("ix_visitor_pool_weekday_minute", "pool_id", "iso_weekday", "local_minute"),
     )
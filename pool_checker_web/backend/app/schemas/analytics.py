@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from datetime import date
+from datetime import date, datetime
 from typing import List, Optional
 
 
@@ -24,12 +24,34 @@ class HeatmapData(BaseModel):
     max_value: float
 
 
+class PercentileHeatmapData(HeatmapData):
+    percentile: float  # each cell's value is this percentile of its readings
+
+
+class PercentileBand(BaseModel):
+    hour: int
+    p10: float
+    p25: float
+    p50: float
+    p75: float
+    p90: float
+    sample_count: int
+
+
+class PercentileBands(BaseModel):
+    pool_id: int
+    pool_name: str
+    weekday: Optional[str] = None  # None: all weekdays
+    data: List[PercentileBand]
+
+
 class DailySummary(BaseModel):
     date: date
     pool_id: int
     min_visitors: int
     max_visitors: int
     avg_visitors: float
+    std_visitors: Optional[float] = None
     total_readings: int
 
 
@@ -56,3 +78,89 @@ class WeekdayAverageUpToNow(BaseModel):
     min_visitors: int
     max_visitors: int
     sample_count: int
+
+
+class AnalyticsBundle(BaseModel):
+    pool_id: int
+    pool_name: str
+    # Sections that were not requested stay None
+    heatmap: Optional[HeatmapData] = None
+    weekday_averages: Optional[List[WeekdayAverage]] = None
+    peak_hours: Optional[dict] = None
+    trends: Optional[TrendData] = None
+    daily_summary: Optional[List[DailySummary]] = None
+    weekday_average_now: Optional[WeekdayAverageUpToNow] = None
+
+
+class ComparedPool(BaseModel):
+    pool_id: int
+    pool_name: str
+    heatmap: List[List[Optional[float]]]  # [weekday][hour] on the comparison's grid
+    hourly_averages: List[Optional[float]]  # per hour of the grid
+    peak_hour: Optional[int] = None
+    quietest_hour: Optional[int] = None
+
+
+class PoolComparison(BaseModel):
+    weekdays: List[str]
+    hours: List[int]
+    weekday: Optional[str] = None  # None: hourly averages over all weekdays
+    min_value: float  # over all pools' heatmaps, for a shared color scale
+    max_value: float
+    pools: List[ComparedPool]
+
+
+class NowVsTypical(BaseModel):
+    pool_id: int
+    pool_name: str
+    weekday: str
+    current_time: str
+    current_visitors: Optional[int] = None  # latest reading, if within the window
+    current_reading_at: Optional[datetime] = None
+    typical_visitors: Optional[float] = None  # mean of this weekday's readings in the window
+    sample_count: int
+    window_minutes: int
+    ratio: Optional[float] = None  # current / typical
+    status: str  # "busier", "usual", "quieter" or "unknown"
+
+
+class BestTimeWindow(BaseModel):
+    pool_id: int
+    pool_name: str
+    date: date
+    weekday: str
+    start_time: str
+    end_time: str
+    expected_visitors: float  # mean expected visitors over the window
+
+
+class BestTimes(BaseModel):
+    start_time: str
+    end_time: str
+    duration_minutes: int
+    slot_minutes: int
+    windows: List[BestTimeWindow]  # quietest first
+
+
+class SlotStatsCell(BaseModel):
+    weekday: str
+    slot: int
+    start_time: str  # "HH:MM", pool-local
+    value: float  # typical or recent, depending on the heatmap kind
+    typical: float
+    stddev: float
+    recent: Optional[float] = None
+    trend: Optional[float] = None  # recent minus typical
+    samples: int
+    last_reading_at: Optional[datetime] = None
+
+
+class SlotStatsHeatmap(BaseModel):
+    pool_id: int
+    pool_name: str
+    kind: str  # "typical" or "recent"
+    slot_minutes: int
+    half_life_days: float
+    data: List[SlotStatsCell]
+    min_value: float
+    max_value: float
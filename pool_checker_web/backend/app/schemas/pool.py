@@ -11,6 +11,14 @@ class PoolBase(BaseModel):
     scrape_start_time: str = Field(default="05:50", pattern=r"^\d{2}:\d{2}$")
     scrape_end_time: str = Field(default="22:10", pattern=r"^\d{2}:\d{2}$")
     scrape_interval_minutes: int = Field(default=10, ge=1, le=60)
+    adaptive_scheduling: bool = False
+    min_scrape_interval_minutes: int = Field(default=5, ge=1, le=60)
+    max_scrape_interval_minutes: int = Field(default=30, ge=1, le=240)
+    ready_timeout_seconds: int = Field(default=15, ge=1, le=120)
+    block_resources: bool = False
+    fetch_strategy: str = Field(default="selenium", pattern=r"^(selenium|http|json|discover)$")
+    data_url: Optional[str] = None
+    json_path: Optional[str] = Field(None, max_length=200)
     is_active: bool = True
 
 
@@ -26,12 +34,22 @@ class PoolUpdate(BaseModel):
     scrape_start_time: Optional[str] = Field(None, pattern=r"^\d{2}:\d{2}$")
     scrape_end_time: Optional[str] = Field(None, pattern=r"^\d{2}:\d{2}$")
     scrape_interval_minutes: Optional[int] = Field(None, ge=1, le=60)
+    adaptive_scheduling: Optional[bool] = None
+    min_scrape_interval_minutes: Optional[int] = Field(None, ge=1, le=60)
+    max_scrape_interval_minutes: Optional[int] = Field(None, ge=1, le=240)
+    ready_timeout_seconds: Optional[int] = Field(None, ge=1, le=120)
+    block_resources: Optional[bool] = None
+    fetch_strategy: Optional[str] = Field(None, pattern=r"^(selenium|http|json|discover)$")
+    data_url: Optional[str] = None
+    json_path: Optional[str] = Field(None, max_length=200)
     is_active: Optional[bool] = None
 
 
 class PoolResponse(PoolBase):
     id: int
     created_at: datetime
+    endpoint_discovered_at: Optional[datetime] = None
+    next_scrape_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
@@ -0,0 +1,65 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Dict, List, Optional
+
+
+class ScrapeTimingSample(BaseModel):
+    timestamp: datetime
+    success: bool
+    error: Optional[str] = None
+    timings: Dict[str, float]  # phase name ("acquire_ms", "navigate_ms", ...) -> ms
+
+
+class PhaseTimingStats(BaseModel):
+    phase: str
+    count: int
+    p50_ms: float
+    p95_ms: float
+    max_ms: float
+
+
+class ScrapeTimingSummary(BaseModel):
+    pool_id: int
+    sample_count: int
+    success_rate: float
+    phases: List[PhaseTimingStats]
+    recent: List[ScrapeTimingSample]
+
+
+class IntervalDecisionResponse(BaseModel):
+    pool_id: int
+    decided_at: datetime
+    interval_minutes: int
+    base_interval_minutes: int
+    change_rate: Optional[float] = None  # visitors per minute the decision was based on
+    reason: str  # "faster", "slower", "unchanged" or "no_data"
+    scrapes_saved: float  # versus the fixed interval; negative when scraping faster
+
+
+class SchedulerDayStats(BaseModel):
+    date: str
+    decisions: int
+    faster: int
+    slower: int
+    unchanged: int
+    scrapes_saved: float
+    baseline_scrapes: float  # scrapes the fixed intervals would have made
+    savings_ratio: float
+
+
+class SchedulerStatsSummary(BaseModel):
+    days: List[SchedulerDayStats]
+    recent: List[IntervalDecisionResponse]
+
+
+class CircuitBreakerStatus(BaseModel):
+    pool_id: int
+    state: str  # "closed", "open" or "half_open"
+    consecutive_failures: int
+    trips: int  # times the breaker opened
+    cooldown_seconds: int
+    open_until: Optional[datetime] = None
+    last_error: Optional[str] = None
+    last_failure_at: Optional[datetime] = None
+    last_success_at: Optional[datetime] = None
+    failed_time_ms: float  # worker time spent on failed scrapes
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from datetime import datetime, date
+from datetime import datetime, date, timezone
 from typing import Optional, List
 
 
@@ -15,6 +15,41 @@ class VisitorRecordCreate(VisitorRecordBase):
     pass
 
 
+def local_time_fields(timestamp: datetime, tz=None) -> dict:
+    """Pool-local bucket columns of a visitor record; naive timestamps are UTC.
+
+    Without a timezone the timestamp's own offset is used.
+    """
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    local = timestamp.astimezone(tz) if tz else timestamp
+    return {
+        "local_date": local.date(),
+        "local_hour": local.hour,
+        "local_minute": local.hour * 60 + local.minute,
+        "iso_weekday": local.isoweekday(),
+    }
+
+
+class ScrapeReading(BaseModel):
+    """A scraped visitor count on its way to visitor_records."""
+    pool_id: int
+    visitor_count: int = Field(..., ge=0)
+    timestamp: datetime  # in the pool's timezone
+
+    def to_record_fields(self, tz=None) -> dict:
+        """Column values of the reading's visitor record, bucketed in the pool's timezone tz."""
+        local = local_time_fields(self.timestamp, tz)
+        return {
+            "pool_id": self.pool_id,
+            "timestamp": self.timestamp,
+            "weekday": local["local_date"].strftime('%A'),
+            "visitor_count": self.visitor_count,
+            "week_number": local["local_date"].isocalendar()[1],
+            **local,
+        }
+
+
 class VisitorRecordResponse(VisitorRecordBase):
     id: int
     created_at: datetime
@@ -25,11 +60,15 @@ class VisitorRecordResponse(VisitorRecordBase):
 
 class VisitorRecordFilter(BaseModel):
     pool_id: Optional[int] = None
+    pool_ids: Optional[List[int]] = None  # any of these pools (combined with pool_id)
     start_date: Optional[date] = None
     end_date: Optional[date] = None
     weekday: Optional[str] = None
+    start_hour: Optional[int] = Field(default=None, ge=0, le=23)  # pool-local, inclusive
+    end_hour: Optional[int] = Field(default=None, ge=0, le=23)
     limit: int = Field(default=100, ge=1, le=10000)
     offset: int = Field(default=0, ge=0)
+    cursor: Optional[str] = None  # next_cursor of the previous page; offset is ignored when set
 
 
 class LatestVisitorResponse(BaseModel):
@@ -43,6 +82,8 @@ class LatestVisitorResponse(BaseModel):
 class PaginatedVisitorResponse(BaseModel):
     records: List[VisitorRecordResponse]
     total: int
+    total_exact: bool = True  # False: records still awaiting the rollup backfill are not counted
     limit: int
     offset: int
     has_more: bool
+    next_cursor: Optional[str] = None  # pass as cursor to get the next page
@@ -2,5 +2,19 @@ from app.services.user_service import UserService
 from app.services.pool_service import PoolService
 from app.services.visitor_service import VisitorService
 from app.services.analytics_service import AnalyticsService
+from app.services.scrape_metrics_service import ScrapeMetricsService
+from app.services.change_rate_service import ChangeRateService
+from app.services.scheduler_stats_service import SchedulerStatsService
+from app.services.circuit_breaker_service import CircuitBreakerService
+from app.services.rollup_service import RollupService
+from app.services.analytics_cache_service import AnalyticsCacheService
+from app.services.slot_stats_service import SlotStatsService
+from app.services.baseline_service import BaselineService
+from app.services.best_time_service import BestTimeService
 
-__all__ = ["UserService", "PoolService", "VisitorService", "AnalyticsService"]
+__all__ = [
+    "UserService", "PoolService", "VisitorService", "AnalyticsService",
+    "ScrapeMetricsService", "ChangeRateService", "SchedulerStatsService",
+    "CircuitBreakerService", "RollupService", "AnalyticsCacheService",
+    "SlotStatsService", "BaselineService", "BestTimeService"
+]
@@ -0,0 +1,314 @@
+import json
+from datetime import date, datetime, timezone
+from typing import Any, Callable, Dict, List, Set, Tuple
+
+import redis
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.services.analytics_service import TREND_PERIODS, AnalyticsService, period_key, rank_peak_hours
+from app.services.rollup_service import RollupService, local_hour_key
+
+# Bump when the shape of cached analytics changes, so old snapshots are ignored
+SNAPSHOT_SCHEMA = 1
+
+# Cached view -> AnalyticsService method computing it
+VIEWS = {
+    "heatmap": "get_heatmap_data",
+    "weekday_averages": "get_weekday_averages",
+    "peak_hours": "get_peak_hours",
+    "trends": "get_trends",
+    "percentile_heatmap": "get_percentile_heatmap",
+    "percentile_bands": "get_percentile_bands",
+}
+
+# Views precomputed for every pool on refresh, as (view, params)
+DEFAULT_VIEWS: List[Tuple[str, Dict[str, Any]]] = [
+    ("heatmap", {}),
+    ("weekday_averages", {}),
+    ("peak_hours", {}),
+    ("trends", {"period": "weekly"}),
+    ("trends", {"period": "monthly"}),
+]
+
+# (local date, hour) slots of a pool that received readings
+PoolSlots = Set[Tuple[date, int]]
+
+# AnalyticsSnapshot.source values
+SOURCE_HIT = "hit"  # served from Redis
+SOURCE_MISS = "miss"  # computed and stored
+SOURCE_BYPASS = "bypass"  # computed, Redis unavailable
+
+
+def _to_json(data):
+    if isinstance(data, BaseModel):
+        return data.model_dump(mode="json")
+    if isinstance(data, list):
+        return [_to_json(item) for item in data]
+    return data
+
+
+def _to_json_params(params: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        name: value.isoformat() if isinstance(value, date) else value
+        for name, value in params.items()
+        if value is not None
+    }
+
+
+def _variant(view: str, params: Dict[str, Any]) -> str:
+    """Cache key part for a view and its (non-empty) parameters."""
+    parts = [f"{name}={value}" for name, value in sorted(_to_json_params(params).items())]
+    return f"{view}?{'&'.join(parts)}" if parts else view
+
+
+DEFAULT_VARIANTS = {_variant(view, params) for view, params in DEFAULT_VIEWS}
+
+
+def _covers(params: Dict[str, Any], day: date) -> bool:
+    """Whether a cached view with these parameters includes readings from a date."""
+    if params.get("start_date") and day < date.fromisoformat(params["start_date"]):
+        return False
+    if params.get("end_date") and day > date.fromisoformat(params["end_date"]):
+        return False
+    if params.get("weekday") and params["weekday"] != day.strftime("%A"):
+        return False
+    return True
+
+
+def _cell_key(entry: dict) -> Tuple[str, int]:
+    return entry["weekday"], entry["hour"]
+
+
+def _replace_entries(entries: List[dict], updates: List[dict], key: Callable[[dict], Any]) -> List[dict]:
+    """Entries with updates replacing (or added next to) those with the same key, sorted by key."""
+    merged = {key(entry): entry for entry in entries}
+    merged.update((key(entry), entry) for entry in updates)
+    return [merged[k] for k in sorted(merged)]
+
+
+class AnalyticsSnapshot:
+    """A computed analytics view and when it was computed."""
+
+    def __init__(self, data: Any, computed_at: datetime, version: int, source: str):
+        self.data = data
+        self.computed_at = computed_at
+        self.version = version
+        self.source = source
+
+    def headers(self) -> Dict[str, str]:
+        """Freshness headers for the API response."""
+        return {
+            "X-Analytics-Computed-At": self.computed_at.isoformat(),
+            "X-Analytics-Snapshot-Version": str(self.version),
+            "X-Analytics-Cache": self.source,
+        }
+
+
+class AnalyticsCacheService:
+    """Precomputed analytics per pool, stored in Redis as versioned snapshots.
+
+    A refresh writes all default views of a pool under a new version and
+    only then moves the pool's version pointer, so readers never mix
+    snapshots from different refreshes. Views missing from the current
+    version are computed on request and stored under it.
+    """
+
+    VERSION_KEY_TEMPLATE = "analytics:v{schema}:{pool_id}:version"
+    SNAPSHOT_KEY_TEMPLATE = "analytics:v{schema}:{pool_id}:{version}:{variant}"
+    # Hash of the non-default variants cached under a version -> their parameters
+    VARIANTS_KEY_TEMPLATE = "analytics:v{schema}:{pool_id}:{version}:variants"
+
+    def __init__(self, db: Session, redis_client: redis.Redis):
+        self.db = db
+        self.redis = redis_client
+
+    def _version_key(self, pool_id: int) -> str:
+        return self.VERSION_KEY_TEMPLATE.format(schema=SNAPSHOT_SCHEMA, pool_id=pool_id)
+
+    def _snapshot_key(self, pool_id: int, version: int, variant: str) -> str:
+        return self.SNAPSHOT_KEY_TEMPLATE.format(
+            schema=SNAPSHOT_SCHEMA, pool_id=pool_id, version=version, variant=variant
+        )
+
+    def _variants_key(self, pool_id: int, version: int) -> str:
+        return self.VARIANTS_KEY_TEMPLATE.format(schema=SNAPSHOT_SCHEMA, pool_id=pool_id, version=version)
+
+    def compute(self, pool_id: int, view: str, **params) -> Any:
+        """Compute a view from the rollups; None if the pool does not exist."""
+        return _to_json(getattr(AnalyticsService(self.db), VIEWS[view])(pool_id, **params))
+
+    def _store(self, pipe, pool_id: int, version: int, view: str, params: Dict[str, Any], data: Any) -> datetime:
+        computed_at = datetime.now(timezone.utc)
+        pipe.set(
+            self._snapshot_key(pool_id, version, _variant(view, params)),
+            json.dumps({"computed_at": computed_at.isoformat(), "data": data}),
+            ex=settings.ANALYTICS_SNAPSHOT_TTL_SECONDS
+        )
+        return computed_at
+
+    def get(self, pool_id: int, view: str, **params) -> AnalyticsSnapshot:
+        """Serve a view from the pool's current snapshot, computing it on a miss.
+
+        Falls back to computing the view when Redis is unavailable. Results
+        for unknown pools (None) are never stored.
+        """
+        try:
+            version = int(self.redis.get(self._version_key(pool_id)) or 0)
+            raw = self.redis.get(self._snapshot_key(pool_id, version, _variant(view, params)))
+        except redis.RedisError:
+            data = self.compute(pool_id, view, **params)
+            return AnalyticsSnapshot(data, datetime.now(timezone.utc), 0, SOURCE_BYPASS)
+
+        if raw is not None:
+            snapshot = json.loads(raw)
+            return AnalyticsSnapshot(
+                snapshot["data"], datetime.fromisoformat(snapshot["computed_at"]), version, SOURCE_HIT
+            )
+
+        data = self.compute(pool_id, view, **params)
+        computed_at = datetime.now(timezone.utc)
+        if data is not None:
+            try:
+                pipe = self.redis.pipeline()
+                computed_at = self._store(pipe, pool_id, version, view, params, data)
+                variant = _variant(view, params)
+                if variant not in DEFAULT_VARIANTS:
+                    # Remembered so new readings can invalidate it
+                    variants_key = self._variants_key(pool_id, version)
+                    pipe.hset(variants_key, variant, json.dumps(_to_json_params(params)))
+                    pipe.expire(variants_key, settings.ANALYTICS_SNAPSHOT_TTL_SECONDS)
+                pipe.execute()
+            except redis.RedisError:
+                return AnalyticsSnapshot(data, computed_at, version, SOURCE_BYPASS)
+        return AnalyticsSnapshot(data, computed_at, version, SOURCE_MISS)
+
+    def refresh(self, pool_id: int) -> int:
+        """Precompute the default views of a pool under a new version; returns the version."""
+        version = int(self.redis.get(self._version_key(pool_id)) or 0) + 1
+        pipe = self.redis.pipeline()
+        for view, params in DEFAULT_VIEWS:
+            self._store(pipe, pool_id, version, view, params, self.compute(pool_id, view, **params))
+        pipe.set(self._version_key(pool_id), version)
+        pipe.execute()
+        return version
+
+    def _patch_snapshot(self, key: str, patch: Callable[[Any], Any]) -> bool:
+        """Apply patch to a stored snapshot's data atomically; False if it is not cached."""
+        with self.redis.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(key)
+                    raw = pipe.get(key)
+                    if raw is None:
+                        pipe.unwatch()
+                        return False
+                    snapshot = json.loads(raw)
+                    snapshot["data"] = patch(snapshot["data"])
+                    snapshot["computed_at"] = datetime.now(timezone.utc).isoformat()
+                    pipe.multi()
+                    pipe.set(key, json.dumps(snapshot), keepttl=True)
+                    pipe.execute()
+                    return True
+                except redis.WatchError:
+                    continue
+
+    def slot_patches(self, pool_id: int, slots: PoolSlots) -> List[Tuple[str, Dict[str, Any], Callable]]:
+        """(view, params, patch) for each default view, with the slots' entries recomputed.
+
+        patch takes a view's cached data and returns it with the entries replaced.
+        """
+        analytics = AnalyticsService(self.db)
+        weekday_hours = {(day.strftime("%A"), hour) for day, hour in slots}
+        averages = [
+            average for average in (
+                analytics.get_slot_average(pool_id, weekday, hour) for weekday, hour in weekday_hours
+            )
+            if average is not None
+        ]
+        peaks = [
+            peak for peak in (analytics.get_hour_peak(pool_id, hour) for hour in {hour for _, hour in slots})
+            if peak is not None
+        ]
+
+        def patch_heatmap(data):
+            cells = [{"weekday": a.weekday, "hour": a.hour, "value": a.average_visitors} for a in averages]
+            data["data"] = _replace_entries(data["data"], cells, _cell_key)
+            values = [cell["value"] for cell in data["data"]]
+            data["min_value"] = min(values) if values else 0
+            data["max_value"] = max(values) if values else 0
+            return data
+
+        def patch_weekday_averages(data):
+            return _replace_entries(data, [a.model_dump(mode="json") for a in averages], _cell_key)
+
+        def patch_peak_hours(data):
+            return rank_peak_hours(_replace_entries(data["by_hour"], peaks, lambda entry: entry["hour"]))
+
+        patches = [
+            ("heatmap", {}, patch_heatmap),
+            ("weekday_averages", {}, patch_weekday_averages),
+            ("peak_hours", {}, patch_peak_hours),
+        ]
+        for period, limit in TREND_PERIODS.items():
+            days = {period_key(day, period): day for day, _ in slots}
+            points = [
+                point.model_dump(mode="json") for point in (
+                    analytics.get_trend_point(pool_id, day, period) for day in days.values()
+                )
+                if point is not None
+            ]
+
+            def patch_trends(data, points=points, limit=limit):
+                data["data"] = _replace_entries(data["data"], points, lambda entry: entry["period"])[-limit:]
+                return data
+
+            patches.append(("trends", {"period": period}, patch_trends))
+        return patches
+
+    def _patch_pool(self, pool_id: int, version: int, slots: PoolSlots) -> int:
+        """Patch the slots into the pool's cached default views; returns how many were cached."""
+        patched = 0
+        for view, params, patch in self.slot_patches(pool_id, slots):
+            key = self._snapshot_key(pool_id, version, _variant(view, params))
+            patched += self._patch_snapshot(key, patch)
+        return patched
+
+    def _invalidate_variants(self, pool_id: int, version: int, days: Set[date]) -> int:
+        """Drop cached date-range and weekday views that include any of the days."""
+        variants_key = self._variants_key(pool_id, version)
+        stale = [
+            variant for variant, params in self.redis.hgetall(variants_key).items()
+            if any(_covers(json.loads(params), day) for day in days)
+        ]
+        if stale:
+            pipe = self.redis.pipeline()
+            pipe.delete(*[self._snapshot_key(pool_id, version, variant) for variant in stale])
+            pipe.hdel(variants_key, *stale)
+            pipe.execute()
+        return len(stale)
+
+    def apply_readings(self, readings: List[Tuple[int, datetime]]) -> dict:
+        """Bring the cached views of pools that got new (pool_id, timestamp) readings up to date.
+
+        Only the slots the readings fall in are recomputed from the rollups:
+        their weekday/hour entry of the heatmap and weekday averages, their
+        hour of the peak hours and their week and month of the trends.
+        Cached date-range and weekday views that include the readings are
+        dropped and recomputed on their next request. Idempotent, so
+        repeated or duplicate events are harmless.
+        """
+        timezones = RollupService(self.db).get_timezones(pool_id for pool_id, _ in readings)
+        slots: Dict[int, PoolSlots] = {}
+        for pool_id, timestamp in readings:
+            if pool_id in timezones:
+                _, local_date, hour = local_hour_key(pool_id, timestamp, timezones[pool_id])
+                slots.setdefault(pool_id, set()).add((local_date, hour))
+
+        patched = invalidated = 0
+        for pool_id, pool_slots in slots.items():
+            version = int(self.redis.get(self._version_key(pool_id)) or 0)
+            patched += self._patch_pool(pool_id, version, pool_slots)
+            invalidated += self._invalidate_variants(pool_id, version, {day for day, _ in pool_slots})
+        return {"pools": len(slots), "patched": patched, "invalidated": invalidated}
@@ -1,296 +1,725 @@
-from typing import List, Optional
-from datetime import date, datetime, time
+from typing import Dict, List, Optional, Tuple
+from datetime import date, datetime, timedelta, timezone
 from sqlalchemy.orm import Session
-from sqlalchemy import func, extract, and_, String
+from sqlalchemy import func
 import pytz
 
-from app.models.visitor import VisitorRecord
+from app.config import settings
 from app.models.pool import Pool
+from app.models.rollup import VisitorHourlyRollup as Rollup
+from app.models.visitor import VisitorRecord
 from app.schemas.analytics import (
     WeekdayAverage, HeatmapData, HeatmapCell,
-    DailySummary, TrendData, TrendDataPoint, WeekdayAverageUpToNow
+    DailySummary, TrendData, TrendDataPoint, WeekdayAverageUpToNow,
+    PercentileHeatmapData, PercentileBand, PercentileBands, NowVsTypical, AnalyticsBundle,
+    ComparedPool, PoolComparison
 )
+from app.services.array_engine import AggregateRow, get_array_engine
+from app.services.baseline_service import BaselineCurve, BaselineService
+from app.services.quantile_sketch import QuantileSketch, merge_sketches
+from app.services.slot_stats_service import WEEKDAY_NAMES
+
+
+# Trend period type -> number of latest periods reported
+TREND_PERIODS = {"weekly": 52, "monthly": 12}
+
+# Sections of the analytics bundle, each the response of the endpoint of the same name
+BUNDLE_SECTIONS = (
+    "heatmap", "weekday_averages", "peak_hours", "trends", "daily_summary", "weekday_average_now"
+)
+
+# Bundle sections built from the weekday-hour and from the daily rollup groups
+SLOT_SECTIONS = {"heatmap", "weekday_averages", "peak_hours"}
+DAY_SECTIONS = {"trends", "daily_summary"}
+
+
+def _mean(total, count) -> float:
+    return round(float(total) / count, 1) if count else 0.0
+
+
+def _stddev(total, sum_squares, count) -> float:
+    if not count:
+        return 0.0
+    mean = float(total) / count
+    return round(max(float(sum_squares) / count - mean * mean, 0.0) ** 0.5, 1)
+
+
+def period_key(day: date, period: str) -> str:
+    """Trend period of a date, e.g. "2024-W01" (ISO week) or "2024-01"."""
+    if period == "weekly":
+        iso_year, iso_week, _ = day.isocalendar()
+        return f"{iso_year}-W{iso_week:02d}"
+    return f"{day.year}-{day.month:02d}"
+
+
+def period_range(day: date, period: str) -> Tuple[date, date]:
+    """First and last date of the trend period containing a date."""
+    if period == "weekly":
+        start = day - timedelta(days=day.weekday())
+        return start, start + timedelta(days=6)
+    start = day.replace(day=1)
+    next_month = (start + timedelta(days=32)).replace(day=1)
+    return start, next_month - timedelta(days=1)
+
+
+def _fold(groups: Dict, key, readings: int, visitor_sum: int, sum_squares: int, low: int, high: int) -> None:
+    """Add rollup statistics to the AggregateRow of a group key."""
+    row = groups.get(key)
+    if row is None:
+        groups[key] = AggregateRow(readings, visitor_sum, sum_squares, low, high)
+        return
+    row.readings += readings
+    row.visitor_sum += visitor_sum
+    row.visitor_sum_squares += sum_squares
+    row.min_visitors = min(row.min_visitors, low)
+    row.max_visitors = max(row.max_visitors, high)
+
+
+def _local_now(pool: Pool, now: Optional[datetime] = None) -> datetime:
+    """The current (or given) time in the pool's timezone."""
+    return (now or datetime.now(timezone.utc)).astimezone(pytz.timezone(pool.timezone or "CET"))
+
+
+def rank_peak_hours(by_hour: List[dict]) -> dict:
+    """Peak and quietest hour of per-hour averages, with the hours in order."""
+    if not by_hour:
+        return {"peak_hour": None, "quietest_hour": None, "by_hour": []}
+    ranked = sorted(by_hour, key=lambda x: x["average"], reverse=True)
+    return {
+        "peak_hour": ranked[0]["hour"],
+        "quietest_hour": ranked[-1]["hour"],
+        "by_hour": sorted(by_hour, key=lambda x: x["hour"])
+    }
 
 
 class AnalyticsService:
-    # Pool opens at 6 AM - filter out earlier hours from all analytics
-    POOL_OPEN_HOUR = 6
-    POOL_CLOSE_HOUR = 22
+    """Visitor analytics, aggregated from the hourly rollups rather than raw records.
+
+    Dates and hours are local to each pool, and every query can be limited
+    to a range of dates at a cost proportional to the range. With
+    ANALYTICS_ENGINE=numpy the weekday, hourly and daily aggregates come from
+    the in-memory ArrayEngine instead, with the same results.
+    """
+
+    # Hours outside the pool's opening hours are left out of all analytics
+    POOL_OPEN_HOUR = settings.ANALYTICS_OPEN_HOUR
+    POOL_CLOSE_HOUR = settings.ANALYTICS_CLOSE_HOUR
 
     def __init__(self, db: Session):
         self.db = db
+        self.engine = get_array_engine() if settings.ANALYTICS_ENGINE == "numpy" else None
+
+    @property
+    def pool_hours(self) -> range:
+        return range(self.POOL_OPEN_HOUR, self.POOL_CLOSE_HOUR + 1)
+
+    def _aggregate(self, *columns):
+        """Query summed rollup statistics, grouped by ``columns``."""
+        return self.db.query(
+            *columns,
+            func.sum(Rollup.reading_count).label('readings'),
+            func.sum(Rollup.visitor_sum).label('visitor_sum'),
+            func.sum(Rollup.visitor_sum_squares).label('visitor_sum_squares'),
+            func.min(Rollup.visitor_min).label('min_visitors'),
+            func.max(Rollup.visitor_max).label('max_visitors')
+        )
 
-    def get_weekday_averages(self, pool_id: int) -> List[WeekdayAverage]:
-        """Get average visitor counts by weekday and hour (during pool hours only)."""
-        results = (
-            self.db.query(
-                VisitorRecord.weekday,
-                extract('hour', VisitorRecord.timestamp).label('hour'),
-                func.avg(VisitorRecord.visitor_count).label('avg_visitors'),
-                func.count(VisitorRecord.id).label('sample_count')
-            )
-            .filter(
-                VisitorRecord.pool_id == pool_id,
-                extract('hour', VisitorRecord.timestamp) >= self.POOL_OPEN_HOUR,
-                extract('hour', VisitorRecord.timestamp) <= self.POOL_CLOSE_HOUR
+    def _filter(
+        self,
+        query,
+        pool_id: int,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        pool_hours: bool = False
+    ):
+        return self._filter_range(query.filter(Rollup.pool_id == pool_id), start_date, end_date, pool_hours)
+
+    def _filter_pools(
+        self,
+        query,
+        pool_ids: List[int],
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        pool_hours: bool = False
+    ):
+        return self._filter_range(query.filter(Rollup.pool_id.in_(pool_ids)), start_date, end_date, pool_hours)
+
+    def _filter_range(
+        self,
+        query,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        pool_hours: bool = False
+    ):
+        if start_date:
+            query = query.filter(Rollup.local_date >= start_date)
+        if end_date:
+            query = query.filter(Rollup.local_date <= end_date)
+        if pool_hours:
+            query = query.filter(
+                Rollup.hour >= self.POOL_OPEN_HOUR,
+                Rollup.hour <= self.POOL_CLOSE_HOUR
             )
-            .group_by(VisitorRecord.weekday, extract('hour', VisitorRecord.timestamp))
-            .order_by(VisitorRecord.weekday, 'hour')
+        return query
+
+    def summarize(
+        self,
+        pool_id: int,
+        weekday: Optional[str] = None,
+        hour: Optional[int] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ):
+        """Readings, visitor sum, sum of squares, min and max over a slice of the rollups."""
+        if self.engine:
+            return self.engine.summarize(self.db, pool_id, weekday, hour, start_date, end_date)
+        query = self._filter(self._aggregate(), pool_id, start_date, end_date)
+        if weekday is not None:
+            query = query.filter(Rollup.weekday == weekday)
+        if hour is not None:
+            query = query.filter(Rollup.hour == hour)
+        return query.one()
+
+    def _weekday_hours(
+        self,
+        pool_id: int,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ):
+        if self.engine:
+            return self.engine.weekday_hours(self.db, pool_id, self.pool_hours, start_date, end_date)
+        query = self._filter(
+            self._aggregate(Rollup.weekday, Rollup.hour), pool_id, start_date, end_date, pool_hours=True
+        )
+        return (
+            query
+            .group_by(Rollup.weekday, Rollup.hour)
+            .order_by(Rollup.weekday, Rollup.hour)
             .all()
         )
 
+    def get_weekday_averages(
+        self,
+        pool_id: int,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ) -> Optional[List[WeekdayAverage]]:
+        """Get average visitor counts by weekday and hour (during pool hours only)."""
+        if not self.db.query(Pool.id).filter(Pool.id == pool_id).first():
+            return None
+        return self._weekday_averages(self._weekday_hours(pool_id, start_date, end_date))
+
+    def _weekday_averages(self, rows) -> List[WeekdayAverage]:
         return [
             WeekdayAverage(
                 weekday=row.weekday,
-                hour=int(row.hour),
-                average_visitors=round(float(row.avg_visitors), 1),
-                sample_count=row.sample_count
+                hour=row.hour,
+                average_visitors=_mean(row.visitor_sum, row.readings),
+                sample_count=row.readings
             )
-            for row in results
+            for row in rows
         ]
 
-    def get_heatmap_data(self, pool_id: int) -> Optional[HeatmapData]:
+    def get_heatmap_data(
+        self,
+        pool_id: int,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ) -> Optional[HeatmapData]:
         """Get heatmap data (weekday x hour matrix) during pool hours only."""
         pool = self.db.query(Pool).filter(Pool.id == pool_id).first()
         if not pool:
             return None
+        return self._heatmap(pool, self._weekday_hours(pool_id, start_date, end_date))
 
-        results = (
-            self.db.query(
-                VisitorRecord.weekday,
-                extract('hour', VisitorRecord.timestamp).label('hour'),
-                func.avg(VisitorRecord.visitor_count).label('avg_visitors')
-            )
-            .filter(
-                VisitorRecord.pool_id == pool_id,
-                extract('hour', VisitorRecord.timestamp) >= self.POOL_OPEN_HOUR,
-                extract('hour', VisitorRecord.timestamp) <= self.POOL_CLOSE_HOUR
+    def _heatmap(self, pool: Pool, rows) -> HeatmapData:
+        cells = [
+            HeatmapCell(
+                weekday=row.weekday,
+                hour=row.hour,
+                value=_mean(row.visitor_sum, row.readings)
             )
-            .group_by(VisitorRecord.weekday, extract('hour', VisitorRecord.timestamp))
-            .all()
+            for row in rows
+        ]
+        values = [cell.value for cell in cells]
+
+        return HeatmapData(
+            pool_id=pool.id,
+            pool_name=pool.name,
+            data=cells,
+            min_value=min(values) if values else 0,
+            max_value=max(values) if values else 0
         )
 
-        if not results:
-            return HeatmapData(
-                pool_id=pool_id,
-                pool_name=pool.name,
-                data=[],
-                min_value=0,
-                max_value=0
-            )
+    def _merged_sketches(
+        self,
+        pool_id: int,
+        group_by_weekday: bool,
+        weekday: Optional[str] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ) -> Dict[tuple, QuantileSketch]:
+        """Hourly sketches merged per (weekday, hour) or per (hour,), during pool hours."""
+        query = self._filter(
+            self.db.query(Rollup.weekday, Rollup.hour, Rollup.visitor_sketch),
+            pool_id, start_date, end_date, pool_hours=True
+        )
+        if weekday:
+            query = query.filter(Rollup.weekday == weekday)
 
-        cells = []
-        values = []
-        for row in results:
-            value = round(float(row.avg_visitors), 1)
-            cells.append(HeatmapCell(
-                weekday=row.weekday,
-                hour=int(row.hour),
-                value=value
-            ))
-            values.append(value)
+        grouped: Dict[tuple, List[str]] = {}
+        for row in query.all():
+            key = (row.weekday, row.hour) if group_by_weekday else (row.hour,)
+            grouped.setdefault(key, []).append(row.visitor_sketch)
+        return {key: merge_sketches(raws) for key, raws in sorted(grouped.items())}
 
-        return HeatmapData(
+    def get_percentile_heatmap(
+        self,
+        pool_id: int,
+        percentile: float = 90,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ) -> Optional[PercentileHeatmapData]:
+        """Get a heatmap of a visitor percentile per weekday and hour (e.g. p90: a busy day)."""
+        pool = self.db.query(Pool).filter(Pool.id == pool_id).first()
+        if not pool:
+            return None
+
+        cells = []
+        for (weekday, hour), sketch in self._merged_sketches(
+            pool_id, True, start_date=start_date, end_date=end_date
+        ).items():
+            value = sketch.quantile(percentile / 100)
+            if value is not None:
+                cells.append(HeatmapCell(weekday=weekday, hour=hour, value=round(value, 1)))
+        values = [cell.value for cell in cells]
+
+        return PercentileHeatmapData(
             pool_id=pool_id,
             pool_name=pool.name,
+            percentile=percentile,
             data=cells,
             min_value=min(values) if values else 0,
             max_value=max(values) if values else 0
         )
 
-    def get_daily_summary(
+    def get_percentile_bands(
         self,
         pool_id: int,
+        weekday: Optional[str] = None,
         start_date: Optional[date] = None,
         end_date: Optional[date] = None
-    ) -> List[DailySummary]:
-        """Get daily summary statistics."""
-        query = self.db.query(
-            func.date(VisitorRecord.timestamp).label('date'),
-            func.min(VisitorRecord.visitor_count).label('min_visitors'),
-            func.max(VisitorRecord.visitor_count).label('max_visitors'),
-            func.avg(VisitorRecord.visitor_count).label('avg_visitors'),
-            func.count(VisitorRecord.id).label('total_readings')
-        ).filter(VisitorRecord.pool_id == pool_id)
+    ) -> Optional[PercentileBands]:
+        """Get p10/p25/p50/p75/p90 visitors per hour, optionally for one weekday."""
+        pool = self.db.query(Pool).filter(Pool.id == pool_id).first()
+        if not pool:
+            return None
 
-        if start_date:
-            start_dt = datetime.combine(start_date, datetime.min.time())
-            query = query.filter(VisitorRecord.timestamp >= start_dt)
+        bands = []
+        for (hour,), sketch in self._merged_sketches(pool_id, False, weekday, start_date, end_date).items():
+            if not sketch.count:
+                continue
+            p10, p25, p50, p75, p90 = (sketch.quantile(q) for q in (0.1, 0.25, 0.5, 0.75, 0.9))
+            bands.append(PercentileBand(
+                hour=hour, p10=p10, p25=p25, p50=p50, p75=p75, p90=p90,
+                sample_count=int(sketch.count)
+            ))
 
-        if end_date:
-            end_dt = datetime.combine(end_date, datetime.max.time())
-            query = query.filter(VisitorRecord.timestamp <= end_dt)
+        return PercentileBands(pool_id=pool_id, pool_name=pool.name, weekday=weekday, data=bands)
 
-        results = (
+    def _daily_rows(
+        self,
+        pool_id: int,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ):
+        if self.engine:
+            return self.engine.days(self.db, pool_id, start_date, end_date)
+        query = self._filter(self._aggregate(Rollup.local_date), pool_id, start_date, end_date)
+        return (
             query
-            .group_by(func.date(VisitorRecord.timestamp))
-            .order_by(func.date(VisitorRecord.timestamp).desc())
+            .group_by(Rollup.local_date)
+            .order_by(Rollup.local_date.desc())
             .all()
         )
 
+    def get_daily_summary(
+        self,
+        pool_id: int,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ) -> List[DailySummary]:
+        """Get daily summary statistics, newest day first."""
+        return self._daily_summary(pool_id, self._daily_rows(pool_id, start_date, end_date))
+
+    def _daily_summary(self, pool_id: int, rows) -> List[DailySummary]:
         return [
             DailySummary(
-                date=row.date,
+                date=row.local_date,
                 pool_id=pool_id,
                 min_visitors=row.min_visitors,
                 max_visitors=row.max_visitors,
-                avg_visitors=round(float(row.avg_visitors), 1),
-                total_readings=row.total_readings
+                avg_visitors=_mean(row.visitor_sum, row.readings),
+                std_visitors=_stddev(row.visitor_sum, row.visitor_sum_squares, row.readings),
+                total_readings=row.readings
             )
-            for row in results
+            for row in rows
         ]
 
     def get_trends(
         self,
         pool_id: int,
-        period: str = "weekly"
+        period: str = "weekly",
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
     ) -> Optional[TrendData]:
-        """Get trend analysis by week or month."""
+        """Get trend analysis by ISO week or month (the latest 52 weeks or 12 months)."""
         pool = self.db.query(Pool).filter(Pool.id == pool_id).first()
         if not pool:
             return None
-
-        if period == "weekly":
-            # Group by year-week
-            period_expr = func.concat(
-                extract('year', VisitorRecord.timestamp),
-                '-W',
-                func.lpad(func.cast(extract('week', VisitorRecord.timestamp), String), 2, '0')
-            )
-        else:
-            # Group by year-month
-            period_expr = func.concat(
-                extract('year', VisitorRecord.timestamp),
-                '-',
-                func.lpad(func.cast(extract('month', VisitorRecord.timestamp), String), 2, '0')
-            )
-
-        results = (
-            self.db.query(
-                period_expr.label('period'),
-                func.avg(VisitorRecord.visitor_count).label('avg_visitors'),
-                func.max(VisitorRecord.visitor_count).label('peak_visitors'),
-                func.count(VisitorRecord.id).label('total_readings')
-            )
-            .filter(VisitorRecord.pool_id == pool_id)
-            .group_by(period_expr)
-            .order_by(period_expr.desc())
-            .limit(52 if period == "weekly" else 12)
-            .all()
-        )
-
+        return self._trends(pool, self._daily_rows(pool_id, start_date, end_date), period)
+
+    def _trends(self, pool: Pool, daily_rows, period: str) -> TrendData:
+        # period -> [readings, visitor sum, peak]
+        periods: Dict[str, List[int]] = {}
+        for row in daily_rows:
+            totals = periods.setdefault(period_key(row.local_date, period), [0, 0, 0])
+            totals[0] += row.readings
+            totals[1] += row.visitor_sum
+            totals[2] = max(totals[2], row.max_visitors)
+
+        latest = sorted(periods)[-TREND_PERIODS.get(period, 12):]
         data_points = [
             TrendDataPoint(
-                period=row.period,
-                average_visitors=round(float(row.avg_visitors), 1),
-                peak_visitors=row.peak_visitors,
-                total_readings=row.total_readings
+                period=key,
+                average_visitors=_mean(periods[key][1], periods[key][0]),
+                peak_visitors=periods[key][2],
+                total_readings=periods[key][0]
             )
-            for row in results
+            for key in latest
         ]
 
-        # Reverse to show oldest first
-        data_points.reverse()
-
         return TrendData(
-            pool_id=pool_id,
+            pool_id=pool.id,
             pool_name=pool.name,
             period_type=period,
             data=data_points
         )
 
-    def get_peak_hours(self, pool_id: int, weekday: Optional[str] = None) -> dict:
+    def get_peak_hours(
+        self,
+        pool_id: int,
+        weekday: Optional[str] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ) -> Optional[dict]:
         """Get peak hours analysis (during pool hours only)."""
-        query = (
-            self.db.query(
-                extract('hour', VisitorRecord.timestamp).label('hour'),
-                func.avg(VisitorRecord.visitor_count).label('avg_visitors'),
-                func.max(VisitorRecord.visitor_count).label('max_visitors')
+        if not self.db.query(Pool.id).filter(Pool.id == pool_id).first():
+            return None
+        return rank_peak_hours([
+            {
+                "hour": row.hour,
+                "average": _mean(row.visitor_sum, row.readings),
+                "max": row.max_visitors
+            }
+            for row in self._hours(pool_id, weekday, start_date, end_date)
+        ])
+
+    def _hours(
+        self,
+        pool_id: int,
+        weekday: Optional[str] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ):
+        if self.engine:
+            return self.engine.hours(self.db, pool_id, self.pool_hours, weekday or None, start_date, end_date)
+        query = self._filter(self._aggregate(Rollup.hour), pool_id, start_date, end_date, pool_hours=True)
+        if weekday:
+            query = query.filter(Rollup.weekday == weekday)
+        return query.group_by(Rollup.hour).all()
+
+    def _rollup_groups(
+        self,
+        pool_ids: List[int],
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        slots: bool = True,
+        days: bool = True
+    ) -> Dict[int, Tuple[List[AggregateRow], List[AggregateRow]]]:
+        """Per pool, the weekday-hour aggregates (during pool hours) and the daily aggregates.
+
+        The same two grouped queries as the heatmap and the trends, for all
+        pools at once with the pool id as an extra group key. Groups that are
+        not asked for are left empty and not queried.
+        """
+        if self.engine:
+            return self.engine.rollup_groups(self.db, pool_ids, self.pool_hours, start_date, end_date, slots, days)
+        groups = {pool_id: ([], []) for pool_id in pool_ids}
+        if slots:
+            query = self._filter_pools(
+                self._aggregate(Rollup.pool_id, Rollup.weekday, Rollup.hour), pool_ids, start_date, end_date,
+                pool_hours=True
             )
-            .filter(
-                VisitorRecord.pool_id == pool_id,
-                extract('hour', VisitorRecord.timestamp) >= self.POOL_OPEN_HOUR,
-                extract('hour', VisitorRecord.timestamp) <= self.POOL_CLOSE_HOUR
+            rows = (
+                query
+                .group_by(Rollup.pool_id, Rollup.weekday, Rollup.hour)
+                .order_by(Rollup.pool_id, Rollup.weekday, Rollup.hour)
+                .all()
             )
+            for row in rows:
+                groups[row.pool_id][0].append(row)
+        if days:
+            query = self._filter_pools(
+                self._aggregate(Rollup.pool_id, Rollup.local_date), pool_ids, start_date, end_date
+            )
+            rows = (
+                query
+                .group_by(Rollup.pool_id, Rollup.local_date)
+                .order_by(Rollup.pool_id, Rollup.local_date.desc())
+                .all()
+            )
+            for row in rows:
+                groups[row.pool_id][1].append(row)
+        return groups
+
+    def _peak_hours(self, slots: List[AggregateRow], weekday: Optional[str] = None) -> dict:
+        """Peak hours of weekday-hour aggregates, optionally for one weekday."""
+        hours: Dict[int, AggregateRow] = {}
+        for row in slots:
+            if not weekday or row.weekday == weekday:
+                _fold(hours, row.hour, row.readings, row.visitor_sum, row.visitor_sum_squares,
+                      row.min_visitors, row.max_visitors)
+        return rank_peak_hours([
+            {"hour": hour, "average": _mean(row.visitor_sum, row.readings), "max": row.max_visitors}
+            for hour, row in sorted(hours.items())
+        ])
+
+    def _pools(self, pool_ids: List[int]) -> List[Pool]:
+        """The pools that exist, in the order of pool_ids (duplicates dropped)."""
+        pools = {pool.id: pool for pool in self.db.query(Pool).filter(Pool.id.in_(pool_ids)).all()}
+        return [pools[pool_id] for pool_id in dict.fromkeys(pool_ids) if pool_id in pools]
+
+    def get_bundles(
+        self,
+        pool_ids: List[int],
+        sections: Optional[List[str]] = None,
+        period: str = "weekly",
+        weekday: Optional[str] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        now: Optional[datetime] = None
+    ) -> List[AnalyticsBundle]:
+        """Several analytics views of each pool, from two grouped queries over all the pools' rollups.
+
+        Sections (default: all of BUNDLE_SECTIONS) match the responses of the
+        separate endpoints; the others are left out. The weekday filters the
+        peak hours only, and the dates apply to every section but
+        weekday_average_now. Pools that do not exist are skipped.
+        """
+        pools = self._pools(pool_ids)
+        sections = set(sections or BUNDLE_SECTIONS)
+        bundles = [AnalyticsBundle(pool_id=pool.id, pool_name=pool.name) for pool in pools]
+
+        if sections & (SLOT_SECTIONS | DAY_SECTIONS):
+            groups = self._rollup_groups(
+                [pool.id for pool in pools], start_date, end_date,
+                slots=bool(sections & SLOT_SECTIONS), days=bool(sections & DAY_SECTIONS)
+            )
+            for pool, bundle in zip(pools, bundles):
+                slots, days = groups[pool.id]
+                if "heatmap" in sections:
+                    bundle.heatmap = self._heatmap(pool, slots)
+                if "weekday_averages" in sections:
+                    bundle.weekday_averages = self._weekday_averages(slots)
+                if "peak_hours" in sections:
+                    bundle.peak_hours = self._peak_hours(slots, weekday)
+                if "trends" in sections:
+                    bundle.trends = self._trends(pool, days, period)
+                if "daily_summary" in sections:
+                    bundle.daily_summary = self._daily_summary(pool.id, days)
+
+        if "weekday_average_now" in sections:
+            local_nows = [_local_now(pool, now) for pool in pools]
+            curves = BaselineService(self.db).get_curves([
+                (pool.id, local_now.weekday()) for pool, local_now in zip(pools, local_nows)
+            ])
+            for pool, local_now, bundle in zip(pools, local_nows, bundles):
+                bundle.weekday_average_now = self._weekday_average_up_to_now(
+                    pool, local_now, curves.get((pool.id, local_now.weekday()))
+                )
+        return bundles
+
+    def get_bundle(
+        self,
+        pool_id: int,
+        sections: Optional[List[str]] = None,
+        period: str = "weekly",
+        weekday: Optional[str] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        now: Optional[datetime] = None
+    ) -> Optional[AnalyticsBundle]:
+        """The bundle of one pool (see get_bundles); None if the pool does not exist."""
+        bundles = self.get_bundles([pool_id], sections, period, weekday, start_date, end_date, now)
+        return bundles[0] if bundles else None
+
+    def compare_pools(
+        self,
+        pool_ids: List[int],
+        weekday: Optional[str] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ) -> PoolComparison:
+        """Heatmaps and hourly averages of several pools on one weekday x hour grid.
+
+        Slots without readings are None. The weekday filters the hourly
+        averages and peak hours only.
+        """
+        pools = self._pools(pool_ids)
+        groups = self._rollup_groups([pool.id for pool in pools], start_date, end_date, days=False)
+        hours = list(self.pool_hours)
+
+        compared = []
+        for pool in pools:
+            slots, _ = groups[pool.id]
+            values = {(row.weekday, row.hour): _mean(row.visitor_sum, row.readings) for row in slots}
+            peaks = self._peak_hours(slots, weekday)
+            by_hour = {entry["hour"]: entry["average"] for entry in peaks["by_hour"]}
+            compared.append(ComparedPool(
+                pool_id=pool.id,
+                pool_name=pool.name,
+                heatmap=[[values.get((name, hour)) for hour in hours] for name in WEEKDAY_NAMES],
+                hourly_averages=[by_hour.get(hour) for hour in hours],
+                peak_hour=peaks["peak_hour"],
+                quietest_hour=peaks["quietest_hour"]
+            ))
+
+        values = [value for pool in compared for row in pool.heatmap for value in row if value is not None]
+        return PoolComparison(
+            weekdays=list(WEEKDAY_NAMES),
+            hours=hours,
+            weekday=weekday,
+            min_value=min(values) if values else 0,
+            max_value=max(values) if values else 0,
+            pools=compared
         )
 
-        if weekday:
-            query = query.filter(VisitorRecord.weekday == weekday)
+    def is_pool_hour(self, hour: int) -> bool:
+        return self.POOL_OPEN_HOUR <= hour <= self.POOL_CLOSE_HOUR
 
-        results = (
-            query
-            .group_by(extract('hour', VisitorRecord.timestamp))
-            .order_by(func.avg(VisitorRecord.visitor_count).desc())
-            .all()
+    def get_slot_average(self, pool_id: int, weekday: str, hour: int) -> Optional[WeekdayAverage]:
+        """One weekday/hour entry of the weekday averages (and heatmap); None if it has no readings."""
+        row = self.summarize(pool_id, weekday=weekday, hour=hour)
+        if not row.readings or not self.is_pool_hour(hour):
+            return None
+        return WeekdayAverage(
+            weekday=weekday,
+            hour=hour,
+            average_visitors=_mean(row.visitor_sum, row.readings),
+            sample_count=row.readings
         )
 
-        if not results:
-            return {"peak_hour": None, "quietest_hour": None, "by_hour": []}
+    def get_hour_peak(self, pool_id: int, hour: int) -> Optional[dict]:
+        """One by_hour entry of the peak hours over all weekdays; None if it has no readings."""
+        row = self.summarize(pool_id, hour=hour)
+        if not row.readings or not self.is_pool_hour(hour):
+            return None
+        return {"hour": hour, "average": _mean(row.visitor_sum, row.readings), "max": row.max_visitors}
 
-        by_hour = [
-            {
-                "hour": int(row.hour),
-                "average": round(float(row.avg_visitors), 1),
-                "max": row.max_visitors
-            }
-            for row in results
-        ]
+    def get_trend_point(self, pool_id: int, day: date, period: str) -> Optional[TrendDataPoint]:
+        """The trend entry of the week or month containing a date; None if it has no readings."""
+        start, end = period_range(day, period)
+        row = self.summarize(pool_id, start_date=start, end_date=end)
+        if not row.readings:
+            return None
+        return TrendDataPoint(
+            period=period_key(day, period),
+            average_visitors=_mean(row.visitor_sum, row.readings),
+            peak_visitors=row.max_visitors,
+            total_readings=row.readings
+        )
 
-        return {
-            "peak_hour": int(results[0].hour) if results else None,
-            "quietest_hour": int(results[-1].hour) if results else None,
-            "by_hour": sorted(by_hour, key=lambda x: x["hour"])
-        }
+    def get_weekday_average_up_to_now(
+        self,
+        pool_id: int,
+        now: Optional[datetime] = None
+    ) -> Optional[WeekdayAverageUpToNow]:
+        """Get average visitor count for current weekday from opening up to the current minute.
 
-    def get_weekday_average_up_to_now(self, pool_id: int) -> Optional[WeekdayAverageUpToNow]:
-        """Get average visitor count for current weekday up to current time of day."""
+        Read from the weekday's baseline curve in two lookups.
+        """
         pool = self.db.query(Pool).filter(Pool.id == pool_id).first()
         if not pool:
             return None
-
         # Get current time in pool's timezone
-        tz = pytz.timezone(pool.timezone)
-        now = datetime.now(tz)
-        current_weekday = now.strftime("%A")
-        current_hour = now.hour
-        current_minute = now.minute
-
-        # Query historical data for same weekday, only hours from pool open to current hour
-        results = (
-            self.db.query(
-                func.avg(VisitorRecord.visitor_count).label('avg_visitors'),
-                func.min(VisitorRecord.visitor_count).label('min_visitors'),
-                func.max(VisitorRecord.visitor_count).label('max_visitors'),
-                func.count(VisitorRecord.id).label('sample_count')
-            )
+        now = _local_now(pool, now)
+        return self._weekday_average_up_to_now(pool, now, BaselineService(self.db).get_curve(pool_id, now.weekday()))
+
+    def _weekday_average_up_to_now(
+        self,
+        pool: Pool,
+        now: datetime,
+        curve: Optional[BaselineCurve]
+    ) -> WeekdayAverageUpToNow:
+        total, count, low, high = curve.up_to(now.hour * 60 + now.minute) if curve else (0, 0, None, None)
+
+        return WeekdayAverageUpToNow(
+            pool_id=pool.id,
+            pool_name=pool.name,
+            weekday=now.strftime("%A"),
+            current_time=now.strftime("%H:%M"),
+            average_visitors=_mean(total, count),
+            min_visitors=low or 0,
+            max_visitors=high or 0,
+            sample_count=count
+        )
+
+    def get_now_vs_typical(self, pool_id: int, now: Optional[datetime] = None) -> Optional[NowVsTypical]:
+        """Compare the latest reading with the typical visitors of this weekday around now."""
+        pool = self.db.query(Pool).filter(Pool.id == pool_id).first()
+        if not pool:
+            return None
+
+        now = _local_now(pool, now)
+        minute = now.hour * 60 + now.minute
+        half_window = settings.BASELINE_WINDOW_MINUTES // 2
+        curve = BaselineService(self.db).get_curve(pool_id, now.weekday())
+        total, count = curve.window(minute - half_window, minute + half_window) if curve else (0, 0)
+        typical = total / count if count else None
+
+        latest = (
+            self.db.query(VisitorRecord.timestamp, VisitorRecord.visitor_count)
             .filter(
                 VisitorRecord.pool_id == pool_id,
-                VisitorRecord.weekday == current_weekday,
-                extract('hour', VisitorRecord.timestamp) >= self.POOL_OPEN_HOUR,
-                extract('hour', VisitorRecord.timestamp) <= current_hour
+                VisitorRecord.timestamp
+                >= now.astimezone(timezone.utc) - timedelta(minutes=settings.BASELINE_WINDOW_MINUTES)
             )
+            .order_by(VisitorRecord.timestamp.desc())
             .first()
         )
 
-        if not results or results.sample_count == 0:
-            return WeekdayAverageUpToNow(
-                pool_id=pool_id,
-                pool_name=pool.name,
-                weekday=current_weekday,
-                current_time=now.strftime("%H:%M"),
-                average_visitors=0,
-                min_visitors=0,
-                max_visitors=0,
-                sample_count=0
-            )
-
-        return WeekdayAverageUpToNow(
+        ratio = None
+        status = "unknown"
+        if latest and typical:
+            ratio = latest.visitor_count / typical
+            if ratio >= settings.BASELINE_BUSY_RATIO:
+                status = "busier"
+            elif ratio <= 1 / settings.BASELINE_BUSY_RATIO:
+                status = "quieter"
+            else:
+                status = "usual"
+
+        return NowVsTypical(
             pool_id=pool_id,
             pool_name=pool.name,
-            weekday=current_weekday,
+            weekday=now.strftime("%A"),
             current_time=now.strftime("%H:%M"),
-            average_visitors=round(float(results.avg_visitors), 1),
-            min_visitors=results.min_visitors,
-            max_visitors=results.max_visitors,
-            sample_count=results.sample_count
+            current_visitors=latest.visitor_count if latest else None,
+            current_reading_at=latest.timestamp if latest else None,
+            typical_visitors=round(typical, 1) if typical is not None else None,
+            sample_count=count,
+            window_minutes=settings.BASELINE_WINDOW_MINUTES,
+            ratio=round(ratio, 2) if ratio is not None else None,
+            status=status
         )
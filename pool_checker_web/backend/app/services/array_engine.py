@@ -0,0 +1,355 @@
+import threading
+import time
+from contextlib import ExitStack
+from datetime import date, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.visitor import VisitorRecord
+from app.services.column_store import ColumnStore, MappedSeries
+from app.services.slot_stats_service import WEEKDAY_NAMES
+
+try:
+    import numpy as np
+except ImportError:  # only needed for ANALYTICS_ENGINE=numpy
+    np = None
+
+# Weekday-hour slots (weekday * 24 + hour), the uint8 slot index
+SLOTS = 7 * 24
+
+# Rows fetched per query while loading a pool's history
+LOAD_CHUNK_SIZE = 50000
+
+
+class AggregateRow:
+    """One group of an aggregate, with the fields of AnalyticsService's rollup queries."""
+
+    def __init__(
+        self,
+        readings: int,
+        visitor_sum: int,
+        visitor_sum_squares: int,
+        min_visitors: Optional[int],
+        max_visitors: Optional[int],
+        **keys
+    ):
+        self.readings = readings
+        self.visitor_sum = visitor_sum
+        self.visitor_sum_squares = visitor_sum_squares
+        self.min_visitors = min_visitors
+        self.max_visitors = max_visitors
+        for name, value in keys.items():
+            setattr(self, name, value)
+
+
+class PoolSeries:
+    """A pool's readings as growable columns: epoch seconds, count, slot and local day."""
+
+    def __init__(self, capacity: int = 1024):
+        self.size = 0
+        self.last_id = 0  # highest id of the pool's rows appended
+        self.checked_id = 0  # highest id of any pool's rows when last checked
+        self.loaded_at = time.monotonic()
+        self.timestamps = np.empty(capacity, dtype=np.int64)
+        self.counts = np.empty(capacity, dtype=np.int32)
+        self.slots = np.empty(capacity, dtype=np.uint8)
+        self.days = np.empty(capacity, dtype=np.int32)  # proleptic ordinal of the local date
+
+    def _reserve(self, extra: int) -> None:
+        needed = self.size + extra
+        if needed <= len(self.counts):
+            return
+        capacity = max(needed, 2 * len(self.counts))
+        for name in ("timestamps", "counts", "slots", "days"):
+            column = getattr(self, name)
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:self.size] = column[:self.size]
+            setattr(self, name, grown)
+
+    def append(self, rows: List[tuple]) -> None:
+        """Append (id, timestamp, visitor_count, local_date, local_hour, iso_weekday) rows."""
+        if not rows:
+            return
+        self._reserve(len(rows))
+        end = self.size + len(rows)
+        self.timestamps[self.size:end] = [
+            (row[1] if row[1].tzinfo else row[1].replace(tzinfo=timezone.utc)).timestamp() for row in rows
+        ]
+        self.counts[self.size:end] = [row[2] for row in rows]
+        self.slots[self.size:end] = [(row[5] - 1) * 24 + row[4] for row in rows]
+        self.days[self.size:end] = [row[3].toordinal() for row in rows]
+        self.size = end
+
+    def columns(self):
+        return self.counts[:self.size], self.slots[:self.size], self.days[:self.size]
+
+
+def _group(keys, counts, length: int) -> List[tuple]:
+    """(key, readings, sum, sum of squares, min, max) of every non-empty key in range(length)."""
+    readings = np.bincount(keys, minlength=length)
+    values = counts.astype(np.int64)
+    sums = np.bincount(keys, weights=values, minlength=length)
+    squares = np.bincount(keys, weights=values * values, minlength=length)
+    minimums = np.full(length, np.iinfo(np.int64).max)
+    maximums = np.full(length, np.iinfo(np.int64).min)
+    np.minimum.at(minimums, keys, values)
+    np.maximum.at(maximums, keys, values)
+    return [
+        (int(key), int(readings[key]), int(sums[key]), int(squares[key]), int(minimums[key]), int(maximums[key]))
+        for key in np.flatnonzero(readings)
+    ]
+
+
+def _filter_columns(
+    columns,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    hours: Optional[range] = None,
+    weekday: Optional[str] = None,
+    hour: Optional[int] = None
+):
+    """Counts, slots and days of the readings matching the filters."""
+    counts, slots, days = columns
+    mask = np.ones(len(counts), dtype=bool)
+    if start_date:
+        mask &= days >= start_date.toordinal()
+    if end_date:
+        mask &= days <= end_date.toordinal()
+    slot_hours = slots % 24
+    if hours is not None:
+        mask &= (slot_hours >= hours.start) & (slot_hours < hours.stop)
+    if weekday is not None:
+        mask &= slots // 24 == (WEEKDAY_NAMES.index(weekday) if weekday in WEEKDAY_NAMES else SLOTS)
+    if hour is not None:
+        mask &= slot_hours == hour
+    return counts[mask], slots[mask], days[mask]
+
+
+def _weekday_hour_rows(counts, slots) -> List[AggregateRow]:
+    rows = [
+        AggregateRow(*stats, weekday=WEEKDAY_NAMES[slot // 24], hour=slot % 24)
+        for slot, *stats in _group(slots, counts, SLOTS)
+    ]
+    return sorted(rows, key=lambda row: (row.weekday, row.hour))
+
+
+def _day_rows(counts, days) -> List[AggregateRow]:
+    if not len(days):
+        return []
+    first = int(days.min())
+    return [
+        AggregateRow(*stats, local_date=date.fromordinal(first + offset))
+        for offset, *stats in reversed(_group(days - first, counts, int(days.max()) - first + 1))
+    ]
+
+
+class ArrayEngine:
+    """Process-wide in-memory copy of every pool's readings for vectorized analytics.
+
+    A pool's history is loaded on first use; later calls append only rows
+    stored since (by id), so the arrays follow new readings without reloading.
+    Each pool is reloaded in full every ANALYTICS_ENGINE_RELOAD_SECONDS to
+    pick up rows whose transaction committed after a higher id was read.
+
+    With COLUMN_STORE_DIR set, the columns are memory-mapped from the
+    column store instead, which the ingest path keeps up to date.
+    """
+
+    def __init__(self, store: Optional[ColumnStore] = None):
+        self._series: Dict[int, PoolSeries] = {}
+        self._mapped: Dict[int, MappedSeries] = {}
+        self._lock = threading.Lock()  # guards the per-pool dicts, not loading
+        self._pool_locks: Dict[int, threading.Lock] = {}
+        self.store = store or (ColumnStore() if settings.COLUMN_STORE_DIR else None)
+
+    def _load_new(self, db: Session, pool_id: int, series: PoolSeries) -> None:
+        self._load_new_many(db, {pool_id: series})
+
+    def _load_new_many(self, db: Session, pools: Dict[int, PoolSeries]) -> None:
+        """Append the rows stored since each series was loaded, for all pools in one query per chunk."""
+        # The primary key's maximum is a cheap check for new rows of any pool
+        max_id = db.query(func.max(VisitorRecord.id)).scalar() or 0
+        pools = {pool_id: series for pool_id, series in pools.items() if max_id > series.checked_id}
+        for series in pools.values():
+            series.checked_id = max_id
+        while pools:
+            rows = (
+                db.query(
+                    VisitorRecord.id, VisitorRecord.timestamp, VisitorRecord.visitor_count,
+                    VisitorRecord.local_date, VisitorRecord.local_hour, VisitorRecord.iso_weekday,
+                    VisitorRecord.pool_id
+                )
+                .filter(or_(*(
+                    and_(VisitorRecord.pool_id == pool_id, VisitorRecord.id > series.last_id)
+                    for pool_id, series in pools.items()
+                )))
+                .order_by(VisitorRecord.id)
+                .limit(LOAD_CHUNK_SIZE)
+                .all()
+            )
+            new: Dict[int, List[tuple]] = {}
+            for row in rows:
+                # Rows written before the local time columns existed are skipped
+                if row.local_date is not None:
+                    new.setdefault(row.pool_id, []).append(tuple(row))
+                pools[row.pool_id].last_id = row.id
+            for pool_id, pool_rows in new.items():
+                pools[pool_id].append(pool_rows)
+            if len(rows) < LOAD_CHUNK_SIZE:
+                return
+
+    def _pool_lock(self, pool_id: int) -> threading.Lock:
+        with self._lock:
+            return self._pool_locks.setdefault(pool_id, threading.Lock())
+
+    def _mapped_series(self, pool_id: int) -> MappedSeries:
+        mapped = self._mapped.get(pool_id) or MappedSeries(self.store, pool_id)
+        mapped.refresh()
+        self._mapped[pool_id] = mapped
+        return mapped
+
+    def _current_series(self, pool_id: int) -> PoolSeries:
+        """The pool's loaded series, or an empty one when it is missing or due for a reload."""
+        series = self._series.get(pool_id)
+        if series is None or time.monotonic() - series.loaded_at > settings.ANALYTICS_ENGINE_RELOAD_SECONDS:
+            series = PoolSeries()
+        return series
+
+    def series(self, db: Session, pool_id: int):
+        """The pool's PoolSeries, or its MappedSeries when the column store is enabled.
+
+        Loading holds only the pool's own lock, so a cold load or reload of
+        one pool does not hold up analytics of the others.
+        """
+        with self._pool_lock(pool_id):
+            if self.store is not None:
+                return self._mapped_series(pool_id)
+            series = self._current_series(pool_id)
+            self._load_new(db, pool_id, series)
+            self._series[pool_id] = series
+            return series
+
+    def series_many(self, db: Session, pool_ids: List[int]) -> Dict[int, object]:
+        """series() of several pools, checking and loading their new rows together.
+
+        Holds the locks of all the pools while loading, taken in id order so
+        concurrent batches cannot deadlock.
+        """
+        pool_ids = sorted(set(pool_ids))
+        with ExitStack() as locks:
+            for pool_id in pool_ids:
+                locks.enter_context(self._pool_lock(pool_id))
+            if self.store is not None:
+                return {pool_id: self._mapped_series(pool_id) for pool_id in pool_ids}
+            pools = {pool_id: self._current_series(pool_id) for pool_id in pool_ids}
+            self._load_new_many(db, pools)
+            self._series.update(pools)
+            return pools
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+            self._mapped.clear()
+
+    def _select(
+        self,
+        db: Session,
+        pool_id: int,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        hours: Optional[range] = None,
+        weekday: Optional[str] = None,
+        hour: Optional[int] = None
+    ):
+        """Counts, slots and days of the pool's readings matching the filters."""
+        return _filter_columns(self.series(db, pool_id).columns(), start_date, end_date, hours, weekday, hour)
+
+    def weekday_hours(
+        self,
+        db: Session,
+        pool_id: int,
+        hours: range,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ) -> List[AggregateRow]:
+        """Aggregates per weekday and hour, in the order of the rollup query (weekday name, hour)."""
+        counts, slots, _ = self._select(db, pool_id, start_date, end_date, hours)
+        return _weekday_hour_rows(counts, slots)
+
+    def hours(
+        self,
+        db: Session,
+        pool_id: int,
+        hours: range,
+        weekday: Optional[str] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ) -> List[AggregateRow]:
+        counts, slots, _ = self._select(db, pool_id, start_date, end_date, hours, weekday)
+        return [AggregateRow(*stats, hour=hour) for hour, *stats in _group(slots % 24, counts, 24)]
+
+    def days(
+        self,
+        db: Session,
+        pool_id: int,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ) -> List[AggregateRow]:
+        """Aggregates per local date, newest first."""
+        counts, _, days = self._select(db, pool_id, start_date, end_date)
+        return _day_rows(counts, days)
+
+    def rollup_groups(
+        self,
+        db: Session,
+        pool_ids: List[int],
+        hours: range,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        slots: bool = True,
+        days: bool = True
+    ) -> Dict[int, Tuple[List[AggregateRow], List[AggregateRow]]]:
+        """weekday_hours() and days() of several pools (each left empty unless asked for)."""
+        groups = {}
+        for pool_id, series in self.series_many(db, pool_ids).items():
+            counts, pool_slots, pool_days = _filter_columns(series.columns(), start_date, end_date)
+            slot_rows = []
+            if slots:
+                slot_hours = pool_slots % 24
+                in_hours = (slot_hours >= hours.start) & (slot_hours < hours.stop)
+                slot_rows = _weekday_hour_rows(counts[in_hours], pool_slots[in_hours])
+            groups[pool_id] = (slot_rows, _day_rows(counts, pool_days) if days else [])
+        return groups
+
+    def summarize(
+        self,
+        db: Session,
+        pool_id: int,
+        weekday: Optional[str] = None,
+        hour: Optional[int] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ) -> AggregateRow:
+        counts, _, _ = self._select(db, pool_id, start_date, end_date, weekday=weekday, hour=hour)
+        groups = _group(np.zeros(len(counts), dtype=np.intp), counts, 1)
+        if not groups:
+            return AggregateRow(0, 0, 0, None, None)
+        return AggregateRow(*groups[0][1:])
+
+
+_engine: Optional[ArrayEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_array_engine() -> Optional[ArrayEngine]:
+    """The process-wide engine, or None when NumPy is not installed."""
+    global _engine
+    if np is None:
+        return None
+    with _engine_lock:
+        if _engine is None:
+            _engine = ArrayEngine()
+        return _engine
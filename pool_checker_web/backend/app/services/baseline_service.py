@@ -0,0 +1,207 @@
+import json
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db.database import dialect_insert
+from app.models.baseline import PoolBaselineCurve
+from app.models.visitor import VisitorRecord
+from app.services.rollup_service import RollupService
+
+# (pool_id, weekday) in the pool's timezone
+CurveKey = Tuple[int, int]
+
+
+def curve_bounds() -> Tuple[int, int]:
+    """First and last minute of the day the curves cover (the opening hours)."""
+    return settings.ANALYTICS_OPEN_HOUR * 60, settings.ANALYTICS_CLOSE_HOUR * 60 + 59
+
+
+def curve_key(pool_id: int, timestamp: datetime, tz) -> Tuple[CurveKey, int]:
+    """Curve and minute of day of a reading; naive timestamps (as returned by SQLite) are UTC."""
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    local = timestamp.astimezone(tz)
+    return (pool_id, local.weekday()), local.hour * 60 + local.minute
+
+
+class BaselineCurve:
+    """Prefix sums, counts, minimums and maximums of a weekday's readings per minute."""
+
+    def __init__(
+        self,
+        start_minute: int,
+        sums: List[int],
+        counts: List[int],
+        minimums: List[Optional[int]],
+        maximums: List[Optional[int]]
+    ):
+        self.start_minute = start_minute
+        self.sums = sums
+        self.counts = counts
+        self.minimums = minimums
+        self.maximums = maximums
+
+    @classmethod
+    def empty(cls) -> "BaselineCurve":
+        first, last = curve_bounds()
+        length = last - first + 1
+        return cls(first, [0] * length, [0] * length, [None] * length, [None] * length)
+
+    @classmethod
+    def from_row(cls, row: PoolBaselineCurve) -> "BaselineCurve":
+        return cls(
+            row.start_minute, json.loads(row.cum_sum), json.loads(row.cum_count),
+            json.loads(row.cum_min), json.loads(row.cum_max)
+        )
+
+    def to_columns(self) -> dict:
+        return {
+            "start_minute": self.start_minute,
+            "cum_sum": json.dumps(self.sums, separators=(",", ":")),
+            "cum_count": json.dumps(self.counts, separators=(",", ":")),
+            "cum_min": json.dumps(self.minimums, separators=(",", ":")),
+            "cum_max": json.dumps(self.maximums, separators=(",", ":")),
+        }
+
+    def index(self, minute: int) -> Optional[int]:
+        """Entry of a minute of the day; None before opening, the last entry after closing."""
+        if minute < self.start_minute:
+            return None
+        return min(minute - self.start_minute, len(self.sums) - 1)
+
+    def add(self, values: Dict[int, List[int]]) -> None:
+        """Add readings (minute of day -> visitor counts) in one pass over the curve."""
+        total = count = 0
+        low = high = None
+        for i in range(len(self.sums)):
+            for value in values.get(self.start_minute + i, ()):
+                total += value
+                count += 1
+                low = value if low is None else min(low, value)
+                high = value if high is None else max(high, value)
+            if count:
+                self.sums[i] += total
+                self.counts[i] += count
+                self.minimums[i] = low if self.minimums[i] is None else min(self.minimums[i], low)
+                self.maximums[i] = high if self.maximums[i] is None else max(self.maximums[i], high)
+
+    def up_to(self, minute: int) -> Tuple[int, int, Optional[int], Optional[int]]:
+        """Sum, count, minimum and maximum of readings from opening to a minute of the day."""
+        i = self.index(minute)
+        if i is None:
+            return 0, 0, None, None
+        return self.sums[i], self.counts[i], self.minimums[i], self.maximums[i]
+
+    def window(self, first: int, last: int) -> Tuple[int, int]:
+        """Sum and count of readings between two minutes of the day, inclusive."""
+        end = self.index(last)
+        if end is None:
+            return 0, 0
+        start = self.index(first - 1)
+        if start is None:
+            return self.sums[end], self.counts[end]
+        return self.sums[end] - self.sums[start], self.counts[end] - self.counts[start]
+
+
+class BaselineService:
+    """Maintains the minute-of-day baseline curves of every pool weekday.
+
+    New readings update their weekday's curve in the caller's transaction,
+    so "average until now" and "typical right now" never aggregate records.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _lock_curves(self, keys: List[CurveKey]) -> Dict[CurveKey, PoolBaselineCurve]:
+        """Create missing curves and lock all of them for update."""
+        empty = BaselineCurve.empty().to_columns()
+        stmt = dialect_insert(self.db, PoolBaselineCurve).values([
+            {"pool_id": pool_id, "weekday": weekday, **empty} for pool_id, weekday in keys
+        ]).on_conflict_do_nothing(index_elements=["pool_id", "weekday"])
+        self.db.execute(stmt)
+
+        rows = (
+            self.db.query(PoolBaselineCurve)
+            .filter(tuple_(PoolBaselineCurve.pool_id, PoolBaselineCurve.weekday).in_(keys))
+            .order_by(PoolBaselineCurve.id)
+            .with_for_update()
+            .populate_existing()
+            .all()
+        )
+        return {(row.pool_id, row.weekday): row for row in rows}
+
+    def add_readings(self, readings: List[Tuple[int, datetime, int]]) -> int:
+        """Add newly stored (pool_id, timestamp, visitor_count) readings to their curves.
+
+        Readings outside the opening hours are ignored. Returns the number of
+        curves updated.
+        """
+        if not readings:
+            return 0
+        timezones = RollupService(self.db).get_timezones(pool_id for pool_id, _, _ in readings)
+        first, last = curve_bounds()
+        values: Dict[CurveKey, Dict[int, List[int]]] = {}
+        for pool_id, timestamp, visitor_count in readings:
+            if pool_id not in timezones:
+                continue
+            key, minute = curve_key(pool_id, timestamp, timezones[pool_id])
+            if first <= minute <= last:
+                values.setdefault(key, {}).setdefault(minute, []).append(visitor_count)
+        if not values:
+            return 0
+
+        for key, row in self._lock_curves(sorted(values)).items():
+            curve = BaselineCurve.from_row(row)
+            curve.add(values[key])
+            for column, value in curve.to_columns().items():
+                setattr(row, column, value)
+        self.db.flush()
+        return len(values)
+
+    def rebuild(self, pool_id: int) -> int:
+        """Recompute a pool's curves from its visitor records' local time columns."""
+        first, last = curve_bounds()
+        rows = (
+            self.db.query(VisitorRecord.iso_weekday, VisitorRecord.local_minute, VisitorRecord.visitor_count)
+            .filter(
+                VisitorRecord.pool_id == pool_id,
+                VisitorRecord.local_minute >= first,
+                VisitorRecord.local_minute <= last
+            )
+            .yield_per(5000)
+        )
+        values: Dict[int, Dict[int, List[int]]] = {}
+        for row in rows:
+            values.setdefault(row.iso_weekday - 1, {}).setdefault(row.local_minute, []).append(row.visitor_count)
+
+        self.db.query(PoolBaselineCurve).filter(PoolBaselineCurve.pool_id == pool_id).delete()
+        for weekday, minutes in sorted(values.items()):
+            curve = BaselineCurve.empty()
+            curve.add(minutes)
+            self.db.add(PoolBaselineCurve(pool_id=pool_id, weekday=weekday, **curve.to_columns()))
+        self.db.commit()
+        return len(values)
+
+    def get_curves(self, keys: List[CurveKey]) -> Dict[CurveKey, BaselineCurve]:
+        """Curves of several (pool_id, weekday) pairs, in one query."""
+        if not keys:
+            return {}
+        rows = (
+            self.db.query(PoolBaselineCurve)
+            .filter(tuple_(PoolBaselineCurve.pool_id, PoolBaselineCurve.weekday).in_(keys))
+            .all()
+        )
+        return {(row.pool_id, row.weekday): BaselineCurve.from_row(row) for row in rows}
+
+    def get_curve(self, pool_id: int, weekday: int) -> Optional[BaselineCurve]:
+        row = (
+            self.db.query(PoolBaselineCurve)
+            .filter(PoolBaselineCurve.pool_id == pool_id, PoolBaselineCurve.weekday == weekday)
+            .first()
+        )
+        return BaselineCurve.from_row(row) if row else None
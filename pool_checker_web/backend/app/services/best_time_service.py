@@ -0,0 +1,260 @@
+import math
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pytz
+import redis
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db.redis import get_redis
+from app.models.baseline import PoolBaselineCurve
+from app.models.pool import Pool
+from app.schemas.analytics import BestTimes, BestTimeWindow
+from app.services.baseline_service import BaselineCurve
+
+
+def minute_of_day(value: str) -> int:
+    """Minute of the day of an "HH:MM" time; raises ValueError if it is not a valid time."""
+    parsed = datetime.strptime(value, "%H:%M")
+    return parsed.hour * 60 + parsed.minute
+
+
+def format_minute(minute: int) -> str:
+    return f"{minute // 60:02d}:{minute % 60:02d}"
+
+
+class SparseTable:
+    """Range-minimum index: O(n log n) to build, then the minimum of any range in O(1)."""
+
+    def __init__(self, values: List[float]):
+        self.values = values
+        # levels[k][i]: index of the minimum of values[i:i + 2**k]
+        self.levels = [list(range(len(values)))]
+        span = 1
+        while span * 2 <= len(values):
+            previous = self.levels[-1]
+            self.levels.append([
+                self._lower(previous[i], previous[i + span]) for i in range(len(values) - 2 * span + 1)
+            ])
+            span *= 2
+
+    def _lower(self, i: int, j: int) -> int:
+        return i if self.values[i] <= self.values[j] else j
+
+    def argmin(self, first: int, last: int) -> int:
+        """Index of the smallest value in values[first:last + 1] (the first one on ties)."""
+        level = (last - first + 1).bit_length() - 1
+        return self._lower(self.levels[level][first], self.levels[level][last - (1 << level) + 1])
+
+
+class CrowdCurve:
+    """Expected visitors of a pool weekday per BEST_TIME_SLOT_MINUTES slot.
+
+    Window means of a duration are indexed in a sparse table the first time
+    that duration is asked for, so later queries take constant time.
+    """
+
+    def __init__(self, start_minute: int, slot_minutes: int, expected: List[Optional[float]]):
+        self.start_minute = start_minute
+        self.slot_minutes = slot_minutes
+        self.expected = expected
+        self._tables: Dict[int, SparseTable] = {}
+
+    @classmethod
+    def from_baseline(cls, curve: BaselineCurve, slot_minutes: int) -> "CrowdCurve":
+        expected = []
+        for start in range(curve.start_minute, curve.start_minute + len(curve.sums), slot_minutes):
+            total, count = curve.window(start, start + slot_minutes - 1)
+            expected.append(total / count if count else None)
+        return cls(curve.start_minute, slot_minutes, expected)
+
+    def _table(self, slots: int) -> SparseTable:
+        if slots not in self._tables:
+            # Windows with a slot nobody has seen yet never win
+            prefix = [0.0]
+            unknown = [0]
+            for value in self.expected:
+                prefix.append(prefix[-1] + (value or 0.0))
+                unknown.append(unknown[-1] + (value is None))
+            self._tables[slots] = SparseTable([
+                (prefix[i + slots] - prefix[i]) / slots if unknown[i + slots] == unknown[i] else math.inf
+                for i in range(len(self.expected) - slots + 1)
+            ])
+        return self._tables[slots]
+
+    def quietest(self, first_minute: int, end_minute: int, duration_minutes: int) -> Optional[Tuple[int, float]]:
+        """Start minute and mean expected visitors of the quietest window.
+
+        Windows start on the slot grid at or after first_minute and end by
+        end_minute. None if no window fits or none has data.
+        """
+        slots = max(1, math.ceil(duration_minutes / self.slot_minutes))
+        first = max(0, math.ceil((first_minute - self.start_minute) / self.slot_minutes))
+        last = min(
+            (end_minute - self.start_minute) // self.slot_minutes - slots,
+            len(self.expected) - slots
+        )
+        if first > last:
+            return None
+        table = self._table(slots)
+        i = table.argmin(first, last)
+        if math.isinf(table.values[i]):
+            return None
+        return self.start_minute + i * self.slot_minutes, table.values[i]
+
+
+class PoolCrowdIndex:
+    """A pool's name, timezone and crowd curve per weekday (0 = Monday)."""
+
+    def __init__(self, pool_id: int, name: str, tz, curves: Dict[int, CrowdCurve]):
+        self.pool_id = pool_id
+        self.name = name
+        self.tz = tz
+        self.curves = curves
+        self.loaded_at = time.monotonic()
+        self.generation = 0  # the pool's generation in Redis when loaded
+
+
+class BestTimeIndex:
+    """Process-wide crowd curves of the pools, reloaded from the baseline curves when they change.
+
+    Storing readings bumps the pools' generation counters in Redis (see
+    invalidate), so every API process reloads them on its next request.
+    The TTL still applies, and alone covers the time Redis is unavailable.
+    """
+
+    GENERATION_KEY_TEMPLATE = "best_time:generation:{pool_id}"
+
+    def __init__(self, redis_client: Optional[redis.Redis] = None):
+        self._pools: Dict[int, PoolCrowdIndex] = {}
+        self._lock = threading.Lock()
+        self.redis = redis_client
+
+    def _redis(self) -> redis.Redis:
+        return self.redis if self.redis is not None else get_redis()
+
+    def _generation_key(self, pool_id: int) -> str:
+        return self.GENERATION_KEY_TEMPLATE.format(pool_id=pool_id)
+
+    def _generations(self, pool_ids: List[int]) -> Dict[int, int]:
+        """Current generation of each pool; empty if Redis is unavailable."""
+        try:
+            values = self._redis().mget([self._generation_key(pool_id) for pool_id in pool_ids])
+        except redis.RedisError:
+            return {}
+        return {pool_id: int(value or 0) for pool_id, value in zip(pool_ids, values)}
+
+    def _load(self, db: Session, pool_ids: List[int]) -> Dict[int, PoolCrowdIndex]:
+        slot_minutes = settings.BEST_TIME_SLOT_MINUTES
+        pools = {
+            pool.id: PoolCrowdIndex(pool.id, pool.name, pytz.timezone(pool.timezone or "CET"), {})
+            for pool in db.query(Pool).filter(Pool.id.in_(pool_ids)).all()
+        }
+        rows = db.query(PoolBaselineCurve).filter(PoolBaselineCurve.pool_id.in_(list(pools))).all()
+        for row in rows:
+            pools[row.pool_id].curves[row.weekday] = CrowdCurve.from_baseline(
+                BaselineCurve.from_row(row), slot_minutes
+            )
+        return pools
+
+    def get(self, db: Session, pool_ids: Iterable[int]) -> List[PoolCrowdIndex]:
+        """Indexes of the pools that exist, loading missing, changed or expired ones in one query."""
+        pool_ids = list(dict.fromkeys(pool_ids))
+        expired_before = time.monotonic() - settings.BEST_TIME_INDEX_TTL_SECONDS
+        generations = self._generations(pool_ids)
+        with self._lock:
+            stale = [
+                pool_id for pool_id in pool_ids
+                if pool_id not in self._pools
+                or self._pools[pool_id].loaded_at < expired_before
+                or self._pools[pool_id].generation != generations.get(pool_id, self._pools[pool_id].generation)
+            ]
+        if stale:
+            loaded = self._load(db, stale)
+            with self._lock:
+                for pool_id in stale:
+                    if pool_id in loaded:
+                        loaded[pool_id].generation = generations.get(pool_id, 0)
+                        self._pools[pool_id] = loaded[pool_id]
+                    else:
+                        self._pools.pop(pool_id, None)
+        with self._lock:
+            return [self._pools[pool_id] for pool_id in pool_ids if pool_id in self._pools]
+
+    def invalidate(self, pool_ids: Iterable[int]) -> None:
+        """Make every process reload these pools, whose baseline curves changed."""
+        pool_ids = list(dict.fromkeys(pool_ids))
+        with self._lock:
+            for pool_id in pool_ids:
+                self._pools.pop(pool_id, None)
+        try:
+            pipe = self._redis().pipeline()
+            for pool_id in pool_ids:
+                pipe.incr(self._generation_key(pool_id))
+            pipe.execute()
+        except redis.RedisError:
+            pass  # other processes fall back to the TTL
+
+
+best_time_index = BestTimeIndex()
+
+
+class BestTimeService:
+    """Finds the quietest time windows to swim across pools and days."""
+
+    def __init__(self, db: Session, index: Optional[BestTimeIndex] = None):
+        self.db = db
+        self.index = index or best_time_index
+
+    def find_quietest(
+        self,
+        pool_ids: List[int],
+        start_time: str,
+        end_time: str,
+        duration_minutes: int = 90,
+        days: int = 7,
+        limit: int = 5,
+        now: Optional[datetime] = None
+    ) -> BestTimes:
+        """The quietest window of each pool and day from today on, quietest first.
+
+        Times are local to each pool; today's windows start no earlier than now.
+        """
+        now = now or datetime.now(timezone.utc)
+        first_minute, end_minute = minute_of_day(start_time), minute_of_day(end_time)
+        windows = []
+        for pool in self.index.get(self.db, pool_ids):
+            local_now = now.astimezone(pool.tz)
+            for offset in range(days):
+                day = local_now.date() + timedelta(days=offset)
+                curve = pool.curves.get(day.weekday())
+                if curve is None:
+                    continue
+                first = first_minute
+                if offset == 0:
+                    first = max(first, local_now.hour * 60 + local_now.minute)
+                best = curve.quietest(first, end_minute, duration_minutes)
+                if best is None:
+                    continue
+                start, expected = best
+                windows.append(BestTimeWindow(
+                    pool_id=pool.pool_id,
+                    pool_name=pool.name,
+                    date=day,
+                    weekday=day.strftime("%A"),
+                    start_time=format_minute(start),
+                    end_time=format_minute(start + duration_minutes),
+                    expected_visitors=round(expected, 1)
+                ))
+
+        windows.sort(key=lambda window: (window.expected_visitors, window.date, window.start_time))
+        return BestTimes(
+            start_time=start_time,
+            end_time=end_time,
+            duration_minutes=duration_minutes,
+            slot_minutes=settings.BEST_TIME_SLOT_MINUTES,
+            windows=windows[:limit]
+        )
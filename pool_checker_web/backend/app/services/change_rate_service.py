@@ -0,0 +1,146 @@
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+import pytz
+from sqlalchemy import func, tuple_
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.change_profile import PoolChangeProfile
+from app.models.pool import Pool
+from app.models.visitor import VisitorRecord
+
+# (weekday, slot) in the pool's timezone
+ProfileSlot = Tuple[int, int]
+
+
+def _to_local(timestamp: datetime, tz) -> datetime:
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.astimezone(tz)
+
+
+def profile_slot(local_time: datetime) -> ProfileSlot:
+    """Weekday and time-of-day slot of a pool-local time."""
+    minute_of_day = local_time.hour * 60 + local_time.minute
+    return local_time.weekday(), minute_of_day // settings.SCHEDULER_PROFILE_SLOT_MINUTES
+
+
+def change_rate(previous: Tuple[datetime, int], current: Tuple[datetime, int]) -> Optional[float]:
+    """Absolute change in visitors per minute between two readings.
+
+    None if the readings are too far apart to say anything about the rate.
+    """
+    minutes = (current[0] - previous[0]).total_seconds() / 60
+    if minutes <= 0 or minutes > settings.SCHEDULER_MAX_READING_GAP_MINUTES:
+        return None
+    return abs(current[1] - previous[1]) / minutes
+
+
+class ChangeRateService:
+    """Learns how fast each pool's visitor count changes, per weekday time slot."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def compute_profile(self, pool: Pool, since: datetime) -> Dict[ProfileSlot, Tuple[float, int]]:
+        """Mean change rate and sample count per slot from the pool's visitor records."""
+        tz = pytz.timezone(pool.timezone or "CET")
+        rows = (
+            self.db.query(VisitorRecord.timestamp, VisitorRecord.visitor_count)
+            .filter(VisitorRecord.pool_id == pool.id, VisitorRecord.timestamp >= since)
+            .order_by(VisitorRecord.timestamp)
+            .all()
+        )
+
+        totals: Dict[ProfileSlot, List[float]] = {}
+        previous = None
+        for row in rows:
+            current = (_to_local(row.timestamp, tz), row.visitor_count)
+            if previous is not None and previous[0].date() == current[0].date():
+                rate = change_rate(previous, current)
+                if rate is not None:
+                    # Attribute the change to the slot where it started
+                    totals.setdefault(profile_slot(previous[0]), []).append(rate)
+            previous = current
+
+        return {slot: (sum(rates) / len(rates), len(rates)) for slot, rates in totals.items()}
+
+    def rebuild(self, pool: Pool, weeks: Optional[int] = None) -> int:
+        """Replace a pool's profile with one learned from recent records."""
+        weeks = weeks or settings.SCHEDULER_PROFILE_WEEKS
+        since = datetime.now(timezone.utc) - timedelta(weeks=weeks)
+        profile = self.compute_profile(pool, since)
+
+        self.db.query(PoolChangeProfile).filter(PoolChangeProfile.pool_id == pool.id).delete()
+        self.db.add_all([
+            PoolChangeProfile(
+                pool_id=pool.id,
+                weekday=weekday,
+                slot=slot,
+                change_rate=round(rate, 4),
+                samples=samples
+            )
+            for (weekday, slot), (rate, samples) in profile.items()
+        ])
+        self.db.commit()
+        return len(profile)
+
+    def get_rates(self, slots: Dict[int, ProfileSlot]) -> Dict[int, float]:
+        """Learned change rates for pool id -> (weekday, slot), in one query."""
+        if not slots:
+            return {}
+        keys = [(pool_id, weekday, slot) for pool_id, (weekday, slot) in slots.items()]
+        rows = (
+            self.db.query(PoolChangeProfile.pool_id, PoolChangeProfile.change_rate)
+            .filter(
+                tuple_(
+                    PoolChangeProfile.pool_id, PoolChangeProfile.weekday, PoolChangeProfile.slot
+                ).in_(keys)
+            )
+            .all()
+        )
+        return {row.pool_id: row.change_rate for row in rows}
+
+    def get_recent_rates(self, pool_ids: List[int]) -> Dict[int, float]:
+        """Change rate between each pool's two latest readings, in one query.
+
+        Only readings within two reading gaps of now count as recent.
+        """
+        if not pool_ids:
+            return {}
+        since = datetime.now(timezone.utc) - timedelta(
+            minutes=2 * settings.SCHEDULER_MAX_READING_GAP_MINUTES
+        )
+        ranked = (
+            self.db.query(
+                VisitorRecord.pool_id,
+                VisitorRecord.timestamp,
+                VisitorRecord.visitor_count,
+                func.row_number().over(
+                    partition_by=VisitorRecord.pool_id,
+                    order_by=VisitorRecord.timestamp.desc()
+                ).label("rank")
+            )
+            .filter(VisitorRecord.pool_id.in_(pool_ids), VisitorRecord.timestamp >= since)
+            .subquery()
+        )
+        rows = (
+            self.db.query(ranked.c.pool_id, ranked.c.timestamp, ranked.c.visitor_count)
+            .filter(ranked.c.rank <= 2)
+            .order_by(ranked.c.pool_id, ranked.c.timestamp)
+            .all()
+        )
+
+        readings: Dict[int, List[Tuple[datetime, int]]] = {}
+        for row in rows:
+            reading = (_to_local(row.timestamp, timezone.utc), row.visitor_count)
+            readings.setdefault(row.pool_id, []).append(reading)
+
+        rates = {}
+        for pool_id, pair in readings.items():
+            if len(pair) == 2:
+                rate = change_rate(pair[0], pair[1])
+                if rate is not None:
+                    rates[pool_id] = rate
+        return rates
@@ -0,0 +1,230 @@
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+import redis
+
+from app.config import settings
+from app.schemas.scrape import CircuitBreakerStatus
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
+def _format_time(value: Optional[datetime]) -> str:
+    return value.isoformat() if value else ""
+
+
+class BreakerState:
+    """A pool's circuit breaker and the transitions between its states.
+
+    closed: scrapes run; N consecutive failures open it.
+    open: nothing is dispatched until open_until.
+    half_open: one probe scrape runs; success closes the breaker, failure
+    reopens it with twice the previous cooldown.
+    """
+
+    def __init__(
+        self,
+        state: str = STATE_CLOSED,
+        consecutive_failures: int = 0,
+        trips: int = 0,
+        cooldown_seconds: int = 0,
+        open_until: Optional[datetime] = None,
+        probe_started_at: Optional[datetime] = None,
+        last_error: Optional[str] = None,
+        last_failure_at: Optional[datetime] = None,
+        last_success_at: Optional[datetime] = None,
+        failed_time_ms: float = 0.0
+    ):
+        self.state = state
+        self.consecutive_failures = consecutive_failures
+        self.trips = trips
+        self.cooldown_seconds = cooldown_seconds
+        self.open_until = open_until
+        self.probe_started_at = probe_started_at
+        self.last_error = last_error
+        self.last_failure_at = last_failure_at
+        self.last_success_at = last_success_at
+        self.failed_time_ms = failed_time_ms
+
+    @classmethod
+    def from_hash(cls, data: Dict[str, str]) -> "BreakerState":
+        if not data:
+            return cls()
+        return cls(
+            state=data.get("state", STATE_CLOSED),
+            consecutive_failures=int(data.get("consecutive_failures", 0)),
+            trips=int(data.get("trips", 0)),
+            cooldown_seconds=int(data.get("cooldown_seconds", 0)),
+            open_until=_parse_time(data.get("open_until")),
+            probe_started_at=_parse_time(data.get("probe_started_at")),
+            last_error=data.get("last_error") or None,
+            last_failure_at=_parse_time(data.get("last_failure_at")),
+            last_success_at=_parse_time(data.get("last_success_at")),
+            failed_time_ms=float(data.get("failed_time_ms", 0))
+        )
+
+    def to_hash(self) -> Dict[str, str]:
+        return {
+            "state": self.state,
+            "consecutive_failures": str(self.consecutive_failures),
+            "trips": str(self.trips),
+            "cooldown_seconds": str(self.cooldown_seconds),
+            "open_until": _format_time(self.open_until),
+            "probe_started_at": _format_time(self.probe_started_at),
+            "last_error": self.last_error or "",
+            "last_failure_at": _format_time(self.last_failure_at),
+            "last_success_at": _format_time(self.last_success_at),
+            "failed_time_ms": str(round(self.failed_time_ms, 1)),
+        }
+
+    def is_blocking(self, now: datetime) -> bool:
+        """Whether a scrape must not run now (a due half-open probe may)."""
+        if self.state == STATE_OPEN:
+            return self.open_until is not None and now < self.open_until
+        return False
+
+    def try_dispatch(self, now: datetime) -> bool:
+        """Decide whether to dispatch a scrape, starting a probe when the cooldown ran out."""
+        if self.state == STATE_CLOSED:
+            return True
+        if self.state == STATE_OPEN:
+            if self.is_blocking(now):
+                return False
+            self.state = STATE_HALF_OPEN
+            self.probe_started_at = now
+            return True
+        # Half-open: only one probe at a time, unless the last one never reported back
+        stale_after = timedelta(seconds=max(self.cooldown_seconds, settings.BREAKER_BASE_COOLDOWN_MINUTES * 60))
+        if self.probe_started_at is None or now - self.probe_started_at > stale_after:
+            self.probe_started_at = now
+            return True
+        return False
+
+    def on_success(self, now: datetime) -> None:
+        self.state = STATE_CLOSED
+        self.consecutive_failures = 0
+        self.cooldown_seconds = 0
+        self.open_until = None
+        self.probe_started_at = None
+        self.last_success_at = now
+
+    def on_failure(self, now: datetime, error: str, duration_ms: float = 0.0) -> None:
+        self.consecutive_failures += 1
+        self.last_error = error[:500]
+        self.last_failure_at = now
+        self.failed_time_ms += duration_ms
+
+        if self.state == STATE_HALF_OPEN:
+            cooldown = min(
+                self.cooldown_seconds * 2 or settings.BREAKER_BASE_COOLDOWN_MINUTES * 60,
+                settings.BREAKER_MAX_COOLDOWN_MINUTES * 60
+            )
+            self._open(now, cooldown)
+        elif self.state == STATE_CLOSED and self.consecutive_failures >= settings.BREAKER_FAILURE_THRESHOLD:
+            self._open(now, settings.BREAKER_BASE_COOLDOWN_MINUTES * 60)
+
+    def _open(self, now: datetime, cooldown_seconds: int) -> None:
+        self.state = STATE_OPEN
+        self.trips += 1
+        self.cooldown_seconds = cooldown_seconds
+        self.open_until = now + timedelta(seconds=cooldown_seconds)
+        self.probe_started_at = None
+
+    def to_status(self, pool_id: int) -> CircuitBreakerStatus:
+        return CircuitBreakerStatus(
+            pool_id=pool_id,
+            state=self.state,
+            consecutive_failures=self.consecutive_failures,
+            trips=self.trips,
+            cooldown_seconds=self.cooldown_seconds,
+            open_until=self.open_until,
+            last_error=self.last_error,
+            last_failure_at=self.last_failure_at,
+            last_success_at=self.last_success_at,
+            failed_time_ms=round(self.failed_time_ms, 1)
+        )
+
+
+class CircuitBreakerService:
+    """Per-pool circuit breakers for scraping, stored in Redis hashes."""
+
+    KEY_TEMPLATE = "scrape:breaker:{pool_id}"
+
+    def __init__(self, redis_client: redis.Redis):
+        self.redis = redis_client
+
+    def _key(self, pool_id: int) -> str:
+        return self.KEY_TEMPLATE.format(pool_id=pool_id)
+
+    def _update(self, pool_id: int, change: Callable[[BreakerState], object]):
+        """Apply a transition atomically (optimistic WATCH/MULTI); returns change()'s result."""
+        key = self._key(pool_id)
+        with self.redis.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(key)
+                    state = BreakerState.from_hash(pipe.hgetall(key))
+                    result = change(state)
+                    pipe.multi()
+                    pipe.hset(key, mapping=state.to_hash())
+                    pipe.execute()
+                    return result
+                except redis.WatchError:
+                    continue
+
+    def get(self, pool_id: int) -> BreakerState:
+        return BreakerState.from_hash(self.redis.hgetall(self._key(pool_id)))
+
+    def get_statuses(self, pool_ids: List[int]) -> List[CircuitBreakerStatus]:
+        pipe = self.redis.pipeline()
+        for pool_id in pool_ids:
+            pipe.hgetall(self._key(pool_id))
+        return [
+            BreakerState.from_hash(data).to_status(pool_id)
+            for pool_id, data in zip(pool_ids, pipe.execute())
+        ]
+
+    def is_blocking(self, pool_id: int) -> bool:
+        return self.get(pool_id).is_blocking(datetime.now(timezone.utc))
+
+    def try_dispatch(self, pool_id: int) -> bool:
+        now = datetime.now(timezone.utc)
+        return self._update(pool_id, lambda state: state.try_dispatch(now))
+
+    def filter_dispatchable(self, pool_ids: List[int]) -> Tuple[List[int], List[int]]:
+        """Split pools into those that may be scraped now and those whose breaker blocks them.
+
+        Closed breakers are read in one round trip; only the others need a transition.
+        """
+        pipe = self.redis.pipeline()
+        for pool_id in pool_ids:
+            pipe.hget(self._key(pool_id), "state")
+        allowed, blocked = [], []
+        for pool_id, state in zip(pool_ids, pipe.execute()):
+            if state in (None, STATE_CLOSED) or self.try_dispatch(pool_id):
+                allowed.append(pool_id)
+            else:
+                blocked.append(pool_id)
+        return allowed, blocked
+
+    def record_success(self, pool_id: int) -> None:
+        now = datetime.now(timezone.utc)
+        self._update(pool_id, lambda state: state.on_success(now))
+
+    def record_failure(self, pool_id: int, error: str, duration_ms: float = 0.0) -> BreakerState:
+        now = datetime.now(timezone.utc)
+
+        def fail(state: BreakerState) -> BreakerState:
+            state.on_failure(now, error, duration_ms)
+            return state
+
+        return self._update(pool_id, fail)
+
+    def reset(self, pool_id: int) -> None:
+        self.redis.delete(self._key(pool_id))
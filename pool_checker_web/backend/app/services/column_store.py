@@ -0,0 +1,253 @@
+import fcntl
+import json
+import os
+import shutil
+import threading
+from array import array
+from contextlib import contextmanager
+from datetime import timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.visitor import VisitorRecord
+
+try:
+    import numpy as np
+except ImportError:  # only readers (ANALYTICS_ENGINE=numpy) map the columns
+    np = None
+
+# Column name -> array typecode; one fixed-width file per column
+COLUMNS: List[Tuple[str, str]] = [
+    ("id", "q"),
+    ("timestamp", "q"),  # epoch seconds
+    ("visitor_count", "i"),
+    ("slot", "B"),  # weekday * 24 + hour, in the pool's timezone
+    ("day", "i"),  # proleptic ordinal of the local date
+]
+
+# Rows read from visitor_records per query while syncing
+SYNC_CHUNK_SIZE = 50000
+
+
+def record_values(row) -> Tuple[int, int, int, int, int]:
+    """Column values of a (id, timestamp, visitor_count, local_date, local_hour, iso_weekday) row."""
+    timestamp = row[1] if row[1].tzinfo else row[1].replace(tzinfo=timezone.utc)
+    return row[0], int(timestamp.timestamp()), row[2], (row[5] - 1) * 24 + row[4], row[3].toordinal()
+
+
+class ColumnStore:
+    """Append-only columnar copy of visitor_records, one directory per pool.
+
+    Writers (the ingest path and the maintenance script) append new rows
+    under a per-pool file lock and then publish the committed row count in
+    meta.json with an atomic rename; readers only ever look at that many
+    rows, so a half-written append is invisible. Compaction rewrites a
+    pool's files from the database under a new generation number.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or settings.COLUMN_STORE_DIR
+
+    def _pool_dir(self, pool_id: int) -> str:
+        return os.path.join(self.root, f"pool_{pool_id}")
+
+    @contextmanager
+    def _locked(self, pool_id: int):
+        os.makedirs(self.root, exist_ok=True)
+        with open(os.path.join(self.root, f"pool_{pool_id}.lock"), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def read_meta(self, pool_id: int) -> Dict[str, int]:
+        try:
+            with open(os.path.join(self._pool_dir(pool_id), "meta.json")) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"rows": 0, "last_id": 0, "generation": 0}
+
+    def _write_meta(self, directory: str, meta: Dict[str, int]) -> None:
+        path = os.path.join(directory, "meta.json")
+        with open(path + ".tmp", "w") as f:
+            json.dump(meta, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(path + ".tmp", path)
+
+    def _append(self, directory: str, meta: Dict[str, int], rows: List[tuple]) -> None:
+        """Write rows after the committed ones, dropping anything a failed append left behind."""
+        os.makedirs(directory, exist_ok=True)
+        for index, (name, typecode) in enumerate(COLUMNS):
+            values = array(typecode, (row[index] for row in rows))
+            path = os.path.join(directory, f"{name}.bin")
+            with open(path, "ab") as f:
+                f.truncate(meta["rows"] * values.itemsize)
+                values.tofile(f)
+                f.flush()
+                os.fsync(f.fileno())
+        meta["rows"] += len(rows)
+        meta["last_id"] = max(meta["last_id"], max(row[0] for row in rows))
+        self._write_meta(directory, meta)
+
+    def _new_rows(self, db: Session, pool_id: int, after_id: int) -> Iterable[List[tuple]]:
+        """Chunks of the pool's rows with ids above after_id, in id order."""
+        while True:
+            rows = (
+                db.query(
+                    VisitorRecord.id, VisitorRecord.timestamp, VisitorRecord.visitor_count,
+                    VisitorRecord.local_date, VisitorRecord.local_hour, VisitorRecord.iso_weekday
+                )
+                .filter(VisitorRecord.pool_id == pool_id, VisitorRecord.id > after_id)
+                .order_by(VisitorRecord.id)
+                .limit(SYNC_CHUNK_SIZE)
+                .all()
+            )
+            if not rows:
+                return
+            after_id = rows[-1].id
+            # Rows written before the local time columns existed wait for compaction
+            yield [record_values(row) for row in rows if row.local_date is not None]
+            if len(rows) < SYNC_CHUNK_SIZE:
+                return
+
+    def sync(self, db: Session, pool_id: int) -> int:
+        """Append the pool's rows stored since the last sync; returns rows appended."""
+        with self._locked(pool_id):
+            meta = self.read_meta(pool_id)
+            appended = 0
+            for chunk in self._new_rows(db, pool_id, meta["last_id"]):
+                if chunk:
+                    self._append(self._pool_dir(pool_id), meta, chunk)
+                    appended += len(chunk)
+            return appended
+
+    def compact(self, db: Session, pool_id: int) -> int:
+        """Rewrite the pool's files from visitor_records in timestamp order; returns rows written.
+
+        Also picks up rows that a sync missed because their transaction
+        committed after a higher id had been synced.
+        """
+        with self._locked(pool_id):
+            generation = self.read_meta(pool_id)["generation"] + 1
+            directory = self._pool_dir(pool_id)
+            staging = f"{directory}.compact"
+            shutil.rmtree(staging, ignore_errors=True)
+            meta = {"rows": 0, "last_id": 0, "generation": generation}
+
+            rows = (
+                db.query(
+                    VisitorRecord.id, VisitorRecord.timestamp, VisitorRecord.visitor_count,
+                    VisitorRecord.local_date, VisitorRecord.local_hour, VisitorRecord.iso_weekday
+                )
+                .filter(VisitorRecord.pool_id == pool_id, VisitorRecord.local_date.isnot(None))
+                .order_by(VisitorRecord.timestamp)
+                .yield_per(SYNC_CHUNK_SIZE)
+            )
+            chunk = []
+            for row in rows:
+                chunk.append(record_values(row))
+                if len(chunk) == SYNC_CHUNK_SIZE:
+                    self._append(staging, meta, chunk)
+                    chunk = []
+            if chunk:
+                self._append(staging, meta, chunk)
+            os.makedirs(staging, exist_ok=True)
+            self._write_meta(staging, meta)
+
+            # Readers keep the files they mapped; new readers see the new generation
+            retired = f"{directory}.old"
+            shutil.rmtree(retired, ignore_errors=True)
+            if os.path.exists(directory):
+                os.rename(directory, retired)
+            os.rename(staging, directory)
+            shutil.rmtree(retired, ignore_errors=True)
+            return meta["rows"]
+
+    def read_column(self, pool_id: int, name: str) -> array:
+        """A committed column as a Python array (for checks; readers map the files instead)."""
+        typecode = dict(COLUMNS)[name]
+        rows = self.read_meta(pool_id)["rows"]
+        values = array(typecode)
+        if rows:
+            with open(os.path.join(self._pool_dir(pool_id), f"{name}.bin"), "rb") as f:
+                values.fromfile(f, rows)
+        return values
+
+    def check(self, db: Session, pool_id: int) -> Dict[str, object]:
+        """Compare the stored rows with visitor_records (count, visitor sum, highest id)."""
+        db_rows, db_sum, db_last_id = (
+            db.query(func.count(VisitorRecord.id), func.sum(VisitorRecord.visitor_count), func.max(VisitorRecord.id))
+            .filter(VisitorRecord.pool_id == pool_id, VisitorRecord.local_date.isnot(None))
+            .one()
+        )
+        meta = self.read_meta(pool_id)
+        stored_ids = self.read_column(pool_id, "id")
+        report = {
+            "pool_id": pool_id,
+            "generation": meta["generation"],
+            "db_rows": db_rows,
+            "stored_rows": meta["rows"],
+            "db_visitor_sum": int(db_sum or 0),
+            "stored_visitor_sum": sum(self.read_column(pool_id, "visitor_count")),
+            "db_last_id": db_last_id or 0,
+            "stored_last_id": meta["last_id"],
+            "duplicate_ids": len(stored_ids) - len(set(stored_ids)),
+        }
+        report["consistent"] = (
+            report["db_rows"] == report["stored_rows"]
+            and report["db_visitor_sum"] == report["stored_visitor_sum"]
+            and report["db_last_id"] == report["stored_last_id"]
+            and report["duplicate_ids"] == 0
+        )
+        return report
+
+
+class MappedSeries:
+    """A pool's stored columns memory-mapped read-only, remapped when new rows are committed.
+
+    Offers the columns() of array_engine.PoolSeries, as zero-copy views
+    into the page cache shared by every process reading the store.
+    """
+
+    def __init__(self, store: ColumnStore, pool_id: int):
+        self.store = store
+        self.pool_id = pool_id
+        self.size = 0
+        self.generation = None
+        self._columns: Dict[str, object] = {}
+
+    def refresh(self) -> None:
+        meta = self.store.read_meta(self.pool_id)
+        if meta["rows"] == self.size and meta["generation"] == self.generation:
+            return
+        directory = self.store._pool_dir(self.pool_id)
+        self._columns = {
+            name: (
+                np.memmap(os.path.join(directory, f"{name}.bin"), dtype=np.dtype(typecode), mode="r",
+                          shape=(meta["rows"],))
+                if meta["rows"] else np.empty(0, dtype=np.dtype(typecode))
+            )
+            for name, typecode in COLUMNS
+        }
+        self.size = meta["rows"]
+        self.generation = meta["generation"]
+
+    def columns(self):
+        return self._columns["visitor_count"], self._columns["slot"], self._columns["day"]
+
+
+_lock = threading.Lock()
+
+
+def sync_pools(db: Session, pool_ids: Iterable[int]) -> int:
+    """Append new rows of the pools to the store, if COLUMN_STORE_DIR is set."""
+    if not settings.COLUMN_STORE_DIR:
+        return 0
+    store = ColumnStore()
+    with _lock:
+        return sum(store.sync(db, pool_id) for pool_id in sorted(set(pool_ids)))
@@ -0,0 +1,252 @@
+import csv
+import io
+import json
+import zlib
+from datetime import timezone
+from typing import Callable, Iterator, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.db.database import SessionLocal
+from app.models.visitor import VisitorRecord
+from app.schemas.visitor import VisitorRecordFilter
+from app.services.visitor_service import VisitorService
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # only needed for the parquet and arrow formats
+    pa = pq = None
+
+# Exported columns, in file order
+EXPORT_COLUMNS = [
+    VisitorRecord.id,
+    VisitorRecord.pool_id,
+    VisitorRecord.timestamp,
+    VisitorRecord.local_date,
+    VisitorRecord.local_hour,
+    VisitorRecord.weekday,
+    VisitorRecord.week_number,
+    VisitorRecord.visitor_count,
+]
+
+# Export format -> (media type, file extension)
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "arrow": ("application/vnd.apache.arrow.file", "arrow"),
+}
+
+# Formats written with pyarrow, as typed columns in one row group (or record batch) per month
+COLUMNAR_FORMATS = {"parquet", "arrow"}
+
+# Rows fetched from the cursor and encoded at a time
+EXPORT_CHUNK_ROWS = 5000
+
+# Row groups are split within a month beyond this many rows, to bound memory
+MAX_ROW_GROUP_ROWS = 500000
+
+
+def arrow_schema():
+    return pa.schema([
+        ("id", pa.int64()),
+        ("pool_id", pa.int32()),
+        ("timestamp", pa.timestamp("us", tz="UTC")),
+        ("local_date", pa.date32()),
+        ("local_hour", pa.int8()),
+        ("weekday", pa.dictionary(pa.int8(), pa.string())),
+        ("week_number", pa.int8()),
+        ("visitor_count", pa.int32()),
+    ])
+
+
+def _utc(timestamp):
+    """A stored timestamp in UTC (SQLite returns them naive, in UTC)."""
+    return timestamp.astimezone(timezone.utc) if timestamp.tzinfo else timestamp.replace(tzinfo=timezone.utc)
+
+
+def _values(row) -> list:
+    """A row's values with dates as ISO strings."""
+    values = list(row)
+    values[2] = _utc(values[2]).isoformat()
+    values[3] = values[3].isoformat() if values[3] else None
+    return values
+
+
+def csv_chunks(chunks: Iterator[list]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([column.key for column in EXPORT_COLUMNS])
+    for chunk in chunks:
+        writer.writerows(_values(row) for row in chunk)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def ndjson_chunks(chunks: Iterator[list]) -> Iterator[bytes]:
+    names = [column.key for column in EXPORT_COLUMNS]
+    for chunk in chunks:
+        yield "".join(json.dumps(dict(zip(names, _values(row)))) + "\n" for row in chunk).encode()
+
+
+class _ChunkSink:
+    """Write-only file that keeps what was written until it is drained."""
+
+    def __init__(self):
+        self.closed = False
+        self._parts: List[bytes] = []
+        self._position = 0
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._parts.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts = []
+        return data
+
+
+def _month_groups(chunks: Iterator[list], max_rows: int) -> Iterator[list]:
+    """Regroup timestamp-ordered rows into one list per UTC month (split beyond max_rows)."""
+    group, month = [], None
+    for chunk in chunks:
+        for row in chunk:
+            timestamp = _utc(row[2])
+            row_month = (timestamp.year, timestamp.month)
+            if group and (row_month != month or len(group) >= max_rows):
+                yield group
+                group = []
+            group.append(row)
+            month = row_month
+    if group:
+        yield group
+
+
+def _arrow_table(rows: list, schema):
+    columns = list(zip(*rows))
+    return pa.table([
+        pa.array(columns[0], pa.int64()),
+        pa.array(columns[1], pa.int32()),
+        pa.array([_utc(value) for value in columns[2]], pa.timestamp("us", tz="UTC")),
+        pa.array(columns[3], pa.date32()),
+        pa.array(columns[4], pa.int8()),
+        pa.array(columns[5], pa.string()).dictionary_encode().cast(schema.field("weekday").type),
+        pa.array(columns[6], pa.int8()),
+        pa.array(columns[7], pa.int32()),
+    ], schema=schema)
+
+
+def columnar_chunks(
+    chunks: Iterator[list],
+    export_format: str,
+    max_rows: int = MAX_ROW_GROUP_ROWS
+) -> Iterator[bytes]:
+    """Parquet or Arrow IPC file bytes, written one month at a time.
+
+    Both formats are written front to back (the footer comes last), so
+    each month's bytes are sent as soon as its row group is encoded.
+    """
+    schema = arrow_schema()
+    sink = _ChunkSink()
+    if export_format == "parquet":
+        writer = pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema, compression="zstd")
+    else:
+        writer = pa.ipc.new_file(
+            pa.PythonFile(sink, mode="w"), schema, options=pa.ipc.IpcWriteOptions(compression="zstd")
+        )
+    for group in _month_groups(chunks, max_rows):
+        table = _arrow_table(group, schema)
+        if export_format == "parquet":
+            writer.write_table(table, row_group_size=len(group))
+        else:
+            writer.write_table(table, max_chunksize=len(group))
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+
+def gzip_chunks(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    """Compress a byte stream into one gzip member, chunk by chunk."""
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+class ExportService:
+    """Streams filtered visitor records as CSV or NDJSON (optionally gzipped), Parquet or Arrow IPC.
+
+    Opens its own session, since the stream is consumed after the request
+    handler (and its session) has returned. Memory stays at one chunk of
+    EXPORT_CHUNK_ROWS rows (one month's row group for the columnar
+    formats) however many records are exported.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        chunk_rows: Optional[int] = None
+    ):
+        self.session_factory = session_factory
+        self.chunk_rows = chunk_rows or EXPORT_CHUNK_ROWS
+
+    @staticmethod
+    def available(export_format: str) -> bool:
+        """Whether a format can be written here (the columnar ones need pyarrow)."""
+        return export_format in EXPORT_FORMATS and (export_format not in COLUMNAR_FORMATS or pa is not None)
+
+    @staticmethod
+    def compressed(export_format: str, gzip: bool) -> bool:
+        """Whether the export is gzipped (the columnar formats compress their own columns)."""
+        return gzip and export_format not in COLUMNAR_FORMATS
+
+    def media_type(self, export_format: str, gzip: bool = False) -> str:
+        return "application/gzip" if self.compressed(export_format, gzip) else EXPORT_FORMATS[export_format][0]
+
+    def filename(self, filters: VisitorRecordFilter, export_format: str, gzip: bool = False) -> str:
+        pool_ids = ([filters.pool_id] if filters.pool_id else []) + (filters.pool_ids or [])
+        parts: List[str] = [
+            "visitors",
+            f"pool-{'-'.join(str(pool_id) for pool_id in pool_ids)}" if pool_ids else "all-pools"
+        ]
+        if filters.start_date:
+            parts.append(f"from-{filters.start_date.isoformat()}")
+        if filters.end_date:
+            parts.append(f"to-{filters.end_date.isoformat()}")
+        extension = EXPORT_FORMATS[export_format][1]
+        return "_".join(parts) + f".{extension}" + (".gz" if self.compressed(export_format, gzip) else "")
+
+    def _encoded(self, db: Session, filters: VisitorRecordFilter, export_format: str) -> Iterator[bytes]:
+        chunks = VisitorService(db).iter_chunks(filters, EXPORT_COLUMNS, self.chunk_rows)
+        if export_format in COLUMNAR_FORMATS:
+            return columnar_chunks(chunks, export_format)
+        if export_format == "ndjson":
+            return ndjson_chunks(chunks)
+        return csv_chunks(chunks)
+
+    def stream(self, filters: VisitorRecordFilter, export_format: str = "csv", gzip: bool = False) -> Iterator[bytes]:
+        """The export as a stream of byte chunks, oldest record first (gzip applies to csv and ndjson)."""
+        db = self.session_factory()
+        try:
+            encoded = self._encoded(db, filters, export_format)
+            yield from gzip_chunks(encoded) if self.compressed(export_format, gzip) else encoded
+        finally:
+            db.close()
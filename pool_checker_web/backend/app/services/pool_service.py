@@ -4,7 +4,14 @@ from sqlalchemy import func
 
 from app.models.pool import Pool
 from app.models.visitor import VisitorRecord
-from app.schemas.pool import PoolCreate, PoolUpdate, PoolWithStats
+from app.schemas.pool import PoolCreate, PoolUpdate, PoolResponse, PoolWithStats
+
+# Changing any of these moves the pool's scrape slots
+SCHEDULE_FIELDS = {
+    "url", "timezone", "scrape_start_time", "scrape_end_time", "scrape_interval_minutes",
+    "adaptive_scheduling", "min_scrape_interval_minutes", "max_scrape_interval_minutes",
+    "block_resources", "fetch_strategy", "data_url", "json_path", "is_active",
+}
 
 
 class PoolService:
@@ -23,6 +30,10 @@ class PoolService:
         """Get a pool by ID."""
         return self.db.query(Pool).filter(Pool.id == pool_id).first()
 
+    def get_by_ids(self, pool_ids: List[int]) -> List[Pool]:
+        """Get several pools by ID."""
+        return self.db.query(Pool).filter(Pool.id.in_(pool_ids)).all()
+
     def get_by_name(self, name: str) -> Optional[Pool]:
         """Get a pool by name."""
         return self.db.query(Pool).filter(Pool.name == name).first()
@@ -41,6 +52,10 @@ class PoolService:
         for field, value in update_data.items():
             setattr(pool, field, value)
 
+        if SCHEDULE_FIELDS & update_data.keys():
+            # The scheduler computes the new next slot on its next run
+            pool.next_scrape_at = None
+
         self.db.commit()
         self.db.refresh(pool)
         return pool
@@ -72,16 +87,7 @@ class PoolService:
         )
 
         return PoolWithStats(
-            id=pool.id,
-            name=pool.name,
-            url=pool.url,
-            element_id=pool.element_id,
-            timezone=pool.timezone,
-            scrape_start_time=pool.scrape_start_time,
-            scrape_end_time=pool.scrape_end_time,
-            scrape_interval_minutes=pool.scrape_interval_minutes,
-            is_active=pool.is_active,
-            created_at=pool.created_at,
+            **PoolResponse.model_validate(pool).model_dump(),
             latest_visitor_count=latest_record.visitor_count if latest_record else None,
             latest_reading_time=latest_record.timestamp if latest_record else None,
             total_records=total_records or 0
@@ -0,0 +1,93 @@
+import json
+import math
+from typing import Iterable, List, Optional
+
+from app.config import settings
+
+
+class QuantileSketch:
+    """A mergeable quantile sketch (a merging t-digest) of visitor counts.
+
+    Centroids are (mean, weight) pairs sorted by mean. Visitor counts are
+    integers, so a sketch stays exact (one centroid per distinct count) until
+    it holds more than its compression allows; then neighbouring centroids
+    are merged, finely at the tails and coarsely around the median.
+    Sketches of different hours merge by pooling their centroids.
+    """
+
+    def __init__(self, centroids: Optional[List[List[float]]] = None, compression: Optional[int] = None):
+        self.centroids: List[List[float]] = centroids or []
+        self.compression = compression or settings.QUANTILE_SKETCH_COMPRESSION
+
+    @classmethod
+    def from_json(cls, raw: Optional[str]) -> "QuantileSketch":
+        return cls(json.loads(raw) if raw else [])
+
+    def to_json(self) -> str:
+        return json.dumps(
+            [[_compact(mean), _compact(weight)] for mean, weight in self.centroids],
+            separators=(",", ":")
+        )
+
+    @property
+    def count(self) -> float:
+        return sum(weight for _, weight in self.centroids)
+
+    def add(self, value: float, weight: float = 1.0) -> None:
+        self._absorb([[float(value), float(weight)]])
+
+    def merge(self, other: "QuantileSketch") -> None:
+        self._absorb(other.centroids)
+
+    def _absorb(self, centroids: Iterable[List[float]]) -> None:
+        combined = {}
+        for mean, weight in list(self.centroids) + [list(c) for c in centroids]:
+            combined[mean] = combined.get(mean, 0.0) + weight
+        self.centroids = [[mean, combined[mean]] for mean in sorted(combined)]
+        if len(self.centroids) > self.compression:
+            self._compress()
+
+    def _scale(self, q: float) -> float:
+        """t-digest k1 scale function: centroids may span one unit of it."""
+        return self.compression / (2 * math.pi) * math.asin(2 * min(max(q, 0.0), 1.0) - 1)
+
+    def _compress(self) -> None:
+        total = self.count
+        merged = [list(self.centroids[0])]
+        cumulative = 0.0
+        k_start = self._scale(0.0)
+        for mean, weight in self.centroids[1:]:
+            current = merged[-1]
+            if self._scale((cumulative + current[1] + weight) / total) - k_start <= 1:
+                current[0] += (mean - current[0]) * weight / (current[1] + weight)
+                current[1] += weight
+            else:
+                cumulative += current[1]
+                k_start = self._scale(cumulative / total)
+                merged.append([mean, weight])
+        self.centroids = merged
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Value at quantile q (0-1); the lower value when q falls between readings."""
+        if not self.centroids:
+            return None
+        target = q * self.count
+        cumulative = 0.0
+        for mean, weight in self.centroids:
+            cumulative += weight
+            if target <= cumulative:
+                return mean
+        return self.centroids[-1][0]
+
+
+def _compact(value: float):
+    return int(value) if float(value).is_integer() else round(value, 3)
+
+
+def merge_sketches(raws: Iterable[Optional[str]]) -> QuantileSketch:
+    """Merge stored sketches (as JSON) into one."""
+    sketch = QuantileSketch()
+    for raw in raws:
+        if raw:
+            sketch.merge(QuantileSketch.from_json(raw))
+    return sketch
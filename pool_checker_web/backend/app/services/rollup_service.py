@@ -0,0 +1,191 @@
+from datetime import date, datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pytz
+from sqlalchemy import func, tuple_
+from sqlalchemy.orm import Session
+
+from app.db.database import dialect_insert
+from app.models.pool import Pool
+from app.models.rollup import VisitorHourlyRollup
+from app.models.visitor import VisitorRecord
+from app.services.quantile_sketch import QuantileSketch
+
+# (pool_id, local_date, hour) in the pool's timezone
+RollupKey = Tuple[int, date, int]
+
+# Rows per INSERT when writing many rollups at once
+UPSERT_CHUNK_SIZE = 1000
+
+
+class HourAggregate:
+    """Count, sum, min, max, sum of squares and quantile sketch of the readings in one hour."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.minimum: Optional[int] = None
+        self.maximum: Optional[int] = None
+        self.sum_squares = 0
+        self.sketch = QuantileSketch()
+
+    def add(self, visitor_count: int) -> None:
+        self.count += 1
+        self.total += visitor_count
+        self.sum_squares += visitor_count * visitor_count
+        self.minimum = visitor_count if self.minimum is None else min(self.minimum, visitor_count)
+        self.maximum = visitor_count if self.maximum is None else max(self.maximum, visitor_count)
+        self.sketch.add(visitor_count)
+
+
+def local_hour_key(pool_id: int, timestamp: datetime, tz) -> RollupKey:
+    """Rollup key of a reading; naive timestamps (as returned by SQLite) are UTC."""
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    local = timestamp.astimezone(tz)
+    return pool_id, local.date(), local.hour
+
+
+def aggregate_readings(
+    readings: Iterable[Tuple[int, datetime, int]],
+    timezones: Dict[int, object]
+) -> Dict[RollupKey, HourAggregate]:
+    """Group (pool_id, timestamp, visitor_count) readings by pool-local hour."""
+    aggregates: Dict[RollupKey, HourAggregate] = {}
+    for pool_id, timestamp, visitor_count in readings:
+        key = local_hour_key(pool_id, timestamp, timezones[pool_id])
+        aggregates.setdefault(key, HourAggregate()).add(visitor_count)
+    return aggregates
+
+
+class RollupService:
+    """Maintains visitor_hourly_rollups, the hourly aggregates analytics read from."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_timezones(self, pool_ids: Iterable[int]) -> Dict[int, object]:
+        rows = self.db.query(Pool.id, Pool.timezone).filter(Pool.id.in_(set(pool_ids))).all()
+        return {row.id: pytz.timezone(row.timezone or "CET") for row in rows}
+
+    def _upsert(self, aggregates: Dict[RollupKey, HourAggregate]) -> None:
+        """Merge aggregates into the stored rollups in bulk INSERT ... ON CONFLICT statements."""
+        rows = [
+            {
+                "pool_id": pool_id,
+                "local_date": local_date,
+                "hour": hour,
+                "weekday": local_date.strftime("%A"),
+                "reading_count": aggregate.count,
+                "visitor_sum": aggregate.total,
+                "visitor_min": aggregate.minimum,
+                "visitor_max": aggregate.maximum,
+                "visitor_sum_squares": aggregate.sum_squares,
+            }
+            for (pool_id, local_date, hour), aggregate in aggregates.items()
+        ]
+        postgresql = self.db.get_bind().dialect.name == "postgresql"
+        least = func.least if postgresql else func.min
+        greatest = func.greatest if postgresql else func.max
+
+        for start in range(0, len(rows), UPSERT_CHUNK_SIZE):
+            stmt = dialect_insert(self.db, VisitorHourlyRollup).values(rows[start:start + UPSERT_CHUNK_SIZE])
+            excluded = stmt.excluded
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["pool_id", "local_date", "hour"],
+                set_={
+                    "reading_count": VisitorHourlyRollup.reading_count + excluded.reading_count,
+                    "visitor_sum": VisitorHourlyRollup.visitor_sum + excluded.visitor_sum,
+                    "visitor_min": least(VisitorHourlyRollup.visitor_min, excluded.visitor_min),
+                    "visitor_max": greatest(VisitorHourlyRollup.visitor_max, excluded.visitor_max),
+                    "visitor_sum_squares": (
+                        VisitorHourlyRollup.visitor_sum_squares + excluded.visitor_sum_squares
+                    ),
+                    "updated_at": func.now(),
+                }
+            )
+            self.db.execute(stmt)
+
+    def _merge_sketches(self, aggregates: Dict[RollupKey, HourAggregate]) -> None:
+        """Merge the aggregates' sketches into the stored ones.
+
+        Sketches cannot be merged in SQL, so the rollups (already written by
+        _upsert) are locked and updated here, in the same transaction.
+        """
+        keys = list(aggregates)
+        for start in range(0, len(keys), UPSERT_CHUNK_SIZE):
+            rows = (
+                self.db.query(VisitorHourlyRollup)
+                .filter(
+                    tuple_(
+                        VisitorHourlyRollup.pool_id, VisitorHourlyRollup.local_date, VisitorHourlyRollup.hour
+                    ).in_(keys[start:start + UPSERT_CHUNK_SIZE])
+                )
+                .order_by(VisitorHourlyRollup.id)
+                .with_for_update()
+                .populate_existing()
+                .all()
+            )
+            for row in rows:
+                sketch = QuantileSketch.from_json(row.visitor_sketch)
+                sketch.merge(aggregates[(row.pool_id, row.local_date, row.hour)].sketch)
+                row.visitor_sketch = sketch.to_json()
+        self.db.flush()
+
+    def add_readings(self, readings: List[Tuple[int, datetime, int]]) -> int:
+        """Fold newly stored (pool_id, timestamp, visitor_count) readings into the rollups.
+
+        Runs in the caller's transaction, so rollups and raw records commit
+        together. Only pass readings that were actually inserted, or they are
+        counted twice. Returns the number of hours touched.
+        """
+        if not readings:
+            return 0
+        timezones = self.get_timezones(pool_id for pool_id, _, _ in readings)
+        aggregates = aggregate_readings(
+            (reading for reading in readings if reading[0] in timezones), timezones
+        )
+        self._upsert(aggregates)
+        self._merge_sketches(aggregates)
+        return len(aggregates)
+
+    def rebuild(
+        self,
+        pool_id: int,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ) -> int:
+        """Recompute a pool's rollups from visitor_records, optionally for local dates in a range.
+
+        Rebuilding the whole history marks the pool's rollups as backfilled.
+        Returns the number of hourly rollups written.
+        """
+        tz = self.get_timezones([pool_id]).get(pool_id)
+        if tz is None:
+            return 0
+
+        deleted = self.db.query(VisitorHourlyRollup).filter(VisitorHourlyRollup.pool_id == pool_id)
+        records = (
+            self.db.query(VisitorRecord.pool_id, VisitorRecord.timestamp, VisitorRecord.visitor_count)
+            .filter(VisitorRecord.pool_id == pool_id)
+        )
+        if start_date:
+            deleted = deleted.filter(VisitorHourlyRollup.local_date >= start_date)
+            records = records.filter(VisitorRecord.local_date >= start_date)
+        if end_date:
+            deleted = deleted.filter(VisitorHourlyRollup.local_date <= end_date)
+            records = records.filter(VisitorRecord.local_date <= end_date)
+
+        deleted.delete(synchronize_session=False)
+        aggregates = aggregate_readings(
+            ((row.pool_id, row.timestamp, row.visitor_count) for row in records.yield_per(5000)),
+            {pool_id: tz}
+        )
+        self._upsert(aggregates)
+        self._merge_sketches(aggregates)
+        if not start_date and not end_date:
+            self.db.query(Pool).filter(Pool.id == pool_id).update(
+                {Pool.rollups_backfilled: True}, synchronize_session=False
+            )
+        self.db.commit()
+        return len(aggregates)
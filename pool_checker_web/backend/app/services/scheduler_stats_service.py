@@ -0,0 +1,72 @@
+import json
+from datetime import date, datetime, timedelta, timezone
+from typing import List
+
+import redis
+
+from app.config import settings
+from app.schemas.scrape import IntervalDecisionResponse, SchedulerDayStats, SchedulerStatsSummary
+
+# Daily counters are kept this long
+STATS_RETENTION_DAYS = 35
+
+
+class SchedulerStatsService:
+    """Records adaptive scheduling decisions and the scrapes they saved in Redis."""
+
+    DAY_KEY_TEMPLATE = "scheduler:stats:{day}"
+    DECISIONS_KEY = "scheduler:decisions"
+
+    def __init__(self, redis_client: redis.Redis):
+        self.redis = redis_client
+
+    def _day_key(self, day: date) -> str:
+        return self.DAY_KEY_TEMPLATE.format(day=day.isoformat())
+
+    def record(self, decisions: List[dict]) -> None:
+        """Add decisions (IntervalDecision.as_dict() items) to today's counters."""
+        if not decisions:
+            return
+        now = datetime.now(timezone.utc)
+        key = self._day_key(now.date())
+
+        pipe = self.redis.pipeline()
+        for decision in decisions:
+            reason = decision["reason"]
+            pipe.hincrby(key, "decisions", 1)
+            pipe.hincrby(key, reason if reason in ("faster", "slower") else "unchanged", 1)
+            pipe.hincrbyfloat(key, "scrapes_saved", decision["scrapes_saved"])
+            # Each decision stands for one adaptive scrape plus the fixed ones it replaced
+            pipe.hincrbyfloat(key, "baseline_scrapes", 1 + decision["scrapes_saved"])
+            pipe.lpush(self.DECISIONS_KEY, json.dumps({**decision, "decided_at": now.isoformat()}))
+        pipe.expire(key, STATS_RETENTION_DAYS * 24 * 3600)
+        pipe.ltrim(self.DECISIONS_KEY, 0, settings.SCHEDULER_DECISION_HISTORY - 1)
+        pipe.execute()
+
+    def get_summary(self, days: int = 7, recent_limit: int = 50) -> SchedulerStatsSummary:
+        """Daily decision counts and savings, newest day first, plus recent decisions."""
+        today = datetime.now(timezone.utc).date()
+        day_stats = []
+        for offset in range(days):
+            day = today - timedelta(days=offset)
+            raw = self.redis.hgetall(self._day_key(day))
+            if not raw:
+                continue
+            saved = float(raw.get("scrapes_saved", 0))
+            baseline = float(raw.get("baseline_scrapes", 0))
+            day_stats.append(SchedulerDayStats(
+                date=day.isoformat(),
+                decisions=int(raw.get("decisions", 0)),
+                faster=int(raw.get("faster", 0)),
+                slower=int(raw.get("slower", 0)),
+                unchanged=int(raw.get("unchanged", 0)),
+                scrapes_saved=round(saved, 1),
+                baseline_scrapes=round(baseline, 1),
+                savings_ratio=round(saved / baseline, 3) if baseline > 0 else 0.0
+            ))
+
+        recent = [
+            IntervalDecisionResponse(**json.loads(item))
+            for item in self.redis.lrange(self.DECISIONS_KEY, 0, recent_limit - 1)
+        ]
+        return SchedulerStatsSummary(days=day_stats, recent=recent)
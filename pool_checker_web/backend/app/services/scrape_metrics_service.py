@@ -0,0 +1,80 @@
+import json
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import redis
+
+from app.config import settings
+from app.schemas.scrape import PhaseTimingStats, ScrapeTimingSample, ScrapeTimingSummary
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    """Percentile of an already sorted list, rounded to the nearest stored value."""
+    index = min(len(sorted_values) - 1, max(0, round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class ScrapeMetricsService:
+    """Keeps a capped per-pool history of scrape phase timings in Redis."""
+
+    KEY_TEMPLATE = "scrape:timings:{pool_id}"
+
+    def __init__(self, redis_client: redis.Redis):
+        self.redis = redis_client
+
+    def _key(self, pool_id: int) -> str:
+        return self.KEY_TEMPLATE.format(pool_id=pool_id)
+
+    def record(
+        self,
+        pool_id: int,
+        timings: Dict[str, float],
+        success: bool,
+        error: Optional[str] = None
+    ) -> None:
+        """Store the timings of one scrape, keeping only the newest samples."""
+        sample = {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "success": success,
+            "error": error,
+            "timings": timings
+        }
+        key = self._key(pool_id)
+        pipe = self.redis.pipeline()
+        pipe.lpush(key, json.dumps(sample))
+        pipe.ltrim(key, 0, settings.SCRAPE_TIMING_HISTORY - 1)
+        pipe.execute()
+
+    def get_recent(self, pool_id: int, limit: int = 50) -> List[ScrapeTimingSample]:
+        """Get the most recent timing samples, newest first."""
+        raw = self.redis.lrange(self._key(pool_id), 0, limit - 1)
+        return [ScrapeTimingSample(**json.loads(item)) for item in raw]
+
+    def get_summary(self, pool_id: int, recent_limit: int = 20) -> ScrapeTimingSummary:
+        """Summarize the stored history into per-phase percentiles."""
+        samples = self.get_recent(pool_id, settings.SCRAPE_TIMING_HISTORY)
+
+        by_phase: Dict[str, List[float]] = {}
+        for sample in samples:
+            for phase, value in sample.timings.items():
+                by_phase.setdefault(phase, []).append(value)
+
+        phases = []
+        for phase, values in sorted(by_phase.items()):
+            values.sort()
+            phases.append(PhaseTimingStats(
+                phase=phase,
+                count=len(values),
+                p50_ms=_percentile(values, 0.5),
+                p95_ms=_percentile(values, 0.95),
+                max_ms=values[-1]
+            ))
+
+        successes = sum(1 for sample in samples if sample.success)
+        return ScrapeTimingSummary(
+            pool_id=pool_id,
+            sample_count=len(samples),
+            success_rate=round(successes / len(samples), 3) if samples else 0.0,
+            phases=phases,
+            recent=samples[:recent_limit]
+        )
@@ -0,0 +1,202 @@
+import math
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db.database import dialect_insert
+from app.models.pool import Pool
+from app.models.slot_stats import PoolSlotStats
+from app.models.visitor import VisitorRecord
+from app.schemas.analytics import SlotStatsCell, SlotStatsHeatmap
+from app.services.rollup_service import RollupService
+
+WEEKDAY_NAMES = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
+# SlotStatsHeatmap kinds
+KIND_TYPICAL = "typical"  # all-time mean of the slot
+KIND_RECENT = "recent"  # time-weighted mean, halving a reading's weight every ONLINE_STATS_HALF_LIFE_DAYS
+
+# (pool_id, weekday, slot) in the pool's timezone
+SlotKey = Tuple[int, int, int]
+
+
+def _as_utc(timestamp: datetime) -> datetime:
+    """Treat naive datetimes (as returned by SQLite) as UTC."""
+    if timestamp.tzinfo is None:
+        return timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.astimezone(timezone.utc)
+
+
+def slot_key(pool_id: int, timestamp: datetime, tz) -> SlotKey:
+    local = _as_utc(timestamp).astimezone(tz)
+    return pool_id, local.weekday(), (local.hour * 60 + local.minute) // settings.ONLINE_STATS_SLOT_MINUTES
+
+
+def decay_factor(seconds: float) -> float:
+    """Weight left after ``seconds`` with a half-life of ONLINE_STATS_HALF_LIFE_DAYS."""
+    return 0.5 ** (seconds / (settings.ONLINE_STATS_HALF_LIFE_DAYS * 86400))
+
+
+def add_reading(stats: PoolSlotStats, timestamp: datetime, visitor_count: int) -> None:
+    """Fold one reading into a slot's statistics in constant time."""
+    # Welford's online mean and variance
+    count = (stats.count or 0) + 1
+    mean = stats.mean or 0.0
+    delta = visitor_count - mean
+    mean += delta / count
+    stats.m2 = (stats.m2 or 0.0) + delta * (visitor_count - mean)
+    stats.mean = mean
+    stats.count = count
+
+    # Time-decayed mean: decay the sums to the newest reading's time
+    timestamp = _as_utc(timestamp)
+    decayed_at = _as_utc(stats.decayed_at) if stats.decayed_at else timestamp
+    if timestamp >= decayed_at:
+        decay = decay_factor((timestamp - decayed_at).total_seconds())
+        stats.decayed_sum = (stats.decayed_sum or 0.0) * decay + visitor_count
+        stats.decayed_weight = (stats.decayed_weight or 0.0) * decay + 1.0
+        stats.decayed_at = timestamp
+    else:
+        # A late reading enters with the weight it would have by now
+        weight = decay_factor((decayed_at - timestamp).total_seconds())
+        stats.decayed_sum = (stats.decayed_sum or 0.0) + weight * visitor_count
+        stats.decayed_weight = (stats.decayed_weight or 0.0) + weight
+        stats.decayed_at = decayed_at
+
+
+def stddev(stats: PoolSlotStats) -> float:
+    return math.sqrt(stats.m2 / (stats.count - 1)) if stats.count > 1 else 0.0
+
+
+def recent_mean(stats: PoolSlotStats) -> Optional[float]:
+    return stats.decayed_sum / stats.decayed_weight if stats.decayed_weight else None
+
+
+class SlotStatsService:
+    """Online visitor statistics per pool, weekday and time slot.
+
+    Every stored reading updates its slot in constant time, so typical and
+    recent heatmaps are read straight from pool_slot_stats without
+    aggregating any visitor records.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _lock_slots(self, keys: List[SlotKey]) -> Dict[SlotKey, PoolSlotStats]:
+        """Create missing slots and lock all of them for update."""
+        stmt = dialect_insert(self.db, PoolSlotStats).values([
+            {
+                "pool_id": pool_id, "weekday": weekday, "slot": slot,
+                "count": 0, "mean": 0.0, "m2": 0.0, "decayed_sum": 0.0, "decayed_weight": 0.0,
+            }
+            for pool_id, weekday, slot in keys
+        ]).on_conflict_do_nothing(index_elements=["pool_id", "weekday", "slot"])
+        self.db.execute(stmt)
+
+        rows = (
+            self.db.query(PoolSlotStats)
+            .filter(tuple_(PoolSlotStats.pool_id, PoolSlotStats.weekday, PoolSlotStats.slot).in_(keys))
+            .order_by(PoolSlotStats.id)
+            .with_for_update()
+            .all()
+        )
+        return {(row.pool_id, row.weekday, row.slot): row for row in rows}
+
+    def add_readings(self, readings: List[Tuple[int, datetime, int]]) -> int:
+        """Fold newly stored (pool_id, timestamp, visitor_count) readings into their slots.
+
+        Runs in the caller's transaction; only pass readings that were
+        actually inserted. Returns the number of slots updated.
+        """
+        if not readings:
+            return 0
+        timezones = RollupService(self.db).get_timezones(pool_id for pool_id, _, _ in readings)
+        keyed = [
+            (slot_key(pool_id, timestamp, timezones[pool_id]), timestamp, visitor_count)
+            for pool_id, timestamp, visitor_count in readings
+            if pool_id in timezones
+        ]
+        if not keyed:
+            return 0
+
+        slots = self._lock_slots(sorted({key for key, _, _ in keyed}))
+        for key, timestamp, visitor_count in sorted(keyed, key=lambda item: _as_utc(item[1])):
+            add_reading(slots[key], timestamp, visitor_count)
+        self.db.flush()
+        return len(slots)
+
+    def rebuild(self, pool_id: int) -> int:
+        """Recompute a pool's slot statistics from all its visitor records."""
+        tz = RollupService(self.db).get_timezones([pool_id]).get(pool_id)
+        if tz is None:
+            return 0
+
+        self.db.query(PoolSlotStats).filter(PoolSlotStats.pool_id == pool_id).delete()
+        slots: Dict[SlotKey, PoolSlotStats] = {}
+        records = (
+            self.db.query(VisitorRecord.timestamp, VisitorRecord.visitor_count)
+            .filter(VisitorRecord.pool_id == pool_id)
+            .order_by(VisitorRecord.timestamp)
+            .yield_per(5000)
+        )
+        for row in records:
+            key = slot_key(pool_id, row.timestamp, tz)
+            if key not in slots:
+                slots[key] = PoolSlotStats(
+                    pool_id=pool_id, weekday=key[1], slot=key[2],
+                    count=0, mean=0.0, m2=0.0, decayed_sum=0.0, decayed_weight=0.0
+                )
+            add_reading(slots[key], row.timestamp, row.visitor_count)
+
+        self.db.add_all(slots.values())
+        self.db.commit()
+        return len(slots)
+
+    def get_heatmap(self, pool_id: int, kind: str = KIND_TYPICAL) -> Optional[SlotStatsHeatmap]:
+        """Typical (all-time) or recent (time-weighted) visitors per weekday and slot."""
+        pool = self.db.query(Pool).filter(Pool.id == pool_id).first()
+        if not pool:
+            return None
+
+        rows = (
+            self.db.query(PoolSlotStats)
+            .filter(PoolSlotStats.pool_id == pool_id, PoolSlotStats.count > 0)
+            .order_by(PoolSlotStats.weekday, PoolSlotStats.slot)
+            .all()
+        )
+        slot_minutes = settings.ONLINE_STATS_SLOT_MINUTES
+        cells = []
+        for row in rows:
+            recent = recent_mean(row)
+            value = row.mean if kind == KIND_TYPICAL else recent
+            if value is None:
+                continue
+            start = row.slot * slot_minutes
+            cells.append(SlotStatsCell(
+                weekday=WEEKDAY_NAMES[row.weekday],
+                slot=row.slot,
+                start_time=f"{start // 60:02d}:{start % 60:02d}",
+                value=round(value, 1),
+                typical=round(row.mean, 1),
+                stddev=round(stddev(row), 1),
+                recent=round(recent, 1) if recent is not None else None,
+                trend=round(recent - row.mean, 1) if recent is not None else None,
+                samples=row.count,
+                last_reading_at=row.decayed_at
+            ))
+        values = [cell.value for cell in cells]
+
+        return SlotStatsHeatmap(
+            pool_id=pool_id,
+            pool_name=pool.name,
+            kind=kind,
+            slot_minutes=slot_minutes,
+            half_life_days=settings.ONLINE_STATS_HALF_LIFE_DAYS,
+            data=cells,
+            min_value=min(values) if values else 0,
+            max_value=max(values) if values else 0
+        )
@@ -1,79 +1,215 @@
-from typing import List, Optional
-from datetime import datetime, date
+import base64
+from typing import Iterator, List, Optional, Tuple
+from datetime import datetime, timezone
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
+from sqlalchemy import func, and_, or_, false
 
+from app.db.database import dialect_insert
 from app.models.visitor import VisitorRecord
 from app.models.pool import Pool
+from app.models.rollup import VisitorHourlyRollup as Rollup
+from app.services.baseline_service import BaselineService
+from app.services.rollup_service import RollupService
+from app.services.slot_stats_service import WEEKDAY_NAMES, SlotStatsService
 from app.schemas.visitor import (
-    VisitorRecordCreate, VisitorRecordFilter, LatestVisitorResponse, PaginatedVisitorResponse,
-    VisitorRecordResponse
+    VisitorRecordFilter, LatestVisitorResponse, PaginatedVisitorResponse, VisitorRecordResponse,
+    ScrapeReading
 )
 
+# Weekday name -> VisitorRecord.iso_weekday
+ISO_WEEKDAYS = {name: number for number, name in enumerate(WEEKDAY_NAMES, start=1)}
+
+
+def _reading_key(pool_id: int, timestamp: datetime, naive: bool) -> Tuple[int, datetime]:
+    """Key matching a reading to its stored row.
+
+    Databases without time zone support (SQLite) return the wall-clock time
+    the reading was written with, so those keys drop the offset instead.
+    """
+    if naive:
+        return pool_id, timestamp.replace(tzinfo=None)
+    return pool_id, timestamp.astimezone(timezone.utc)
+
+
+def encode_cursor(record: VisitorRecord) -> str:
+    """Opaque cursor of the page after a record, in (timestamp, id) order."""
+    return base64.urlsafe_b64encode(f"{record.timestamp.isoformat()}|{record.id}".encode()).decode()
+
+
+class InvalidCursor(Exception):
+    """A pagination cursor that was not produced by encode_cursor."""
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """The (timestamp, id) of a cursor; raises InvalidCursor if it is malformed."""
+    try:
+        timestamp, record_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(timestamp), int(record_id)
+    except ValueError as e:
+        raise InvalidCursor(cursor) from e
+
 
 class VisitorService:
     def __init__(self, db: Session):
         self.db = db
 
-    def create(self, record_in: VisitorRecordCreate) -> VisitorRecord:
-        """Create a new visitor record."""
-        record = VisitorRecord(**record_in.model_dump())
-        self.db.add(record)
-        self.db.commit()
-        self.db.refresh(record)
-        return record
-
-    def create_from_scrape(
-        self,
-        pool_id: int,
-        visitor_count: int,
-        timestamp: datetime
-    ) -> VisitorRecord:
-        """Create a visitor record from a scrape result."""
-        weekday = timestamp.strftime('%A')
-        week_number = timestamp.isocalendar()[1]
-
-        record = VisitorRecord(
-            pool_id=pool_id,
-            timestamp=timestamp,
-            weekday=weekday,
-            visitor_count=visitor_count,
-            week_number=week_number
+    def _timezones(self, pool_ids) -> dict:
+        return RollupService(self.db).get_timezones(pool_ids)
+
+    def _add_to_aggregates(self, readings: List[Tuple[int, datetime, int]]) -> None:
+        """Update hourly rollups, slot statistics and baseline curves with newly stored readings."""
+        RollupService(self.db).add_readings(readings)
+        SlotStatsService(self.db).add_readings(readings)
+        BaselineService(self.db).add_readings(readings)
+
+    def insert_readings(self, readings: List[ScrapeReading]) -> List[ScrapeReading]:
+        """Insert scraped readings with one multi-row statement in one transaction.
+
+        Readings already stored (same pool and timestamp) are skipped, so a
+        batch can safely be written again; the rows actually inserted are
+        added to the rollups and slot statistics in the same transaction.
+        Returns the readings that were new, as reported by RETURNING.
+        """
+        if not readings:
+            return []
+        timezones = self._timezones(reading.pool_id for reading in readings)
+        stmt = (
+            dialect_insert(self.db, VisitorRecord)
+            .values([reading.to_record_fields(timezones.get(reading.pool_id)) for reading in readings])
+            .on_conflict_do_nothing(index_elements=["pool_id", "timestamp"])
+            .returning(VisitorRecord.pool_id, VisitorRecord.timestamp, VisitorRecord.visitor_count)
         )
-        self.db.add(record)
+        inserted = [tuple(row) for row in self.db.execute(stmt)]
+        self._add_to_aggregates(inserted)
         self.db.commit()
-        self.db.refresh(record)
-        return record
+
+        naive = bool(inserted) and inserted[0][1].tzinfo is None
+        new_keys = {_reading_key(pool_id, timestamp, naive) for pool_id, timestamp, _ in inserted}
+        new_readings = []
+        for reading in readings:
+            key = _reading_key(reading.pool_id, reading.timestamp, naive)
+            if key in new_keys:
+                new_keys.discard(key)  # a reading repeated within the batch was inserted once
+                new_readings.append(reading)
+        return new_readings
+
+    def bulk_insert_readings(self, readings: List[ScrapeReading]) -> int:
+        """Insert scraped readings, skipping stored ones; returns the number of new rows."""
+        return len(self.insert_readings(readings))
 
     def get_by_id(self, record_id: int) -> Optional[VisitorRecord]:
         """Get a visitor record by ID."""
         return self.db.query(VisitorRecord).filter(VisitorRecord.id == record_id).first()
 
-    def get_filtered(self, filters: VisitorRecordFilter) -> List[VisitorRecord]:
-        """Get visitor records with filters."""
-        query = self.db.query(VisitorRecord)
-
+    def _apply_filters(self, query, filters: VisitorRecordFilter):
+        """Filter on the pool-local bucket columns, so each filter is an index range."""
         if filters.pool_id:
             query = query.filter(VisitorRecord.pool_id == filters.pool_id)
 
+        if filters.pool_ids:
+            query = query.filter(VisitorRecord.pool_id.in_(filters.pool_ids))
+
         if filters.start_date:
-            start_dt = datetime.combine(filters.start_date, datetime.min.time())
-            query = query.filter(VisitorRecord.timestamp >= start_dt)
+            query = query.filter(VisitorRecord.local_date >= filters.start_date)
 
         if filters.end_date:
-            end_dt = datetime.combine(filters.end_date, datetime.max.time())
-            query = query.filter(VisitorRecord.timestamp <= end_dt)
+            query = query.filter(VisitorRecord.local_date <= filters.end_date)
 
         if filters.weekday:
-            query = query.filter(VisitorRecord.weekday == filters.weekday)
+            iso_weekday = ISO_WEEKDAYS.get(filters.weekday.capitalize())
+            if iso_weekday is None:
+                return query.filter(false())
+            query = query.filter(VisitorRecord.iso_weekday == iso_weekday)
 
-        return (
-            query
-            .order_by(VisitorRecord.timestamp.desc())
-            .offset(filters.offset)
-            .limit(filters.limit)
-            .all()
-        )
+        if filters.start_hour is not None:
+            query = query.filter(VisitorRecord.local_minute >= filters.start_hour * 60)
+
+        if filters.end_hour is not None:
+            query = query.filter(VisitorRecord.local_minute < (filters.end_hour + 1) * 60)
+
+        return query
+
+    def get_page(self, filters: VisitorRecordFilter) -> Tuple[List[VisitorRecord], Optional[str]]:
+        """A page of filtered records, newest first, and the cursor of the next page (None on the last).
+
+        With a cursor the page starts right after the record it points to
+        (keyset pagination on (timestamp, id)), so deep pages cost the same
+        as the first; otherwise filters.offset rows are skipped.
+        """
+        query = self._apply_filters(self.db.query(VisitorRecord), filters)
+        query = query.order_by(VisitorRecord.timestamp.desc(), VisitorRecord.id.desc())
+        if filters.cursor:
+            timestamp, record_id = decode_cursor(filters.cursor)
+            # The first condition is a range on the (pool_id, timestamp) index
+            query = query.filter(
+                VisitorRecord.timestamp <= timestamp,
+                or_(VisitorRecord.timestamp < timestamp, VisitorRecord.id < record_id)
+            )
+        else:
+            query = query.offset(filters.offset)
+
+        records = query.limit(filters.limit + 1).all()
+        if len(records) > filters.limit:
+            return records[:filters.limit], encode_cursor(records[filters.limit - 1])
+        return records, None
+
+    def get_filtered(self, filters: VisitorRecordFilter) -> List[VisitorRecord]:
+        """Get visitor records with filters."""
+        return self.get_page(filters)[0]
+
+    def iter_chunks(self, filters: VisitorRecordFilter, columns: list, chunk_size: int) -> Iterator[list]:
+        """All filtered records, oldest first, as lists of up to chunk_size rows of ``columns``.
+
+        Rows are streamed from a server-side cursor where the database
+        supports one, so memory does not grow with the number of records.
+        Pagination fields of the filter are ignored.
+        """
+        query = self._apply_filters(self.db.query(*columns), filters)
+        chunk = []
+        for row in query.order_by(VisitorRecord.timestamp, VisitorRecord.id).yield_per(chunk_size):
+            chunk.append(row)
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def _rollups_cover(self, filters: VisitorRecordFilter) -> bool:
+        """Whether the hourly rollups count every record of the pools the filters cover.
+
+        Rollups are updated in the same transaction as every insert, but
+        history stored before they existed is only added by
+        scripts/backfill_rollups.py, which marks each pool it rebuilds.
+        """
+        query = self.db.query(Pool.id).filter(Pool.rollups_backfilled == False)
+        if filters.pool_id:
+            query = query.filter(Pool.id == filters.pool_id)
+        if filters.pool_ids:
+            query = query.filter(Pool.id.in_(filters.pool_ids))
+        return query.first() is None
+
+    def count_filtered(self, filters: VisitorRecordFilter) -> Tuple[int, bool]:
+        """Number of records matching the filters, read from the hourly rollups, and whether it is exact.
+
+        The count is exact once the rollups of the pools in scope are
+        backfilled (see _rollups_cover), which is one lookup in pools.
+        """
+        query = self.db.query(func.coalesce(func.sum(Rollup.reading_count), 0))
+        if filters.pool_id:
+            query = query.filter(Rollup.pool_id == filters.pool_id)
+        if filters.pool_ids:
+            query = query.filter(Rollup.pool_id.in_(filters.pool_ids))
+        if filters.start_date:
+            query = query.filter(Rollup.local_date >= filters.start_date)
+        if filters.end_date:
+            query = query.filter(Rollup.local_date <= filters.end_date)
+        if filters.weekday:
+            query = query.filter(Rollup.weekday == filters.weekday.capitalize())
+        if filters.start_hour is not None:
+            query = query.filter(Rollup.hour >= filters.start_hour)
+        if filters.end_hour is not None:
+            query = query.filter(Rollup.hour <= filters.end_hour)
+        return int(query.scalar()), self._rollups_cover(filters)
 
     def get_latest_for_pool(self, pool_id: int) -> Optional[VisitorRecord]:
         """Get the latest visitor record for a pool."""
@@ -122,17 +258,17 @@ class VisitorService:
         ]
 
     def get_today_for_pool(self, pool_id: int) -> List[VisitorRecord]:
-        """Get all visitor records for today for a specific pool."""
-        today = date.today()
-        start_dt = datetime.combine(today, datetime.min.time())
-        end_dt = datetime.combine(today, datetime.max.time())
+        """Get all visitor records of the current day in the pool's timezone."""
+        tz = self._timezones([pool_id]).get(pool_id)
+        if tz is None:
+            return []
+        today = datetime.now(tz).date()
 
         return (
             self.db.query(VisitorRecord)
             .filter(
                 VisitorRecord.pool_id == pool_id,
-                VisitorRecord.timestamp >= start_dt,
-                VisitorRecord.timestamp <= end_dt
+                VisitorRecord.local_date == today
             )
             .order_by(VisitorRecord.timestamp.asc())
             .all()
@@ -159,38 +295,15 @@ class VisitorService:
 
     def get_paginated(self, filters: VisitorRecordFilter) -> PaginatedVisitorResponse:
         """Get visitor records with pagination info."""
-        query = self.db.query(VisitorRecord)
-
-        if filters.pool_id:
-            query = query.filter(VisitorRecord.pool_id == filters.pool_id)
-
-        if filters.start_date:
-            start_dt = datetime.combine(filters.start_date, datetime.min.time())
-            query = query.filter(VisitorRecord.timestamp >= start_dt)
-
-        if filters.end_date:
-            end_dt = datetime.combine(filters.end_date, datetime.max.time())
-            query = query.filter(VisitorRecord.timestamp <= end_dt)
-
-        if filters.weekday:
-            query = query.filter(VisitorRecord.weekday == filters.weekday)
-
-        # Get total count
-        total = query.count()
-
-        # Get records with pagination
-        records = (
-            query
-            .order_by(VisitorRecord.timestamp.desc())
-            .offset(filters.offset)
-            .limit(filters.limit)
-            .all()
-        )
+        records, next_cursor = self.get_page(filters)
+        total, total_exact = self.count_filtered(filters)
 
         return PaginatedVisitorResponse(
             records=[VisitorRecordResponse.model_validate(r) for r in records],
             total=total,
+            total_exact=total_exact,
             limit=filters.limit,
             offset=filters.offset,
-            has_more=(filters.offset + len(records)) < total
+            has_more=next_cursor is not None,
+            next_cursor=next_cursor
         )
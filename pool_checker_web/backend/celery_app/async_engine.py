@@ -0,0 +1,200 @@
+import asyncio
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+from celery.utils.log import get_task_logger
+
+from app.config import settings
+from app.models.pool import Pool
+from celery_app.discovery import apply_discovered_endpoint
+from celery_app.fetching import (
+    discover_endpoint, fetch_group_key, fetch_pages_in_tabs, group_timeout,
+    http_fetchable_pools, pages_by_url, read_group_counts
+)
+from celery_app.http_fetcher import STRATEGY_DISCOVER, STRATEGY_SELENIUM
+from celery_app.readiness import ScrapeTimer
+
+logger = get_task_logger(__name__)
+
+
+class GroupOutcome:
+    """Counts and timings of one fetch group scraped by the engine."""
+
+    def __init__(self, pools: List[Pool]):
+        self.pools = pools
+        self.strategy, self.target, self.block_resources = fetch_group_key(pools[0])
+        self.timer = ScrapeTimer()
+        self.results: Dict[int, Tuple[Optional[int], str]] = {
+            pool.id: (None, self.strategy) for pool in pools
+        }
+
+    def missing(self) -> List[Pool]:
+        return [pool for pool in self.pools if self.results[pool.id][0] is None]
+
+
+class AsyncScrapeEngine:
+    """Scrapes a batch of fetch groups concurrently inside one worker process.
+
+    HTTP fetches run on an asyncio event loop, limited globally and per host
+    and each bounded by its group's deadline. Pages that need a browser are
+    opened as tabs of pooled browsers in worker threads; pools whose
+    browserless fetch failed fall back to such tabs, like the synchronous path.
+    """
+
+    def __init__(
+        self,
+        concurrency: Optional[int] = None,
+        per_host: Optional[int] = None,
+        tabs_per_browser: Optional[int] = None,
+        batch_deadline: Optional[float] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        self.concurrency = concurrency or settings.SCRAPE_BATCH_CONCURRENCY
+        self.per_host = per_host or settings.SCRAPE_BATCH_PER_HOST
+        self.tabs_per_browser = tabs_per_browser or settings.SCRAPE_BATCH_TABS_PER_BROWSER
+        self.batch_deadline = batch_deadline or settings.SCRAPE_BATCH_DEADLINE_SECONDS
+        self.transport = transport
+        self._global: Optional[asyncio.Semaphore] = None
+        self._browsers: Optional[asyncio.Semaphore] = None
+        self._hosts: Dict[str, asyncio.Semaphore] = {}
+
+    def _host_limit(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc
+        if host not in self._hosts:
+            self._hosts[host] = asyncio.Semaphore(self.per_host)
+        return self._hosts[host]
+
+    def _new_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            follow_redirects=True,
+            headers={"User-Agent": settings.SCRAPE_USER_AGENT},
+            limits=httpx.Limits(
+                max_connections=self.concurrency,
+                max_keepalive_connections=min(self.concurrency, settings.HTTP_FETCH_MAX_KEEPALIVE),
+            ),
+            timeout=settings.HTTP_FETCH_TIMEOUT_SECONDS,
+            transport=self.transport,
+        )
+
+    async def _fetch_http(self, client: httpx.AsyncClient, outcome: GroupOutcome) -> None:
+        pools = http_fetchable_pools(outcome.pools, outcome.strategy)
+        if not pools:
+            return
+
+        async with self._host_limit(outcome.target), self._global:
+            try:
+                with outcome.timer.phase("fetch"):
+                    response = await asyncio.wait_for(
+                        client.get(outcome.target), timeout=group_timeout(pools)
+                    )
+                    response.raise_for_status()
+            except (httpx.HTTPError, asyncio.TimeoutError) as e:
+                logger.warning(f"HTTP fetch of {outcome.target} failed: {e!r}")
+                return
+
+        with outcome.timer.phase("parse"):
+            counts = read_group_counts(pools, outcome.strategy, response.text, outcome.target)
+        outcome.results.update({pool.id: (counts[pool.id], outcome.strategy) for pool in pools})
+
+    async def _rediscover(self, outcome: GroupOutcome, pool: Pool) -> None:
+        # Only the discovery runs in a thread; the pool is updated on the loop's thread
+        async with self._browsers:
+            visitor_count, endpoint = await asyncio.to_thread(
+                discover_endpoint, pool.id, pool.url, pool.element_id,
+                pool.ready_timeout_seconds or 15, outcome.timer
+            )
+        if endpoint:
+            apply_discovered_endpoint(pool, endpoint)
+        outcome.results[pool.id] = (visitor_count, outcome.strategy)
+
+    def _tab_chunks(
+        self,
+        pages: List[Tuple[GroupOutcome, str, List[Pool]]]
+    ) -> List[List[Tuple[GroupOutcome, str, List[Pool]]]]:
+        """Split pages into browser-sized chunks, at most per_host tabs of one host each."""
+        chunks: List[List[Tuple[GroupOutcome, str, List[Pool]]]] = []
+        for page in pages:
+            host = urlsplit(page[1]).netloc
+            for chunk in chunks:
+                same_host = sum(1 for _, url, _ in chunk if urlsplit(url).netloc == host)
+                if len(chunk) < self.tabs_per_browser and same_host < self.per_host:
+                    chunk.append(page)
+                    break
+            else:
+                chunks.append([page])
+        return chunks
+
+    async def _fetch_tabs(self, chunk: List[Tuple[GroupOutcome, str, List[Pool]]]) -> None:
+        chunk_timer = ScrapeTimer()
+        tabs = [
+            (url, [pool.element_id for pool in pools], outcome.block_resources)
+            for outcome, url, pools in chunk
+        ]
+        timeout = max(group_timeout(pools) for _, _, pools in chunk)
+        async with self._browsers:
+            counts = await asyncio.to_thread(fetch_pages_in_tabs, tabs, timeout, chunk_timer)
+
+        for (outcome, _, pools), page_counts in zip(chunk, counts):
+            outcome.timer.merge(chunk_timer)
+            outcome.results.update(
+                {pool.id: (page_counts[pool.element_id], STRATEGY_SELENIUM) for pool in pools}
+            )
+
+    async def _fetch_browser_pages(self, outcomes: List[GroupOutcome]) -> None:
+        pages = [
+            (outcome, url, pools)
+            for outcome in outcomes
+            for url, pools in pages_by_url(outcome.missing()).items()
+        ]
+        await asyncio.gather(*(self._fetch_tabs(chunk) for chunk in self._tab_chunks(pages)))
+
+    async def _run(self, outcomes: List[GroupOutcome]) -> None:
+        selenium = [outcome for outcome in outcomes if outcome.strategy == STRATEGY_SELENIUM]
+        browserless = [outcome for outcome in outcomes if outcome.strategy != STRATEGY_SELENIUM]
+
+        # Browser pages load while the HTTP fetches are in flight
+        async with self._new_client() as client:
+            await asyncio.gather(
+                self._fetch_browser_pages(selenium),
+                *(self._fetch_http(client, outcome) for outcome in browserless)
+            )
+
+        await asyncio.gather(*(
+            self._rediscover(outcome, pool)
+            for outcome in browserless if outcome.strategy == STRATEGY_DISCOVER
+            for pool in outcome.missing()
+        ))
+
+        fallback = [outcome for outcome in browserless if outcome.missing()]
+        for outcome in fallback:
+            logger.warning(
+                f"{outcome.strategy} strategy failed for pools "
+                f"{[pool.id for pool in outcome.missing()]}, falling back to Selenium"
+            )
+        await self._fetch_browser_pages(fallback)
+
+    async def scrape_async(self, groups: List[List[Pool]]) -> List[GroupOutcome]:
+        """Scrape fetch groups concurrently; pools not done by the batch deadline stay None."""
+        self._global = asyncio.Semaphore(self.concurrency)
+        self._browsers = asyncio.Semaphore(settings.BROWSER_POOL_SIZE)
+        self._hosts = {}
+
+        outcomes = [GroupOutcome(pools) for pools in groups]
+        try:
+            await asyncio.wait_for(self._run(outcomes), timeout=self.batch_deadline)
+        except asyncio.TimeoutError:
+            missing = sum(len(outcome.missing()) for outcome in outcomes)
+            logger.error(f"Scrape batch hit its {self.batch_deadline}s deadline, {missing} pools unfinished")
+        return outcomes
+
+    def scrape(self, groups: List[List[Pool]]) -> List[GroupOutcome]:
+        """Run a batch to completion from synchronous code such as a Celery task."""
+        started = time.perf_counter()
+        outcomes = asyncio.run(self.scrape_async(groups))
+        logger.info(
+            f"Scraped {sum(len(group) for group in groups)} pools in {len(groups)} fetch groups "
+            f"in {time.perf_counter() - started:.2f}s"
+        )
+        return outcomes
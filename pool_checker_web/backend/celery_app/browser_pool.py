@@ -0,0 +1,340 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+
+from celery.signals import worker_process_shutdown
+from celery.utils.log import get_task_logger
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+
+from app.config import settings
+
+logger = get_task_logger(__name__)
+
+
+class BrowserPoolTimeout(Exception):
+    """Raised when no browser could be leased within the lease timeout."""
+
+
+def build_chrome_options() -> Options:
+    """Build the Chrome options used for headless scraping."""
+    chrome_options = Options()
+    chrome_options.add_argument("--headless")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--window-size=1920,1080")
+    # Return from get() at DOMContentLoaded; readiness polling covers the rest
+    chrome_options.page_load_strategy = "eager"
+
+    # Use chromium binary from environment if set
+    chrome_bin = os.environ.get("CHROME_BIN")
+    if chrome_bin:
+        chrome_options.binary_location = chrome_bin
+
+    return chrome_options
+
+
+def launch_driver() -> webdriver.Chrome:
+    """Start a new headless Chromium using system chromedriver or env path."""
+    chromedriver_path = os.environ.get("CHROMEDRIVER_PATH", "/usr/bin/chromedriver")
+    service = Service(chromedriver_path)
+    return webdriver.Chrome(service=service, options=build_chrome_options())
+
+
+def _process_tree_rss_kb(root_pid: int) -> Optional[int]:
+    """Sum the resident memory (kB) of a process and all of its descendants.
+
+    Reads /proc directly so it only works on Linux; returns None elsewhere.
+    """
+    if not os.path.isdir("/proc"):
+        return None
+
+    children: Dict[int, List[int]] = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # The command name may contain spaces, so split after the ")"
+                fields = f.read().rsplit(")", 1)[1].split()
+            children.setdefault(int(fields[1]), []).append(int(entry))
+        except (OSError, IndexError, ValueError):
+            continue
+
+    total = 0
+    found = False
+    stack = [root_pid]
+    while stack:
+        pid = stack.pop()
+        try:
+            with open(f"/proc/{pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1])
+                        found = True
+                        break
+        except (OSError, ValueError):
+            continue
+        stack.extend(children.get(pid, []))
+
+    return total if found else None
+
+
+class PooledDriver:
+    """A long-lived WebDriver plus the bookkeeping needed to recycle it."""
+
+    def __init__(self, driver: webdriver.Chrome):
+        self.driver = driver
+        self.pages_served = 0
+        self.launched_at = time.monotonic()
+
+    @property
+    def pid(self) -> Optional[int]:
+        service = getattr(self.driver, "service", None)
+        process = getattr(service, "process", None)
+        return getattr(process, "pid", None)
+
+    def rss_kb(self) -> Optional[int]:
+        """Resident memory of chromedriver and the browser processes it spawned."""
+        pid = self.pid
+        if pid is None:
+            return None
+        return _process_tree_rss_kb(pid)
+
+    def is_healthy(self) -> bool:
+        """Check that the browser still answers commands."""
+        try:
+            return self.driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    def quit(self) -> None:
+        try:
+            self.driver.quit()
+        except Exception as e:
+            logger.warning(f"Error quitting browser: {e}")
+
+
+class BrowserPool:
+    """A per-process pool of warm headless browsers leased to scrape tasks.
+
+    Drivers are health-checked when leased and recycled once they have served
+    ``max_pages`` pages or their process tree grows beyond ``max_rss_mb``.
+    """
+
+    RECYCLE_REASONS = ("max_pages", "rss", "unhealthy")
+
+    def __init__(
+        self,
+        size: int = 1,
+        max_pages: int = 50,
+        max_rss_mb: Optional[int] = 600,
+        lease_timeout: float = 60.0,
+        launcher: Callable[[], webdriver.Chrome] = launch_driver
+    ):
+        self.size = max(1, size)
+        self.max_pages = max_pages
+        self.max_rss_mb = max_rss_mb
+        self.lease_timeout = lease_timeout
+        self._launcher = launcher
+
+        self._lock = threading.Condition()
+        self._idle: List[PooledDriver] = []
+        self._total = 0  # idle + leased + currently launching
+        self._closed = False
+
+        # Counters
+        self._launches = 0
+        self._launch_failures = 0
+        self._launch_seconds = 0.0
+        self._leases = 0
+        self._lease_timeouts = 0
+        self._lease_wait_seconds = 0.0
+        self._lease_wait_max = 0.0
+        self._pages_served = 0
+        self._recycles = {reason: 0 for reason in self.RECYCLE_REASONS}
+
+    def _launch(self) -> PooledDriver:
+        started = time.monotonic()
+        try:
+            driver = self._launcher()
+        except Exception:
+            with self._lock:
+                self._total -= 1
+                self._launch_failures += 1
+                self._lock.notify()
+            raise
+
+        elapsed = time.monotonic() - started
+        with self._lock:
+            self._launches += 1
+            self._launch_seconds += elapsed
+        logger.info(f"Launched browser in {elapsed:.2f}s (pid {os.getpid()})")
+        return PooledDriver(driver)
+
+    def _discard(self, pooled: PooledDriver, reason: str) -> None:
+        pooled.quit()
+        with self._lock:
+            self._total -= 1
+            self._recycles[reason] += 1
+            self._lock.notify()
+        logger.info(
+            f"Recycled browser after {pooled.pages_served} pages ({reason})"
+        )
+
+    def _acquire(self) -> PooledDriver:
+        started = time.monotonic()
+        deadline = started + self.lease_timeout
+        must_launch = False
+
+        with self._lock:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Browser pool is closed")
+                if self._idle:
+                    pooled = self._idle.pop()
+                    break
+                if self._total < self.size:
+                    self._total += 1
+                    pooled = None
+                    must_launch = True
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._lease_timeouts += 1
+                    raise BrowserPoolTimeout(
+                        f"No browser available after {self.lease_timeout:.0f}s"
+                    )
+                self._lock.wait(remaining)
+
+            waited = time.monotonic() - started
+            self._leases += 1
+            self._lease_wait_seconds += waited
+            self._lease_wait_max = max(self._lease_wait_max, waited)
+
+        if must_launch:
+            return self._launch()
+
+        if not pooled.is_healthy():
+            # Replace the dead browser while keeping its slot reserved
+            pooled.quit()
+            with self._lock:
+                self._recycles["unhealthy"] += 1
+            logger.info(
+                f"Replacing unhealthy browser after {pooled.pages_served} pages"
+            )
+            return self._launch()
+
+        return pooled
+
+    def _release(self, pooled: PooledDriver, failed: bool) -> None:
+        if failed and not pooled.is_healthy():
+            self._discard(pooled, "unhealthy")
+            return
+
+        if self.max_pages and pooled.pages_served >= self.max_pages:
+            self._discard(pooled, "max_pages")
+            return
+
+        if self.max_rss_mb:
+            rss_kb = pooled.rss_kb()
+            if rss_kb is not None and rss_kb > self.max_rss_mb * 1024:
+                self._discard(pooled, "rss")
+                return
+
+        with self._lock:
+            if self._closed:
+                self._total -= 1
+                pooled.quit()
+                return
+            self._idle.append(pooled)
+            self._lock.notify()
+
+    @contextmanager
+    def lease(self) -> Iterator[webdriver.Chrome]:
+        """Lease a warm browser for the duration of the ``with`` block."""
+        pooled = self._acquire()
+        failed = False
+        try:
+            yield pooled.driver
+        except Exception:
+            failed = True
+            raise
+        finally:
+            pooled.pages_served += 1
+            with self._lock:
+                self._pages_served += 1
+            self._release(pooled, failed)
+
+    def close(self) -> None:
+        """Quit all idle browsers; leased ones are quit when returned."""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._total -= len(idle)
+            self._lock.notify_all()
+        for pooled in idle:
+            pooled.quit()
+
+    def stats(self) -> dict:
+        """Return the pool counters for this process."""
+        with self._lock:
+            return {
+                "pid": os.getpid(),
+                "size": self.size,
+                "browsers": self._total,
+                "idle": len(self._idle),
+                "launches": self._launches,
+                "launch_failures": self._launch_failures,
+                "launch_seconds_total": round(self._launch_seconds, 3),
+                "leases": self._leases,
+                "lease_timeouts": self._lease_timeouts,
+                "lease_wait_seconds_total": round(self._lease_wait_seconds, 3),
+                "lease_wait_seconds_max": round(self._lease_wait_max, 3),
+                "pages_served": self._pages_served,
+                "recycles": dict(self._recycles),
+            }
+
+
+_pool: Optional[BrowserPool] = None
+_pool_pid: Optional[int] = None
+_pool_lock = threading.Lock()
+
+
+def get_browser_pool() -> BrowserPool:
+    """Get the browser pool for the current worker process.
+
+    Browsers must never be shared across a fork, so the pool is rebuilt
+    whenever the process id changes.
+    """
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = BrowserPool(
+                size=settings.BROWSER_POOL_SIZE,
+                max_pages=settings.BROWSER_MAX_PAGES,
+                max_rss_mb=settings.BROWSER_MAX_RSS_MB,
+                lease_timeout=settings.BROWSER_LEASE_TIMEOUT_SECONDS,
+            )
+            _pool_pid = os.getpid()
+        return _pool
+
+
+def shutdown_browser_pool() -> None:
+    """Quit the browsers owned by the current process."""
+    global _pool
+    with _pool_lock:
+        pool = _pool if _pool_pid == os.getpid() else None
+        _pool = None
+    if pool is not None:
+        logger.info(f"Shutting down browser pool: {pool.stats()}")
+        pool.close()
+
+
+@worker_process_shutdown.connect
+def _on_worker_process_shutdown(**kwargs) -> None:
+    shutdown_browser_pool()
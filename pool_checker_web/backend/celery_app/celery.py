@@ -29,12 +29,20 @@ celery_app.conf.update(
 
 # Celery Beat schedule
 celery_app.conf.beat_schedule = {
-    "scrape-all-pools-every-10-minutes": {
-        "task": "celery_app.tasks.scraper_tasks.scrape_all_pools",
-        "schedule": crontab(minute="*/10"),  # Every 10 minutes
+    "dispatch-due-pools-every-minute": {
+        "task": "celery_app.tasks.scraper_tasks.dispatch_due_pools",
+        "schedule": crontab(),  # Every minute; pools run on their own intervals
     },
-    "refresh-analytics-cache-daily": {
+    "drain-scrape-ingest-every-minute": {
+        "task": "celery_app.tasks.scraper_tasks.drain_scrape_ingest",
+        "schedule": crontab(),  # Every minute; backs up the ingest consumer
+    },
+    "refresh-change-profiles-daily": {
+        "task": "celery_app.tasks.scraper_tasks.refresh_change_profiles",
+        "schedule": crontab(hour=2, minute=30),  # Daily at 2:30 AM
+    },
+    "refresh-analytics-cache-every-15-minutes": {
         "task": "celery_app.tasks.scraper_tasks.refresh_analytics_cache",
-        "schedule": crontab(hour=3, minute=0),  # Daily at 3 AM
+        "schedule": crontab(minute="*/15"),  # New readings patch snapshots in between
     },
 }
@@ -0,0 +1,267 @@
+import base64
+import json
+import os
+import re
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from celery.utils.log import get_task_logger
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+
+from app.config import settings
+from app.models.pool import Pool
+from celery_app.browser_pool import build_chrome_options
+from celery_app.http_fetcher import extract_element_text, json_value_to_count
+from celery_app.readiness import parse_visitor_count, wait_for_visitor_count
+
+logger = get_task_logger(__name__)
+
+# Resource types whose responses may carry the visitor number
+CANDIDATE_RESOURCE_TYPES = ("XHR", "Fetch", "Document", "Other")
+
+# Words that make a JSON key look like a visitor counter
+COUNT_KEY_HINTS = ("visitor", "besucher", "current", "count", "occupancy", "persons", "auslastung")
+
+
+class DiscoveredEndpoint:
+    """A replayable request whose response contains the visitor count."""
+
+    def __init__(
+        self,
+        url: str,
+        visitor_count: int,
+        json_path: Optional[str] = None,
+        resource_type: Optional[str] = None
+    ):
+        self.url = url
+        self.visitor_count = visitor_count
+        self.json_path = json_path
+        self.resource_type = resource_type
+
+    def as_dict(self) -> dict:
+        return {
+            "url": self.url,
+            "json_path": self.json_path,
+            "resource_type": self.resource_type,
+            "visitor_count": self.visitor_count,
+        }
+
+
+def launch_logging_driver() -> webdriver.Chrome:
+    """Start a Chromium with network (performance) logging enabled."""
+    options = build_chrome_options()
+    options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    chromedriver_path = os.environ.get("CHROMEDRIVER_PATH", "/usr/bin/chromedriver")
+    return webdriver.Chrome(service=Service(chromedriver_path), options=options)
+
+
+def parse_network_log(entries: List[dict]) -> List[dict]:
+    """Extract the completed GET requests from Chromium performance log entries.
+
+    Returns dicts with request_id, url, method, resource_type and status,
+    in the order the responses were received.
+    """
+    methods: Dict[str, str] = {}
+    responses = []
+    for entry in entries:
+        try:
+            message = json.loads(entry["message"])["message"]
+        except (KeyError, TypeError, ValueError):
+            continue
+
+        params = message.get("params", {})
+        if message.get("method") == "Network.requestWillBeSent":
+            methods[params.get("requestId")] = params.get("request", {}).get("method", "GET")
+        elif message.get("method") == "Network.responseReceived":
+            response = params.get("response", {})
+            responses.append({
+                "request_id": params.get("requestId"),
+                "url": response.get("url", ""),
+                "resource_type": params.get("type"),
+                "status": response.get("status"),
+            })
+
+    result = []
+    for response in responses:
+        response["method"] = methods.get(response["request_id"], "GET")
+        if (
+            response["method"] == "GET"
+            and response["url"].startswith(("http://", "https://"))
+            and response["resource_type"] in CANDIDATE_RESOURCE_TYPES
+            and response["status"] and 200 <= response["status"] < 300
+        ):
+            result.append(response)
+    return result
+
+
+def _is_count_value(value: Any, target: int) -> bool:
+    if isinstance(value, str) and not value.strip().isdigit():
+        return False
+    return json_value_to_count(value) == target
+
+
+def find_json_paths(data: Any, target: int, path: str = "$") -> List[Tuple[str, Any]]:
+    """Find every JSON path whose scalar value equals the target count.
+
+    Returns (path, parent) pairs so callers can look at sibling values.
+    """
+    if isinstance(data, dict):
+        items = [(f"{path}.{key}", value) for key, value in data.items()]
+    elif isinstance(data, list):
+        items = [(f"{path}[{index}]", value) for index, value in enumerate(data)]
+    else:
+        return []
+
+    matches: List[Tuple[str, Any]] = []
+    for child, value in items:
+        if isinstance(value, (dict, list)):
+            matches.extend(find_json_paths(value, target, child))
+        elif _is_count_value(value, target):
+            matches.append((child, data))
+    return matches
+
+
+def _score_json_path(path: str, parent: Any, element_id: str) -> int:
+    """Rank candidate paths: counter-like keys next to an id matching the element."""
+    score = 0
+    key = re.split(r"[.\[]", path)[-1].lower()
+    if any(hint in key for hint in COUNT_KEY_HINTS):
+        score += 1
+    if isinstance(parent, dict):
+        element_id_lower = element_id.lower()
+        for value in parent.values():
+            if isinstance(value, (str, int)) and not isinstance(value, bool):
+                token = str(value).lower()
+                if len(token) >= 2 and token in element_id_lower:
+                    score += 2
+                    break
+    return score
+
+
+def match_response_body(
+    body: str,
+    visitor_count: int,
+    element_id: str
+) -> Tuple[bool, Optional[str]]:
+    """Check whether a response body carries the visitor count.
+
+    Returns (matched, json_path); json_path is None when the body is an HTML
+    document or fragment containing the element itself.
+    """
+    try:
+        data = json.loads(body)
+    except ValueError:
+        data = None
+
+    if data is not None and isinstance(data, (dict, list)):
+        matches = find_json_paths(data, visitor_count)
+        if not matches:
+            return False, None
+        scored = sorted(
+            matches,
+            key=lambda match: (-_score_json_path(match[0], match[1], element_id), len(match[0]))
+        )
+        best_score = _score_json_path(scored[0][0], scored[0][1], element_id)
+        if len(scored) > 1 and best_score == 0:
+            # Several anonymous numbers equal the count; too ambiguous to trust
+            return False, None
+        return True, scored[0][0]
+
+    text = extract_element_text(body, element_id)
+    if text is not None and parse_visitor_count(text) == visitor_count:
+        return True, None
+    return False, None
+
+
+def select_endpoint(
+    requests: List[dict],
+    bodies: Dict[str, str],
+    visitor_count: int,
+    element_id: str,
+    page_url: str
+) -> Optional[DiscoveredEndpoint]:
+    """Pick the request whose response contains the rendered visitor number.
+
+    Data requests (XHR/Fetch) win over documents; the page itself is only
+    chosen if nothing else matches.
+    """
+    def priority(request: dict) -> int:
+        if request["resource_type"] in ("XHR", "Fetch"):
+            return 0
+        if request["url"] != page_url:
+            return 1
+        return 2
+
+    for request in sorted(requests, key=priority):
+        body = bodies.get(request["request_id"])
+        if body is None:
+            continue
+        matched, json_path = match_response_body(body, visitor_count, element_id)
+        if matched:
+            return DiscoveredEndpoint(
+                url=request["url"],
+                visitor_count=visitor_count,
+                json_path=json_path,
+                resource_type=request["resource_type"]
+            )
+    return None
+
+
+def _get_response_body(driver, request_id: str) -> Optional[str]:
+    try:
+        result = driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+    except Exception:
+        return None
+    body = result.get("body", "")
+    if result.get("base64Encoded"):
+        try:
+            body = base64.b64decode(body).decode("utf-8")
+        except (ValueError, UnicodeDecodeError):
+            return None
+    return body
+
+
+def discover_data_endpoint(
+    url: str,
+    element_id: str,
+    timeout: float = 15
+) -> Tuple[Optional[int], Optional[DiscoveredEndpoint]]:
+    """Load a page once with network logging and find its data endpoint.
+
+    Returns the rendered visitor count (so the scrape still succeeds) and the
+    endpoint that delivered it, if one could be identified.
+    """
+    driver = launch_logging_driver()
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.set_page_load_timeout(timeout)
+        driver.get(url)
+        element = wait_for_visitor_count(
+            driver, element_id, timeout=timeout,
+            poll_interval=settings.SCRAPE_READY_POLL_SECONDS
+        )
+        visitor_count = parse_visitor_count(element.text.strip())
+
+        requests = parse_network_log(driver.get_log("performance"))
+        bodies = {}
+        for request in requests:
+            body = _get_response_body(driver, request["request_id"])
+            if body is not None:
+                bodies[request["request_id"]] = body
+
+        endpoint = select_endpoint(requests, bodies, visitor_count, element_id, url)
+        if endpoint:
+            logger.info(f"Discovered data endpoint for {url}: {endpoint.as_dict()}")
+        else:
+            logger.warning(f"No replayable response for {url} contained {visitor_count}")
+        return visitor_count, endpoint
+    finally:
+        driver.quit()
+
+
+def apply_discovered_endpoint(pool: Pool, endpoint: DiscoveredEndpoint) -> None:
+    """Store a discovered endpoint on the pool (the caller commits)."""
+    pool.data_url = endpoint.url
+    pool.json_path = endpoint.json_path
+    pool.endpoint_discovered_at = datetime.now(timezone.utc)
@@ -0,0 +1,312 @@
+import time
+from typing import Dict, List, Optional, Tuple
+
+import redis
+from celery.utils.log import get_task_logger
+from selenium.common.exceptions import TimeoutException
+
+from app.config import settings
+from app.db.redis import get_redis
+from app.models.pool import Pool
+from celery_app.browser_pool import get_browser_pool
+from celery_app.discovery import DiscoveredEndpoint, apply_discovered_endpoint, discover_data_endpoint
+from celery_app.http_fetcher import (
+    HttpFetcher, STRATEGY_DISCOVER, STRATEGY_HTTP, STRATEGY_JSON, STRATEGY_SELENIUM,
+    read_html_counts, read_json_counts
+)
+from celery_app.readiness import (
+    ScrapeTimer, parse_visitor_count, set_resource_blocking,
+    visitor_count_present, wait_for_visitor_count
+)
+
+logger = get_task_logger(__name__)
+
+# (fetch strategy, URL that is actually requested, block_resources)
+FetchGroupKey = Tuple[str, str, bool]
+
+
+def fetch_visitor_counts(
+    url: str,
+    element_ids: List[str],
+    timeout: float = 15,
+    block_resources: bool = False,
+    timer: Optional[ScrapeTimer] = None
+) -> Dict[str, Optional[int]]:
+    """Load a page once in a pooled Selenium browser and read several counters.
+
+    Polls until each element holds a number instead of sleeping a fixed time;
+    all elements share one readiness deadline.
+    """
+    timer = timer or ScrapeTimer()
+    counts: Dict[str, Optional[int]] = {element_id: None for element_id in element_ids}
+    try:
+        acquire_started = time.perf_counter()
+        with get_browser_pool().lease() as driver:
+            timer.record("acquire", time.perf_counter() - acquire_started)
+
+            with timer.phase("navigate"):
+                set_resource_blocking(driver, block_resources)
+                driver.set_page_load_timeout(timeout)
+                driver.get(url)
+
+            elements = {}
+            with timer.phase("ready"):
+                deadline = time.monotonic() + timeout
+                for element_id in element_ids:
+                    remaining = max(
+                        deadline - time.monotonic(), settings.SCRAPE_READY_POLL_SECONDS
+                    )
+                    try:
+                        elements[element_id] = wait_for_visitor_count(
+                            driver,
+                            element_id,
+                            timeout=remaining,
+                            poll_interval=settings.SCRAPE_READY_POLL_SECONDS
+                        )
+                    except TimeoutException as e:
+                        logger.error(f"Timed out waiting for visitor count: {e.msg}")
+
+            with timer.phase("parse"):
+                for element_id, element in elements.items():
+                    counts[element_id] = parse_visitor_count(element.text.strip())
+
+    except Exception as e:
+        logger.error(f"Error fetching visitor count: {e}")
+
+    return counts
+
+
+def fetch_visitor_count(
+    url: str,
+    element_id: str,
+    timeout: float = 15,
+    block_resources: bool = False,
+    timer: Optional[ScrapeTimer] = None
+) -> Optional[int]:
+    """Fetch the visitor count from a webpage using a pooled Selenium browser."""
+    return fetch_visitor_counts(url, [element_id], timeout, block_resources, timer)[element_id]
+
+
+def fetch_pages_in_tabs(
+    pages: List[Tuple[str, List[str], bool]],
+    timeout: float = 15,
+    timer: Optional[ScrapeTimer] = None
+) -> List[Dict[str, Optional[int]]]:
+    """Load several pages at once as tabs of one pooled browser.
+
+    ``pages`` holds (url, element_ids, block_resources) tuples. Navigation is
+    started in every tab before any of them is polled, so the page loads
+    overlap inside a single Chromium instead of needing one browser each.
+    """
+    timer = timer or ScrapeTimer()
+    counts = [{element_id: None for element_id in element_ids} for _, element_ids, _ in pages]
+    try:
+        acquire_started = time.perf_counter()
+        with get_browser_pool().lease() as driver:
+            timer.record("acquire", time.perf_counter() - acquire_started)
+            original_handle = driver.current_window_handle
+            handles = []
+            try:
+                with timer.phase("navigate"):
+                    for url, _, block_resources in pages:
+                        driver.switch_to.new_window("tab")
+                        set_resource_blocking(driver, block_resources)
+                        # Assigning location returns immediately, unlike driver.get()
+                        driver.execute_script("window.location.href = arguments[0];", url)
+                        handles.append(driver.current_window_handle)
+
+                with timer.phase("ready"):
+                    pending = {index: set(element_ids) for index, (_, element_ids, _) in enumerate(pages)}
+                    deadline = time.monotonic() + timeout
+                    while any(pending.values()) and time.monotonic() < deadline:
+                        for index, handle in enumerate(handles):
+                            if not pending[index]:
+                                continue
+                            driver.switch_to.window(handle)
+                            for element_id in list(pending[index]):
+                                element = visitor_count_present(element_id)(driver)
+                                if element is not None:
+                                    counts[index][element_id] = parse_visitor_count(element.text.strip())
+                                    pending[index].discard(element_id)
+                        time.sleep(settings.SCRAPE_READY_POLL_SECONDS)
+
+                for index, element_ids in pending.items():
+                    for element_id in element_ids:
+                        logger.error(f"Timed out waiting for '{element_id}' on {pages[index][0]}")
+            finally:
+                for handle in handles:
+                    driver.switch_to.window(handle)
+                    driver.close()
+                driver.switch_to.window(original_handle)
+
+    except Exception as e:
+        logger.error(f"Error fetching visitor counts in tabs: {e}")
+
+    return counts
+
+
+def discovery_allowed(pool_id: int) -> bool:
+    """Rate-limit endpoint discovery, which launches a dedicated browser."""
+    try:
+        return bool(get_redis().set(
+            f"scrape:discovery:cooldown:{pool_id}", 1,
+            nx=True, ex=settings.DISCOVERY_COOLDOWN_MINUTES * 60
+        ))
+    except redis.RedisError:
+        return True
+
+
+def discover_endpoint(
+    pool_id: int,
+    url: str,
+    element_id: str,
+    timeout: float,
+    timer: ScrapeTimer
+) -> Tuple[Optional[int], Optional[DiscoveredEndpoint]]:
+    """Run rate-limited endpoint discovery for a pool's page; returns (rendered count, endpoint).
+
+    Takes plain values rather than the pool so it can run in a worker thread.
+    """
+    if not discovery_allowed(pool_id):
+        return None, None
+
+    try:
+        with timer.phase("discover"):
+            return discover_data_endpoint(url, element_id, timeout)
+    except Exception as e:
+        logger.error(f"Endpoint discovery failed for pool {pool_id}: {e}")
+        return None, None
+
+
+def rediscover_endpoint(pool: Pool, timer: ScrapeTimer) -> Optional[int]:
+    """Run endpoint discovery for a pool and return the rendered count.
+
+    A newly discovered endpoint is set on the pool; the caller commits it.
+    """
+    visitor_count, endpoint = discover_endpoint(
+        pool.id, pool.url, pool.element_id, pool.ready_timeout_seconds or 15, timer
+    )
+    if endpoint:
+        apply_discovered_endpoint(pool, endpoint)
+    return visitor_count
+
+
+def fetch_group_key(pool: Pool) -> FetchGroupKey:
+    """Key under which pools can share a single fetch."""
+    strategy = pool.fetch_strategy or STRATEGY_SELENIUM
+    if strategy == STRATEGY_JSON and pool.json_path:
+        target = pool.data_url or pool.url
+    elif strategy == STRATEGY_DISCOVER and pool.data_url:
+        target = pool.data_url
+    else:
+        target = pool.url
+    return strategy, target, bool(pool.block_resources)
+
+
+def group_pools_by_target(pools: List[Pool]) -> List[List[Pool]]:
+    """Group pools that can be scraped with one page load, keeping input order."""
+    groups: Dict[FetchGroupKey, List[Pool]] = {}
+    for pool in pools:
+        groups.setdefault(fetch_group_key(pool), []).append(pool)
+    return list(groups.values())
+
+
+def group_timeout(pools: List[Pool]) -> float:
+    """Deadline for a fetch shared by several pools."""
+    return max(pool.ready_timeout_seconds or 15 for pool in pools)
+
+
+def http_fetchable_pools(pools: List[Pool], strategy: str) -> List[Pool]:
+    """Pools of a fetch group whose count can be read from a plain HTTP response."""
+    if strategy == STRATEGY_HTTP:
+        return list(pools)
+    if strategy == STRATEGY_JSON:
+        return [pool for pool in pools if pool.json_path]
+    if strategy == STRATEGY_DISCOVER:
+        return [pool for pool in pools if pool.data_url]
+    return []
+
+
+def read_group_counts(
+    pools: List[Pool],
+    strategy: str,
+    body: str,
+    url: str
+) -> Dict[int, Optional[int]]:
+    """Read every pool's count from one HTTP response (JSON path or element id)."""
+    json_pools = [pool for pool in pools if strategy != STRATEGY_HTTP and pool.json_path]
+    html_pools = [pool for pool in pools if pool not in json_pools]
+
+    counts: Dict[int, Optional[int]] = {}
+    if json_pools:
+        by_path = read_json_counts(body, [pool.json_path for pool in json_pools], url)
+        counts.update({pool.id: by_path[pool.json_path] for pool in json_pools})
+    if html_pools:
+        by_element = read_html_counts(body, [pool.element_id for pool in html_pools], url)
+        counts.update({pool.id: by_element[pool.element_id] for pool in html_pools})
+    return counts
+
+
+def pages_by_url(pools: List[Pool]) -> Dict[str, List[Pool]]:
+    """Group pools that still need a browser by the page they are rendered on."""
+    by_url: Dict[str, List[Pool]] = {}
+    for pool in pools:
+        by_url.setdefault(pool.url, []).append(pool)
+    return by_url
+
+
+def fetch_group_visitor_counts(
+    pools: List[Pool],
+    timer: Optional[ScrapeTimer] = None
+) -> Dict[int, Tuple[Optional[int], str]]:
+    """Fetch the counts of pools sharing one fetch group key with a single request.
+
+    Browserless strategies fall back to one Selenium page load per URL for the
+    pools they could not read. Returns pool id -> (count, strategy used).
+    """
+    timer = timer or ScrapeTimer()
+    strategy, target, block_resources = fetch_group_key(pools[0])
+    results: Dict[int, Tuple[Optional[int], str]] = {pool.id: (None, strategy) for pool in pools}
+
+    http_pools = http_fetchable_pools(pools, strategy)
+    if http_pools:
+        body = HttpFetcher().fetch_text(target, timeout=group_timeout(http_pools), timer=timer)
+        if body is not None:
+            with timer.phase("parse"):
+                counts = read_group_counts(http_pools, strategy, body, target)
+            results.update({pool.id: (counts[pool.id], strategy) for pool in http_pools})
+
+    if strategy == STRATEGY_DISCOVER:
+        for pool in pools:
+            if results[pool.id][0] is None:
+                results[pool.id] = (rediscover_endpoint(pool, timer), strategy)
+
+    remaining = [pool for pool in pools if results[pool.id][0] is None]
+    if not remaining:
+        return results
+
+    if strategy != STRATEGY_SELENIUM:
+        logger.warning(
+            f"{strategy} strategy failed for pools {[pool.id for pool in remaining]}, "
+            f"falling back to Selenium"
+        )
+
+    for url, url_pools in pages_by_url(remaining).items():
+        counts = fetch_visitor_counts(
+            url,
+            [pool.element_id for pool in url_pools],
+            timeout=group_timeout(url_pools),
+            block_resources=block_resources,
+            timer=timer
+        )
+        results.update({pool.id: (counts[pool.element_id], STRATEGY_SELENIUM) for pool in url_pools})
+
+    return results
+
+
+def fetch_pool_visitor_count(
+    pool: Pool,
+    timer: Optional[ScrapeTimer] = None
+) -> Tuple[Optional[int], str]:
+    """Fetch a single pool's visitor count using its configured strategy."""
+    return fetch_group_visitor_counts([pool], timer)[pool.id]
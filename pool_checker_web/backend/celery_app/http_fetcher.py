@@ -0,0 +1,246 @@
+import json
+import os
+import re
+import threading
+from html.parser import HTMLParser
+from typing import Any, Dict, List, Optional
+
+import httpx
+from celery.utils.log import get_task_logger
+
+from app.config import settings
+from celery_app.readiness import ScrapeTimer, parse_visitor_count
+
+logger = get_task_logger(__name__)
+
+# Pool.fetch_strategy values
+STRATEGY_SELENIUM = "selenium"
+STRATEGY_HTTP = "http"  # GET pool.url and read the element by id from the HTML
+STRATEGY_JSON = "json"  # GET pool.data_url (or pool.url) and read pool.json_path
+STRATEGY_DISCOVER = "discover"  # call the discovered data endpoint, rediscover on failure
+FETCH_STRATEGIES = (STRATEGY_SELENIUM, STRATEGY_HTTP, STRATEGY_JSON, STRATEGY_DISCOVER)
+
+# Elements that never have a closing tag
+VOID_ELEMENTS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "param", "source", "track", "wbr",
+}
+
+_JSON_PATH_TOKEN = re.compile(r"([^.\[\]]+)|\[(\d+)\]")
+
+
+class _ElementTextParser(HTMLParser):
+    """Collects the text content of the first element with a given id."""
+
+    def __init__(self, element_id: str):
+        super().__init__(convert_charrefs=True)
+        self.element_id = element_id
+        self.depth = 0
+        self.found = False
+        self.done = False
+        self.parts: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+        if self.depth:
+            if tag not in VOID_ELEMENTS:
+                self.depth += 1
+            return
+        if dict(attrs).get("id") == self.element_id:
+            self.found = True
+            if tag in VOID_ELEMENTS:
+                self.done = True
+            else:
+                self.depth = 1
+
+    def handle_startendtag(self, tag, attrs):
+        if not self.depth and not self.done and dict(attrs).get("id") == self.element_id:
+            self.found = True
+            self.done = True
+
+    def handle_endtag(self, tag):
+        if self.depth and tag not in VOID_ELEMENTS:
+            self.depth -= 1
+            if not self.depth:
+                self.done = True
+
+    def handle_data(self, data):
+        if self.depth:
+            self.parts.append(data)
+
+
+def extract_element_text(html: str, element_id: str) -> Optional[str]:
+    """Get the text inside the element with the given id, or None if absent."""
+    parser = _ElementTextParser(element_id)
+    parser.feed(html)
+    parser.close()
+    if not parser.found:
+        return None
+    return "".join(parser.parts).strip()
+
+
+def extract_json_path(data: Any, path: str) -> Any:
+    """Resolve a simple JSON path such as ``$.pools[2].current``.
+
+    Raises KeyError, IndexError or TypeError if the path does not exist.
+    """
+    path = path.strip()
+    if path.startswith("$"):
+        path = path[1:].lstrip(".")
+
+    value = data
+    for key, index in _JSON_PATH_TOKEN.findall(path):
+        if index:
+            value = value[int(index)]
+        elif isinstance(value, list) and key.isdigit():
+            value = value[int(key)]
+        else:
+            value = value[key]
+    return value
+
+
+def json_value_to_count(value: Any) -> Optional[int]:
+    """Convert a JSON scalar to a visitor count."""
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str):
+        return parse_visitor_count(value)
+    return None
+
+
+def read_html_counts(html: str, element_ids: List[str], url: str = "") -> Dict[str, Optional[int]]:
+    """Read the counts of several elements from one HTML document."""
+    counts: Dict[str, Optional[int]] = {}
+    for element_id in element_ids:
+        text = extract_element_text(html, element_id)
+        if text is None:
+            logger.warning(f"Element '{element_id}' not in HTML of {url}")
+        counts[element_id] = parse_visitor_count(text) if text is not None else None
+    return counts
+
+
+def read_json_counts(body: str, json_paths: List[str], url: str = "") -> Dict[str, Optional[int]]:
+    """Read the counts at several JSON paths from one JSON document."""
+    counts: Dict[str, Optional[int]] = {json_path: None for json_path in json_paths}
+    try:
+        data = json.loads(body)
+    except ValueError as e:
+        logger.warning(f"Response of {url} is not JSON: {e}")
+        return counts
+
+    for json_path in json_paths:
+        try:
+            counts[json_path] = json_value_to_count(extract_json_path(data, json_path))
+        except (KeyError, IndexError, TypeError) as e:
+            logger.warning(f"JSON path '{json_path}' not found at {url}: {e}")
+    return counts
+
+
+_client: Optional[httpx.Client] = None
+_client_pid: Optional[int] = None
+_client_lock = threading.Lock()
+
+
+def get_http_client() -> httpx.Client:
+    """Get the per-process HTTP client whose keep-alive connections are reused."""
+    global _client, _client_pid
+    with _client_lock:
+        if _client is None or _client_pid != os.getpid():
+            _client = httpx.Client(
+                follow_redirects=True,
+                headers={"User-Agent": settings.SCRAPE_USER_AGENT},
+                limits=httpx.Limits(
+                    max_connections=settings.HTTP_FETCH_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.HTTP_FETCH_MAX_KEEPALIVE,
+                ),
+                timeout=settings.HTTP_FETCH_TIMEOUT_SECONDS,
+            )
+            _client_pid = os.getpid()
+        return _client
+
+
+class HttpFetcher:
+    """Fetches visitor counts over plain HTTP, without a browser."""
+
+    def __init__(self, client: Optional[httpx.Client] = None):
+        self.client = client or get_http_client()
+
+    def _get(self, url: str, timer: ScrapeTimer, timeout: Optional[float]) -> httpx.Response:
+        with timer.phase("fetch"):
+            response = self.client.get(url, timeout=timeout or httpx.USE_CLIENT_DEFAULT)
+            response.raise_for_status()
+        return response
+
+    def fetch_text(
+        self,
+        url: str,
+        timeout: Optional[float] = None,
+        timer: Optional[ScrapeTimer] = None
+    ) -> Optional[str]:
+        """Get the body of a URL, or None if the request failed."""
+        timer = timer or ScrapeTimer()
+        try:
+            return self._get(url, timer, timeout).text
+        except httpx.HTTPError as e:
+            logger.warning(f"HTTP fetch of {url} failed: {e}")
+            return None
+
+    def fetch_html_many(
+        self,
+        url: str,
+        element_ids: List[str],
+        timeout: Optional[float] = None,
+        timer: Optional[ScrapeTimer] = None
+    ) -> Dict[str, Optional[int]]:
+        """Read several counts from one server-rendered page by element id."""
+        timer = timer or ScrapeTimer()
+        counts: Dict[str, Optional[int]] = {element_id: None for element_id in element_ids}
+        try:
+            response = self._get(url, timer, timeout)
+        except httpx.HTTPError as e:
+            logger.warning(f"HTTP fetch of {url} failed: {e}")
+            return counts
+
+        with timer.phase("parse"):
+            return read_html_counts(response.text, element_ids, url)
+
+    def fetch_html(
+        self,
+        url: str,
+        element_id: str,
+        timeout: Optional[float] = None,
+        timer: Optional[ScrapeTimer] = None
+    ) -> Optional[int]:
+        """Read the count from server-rendered HTML by element id."""
+        return self.fetch_html_many(url, [element_id], timeout, timer)[element_id]
+
+    def fetch_json_many(
+        self,
+        url: str,
+        json_paths: List[str],
+        timeout: Optional[float] = None,
+        timer: Optional[ScrapeTimer] = None
+    ) -> Dict[str, Optional[int]]:
+        """Read several counts from one JSON response by JSON path."""
+        timer = timer or ScrapeTimer()
+        try:
+            response = self._get(url, timer, timeout)
+        except httpx.HTTPError as e:
+            logger.warning(f"HTTP fetch of {url} failed: {e}")
+            return {json_path: None for json_path in json_paths}
+
+        with timer.phase("parse"):
+            return read_json_counts(response.text, json_paths, url)
+
+    def fetch_json(
+        self,
+        url: str,
+        json_path: str,
+        timeout: Optional[float] = None,
+        timer: Optional[ScrapeTimer] = None
+    ) -> Optional[int]:
+        """Read the count from a JSON endpoint by JSON path."""
+        return self.fetch_json_many(url, [json_path], timeout, timer)[json_path]
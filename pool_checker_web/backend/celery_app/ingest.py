@@ -0,0 +1,325 @@
+import os
+import socket
+import threading
+import time
+from collections import deque
+from typing import Callable, List, Optional, Tuple
+
+import redis
+from celery.signals import worker_process_shutdown
+from celery.utils.log import get_task_logger
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from celery_app.celery import celery_app
+from app.db.database import SessionLocal
+from app.db.redis import get_redis
+from app.schemas.visitor import ScrapeReading
+from app.services.column_store import sync_pools
+from app.services.visitor_service import VisitorService
+
+logger = get_task_logger(__name__)
+
+# SCRAPE_INGEST_MODE values
+INGEST_DIRECT = "direct"  # write each reading to the database from the scrape task
+INGEST_STREAM = "stream"  # publish to a Redis stream drained by IngestConsumer
+INGEST_LOCAL = "local"  # buffer in-process and flush from a background thread
+
+# Task that brings cached analytics up to date with new readings
+READINGS_STORED_TASK = "celery_app.tasks.scraper_tasks.update_analytics_for_readings"
+
+# (queue entry id, reading)
+IngestEntry = Tuple[str, ScrapeReading]
+
+
+def emit_readings_stored(readings: List[ScrapeReading]) -> None:
+    """Emit a "new readings" event for stored readings; never fails the write."""
+    if not readings or not settings.ANALYTICS_REALTIME_UPDATES:
+        return
+    try:
+        celery_app.send_task(
+            READINGS_STORED_TASK,
+            args=[[[reading.pool_id, reading.timestamp.isoformat()] for reading in readings]],
+            # Fire and forget: never hold up ingest for an analytics refresh
+            ignore_result=True,
+            retry=False
+        )
+    except Exception as e:
+        logger.warning(f"Could not emit analytics update for {len(readings)} readings: {e}")
+
+
+def sync_column_store(db: Session, readings: List[ScrapeReading]) -> None:
+    """Append stored readings to the column store; never fails the write."""
+    try:
+        sync_pools(db, [reading.pool_id for reading in readings])
+    except (OSError, SQLAlchemyError) as e:
+        # The next sync or a compaction catches up
+        logger.warning(f"Could not update the column store: {e}")
+
+
+class RedisStreamQueue:
+    """Scrape readings in a Redis stream, read through a consumer group.
+
+    Entries stay pending until acknowledged, so a batch that failed to reach
+    the database is claimed again after SCRAPE_INGEST_CLAIM_IDLE_SECONDS.
+    """
+
+    GROUP = "visitor-records"
+
+    def __init__(self, redis_client: redis.Redis, stream: Optional[str] = None):
+        self.redis = redis_client
+        self.stream = stream or settings.SCRAPE_INGEST_STREAM
+        self.consumer = f"{socket.gethostname()}-{os.getpid()}"
+        self._group_ready = False
+
+    def _ensure_group(self) -> None:
+        if self._group_ready:
+            return
+        try:
+            self.redis.xgroup_create(self.stream, self.GROUP, id="0", mkstream=True)
+        except redis.ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        self._group_ready = True
+
+    def publish(self, readings: List[ScrapeReading]) -> List[str]:
+        pipe = self.redis.pipeline()
+        for reading in readings:
+            pipe.xadd(
+                self.stream,
+                {"reading": reading.model_dump_json()},
+                maxlen=settings.SCRAPE_INGEST_STREAM_MAXLEN,
+                approximate=True
+            )
+        return pipe.execute()
+
+    def _parse(self, messages) -> List[IngestEntry]:
+        entries = []
+        for entry_id, fields in messages:
+            if not fields:
+                # Deleted or trimmed while pending
+                self.redis.xack(self.stream, self.GROUP, entry_id)
+                continue
+            entries.append((entry_id, ScrapeReading.model_validate_json(fields["reading"])))
+        return entries
+
+    def read(self, count: int, block_seconds: float) -> List[IngestEntry]:
+        self._ensure_group()
+        claimed = self.redis.xautoclaim(
+            self.stream, self.GROUP, self.consumer,
+            min_idle_time=settings.SCRAPE_INGEST_CLAIM_IDLE_SECONDS * 1000,
+            count=count
+        )
+        entries = self._parse(claimed[1])
+        if entries:
+            return entries
+
+        response = self.redis.xreadgroup(
+            self.GROUP, self.consumer, {self.stream: ">"},
+            count=count, block=max(1, int(block_seconds * 1000))
+        )
+        for _, messages in response or []:
+            entries.extend(self._parse(messages))
+        return entries
+
+    def ack(self, entries: List[IngestEntry]) -> None:
+        if entries:
+            self.redis.xack(self.stream, self.GROUP, *[entry_id for entry_id, _ in entries])
+
+    def release(self, entries: List[IngestEntry]) -> None:
+        # Unacknowledged entries are reclaimed by xautoclaim once idle
+        pass
+
+    def backlog(self) -> int:
+        self._ensure_group()
+        pending = self.redis.xpending(self.stream, self.GROUP)["pending"]
+        groups = {group["name"]: group for group in self.redis.xinfo_groups(self.stream)}
+        lag = groups.get(self.GROUP, {}).get("lag") or 0
+        return pending + lag
+
+
+class LocalQueue:
+    """In-process stand-in for the Redis stream, for single-process setups and tests."""
+
+    def __init__(self):
+        self._entries: deque = deque()
+        self._condition = threading.Condition()
+        self._next_id = 0
+
+    def publish(self, readings: List[ScrapeReading]) -> List[str]:
+        with self._condition:
+            ids = []
+            for reading in readings:
+                self._next_id += 1
+                ids.append(str(self._next_id))
+                self._entries.append((ids[-1], reading))
+            self._condition.notify_all()
+            return ids
+
+    def read(self, count: int, block_seconds: float) -> List[IngestEntry]:
+        with self._condition:
+            if not self._entries:
+                self._condition.wait(block_seconds)
+            entries = []
+            while self._entries and len(entries) < count:
+                entries.append(self._entries.popleft())
+            return entries
+
+    def ack(self, entries: List[IngestEntry]) -> None:
+        pass
+
+    def release(self, entries: List[IngestEntry]) -> None:
+        with self._condition:
+            self._entries.extendleft(reversed(entries))
+
+    def backlog(self) -> int:
+        with self._condition:
+            return len(self._entries)
+
+
+class IngestConsumer:
+    """Writes queued readings to visitor_records in batches.
+
+    A batch is flushed when it holds SCRAPE_INGEST_BATCH_SIZE readings or its
+    oldest reading has waited SCRAPE_INGEST_MAX_LATENCY_SECONDS. A failed
+    write leaves the batch queued, so readings survive database outages.
+    """
+
+    def __init__(
+        self,
+        queue,
+        session_factory: Callable[[], Session] = SessionLocal,
+        batch_size: Optional[int] = None,
+        max_latency: Optional[float] = None
+    ):
+        self.queue = queue
+        self.session_factory = session_factory
+        self.batch_size = batch_size or settings.SCRAPE_INGEST_BATCH_SIZE
+        self.max_latency = max_latency or settings.SCRAPE_INGEST_MAX_LATENCY_SECONDS
+        self.batches = 0
+        self.inserted = 0
+        self.failures = 0
+
+    def collect(self, idle_block: float) -> List[IngestEntry]:
+        """Wait up to idle_block for a first reading, then fill the batch until the latency budget is spent."""
+        batch = self.queue.read(self.batch_size, idle_block)
+        if not batch:
+            return batch
+
+        deadline = time.monotonic() + self.max_latency
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            batch.extend(self.queue.read(self.batch_size - len(batch), remaining))
+        return batch
+
+    def flush(self, batch: List[IngestEntry]) -> int:
+        """Insert a batch in one transaction and acknowledge it; returns rows inserted."""
+        if not batch:
+            return 0
+        db = self.session_factory()
+        try:
+            # Redelivered entries are skipped by the insert and must not be applied twice
+            stored = VisitorService(db).insert_readings([reading for _, reading in batch])
+            if stored:
+                sync_column_store(db, stored)
+        except SQLAlchemyError as e:
+            db.rollback()
+            self.failures += 1
+            logger.warning(f"Could not write {len(batch)} readings, keeping them queued: {e}")
+            self.queue.release(batch)
+            return 0
+        finally:
+            db.close()
+
+        self.queue.ack(batch)
+        self.batches += 1
+        self.inserted += len(stored)
+        emit_readings_stored(stored)
+        if len(stored) < len(batch):
+            logger.info(f"Skipped {len(batch) - len(stored)} readings that were already stored")
+        return len(stored)
+
+    def run_once(self, idle_block: float = 1.0) -> int:
+        """Collect and flush one batch; returns the number of readings taken."""
+        batch = self.collect(idle_block)
+        self.flush(batch)
+        return len(batch)
+
+    def drain(self, max_batches: int = 100) -> int:
+        """Flush until the queue is empty, a write fails or max_batches were written."""
+        taken = 0
+        for _ in range(max_batches):
+            failures = self.failures
+            count = self.run_once(idle_block=0.01)
+            if self.failures > failures:
+                break
+            taken += count
+            if count == 0:
+                break
+        return taken
+
+    def run_forever(self, stop: threading.Event) -> None:
+        """Flush batches until stopped, backing off while the database is unavailable."""
+        while not stop.is_set():
+            failures = self.failures
+            self.run_once()
+            if self.failures > failures:
+                stop.wait(settings.SCRAPE_INGEST_RETRY_SECONDS)
+        self.drain()
+
+    def stats(self) -> dict:
+        return {"batches": self.batches, "inserted": self.inserted, "failures": self.failures}
+
+
+_local_queue: Optional[LocalQueue] = None
+_local_consumer_thread: Optional[threading.Thread] = None
+_local_lock = threading.Lock()
+_local_stop = threading.Event()
+
+
+def get_local_queue() -> LocalQueue:
+    """The process-wide local queue, with a background thread flushing it."""
+    global _local_queue, _local_consumer_thread
+    with _local_lock:
+        if _local_queue is None:
+            _local_queue = LocalQueue()
+        if _local_consumer_thread is None or not _local_consumer_thread.is_alive():
+            _local_stop.clear()
+            consumer = IngestConsumer(_local_queue)
+            _local_consumer_thread = threading.Thread(
+                target=consumer.run_forever, args=(_local_stop,), name="ingest-consumer", daemon=True
+            )
+            _local_consumer_thread.start()
+        return _local_queue
+
+
+def get_ingest_queue():
+    """The queue scrape readings are published to for SCRAPE_INGEST_MODE."""
+    if settings.SCRAPE_INGEST_MODE == INGEST_LOCAL:
+        return get_local_queue()
+    return RedisStreamQueue(get_redis())
+
+
+def publish_readings(readings: List[ScrapeReading]) -> Optional[List[str]]:
+    """Queue readings for batched ingest; returns None in direct mode or if Redis is down.
+
+    Callers write the readings themselves when this returns None.
+    """
+    if settings.SCRAPE_INGEST_MODE == INGEST_DIRECT or not readings:
+        return None
+    try:
+        return get_ingest_queue().publish(readings)
+    except redis.RedisError as e:
+        logger.warning(f"Could not queue {len(readings)} readings, writing them directly: {e}")
+        return None
+
+
+@worker_process_shutdown.connect
+def _flush_local_queue(**kwargs) -> None:
+    """Stop the local consumer so buffered readings are written before exit."""
+    _local_stop.set()
+    if _local_consumer_thread is not None:
+        _local_consumer_thread.join(timeout=settings.SCRAPE_INGEST_MAX_LATENCY_SECONDS + 5)
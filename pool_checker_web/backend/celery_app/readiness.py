@@ -0,0 +1,97 @@
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.webelement import WebElement
+from selenium.webdriver.support.ui import WebDriverWait
+
+# URL patterns blocked when a pool has block_resources enabled
+BLOCKED_RESOURCE_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.css",
+]
+
+
+def parse_visitor_count(text: str) -> Optional[int]:
+    """Parse a visitor count, ignoring any non-numeric characters."""
+    digits = "".join(filter(str.isdigit, text or ""))
+    if not digits:
+        return None
+    return int(digits)
+
+
+class visitor_count_present:
+    """Expected condition: the element exists and holds a numeric value.
+
+    Returns the element once ready so the caller does not look it up again.
+    """
+
+    def __init__(self, element_id: str):
+        self.element_id = element_id
+
+    def __call__(self, driver) -> Optional[WebElement]:
+        try:
+            element = driver.find_element(By.ID, self.element_id)
+            if parse_visitor_count(element.text.strip()) is None:
+                return None
+            return element
+        except (NoSuchElementException, StaleElementReferenceException):
+            return None
+
+
+def set_resource_blocking(driver, enabled: bool) -> None:
+    """Block (or unblock) images, fonts and stylesheets via the DevTools protocol.
+
+    Pooled browsers are shared between pools, so this is applied on every page.
+    """
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd(
+        "Network.setBlockedURLs",
+        {"urls": BLOCKED_RESOURCE_PATTERNS if enabled else []}
+    )
+
+
+def wait_for_visitor_count(
+    driver,
+    element_id: str,
+    timeout: float,
+    poll_interval: float = 0.25
+) -> WebElement:
+    """Poll until the visitor element holds a number; raises TimeoutException."""
+    wait = WebDriverWait(driver, timeout, poll_frequency=poll_interval)
+    return wait.until(
+        visitor_count_present(element_id),
+        message=f"Element '{element_id}' had no numeric value after {timeout}s"
+    )
+
+
+class ScrapeTimer:
+    """Collects per-phase wall-clock timings for a single scrape."""
+
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+        self._started = time.perf_counter()
+
+    def record(self, name: str, seconds: float) -> None:
+        self.phases[name] = round(seconds * 1000, 1)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def merge(self, other: "ScrapeTimer") -> None:
+        """Copy the phases of a timer that covered a fetch shared with other pools."""
+        self.phases.update(other.phases)
+
+    def as_dict(self) -> Dict[str, float]:
+        """Phase timings in milliseconds, plus the total since creation."""
+        timings = {f"{name}_ms": value for name, value in self.phases.items()}
+        timings["total_ms"] = round((time.perf_counter() - self._started) * 1000, 1)
+        return timings
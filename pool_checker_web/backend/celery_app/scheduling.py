@@ -0,0 +1,236 @@
+import zlib
+from datetime import datetime, time as dt_time, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+import pytz
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.pool import Pool
+from app.services.change_rate_service import ChangeRateService, profile_slot
+from celery_app.fetching import FetchGroupKey, fetch_group_key
+
+# Never look further ahead than this for a pool's next active window
+MAX_SCHEDULE_DAYS = 8
+
+
+def parse_hhmm(value: str) -> dt_time:
+    """Parse an "HH:MM" pool schedule time."""
+    hours, minutes = value.split(":")
+    return dt_time(int(hours), int(minutes))
+
+
+def as_utc(value: datetime) -> datetime:
+    """Treat naive datetimes (as returned by SQLite) as UTC."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+class IntervalDecision:
+    """The interval adaptive scheduling picked for a pool's next scrape."""
+
+    def __init__(
+        self,
+        pool_id: int,
+        interval_minutes: int,
+        base_interval_minutes: int,
+        change_rate: Optional[float],
+        reason: str
+    ):
+        self.pool_id = pool_id
+        self.interval_minutes = interval_minutes
+        self.base_interval_minutes = base_interval_minutes
+        self.change_rate = change_rate
+        self.reason = reason
+
+    @property
+    def scrapes_saved(self) -> float:
+        """Fixed-interval scrapes this one replaces, minus itself."""
+        return self.interval_minutes / self.base_interval_minutes - 1
+
+    def as_dict(self) -> dict:
+        return {
+            "pool_id": self.pool_id,
+            "interval_minutes": self.interval_minutes,
+            "base_interval_minutes": self.base_interval_minutes,
+            "change_rate": round(self.change_rate, 3) if self.change_rate is not None else None,
+            "reason": self.reason,
+            "scrapes_saved": round(self.scrapes_saved, 3),
+        }
+
+
+def grid_interval_minutes(pool: Pool) -> int:
+    """Spacing of a pool's slot grid.
+
+    Adaptive pools use their minimum interval, so every interval they pick
+    is a whole number of grid steps and the offsets still spread the load.
+    """
+    if pool.adaptive_scheduling:
+        return max(1, pool.min_scrape_interval_minutes or 5)
+    return pool.scrape_interval_minutes or 10
+
+
+def choose_interval(
+    pool: Pool,
+    profile_rate: Optional[float],
+    recent_rate: Optional[float]
+) -> IntervalDecision:
+    """Pick the next interval from the learned and the latest change rate.
+
+    The faster of the two rates wins so peaks stay sharp; the interval aims
+    for SCHEDULER_TARGET_CHANGE visitors of change between scrapes, rounded
+    down to the grid and kept within the pool's min/max interval.
+    """
+    low = grid_interval_minutes(pool)
+    high = max(low, pool.max_scrape_interval_minutes or 30)
+    base = pool.scrape_interval_minutes or 10
+
+    rates = [rate for rate in (profile_rate, recent_rate) if rate is not None]
+    rate = max(rates) if rates else None
+    if rate is None:
+        minutes = float(base)
+    elif rate <= 0:
+        minutes = float(high)
+    else:
+        minutes = settings.SCHEDULER_TARGET_CHANGE / rate
+
+    minutes = min(high, max(low, minutes))
+    interval = max(low, int(minutes // low) * low)
+
+    if rate is None:
+        reason = "no_data"
+    elif interval < base:
+        reason = "faster"
+    elif interval > base:
+        reason = "slower"
+    else:
+        reason = "unchanged"
+    return IntervalDecision(pool.id, interval, base, rate, reason)
+
+
+def decide_intervals(db: Session, due: List[Tuple[Pool, datetime]]) -> Dict[int, IntervalDecision]:
+    """Choose the next interval of every adaptive pool in ``due``."""
+    adaptive = [(pool, due_at) for pool, due_at in due if pool.adaptive_scheduling]
+    if not adaptive:
+        return {}
+
+    service = ChangeRateService(db)
+    slots = {
+        pool.id: profile_slot(due_at.astimezone(pytz.timezone(pool.timezone or "CET")))
+        for pool, due_at in adaptive
+    }
+    profile_rates = service.get_rates(slots)
+    recent_rates = service.get_recent_rates([pool.id for pool, _ in adaptive])
+    return {
+        pool.id: choose_interval(pool, profile_rates.get(pool.id), recent_rates.get(pool.id))
+        for pool, _ in adaptive
+    }
+
+
+def schedule_offset_seconds(pool: Pool) -> int:
+    """Deterministic offset of a pool's slots within its grid interval.
+
+    Derived from the fetch group key, so pools sharing a page get the same
+    slots and are still scraped with one visit, while different pages are
+    spread evenly over the interval.
+    """
+    key = "|".join(str(part) for part in fetch_group_key(pool))
+    return zlib.crc32(key.encode("utf-8")) % (grid_interval_minutes(pool) * 60)
+
+
+def in_active_window(pool: Pool, at: datetime) -> bool:
+    """Whether a moment lies in the pool's active window, in its timezone."""
+    local_time = as_utc(at).astimezone(pytz.timezone(pool.timezone or "CET")).time()
+    start = parse_hhmm(pool.scrape_start_time or "05:50")
+    end = parse_hhmm(pool.scrape_end_time or "22:10")
+    return start <= local_time <= end
+
+
+def next_due_at(pool: Pool, after: datetime, offset_seconds: Optional[int] = None) -> datetime:
+    """First scrape slot strictly after ``after`` that lies in the pool's active window.
+
+    Slots start at the window start (in the pool's timezone) plus the pool's
+    offset and repeat every grid interval until the window end.
+    """
+    if offset_seconds is None:
+        offset_seconds = schedule_offset_seconds(pool)
+    tz = pytz.timezone(pool.timezone or "CET")
+    interval = timedelta(minutes=grid_interval_minutes(pool))
+    start = parse_hhmm(pool.scrape_start_time or "05:50")
+    end = parse_hhmm(pool.scrape_end_time or "22:10")
+    after = as_utc(after)
+
+    day = after.astimezone(tz).date()
+    for _ in range(MAX_SCHEDULE_DAYS):
+        window_start = tz.localize(datetime.combine(day, start))
+        window_end = tz.localize(datetime.combine(day, end))
+        first = window_start + timedelta(seconds=offset_seconds)
+        if first > window_end:
+            first = window_start
+
+        if after < first:
+            candidate = first
+        else:
+            candidate = first + ((after - first) // interval + 1) * interval
+        if candidate <= window_end:
+            return candidate.astimezone(timezone.utc)
+        day += timedelta(days=1)
+
+    raise ValueError(f"Pool {pool.id} has no scrape slot in its active window")
+
+
+def claim_due_pools(
+    db: Session,
+    now: datetime,
+    horizon: datetime
+) -> Tuple[List[Tuple[Pool, datetime]], List[IntervalDecision]]:
+    """Find pools due before ``horizon`` and advance them to their next slot.
+
+    Returns (pool, due_at) pairs and the interval decisions made for adaptive
+    pools. due_at is never in the past, so slots missed while no scheduler ran
+    are scraped once rather than replayed, and only if the pool is open now;
+    otherwise the pool moves on to its next slot. Rows are locked with SKIP
+    LOCKED so concurrent schedulers never claim a pool twice. The caller commits.
+    """
+    pools = (
+        db.query(Pool)
+        .filter(
+            Pool.is_active == True,
+            or_(Pool.next_scrape_at == None, Pool.next_scrape_at <= horizon)
+        )
+        .order_by(Pool.next_scrape_at)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+
+    due = []
+    for pool in pools:
+        stale = pool.next_scrape_at is not None and as_utc(pool.next_scrape_at) < now
+        if pool.next_scrape_at is None or (stale and not in_active_window(pool, now)):
+            # New or rescheduled pool, or a missed slot while closed: start at its next slot
+            pool.next_scrape_at = next_due_at(pool, now - timedelta(seconds=1))
+            if as_utc(pool.next_scrape_at) > horizon:
+                continue
+        due.append((pool, max(as_utc(pool.next_scrape_at), now)))
+
+    decisions = decide_intervals(db, due)
+    for pool, due_at in due:
+        after = due_at
+        if pool.id in decisions:
+            # Skip the grid slots inside the chosen interval
+            after += timedelta(minutes=decisions[pool.id].interval_minutes - grid_interval_minutes(pool))
+        pool.next_scrape_at = next_due_at(pool, after)
+    return due, list(decisions.values())
+
+
+def group_due_pools(due: List[Tuple[Pool, datetime]]) -> List[Tuple[datetime, List[Pool]]]:
+    """Group due pools sharing a fetch target and slot, ordered by due time."""
+    groups: Dict[Tuple[FetchGroupKey, datetime], List[Pool]] = {}
+    for pool, due_at in due:
+        groups.setdefault((fetch_group_key(pool), due_at), []).append(pool)
+    return sorted(
+        ((due_at, pools) for (_, due_at), pools in groups.items()),
+        key=lambda item: item[0]
+    )
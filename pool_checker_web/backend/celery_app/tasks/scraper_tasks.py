@@ -1,25 +1,45 @@
-import os
 import time
-from datetime import datetime, time as dt_time
-from typing import Optional
+from datetime import datetime, time as dt_time, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
 
 import pytz
+import redis
 from celery import shared_task
 from celery.utils.log import get_task_logger
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
 from sqlalchemy.orm import Session
 
+from app.config import settings
 from app.db.database import SessionLocal
+from app.db.redis import get_redis
 from app.models.pool import Pool
-from app.models.visitor import VisitorRecord
+from app.schemas.visitor import ScrapeReading
 from app.services.visitor_service import VisitorService
 from app.services.pool_service import PoolService
+from app.services.scrape_metrics_service import ScrapeMetricsService
+from app.services.change_rate_service import ChangeRateService
+from app.services.scheduler_stats_service import SchedulerStatsService
+from app.services.circuit_breaker_service import STATE_OPEN, CircuitBreakerService
+from app.services.analytics_cache_service import AnalyticsCacheService
+from app.services.best_time_service import best_time_index
+from celery_app.async_engine import AsyncScrapeEngine
+from celery_app.browser_pool import get_browser_pool
+from celery_app.fetching import fetch_group_visitor_counts, group_pools_by_target
+from celery_app.ingest import (
+    INGEST_DIRECT, INGEST_STREAM, IngestConsumer, emit_readings_stored, get_ingest_queue,
+    publish_readings, sync_column_store
+)
+from celery_app.readiness import ScrapeTimer
+from celery_app.scheduling import IntervalDecision, claim_due_pools, group_due_pools
 
 logger = get_task_logger(__name__)
 
+# "ingest" value of results whose readings were queued rather than written
+INGEST_QUEUED = "queued"
+
+
+class CircuitOpenError(Exception):
+    """A scrape failed and tripped its pool's circuit breaker; retrying is pointless."""
+
 
 def get_db_session() -> Session:
     """Get a database session for use in Celery tasks."""
@@ -41,58 +61,213 @@ def is_within_active_hours(pool: Pool) -> bool:
     return start_time <= current_time <= end_time
 
 
-def fetch_visitor_count(url: str, element_id: str) -> Optional[int]:
-    """Fetch the visitor count from a webpage using Selenium."""
-    driver = None
+def record_scrape_timings(
+    pool_id: int,
+    timer: ScrapeTimer,
+    success: bool,
+    error: Optional[str] = None
+) -> dict:
+    """Store the phase timings of a scrape; never fails the scrape itself."""
+    timings = timer.as_dict()
     try:
-        # Set up Chrome options for headless browsing
-        chrome_options = Options()
-        chrome_options.add_argument("--headless")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--window-size=1920,1080")
-
-        # Use chromium binary from environment if set
-        chrome_bin = os.environ.get("CHROME_BIN")
-        if chrome_bin:
-            chrome_options.binary_location = chrome_bin
-
-        # Create the driver using system chromedriver or env path
-        chromedriver_path = os.environ.get("CHROMEDRIVER_PATH", "/usr/bin/chromedriver")
-        service = Service(chromedriver_path)
-        driver = webdriver.Chrome(service=service, options=chrome_options)
-
-        # Load the page
-        driver.get(url)
-
-        # Wait for JavaScript to execute
-        time.sleep(10)
-
-        # Find the element with the visitor number
-        element = driver.find_element(By.ID, element_id)
-
-        if element:
-            visitor_text = element.text.strip()
-            # Parse the visitor count (handle potential non-numeric characters)
-            visitor_count = int("".join(filter(str.isdigit, visitor_text)))
-            return visitor_count
-        else:
-            logger.error(f"Element with ID '{element_id}' not found")
+        ScrapeMetricsService(get_redis()).record(pool_id, timings, success, error)
+    except redis.RedisError as e:
+        logger.warning(f"Could not record scrape timings for pool {pool_id}: {e}")
+    return timings
+
+
+def record_breaker_outcome(
+    pool_id: int,
+    success: bool,
+    error: Optional[str] = None,
+    duration_ms: float = 0.0
+) -> Optional[str]:
+    """Update a pool's circuit breaker; returns its new state (None if Redis is down)."""
+    try:
+        service = CircuitBreakerService(get_redis())
+        if success:
+            service.record_success(pool_id)
             return None
-
-    except Exception as e:
-        logger.error(f"Error fetching visitor count: {e}")
+        state = service.record_failure(pool_id, error or "Unknown error", duration_ms)
+    except redis.RedisError as e:
+        logger.warning(f"Could not update circuit breaker for pool {pool_id}: {e}")
         return None
-    finally:
-        if driver:
-            driver.quit()
+
+    if state.state == STATE_OPEN:
+        logger.warning(
+            f"Circuit breaker for pool {pool_id} is open for {state.cooldown_seconds}s "
+            f"after {state.consecutive_failures} consecutive failures: {state.last_error}"
+        )
+    return state.state
+
+
+def is_breaker_open(pool_id: int) -> bool:
+    """Whether a pool's circuit breaker blocks scraping now; fails open if Redis is down."""
+    try:
+        return CircuitBreakerService(get_redis()).is_blocking(pool_id)
+    except redis.RedisError:
+        return False
+
+
+def dispatchable_pools(pools: List[Pool]) -> Tuple[List[Pool], List[int]]:
+    """Drop pools whose circuit breaker is open; returns (pools, blocked pool ids).
+
+    A pool whose cooldown ran out is let through as its half-open probe.
+    """
+    if not pools:
+        return pools, []
+    try:
+        allowed, blocked = CircuitBreakerService(get_redis()).filter_dispatchable(
+            [pool.id for pool in pools]
+        )
+    except redis.RedisError as e:
+        logger.warning(f"Could not read circuit breakers, dispatching all pools: {e}")
+        return pools, []
+
+    if blocked:
+        logger.info(f"Circuit breakers open, not dispatching pools {blocked}")
+    allowed_ids = set(allowed)
+    return [pool for pool in pools if pool.id in allowed_ids], blocked
+
+
+def filter_scrapable(pools: List[Pool]) -> Tuple[List[Pool], List[dict]]:
+    """Split pools into those to scrape now and skip results for the rest."""
+    scrapable = []
+    skipped = []
+    for pool in pools:
+        if not pool.is_active:
+            logger.info(f"Pool {pool.id} is not active, skipping")
+            skipped.append({"success": False, "pool_id": pool.id, "error": "Pool is not active"})
+        elif not is_within_active_hours(pool):
+            logger.info(f"Pool {pool.id} is outside active hours, skipping")
+            skipped.append({"success": False, "pool_id": pool.id, "error": "Outside active hours"})
+        elif is_breaker_open(pool.id):
+            logger.info(f"Circuit breaker for pool {pool.id} is open, skipping")
+            skipped.append({"success": False, "pool_id": pool.id, "error": "Circuit breaker open"})
+        else:
+            scrapable.append(pool)
+    return scrapable, skipped
+
+
+def store_scrape_results(
+    db: Session,
+    pools: List[Pool],
+    fetched: Dict[int, Tuple[Optional[int], str]],
+    timer: ScrapeTimer
+) -> List[dict]:
+    """Store a visitor record for every fetched pool and build the task results.
+
+    Readings are queued for batched ingest; if the queue is unavailable they
+    are written directly, all in one transaction. Endpoints discovered while
+    fetching are committed here, since queued readings never commit the session.
+    """
+    if any(pool in db.dirty for pool in pools):
+        db.commit()
+
+    results = []
+    readings = []
+    for pool in pools:
+        visitor_count, strategy = fetched[pool.id]
+
+        if visitor_count is None:
+            logger.error(f"Failed to fetch visitor count for pool {pool.id}")
+            timings = record_scrape_timings(
+                pool.id, timer, success=False, error="Failed to fetch visitor count"
+            )
+            breaker = record_breaker_outcome(
+                pool.id, success=False, error="Failed to fetch visitor count",
+                duration_ms=timings.get("total_ms") or 0.0
+            )
+            results.append({
+                "success": False,
+                "pool_id": pool.id,
+                "error": "Failed to fetch visitor count",
+                "timings": timings,
+                "circuit_breaker": breaker
+            })
+            continue
+
+        # Get current timestamp in pool's timezone
+        tz = pytz.timezone(pool.timezone)
+        timestamp = datetime.now(tz)
+
+        readings.append(ScrapeReading(
+            pool_id=pool.id,
+            visitor_count=visitor_count,
+            timestamp=timestamp
+        ))
+
+        timings = record_scrape_timings(pool.id, timer, success=True)
+        record_breaker_outcome(pool.id, success=True)
+
+        logger.info(
+            f"Scraped pool {pool.id} ({pool.name}): "
+            f"{visitor_count} visitors at {timestamp} ({timings['total_ms']:.0f} ms)"
+        )
+
+        results.append({
+            "success": True,
+            "pool_id": pool.id,
+            "pool_name": pool.name,
+            "visitor_count": visitor_count,
+            "timestamp": timestamp.isoformat(),
+            "strategy": strategy,
+            "timings": timings
+        })
+
+    ingest = INGEST_QUEUED if publish_readings(readings) is not None else INGEST_DIRECT
+    if readings and ingest == INGEST_DIRECT:
+        stored = VisitorService(db).insert_readings(readings)
+        if stored:
+            sync_column_store(db, stored)
+            emit_readings_stored(stored)
+    for result in results:
+        if result["success"]:
+            result["ingest"] = ingest
+
+    return results
+
+
+def record_scrape_error(pool_ids: List[int], error: Exception) -> None:
+    """Count a scrape task's exception against its pools' breakers.
+
+    Raises CircuitOpenError if that opened any breaker, so the task is not
+    retried into an open circuit.
+    """
+    opened = [
+        pool_id for pool_id in pool_ids
+        if record_breaker_outcome(pool_id, success=False, error=str(error)) == STATE_OPEN
+    ]
+    if opened:
+        raise CircuitOpenError(f"Circuit breaker open for pools {opened}") from error
+
+
+def scrape_pools(db: Session, pools: List[Pool]) -> List[dict]:
+    """Fetch pools that share a fetch target once and store a record for each."""
+    timer = ScrapeTimer()
+    fetched = fetch_group_visitor_counts(pools, timer)
+    return store_scrape_results(db, pools, fetched, timer)
+
+
+def batch_pool_ids(groups: List[List[Pool]], batch_size: int) -> List[List[int]]:
+    """Pack fetch groups into batches of about batch_size pools, never splitting a group."""
+    batches: List[List[int]] = []
+    current: List[int] = []
+    for group in groups:
+        if current and len(current) + len(group) > batch_size:
+            batches.append(current)
+            current = []
+        current.extend(pool.id for pool in group)
+    if current:
+        batches.append(current)
+    return batches
 
 
 @shared_task(
     bind=True,
     autoretry_for=(Exception,),
     retry_backoff=True,
+    dont_autoretry_for=(CircuitOpenError,),
     retry_kwargs={"max_retries": 3},
     name="celery_app.tasks.scraper_tasks.scrape_pool"
 )
@@ -107,57 +282,180 @@ def scrape_pool(self, pool_id: int) -> dict:
             logger.error(f"Pool {pool_id} not found")
             return {"success": False, "error": "Pool not found"}
 
-        if not pool.is_active:
-            logger.info(f"Pool {pool_id} is not active, skipping")
-            return {"success": False, "error": "Pool is not active"}
+        scrapable, skipped = filter_scrapable([pool])
+        if skipped:
+            return skipped[0]
 
-        if not is_within_active_hours(pool):
-            logger.info(f"Pool {pool_id} is outside active hours, skipping")
-            return {"success": False, "error": "Outside active hours"}
+        result = scrape_pools(db, scrapable)[0]
+        result["browser_pool"] = get_browser_pool().stats()
+        return result
 
-        # Fetch the visitor count
-        visitor_count = fetch_visitor_count(pool.url, pool.element_id)
+    except Exception as e:
+        logger.error(f"Error scraping pool {pool_id}: {e}")
+        record_scrape_error([pool_id], e)
+        raise
+    finally:
+        db.close()
 
-        if visitor_count is None:
-            logger.error(f"Failed to fetch visitor count for pool {pool_id}")
-            return {"success": False, "error": "Failed to fetch visitor count"}
 
-        # Get current timestamp in pool's timezone
-        tz = pytz.timezone(pool.timezone)
-        timestamp = datetime.now(tz)
+@shared_task(
+    bind=True,
+    autoretry_for=(Exception,),
+    retry_backoff=True,
+    dont_autoretry_for=(CircuitOpenError,),
+    retry_kwargs={"max_retries": 3},
+    name="celery_app.tasks.scraper_tasks.scrape_pool_group"
+)
+def scrape_pool_group(self, pool_ids: List[int]) -> dict:
+    """Scrape several pools that share one page with a single page visit."""
+    db = get_db_session()
+    try:
+        pool_service = PoolService(db)
+        pools = pool_service.get_by_ids(pool_ids)
+        scrapable, skipped = filter_scrapable(pools)
 
-        # Create the visitor record
-        visitor_service = VisitorService(db)
-        record = visitor_service.create_from_scrape(
-            pool_id=pool_id,
-            visitor_count=visitor_count,
-            timestamp=timestamp
-        )
+        results = skipped
+        if scrapable:
+            results = scrape_pools(db, scrapable) + skipped
+
+        return {
+            "success": any(result["success"] for result in results),
+            "pools_scraped": sum(1 for result in results if result["success"]),
+            "results": results,
+            "browser_pool": get_browser_pool().stats()
+        }
+
+    except Exception as e:
+        logger.error(f"Error scraping pool group {pool_ids}: {e}")
+        record_scrape_error(pool_ids, e)
+        raise
+    finally:
+        db.close()
 
+
+@shared_task(name="celery_app.tasks.scraper_tasks.scrape_batch")
+def scrape_batch(pool_ids: List[int]) -> dict:
+    """Scrape a batch of pools concurrently with the async engine.
+
+    Not retried as a whole: a retry would re-scrape the pools that succeeded.
+    """
+    started = time.perf_counter()
+    db = get_db_session()
+    try:
+        pool_service = PoolService(db)
+        pools = pool_service.get_by_ids(pool_ids)
+        scrapable, skipped = filter_scrapable(pools)
+
+        results = list(skipped)
+        if scrapable:
+            outcomes = AsyncScrapeEngine().scrape(group_pools_by_target(scrapable))
+            for outcome in outcomes:
+                results.extend(
+                    store_scrape_results(db, outcome.pools, outcome.results, outcome.timer)
+                )
+
+        duration = time.perf_counter() - started
+        pools_scraped = sum(1 for result in results if result["success"])
+        scrapes_per_second = round(pools_scraped / duration, 2) if duration > 0 else 0.0
         logger.info(
-            f"Scraped pool {pool_id} ({pool.name}): "
-            f"{visitor_count} visitors at {timestamp}"
+            f"Batch scraped {pools_scraped}/{len(pool_ids)} pools in {duration:.2f}s "
+            f"({scrapes_per_second} scrapes/sec)"
         )
-
         return {
-            "success": True,
-            "pool_id": pool_id,
-            "pool_name": pool.name,
-            "visitor_count": visitor_count,
-            "timestamp": timestamp.isoformat(),
-            "record_id": record.id
+            "success": pools_scraped > 0,
+            "pools_scraped": pools_scraped,
+            "pools_failed": len(results) - pools_scraped,
+            "duration_seconds": round(duration, 2),
+            "scrapes_per_second": scrapes_per_second,
+            "results": results,
+            "browser_pool": get_browser_pool().stats()
         }
 
     except Exception as e:
-        logger.error(f"Error scraping pool {pool_id}: {e}")
+        logger.error(f"Error scraping batch {pool_ids}: {e}")
         raise
     finally:
         db.close()
 
 
+def record_interval_decisions(decisions: List[IntervalDecision]) -> dict:
+    """Store adaptive scheduling decisions and summarize them for the task result."""
+    summary = {
+        "decisions": len(decisions),
+        "faster": sum(1 for decision in decisions if decision.reason == "faster"),
+        "slower": sum(1 for decision in decisions if decision.reason == "slower"),
+        "scrapes_saved": round(sum(decision.scrapes_saved for decision in decisions), 2),
+    }
+    if not decisions:
+        return summary
+
+    logger.info(
+        f"Adaptive scheduling: {summary['faster']} faster, {summary['slower']} slower "
+        f"of {summary['decisions']} pools, {summary['scrapes_saved']} scrapes saved"
+    )
+    try:
+        SchedulerStatsService(get_redis()).record([decision.as_dict() for decision in decisions])
+    except redis.RedisError as e:
+        logger.warning(f"Could not record scheduling decisions: {e}")
+    return summary
+
+
+def schedule_options(pools: List[Pool], eta: Optional[datetime]) -> dict:
+    """Celery options for a scheduled dispatch.
+
+    Tasks expire one interval after their slot, so a backed-up queue drops
+    stale scrapes instead of running them all at once.
+    """
+    if eta is None:
+        return {}
+    interval = min(pool.scrape_interval_minutes or 10 for pool in pools)
+    return {"eta": eta, "expires": eta + timedelta(minutes=interval)}
+
+
+def dispatch_group(group: List[Pool], eta: Optional[datetime] = None):
+    """Queue the task that scrapes one fetch group, optionally at a given time."""
+    options = schedule_options(group, eta)
+    # Pools on the same page are fetched together
+    if len(group) == 1:
+        return scrape_pool.apply_async(args=[group[0].id], **options)
+    return scrape_pool_group.apply_async(args=[[pool.id for pool in group]], **options)
+
+
+def dispatch_batches(
+    groups: List[List[Pool]],
+    due_times: Optional[Dict[int, datetime]] = None
+) -> dict:
+    """Queue one scrape_batch task per SCRAPE_BATCH_SIZE pools.
+
+    With due_times (pool id -> slot), each batch starts at its earliest slot.
+    """
+    pools_by_id = {pool.id: pool for group in groups for pool in group}
+    tasks = []
+    for pool_ids in batch_pool_ids(groups, settings.SCRAPE_BATCH_SIZE):
+        eta = min(due_times[pool_id] for pool_id in pool_ids) if due_times else None
+        options = schedule_options([pools_by_id[pool_id] for pool_id in pool_ids], eta)
+        task = scrape_batch.apply_async(args=[pool_ids], **options)
+        tasks.append({"pool_ids": pool_ids, "task_id": task.id})
+
+    pools_scraped = sum(len(task["pool_ids"]) for task in tasks)
+    logger.info(f"Triggered batched scraping for {pools_scraped} pools in {len(tasks)} batches")
+    return {
+        "success": True,
+        "mode": "batched",
+        "pools_scraped": pools_scraped,
+        "page_visits": len(groups),
+        "batches": tasks
+    }
+
+
 @shared_task(name="celery_app.tasks.scraper_tasks.scrape_all_pools")
 def scrape_all_pools() -> dict:
-    """Scrape visitor counts for all active pools."""
+    """Scrape visitor counts for all active pools.
+
+    In the default per_page mode one task is queued per shared page; in
+    batched mode pools are scraped concurrently by scrape_batch tasks, which
+    report their throughput.
+    """
     db = get_db_session()
     try:
         pool_service = PoolService(db)
@@ -167,20 +465,30 @@ def scrape_all_pools() -> dict:
             logger.info("No active pools to scrape")
             return {"success": True, "pools_scraped": 0}
 
-        results = []
-        for pool in active_pools:
-            # Trigger individual scrape task for each pool
-            task = scrape_pool.delay(pool.id)
-            results.append({
-                "pool_id": pool.id,
-                "pool_name": pool.name,
-                "task_id": task.id
-            })
+        active_pools, blocked = dispatchable_pools(active_pools)
+        groups = group_pools_by_target(active_pools)
+        if settings.SCRAPE_DISPATCH_MODE == "batched":
+            result = dispatch_batches(groups)
+            result["circuit_open"] = blocked
+            return result
 
-        logger.info(f"Triggered scraping for {len(results)} pools")
+        results = []
+        for group in groups:
+            task = dispatch_group(group)
+            for pool in group:
+                results.append({
+                    "pool_id": pool.id,
+                    "pool_name": pool.name,
+                    "task_id": task.id
+                })
+
+        logger.info(f"Triggered scraping for {len(results)} pools in {len(groups)} page visits")
         return {
             "success": True,
+            "mode": "per_page",
             "pools_scraped": len(results),
+            "page_visits": len(groups),
+            "circuit_open": blocked,
             "tasks": results
         }
 
@@ -191,10 +499,160 @@ def scrape_all_pools() -> dict:
         db.close()
 
 
+@shared_task(name="celery_app.tasks.scraper_tasks.dispatch_due_pools")
+def dispatch_due_pools() -> dict:
+    """Queue scrapes for pools whose next slot falls within the lookahead.
+
+    Runs every minute from beat. Each pool is scheduled from its own
+    interval and active window in its timezone, so closed pools are never
+    enqueued, and tasks carry an ETA at the pool's deterministic offset
+    instead of all starting on the same second.
+    """
+    now = datetime.now(timezone.utc)
+    horizon = now + timedelta(seconds=settings.SCHEDULER_LOOKAHEAD_SECONDS)
+    db = get_db_session()
+    try:
+        due, decisions = claim_due_pools(db, now, horizon)
+        db.commit()
+        adaptive = record_interval_decisions(decisions)
+
+        # Pools with an open breaker keep their schedule but are not dispatched
+        allowed, blocked = dispatchable_pools([pool for pool, _ in due])
+        allowed_ids = {pool.id for pool in allowed}
+        due = [(pool, due_at) for pool, due_at in due if pool.id in allowed_ids]
+
+        if not due:
+            return {
+                "success": True,
+                "pools_dispatched": 0,
+                "page_visits": 0,
+                "adaptive": adaptive,
+                "circuit_open": blocked
+            }
+
+        scheduled = group_due_pools(due)
+        if settings.SCRAPE_DISPATCH_MODE == "batched":
+            result = dispatch_batches(
+                [pools for _, pools in scheduled],
+                {pool.id: due_at for pool, due_at in due}
+            )
+            result["pools_dispatched"] = result.pop("pools_scraped")
+            result["adaptive"] = adaptive
+            result["circuit_open"] = blocked
+            return result
+
+        tasks = []
+        for due_at, pools in scheduled:
+            task = dispatch_group(pools, eta=due_at)
+            tasks.append({
+                "pool_ids": [pool.id for pool in pools],
+                "eta": due_at.isoformat(),
+                "task_id": task.id
+            })
+
+        logger.info(
+            f"Scheduled {len(due)} pools in {len(tasks)} page visits "
+            f"between {scheduled[0][0]:%H:%M:%S} and {scheduled[-1][0]:%H:%M:%S} UTC"
+        )
+        return {
+            "success": True,
+            "mode": "per_page",
+            "pools_dispatched": len(due),
+            "page_visits": len(tasks),
+            "adaptive": adaptive,
+            "circuit_open": blocked,
+            "tasks": tasks
+        }
+
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error in dispatch_due_pools: {e}")
+        return {"success": False, "error": str(e)}
+    finally:
+        db.close()
+
+
+@shared_task(name="celery_app.tasks.scraper_tasks.drain_scrape_ingest")
+def drain_scrape_ingest() -> dict:
+    """Write queued readings to the database.
+
+    Scheduled every minute as a safety net next to the dedicated consumer
+    (scripts/ingest_consumer.py), so readings land even when it is not running.
+    """
+    if settings.SCRAPE_INGEST_MODE != INGEST_STREAM:
+        return {"success": True, "readings": 0}
+
+    try:
+        consumer = IngestConsumer(get_ingest_queue())
+        readings = consumer.drain()
+    except redis.RedisError as e:
+        logger.error(f"Error draining scrape ingest: {e}")
+        return {"success": False, "error": str(e)}
+
+    if readings:
+        logger.info(f"Drained {readings} queued readings")
+    return {"success": consumer.failures == 0, "readings": readings, **consumer.stats()}
+
+
+@shared_task(name="celery_app.tasks.scraper_tasks.refresh_change_profiles")
+def refresh_change_profiles() -> dict:
+    """Relearn the change-rate profile of every adaptively scheduled pool."""
+    db = get_db_session()
+    try:
+        service = ChangeRateService(db)
+        pools = [pool for pool in PoolService(db).get_active() if pool.adaptive_scheduling]
+        slots = {pool.id: service.rebuild(pool) for pool in pools}
+        logger.info(f"Rebuilt change profiles for {len(pools)} pools")
+        return {"success": True, "pools": len(pools), "slots": slots}
+
+    except Exception as e:
+        logger.error(f"Error in refresh_change_profiles: {e}")
+        return {"success": False, "error": str(e)}
+    finally:
+        db.close()
+
+
 @shared_task(name="celery_app.tasks.scraper_tasks.refresh_analytics_cache")
 def refresh_analytics_cache() -> dict:
-    """Refresh pre-computed analytics cache (placeholder for future optimization)."""
-    logger.info("Refreshing analytics cache...")
-    # This is a placeholder for future caching implementation
-    # Could pre-compute weekday averages, heatmap data, etc.
-    return {"success": True, "message": "Analytics cache refreshed"}
+    """Rebuild the analytics snapshots of every active pool in Redis.
+
+    The analytics endpoints serve these snapshots and only compute views
+    that are missing from them. New readings keep them current in between
+    (see update_analytics_for_readings).
+    """
+    db = get_db_session()
+    try:
+        cache = AnalyticsCacheService(db, get_redis())
+        versions = {}
+        for pool in PoolService(db).get_active():
+            versions[pool.id] = cache.refresh(pool.id)
+
+        logger.info(f"Refreshed analytics snapshots for {len(versions)} pools")
+        return {"success": True, "pools": len(versions), "versions": versions}
+
+    except Exception as e:
+        logger.error(f"Error in refresh_analytics_cache: {e}")
+        return {"success": False, "error": str(e)}
+    finally:
+        db.close()
+
+
+@shared_task(name="celery_app.tasks.scraper_tasks.update_analytics_for_readings", ignore_result=True)
+def update_analytics_for_readings(readings: List[List]) -> dict:
+    """Handle a "new readings" event: patch the cached analytics of the affected slots.
+
+    readings are [pool_id, ISO timestamp] pairs of readings just stored.
+    """
+    db = get_db_session()
+    try:
+        parsed = [(pool_id, datetime.fromisoformat(timestamp)) for pool_id, timestamp in readings]
+        # The readings also moved the baseline curves behind the best-time index
+        best_time_index.invalidate(pool_id for pool_id, _ in parsed)
+        result = AnalyticsCacheService(db, get_redis()).apply_readings(parsed)
+        return {"success": True, **result}
+
+    except Exception as e:
+        logger.error(f"Error updating analytics for new readings: {e}")
+        return {"success": False, "error": str(e)}
+    finally:
+        db.close()
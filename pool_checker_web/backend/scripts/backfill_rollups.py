@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""Script to (re)build the hourly rollups, slot statistics and baseline curves from visitor_records."""
+import sys
+import os
+from datetime import date
+from typing import Optional
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db.database import SessionLocal
+from app.models.pool import Pool
+from app.services.baseline_service import BaselineService
+from app.services.rollup_service import RollupService
+from app.services.slot_stats_service import SlotStatsService
+
+
+def backfill_rollups(
+    pool_id: Optional[int] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None
+):
+    """Rebuild rollups of one pool or all pools, optionally for a range of local dates.
+
+    Slot statistics and baseline curves cover a pool's whole history, so
+    they are only rebuilt when no date range is given.
+    """
+    db = SessionLocal()
+    try:
+        query = db.query(Pool).order_by(Pool.id)
+        if pool_id is not None:
+            query = query.filter(Pool.id == pool_id)
+        pools = query.all()
+        if not pools:
+            print(f"Error: Pool with ID {pool_id} not found")
+            return
+
+        service = RollupService(db)
+        slot_stats = SlotStatsService(db)
+        baselines = BaselineService(db)
+        full_history = start_date is None and end_date is None
+        total = 0
+        for pool in pools:
+            hours = service.rebuild(pool.id, start_date, end_date)
+            total += hours
+            print(f"  {pool.name} (ID {pool.id}): {hours} hourly rollups")
+            if full_history:
+                print(f"    {slot_stats.rebuild(pool.id)} slot statistics")
+                print(f"    {baselines.rebuild(pool.id)} baseline curves")
+
+        print(f"\nBackfill complete: {total} hourly rollups for {len(pools)} pools")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Rebuild hourly visitor rollups")
+    parser.add_argument("--pool-id", type=int, help="Only rebuild this pool (default: all pools)")
+    parser.add_argument("--start-date", type=date.fromisoformat, help="First local date (YYYY-MM-DD)")
+    parser.add_argument("--end-date", type=date.fromisoformat, help="Last local date (YYYY-MM-DD)")
+
+    args = parser.parse_args()
+    backfill_rollups(args.pool_id, args.start_date, args.end_date)
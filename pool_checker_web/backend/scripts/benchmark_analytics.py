@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""Script to compare the SQL (rollup) and NumPy analytics engines on a pool's data."""
+import sys
+import os
+import time
+from typing import Callable
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db.database import SessionLocal
+from app.models.pool import Pool
+from app.services.analytics_service import AnalyticsService
+from app.services.array_engine import ArrayEngine, np
+
+# (label, method, kwargs)
+CASES = [
+    ("weekday averages", "get_weekday_averages", {}),
+    ("heatmap", "get_heatmap_data", {}),
+    ("peak hours", "get_peak_hours", {}),
+    ("daily summary", "get_daily_summary", {}),
+    ("weekly trends", "get_trends", {"period": "weekly"}),
+    ("monthly trends", "get_trends", {"period": "monthly"}),
+]
+
+
+def best_of(call: Callable, repeat: int) -> float:
+    """Fastest of ``repeat`` runs, in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        call()
+        timings.append((time.perf_counter() - started) * 1000)
+    return min(timings)
+
+
+def benchmark(pool_id: int, repeat: int):
+    """Time every analytics view with both engines and check they agree."""
+    if np is None:
+        print("Error: NumPy is not installed")
+        return
+
+    db = SessionLocal()
+    try:
+        pool = db.query(Pool).filter(Pool.id == pool_id).first()
+        if not pool:
+            print(f"Error: Pool with ID {pool_id} not found")
+            return
+
+        sql = AnalyticsService(db)
+        sql.engine = None
+        arrays = AnalyticsService(db)
+        arrays.engine = ArrayEngine()
+
+        started = time.perf_counter()
+        series = arrays.engine.series(db, pool_id)
+        print(f"Pool: {pool.name}, {series.size} readings loaded in {(time.perf_counter() - started) * 1000:.1f} ms")
+        print(f"\n{'view':<20} {'sql ms':>10} {'numpy ms':>10} {'speedup':>8}  same")
+
+        for label, method, kwargs in CASES:
+            sql_ms = best_of(lambda: getattr(sql, method)(pool_id, **kwargs), repeat)
+            numpy_ms = best_of(lambda: getattr(arrays, method)(pool_id, **kwargs), repeat)
+            same = getattr(sql, method)(pool_id, **kwargs) == getattr(arrays, method)(pool_id, **kwargs)
+            print(f"{label:<20} {sql_ms:>10.2f} {numpy_ms:>10.2f} {sql_ms / numpy_ms:>7.1f}x  {'yes' if same else 'NO'}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compare the SQL and NumPy analytics engines")
+    parser.add_argument("--pool-id", type=int, required=True, help="Pool to run the analytics for")
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per view (the fastest counts)")
+
+    args = parser.parse_args()
+    benchmark(args.pool_id, args.repeat)
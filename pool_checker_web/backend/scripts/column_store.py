@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""Script to sync, compact or check the columnar copy of visitor_records."""
+import sys
+import os
+from typing import Optional
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import settings
+from app.db.database import SessionLocal
+from app.models.pool import Pool
+from app.services.column_store import ColumnStore
+
+
+def column_store(command: str, pool_id: Optional[int] = None, root: Optional[str] = None) -> bool:
+    """Run a command for one pool or all pools; returns False if a check found differences."""
+    root = root or settings.COLUMN_STORE_DIR
+    if not root:
+        print("Error: COLUMN_STORE_DIR is not set (or pass --dir)")
+        return False
+
+    store = ColumnStore(root)
+    db = SessionLocal()
+    try:
+        query = db.query(Pool).order_by(Pool.id)
+        if pool_id is not None:
+            query = query.filter(Pool.id == pool_id)
+        pools = query.all()
+        if not pools:
+            print(f"Error: Pool with ID {pool_id} not found")
+            return False
+
+        consistent = True
+        for pool in pools:
+            if command == "sync":
+                print(f"  {pool.name} (ID {pool.id}): {store.sync(db, pool.id)} rows appended")
+            elif command == "compact":
+                print(f"  {pool.name} (ID {pool.id}): {store.compact(db, pool.id)} rows rewritten")
+            else:
+                report = store.check(db, pool.id)
+                consistent = consistent and report["consistent"]
+                status = "ok" if report["consistent"] else "MISMATCH"
+                print(
+                    f"  {pool.name} (ID {pool.id}): {status} - "
+                    f"rows {report['stored_rows']}/{report['db_rows']}, "
+                    f"visitors {report['stored_visitor_sum']}/{report['db_visitor_sum']}, "
+                    f"last id {report['stored_last_id']}/{report['db_last_id']}, "
+                    f"{report['duplicate_ids']} duplicate ids"
+                )
+        if command == "check" and not consistent:
+            print("\nRun the compact command to rewrite mismatched pools from the database")
+        return consistent
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Maintain the memory-mapped column store")
+    parser.add_argument(
+        "command", choices=["sync", "compact", "check"],
+        help="sync: append new rows; compact: rewrite from the database; check: compare with the database"
+    )
+    parser.add_argument("--pool-id", type=int, help="Only this pool (default: all pools)")
+    parser.add_argument("--dir", help="Store directory (default: COLUMN_STORE_DIR)")
+
+    args = parser.parse_args()
+    sys.exit(0 if column_store(args.command, args.pool_id, args.dir) else 1)
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Script to discover the data endpoint behind a JavaScript-rendered pool page."""
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db.database import SessionLocal
+from app.models.pool import Pool
+from celery_app.discovery import apply_discovered_endpoint, discover_data_endpoint
+from celery_app.http_fetcher import STRATEGY_DISCOVER
+
+
+def discover_endpoint(pool_id: int, apply: bool = False):
+    """Load the pool page once and report the request carrying the visitor number."""
+    db = SessionLocal()
+    try:
+        pool = db.query(Pool).filter(Pool.id == pool_id).first()
+        if not pool:
+            print(f"Error: Pool with ID {pool_id} not found")
+            return
+
+        print(f"Discovering data endpoint for pool: {pool.name}")
+        print(f"  URL: {pool.url}")
+        print(f"  Element ID: {pool.element_id}")
+
+        visitor_count, endpoint = discover_data_endpoint(
+            pool.url, pool.element_id, timeout=pool.ready_timeout_seconds or 15
+        )
+        print(f"\nRendered visitor count: {visitor_count}")
+
+        if not endpoint:
+            print("No replayable request contained the visitor count")
+            return
+
+        print(f"Endpoint: {endpoint.url}")
+        print(f"  Resource type: {endpoint.resource_type}")
+        print(f"  JSON path: {endpoint.json_path or '(HTML, read by element id)'}")
+
+        if apply:
+            apply_discovered_endpoint(pool, endpoint)
+            pool.fetch_strategy = STRATEGY_DISCOVER
+            db.commit()
+            print(f"Saved endpoint on pool {pool.id} and switched it to the discover strategy")
+
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Discover a pool's data endpoint")
+    parser.add_argument(
+        "--pool-id",
+        type=int,
+        required=True,
+        help="Pool ID to run discovery for"
+    )
+    parser.add_argument(
+        "--apply",
+        action="store_true",
+        help="Save the endpoint on the pool and use the discover strategy"
+    )
+
+    args = parser.parse_args()
+    discover_endpoint(args.pool_id, args.apply)
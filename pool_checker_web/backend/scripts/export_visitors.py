@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""Script to export visitor records as CSV, NDJSON, Parquet or Arrow IPC files."""
+import sys
+import os
+from datetime import date
+from typing import List, Optional
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.schemas.visitor import VisitorRecordFilter
+from app.services.export_service import EXPORT_FORMATS, ExportService
+
+
+def export_visitors(
+    export_format: str,
+    output: Optional[str] = None,
+    pool_ids: Optional[List[int]] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    gzip: bool = False
+):
+    """Write the records of some pools (default: all) and local dates to a file, streaming it in chunks."""
+    service = ExportService()
+    if not service.available(export_format):
+        print(f"Error: the {export_format} format needs pyarrow (pip install pyarrow)")
+        return
+
+    filters = VisitorRecordFilter(pool_ids=pool_ids, start_date=start_date, end_date=end_date)
+    output = output or service.filename(filters, export_format, gzip)
+    size = 0
+    with open(output, "wb") as f:
+        for chunk in service.stream(filters, export_format, gzip):
+            f.write(chunk)
+            size += len(chunk)
+
+    print(f"Exported to {output} ({size / 1024 / 1024:.1f} MB)")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export visitor records")
+    parser.add_argument(
+        "--format", choices=list(EXPORT_FORMATS), default="parquet",
+        help="File format; parquet and arrow have typed columns and one row group per month (default: parquet)"
+    )
+    parser.add_argument("--output", "-o", help="Output file (default: named after the filters)")
+    parser.add_argument("--pool-id", type=int, action="append", help="Export this pool (repeatable; default: all)")
+    parser.add_argument("--start-date", type=date.fromisoformat, help="First local date (YYYY-MM-DD)")
+    parser.add_argument("--end-date", type=date.fromisoformat, help="Last local date (YYYY-MM-DD)")
+    parser.add_argument("--gzip", action="store_true", help="Compress csv and ndjson output with gzip")
+
+    args = parser.parse_args()
+    export_visitors(args.format, args.output, args.pool_id, args.start_date, args.end_date, args.gzip)
@@ -12,6 +12,10 @@ import pytz
 from app.db.database import SessionLocal
 from app.models.pool import Pool
 from app.models.visitor import VisitorRecord
+from app.schemas.visitor import local_time_fields
+from app.services.rollup_service import RollupService
+from app.services.baseline_service import BaselineService
+from app.services.slot_stats_service import SlotStatsService
 
 
 def import_csv(csv_path: str, pool_id: int, batch_size: int = 500):
@@ -72,7 +76,8 @@ def import_csv(csv_path: str, pool_id: int, batch_size: int = 500):
                         timestamp=timestamp,
                         weekday=weekday,
                         visitor_count=visitor_count,
-                        week_number=timestamp.isocalendar()[1]
+                        week_number=timestamp.isocalendar()[1],
+                        **local_time_fields(timestamp, tz)
                     )
                     batch.append(record)
                     records_added += 1
@@ -99,6 +104,12 @@ def import_csv(csv_path: str, pool_id: int, batch_size: int = 500):
         print(f"  Records added: {records_added}")
         print(f"  Records skipped: {records_skipped}")
 
+        if records_added:
+            hours = RollupService(db).rebuild(pool_id)
+            print(f"  Hourly rollups rebuilt: {hours}")
+            print(f"  Slot statistics rebuilt: {SlotStatsService(db).rebuild(pool_id)}")
+            print(f"  Baseline curves rebuilt: {BaselineService(db).rebuild(pool_id)}")
+
         # Verify total count
         total = db.query(VisitorRecord).filter(VisitorRecord.pool_id == pool_id).count()
         print(f"  Total records for pool: {total}")
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""Script to write queued scrape readings to the database in batches."""
+import sys
+import os
+import signal
+import threading
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import settings
+from app.db.redis import get_redis
+from celery_app.ingest import IngestConsumer, RedisStreamQueue
+
+
+def run_consumer(batch_size: int, max_latency: float, once: bool = False):
+    """Consume the scrape reading stream until interrupted (or once, with --once)."""
+    queue = RedisStreamQueue(get_redis())
+    consumer = IngestConsumer(queue, batch_size=batch_size, max_latency=max_latency)
+
+    print(f"Consuming {queue.stream} as {queue.consumer}")
+    print(f"  Batch size: {consumer.batch_size}, max latency: {consumer.max_latency}s")
+    print(f"  Backlog: {queue.backlog()} readings")
+
+    if once:
+        readings = consumer.drain()
+        print(f"Wrote {readings} readings: {consumer.stats()}")
+        return
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *args: stop.set())
+    signal.signal(signal.SIGINT, lambda *args: stop.set())
+    consumer.run_forever(stop)
+    print(f"Stopped: {consumer.stats()}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Write queued scrape readings to the database")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=settings.SCRAPE_INGEST_BATCH_SIZE,
+        help="Maximum readings per insert"
+    )
+    parser.add_argument(
+        "--max-latency",
+        type=float,
+        default=settings.SCRAPE_INGEST_MAX_LATENCY_SECONDS,
+        help="Seconds a reading may wait before its batch is flushed"
+    )
+    parser.add_argument(
+        "--once",
+        action="store_true",
+        help="Drain the current backlog and exit"
+    )
+
+    args = parser.parse_args()
+    run_consumer(args.batch_size, args.max_latency, args.once)
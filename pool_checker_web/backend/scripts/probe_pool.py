@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""Script to probe which fetch strategies work for a pool and how fast they are."""
+import sys
+import os
+import statistics
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db.database import SessionLocal
+from app.models.pool import Pool
+from celery_app.browser_pool import shutdown_browser_pool
+from celery_app.fetching import fetch_visitor_count
+from celery_app.http_fetcher import (
+    HttpFetcher, STRATEGY_HTTP, STRATEGY_JSON, STRATEGY_SELENIUM
+)
+from celery_app.readiness import ScrapeTimer
+
+
+def probe_strategy(pool: Pool, strategy: str, repeat: int) -> dict:
+    """Run one strategy several times and collect values and timings."""
+    fetcher = HttpFetcher()
+    timeout = pool.ready_timeout_seconds or 15
+    values = []
+    durations = []
+
+    for _ in range(repeat):
+        timer = ScrapeTimer()
+        if strategy == STRATEGY_HTTP:
+            value = fetcher.fetch_html(pool.url, pool.element_id, timeout=timeout, timer=timer)
+        elif strategy == STRATEGY_JSON:
+            value = fetcher.fetch_json(
+                pool.data_url or pool.url, pool.json_path, timeout=timeout, timer=timer
+            )
+        else:
+            value = fetch_visitor_count(
+                pool.url,
+                pool.element_id,
+                timeout=timeout,
+                block_resources=bool(pool.block_resources),
+                timer=timer
+            )
+        values.append(value)
+        durations.append(timer.as_dict()["total_ms"])
+
+    successes = [v for v in values if v is not None]
+    return {
+        "strategy": strategy,
+        "ok": len(successes) == repeat,
+        "values": values,
+        "median_ms": statistics.median(durations),
+        "max_ms": max(durations),
+    }
+
+
+def probe_pool(pool_id: int, repeat: int = 3, apply: bool = False):
+    """Probe all applicable strategies for a pool and report the results."""
+    db = SessionLocal()
+    try:
+        pool = db.query(Pool).filter(Pool.id == pool_id).first()
+        if not pool:
+            print(f"Error: Pool with ID {pool_id} not found")
+            return
+
+        print(f"Probing pool: {pool.name}")
+        print(f"  URL: {pool.url}")
+        print(f"  Element ID: {pool.element_id}")
+        print(f"  Current strategy: {pool.fetch_strategy}")
+
+        strategies = [STRATEGY_HTTP]
+        if pool.json_path:
+            strategies.append(STRATEGY_JSON)
+        strategies.append(STRATEGY_SELENIUM)
+
+        results = [probe_strategy(pool, strategy, repeat) for strategy in strategies]
+
+        print(f"\n{'Strategy':<10} {'OK':<4} {'Median ms':>10} {'Max ms':>10}  Values")
+        for result in results:
+            print(
+                f"{result['strategy']:<10} {'yes' if result['ok'] else 'no':<4} "
+                f"{result['median_ms']:>10.0f} {result['max_ms']:>10.0f}  {result['values']}"
+            )
+
+        # Browserless results only count if they agree with what the browser renders
+        reference = next((r for r in results if r["strategy"] == STRATEGY_SELENIUM), None)
+        candidates = [r for r in results if r["ok"]]
+        if reference and reference["ok"]:
+            rendered = reference["values"][-1]
+            candidates = [
+                r for r in candidates
+                if r["strategy"] == STRATEGY_SELENIUM or abs(r["values"][-1] - rendered) <= 2
+            ]
+
+        if not candidates:
+            print("\nNo strategy returned a visitor count")
+            return
+
+        best = min(candidates, key=lambda r: r["median_ms"])
+        print(f"\nRecommended strategy: {best['strategy']} ({best['median_ms']:.0f} ms median)")
+
+        if apply and best["strategy"] != pool.fetch_strategy:
+            pool.fetch_strategy = best["strategy"]
+            db.commit()
+            print(f"Updated pool {pool.id} to use the {best['strategy']} strategy")
+
+    finally:
+        db.close()
+        shutdown_browser_pool()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Probe fetch strategies for a pool")
+    parser.add_argument(
+        "--pool-id",
+        type=int,
+        required=True,
+        help="Pool ID to probe"
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="Number of fetches per strategy"
+    )
+    parser.add_argument(
+        "--apply",
+        action="store_true",
+        help="Save the recommended strategy on the pool"
+    )
+
+    args = parser.parse_args()
+    probe_pool(args.pool_id, args.repeat, args.apply)
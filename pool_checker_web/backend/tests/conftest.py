@@ -6,6 +6,8 @@ from sqlalchemy.pool import StaticPool
 
 from app.main import app
 from app.db.database import Base, get_db
+from app.models.pool import Pool
+from tests.fake_pool_site import FakePoolSite
 
 
 SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
@@ -18,6 +20,10 @@ engine = create_engine(
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+def make_pool(pool_id, url, element_id, **kwargs):
+    return Pool(id=pool_id, name=f"Pool {pool_id}", url=url, element_id=element_id, **kwargs)
+
+
 def override_get_db():
     db = TestingSessionLocal()
     try:
@@ -60,3 +66,21 @@ def test_user_data():
 def registered_user(client, test_user_data):
     response = client.post("/api/v1/auth/register", json=test_user_data)
     return response.json()
+
+
+@pytest.fixture
+def auth_headers(client, test_user_data, registered_user):
+    response = client.post(
+        "/api/v1/auth/login",
+        data={"username": test_user_data["username"], "password": test_user_data["password"]}
+    )
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture
+def fake_pool_site():
+    site = FakePoolSite().start()
+    try:
+        yield site
+    finally:
+        site.stop()
@@ -0,0 +1,107 @@
+"""A local stand-in for the City of Zurich pool pages, used by scraper tests.
+
+Serves:
+  /static.html          counters rendered server-side
+  /city.html            counter filled in by JavaScript from /api/occupancy
+  /api/occupancy        JSON with the current count of every facility
+"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+
+STATIC_PAGE = """<!DOCTYPE html>
+<html><body>
+{facilities}
+</body></html>
+"""
+
+JS_PAGE = """<!DOCTYPE html>
+<html><body>
+<h1>Hallenbad City</h1>
+<span id="SSD-4_visitornumber">-</span>
+<span id="opening-hours">06 - 22</span>
+<script>
+fetch("/api/occupancy?lang=de")
+  .then(function (r) { return r.json(); })
+  .then(function (data) {
+    data.facilities.forEach(function (f) {
+      var el = document.getElementById(f.id + "_visitornumber");
+      if (el) { el.textContent = f.currentVisitors; }
+    });
+  });
+</script>
+</body></html>
+"""
+
+
+class FakePoolSite:
+    """Threaded HTTP server whose counts and failures tests can change."""
+
+    def __init__(self):
+        self.counts: Dict[str, int] = {"SSD-4": 123, "SSD-7": 45}
+        self.api_enabled = True
+        self.requests = []
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def url(self, path: str) -> str:
+        return f"{self.base_url}{path}"
+
+    def start(self) -> "FakePoolSite":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status: int, body: str, content_type: str):
+                payload = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                site.requests.append(self.path)
+                path = self.path.split("?", 1)[0]
+
+                if path == "/static.html":
+                    facilities = "\n".join(
+                        f'<div><span id="{fid}_visitornumber">{count}</span> Personen</div>'
+                        for fid, count in site.counts.items()
+                    )
+                    self._send(200, STATIC_PAGE.format(facilities=facilities), "text/html")
+                elif path == "/city.html":
+                    self._send(200, JS_PAGE, "text/html")
+                elif path == "/api/occupancy":
+                    if not site.api_enabled:
+                        self._send(503, "maintenance", "text/plain")
+                        return
+                    data = {
+                        "updated": "2026-01-01T12:00:00",
+                        "capacity": 400,
+                        "facilities": [
+                            {"id": fid, "name": fid, "currentVisitors": count}
+                            for fid, count in site.counts.items()
+                        ],
+                    }
+                    self._send(200, json.dumps(data), "application/json")
+                else:
+                    self._send(404, "not found", "text/plain")
+
+        return Handler
@@ -0,0 +1,81 @@
+from datetime import date, datetime, timedelta, timezone
+
+import redis
+
+from app.models.pool import Pool
+from app.schemas.visitor import ScrapeReading
+from app.services.analytics_cache_service import (
+    DEFAULT_VIEWS, SOURCE_BYPASS, AnalyticsCacheService, _covers, _variant
+)
+from app.services.visitor_service import VisitorService
+
+# Nothing listens here, so every command fails fast
+UNREACHABLE_REDIS = redis.Redis(port=1, socket_connect_timeout=0.2, decode_responses=True)
+
+
+def add_pool_with_readings(db_session, counts_by_time):
+    db_session.add(Pool(id=1, name="City", url="http://x", element_id="E1", timezone="UTC"))
+    db_session.commit()
+    store(db_session, counts_by_time)
+
+
+def store(db_session, counts_by_time):
+    VisitorService(db_session).bulk_insert_readings([
+        ScrapeReading(pool_id=1, visitor_count=count, timestamp=timestamp)
+        for timestamp, count in counts_by_time
+    ])
+
+
+class TestAnalyticsCache:
+    def test_variant_ignores_unset_params_and_orders_the_rest(self):
+        assert _variant("heatmap", {"start_date": None, "end_date": None}) == "heatmap"
+        assert _variant(
+            "trends", {"start_date": date(2026, 3, 1), "period": "weekly", "end_date": None}
+        ) == "trends?period=weekly&start_date=2026-03-01"
+
+    def test_computes_views_when_redis_is_down(self, db_session):
+        add_pool_with_readings(db_session, [(datetime(2026, 3, 10, 12, tzinfo=timezone.utc), 40)])
+        cache = AnalyticsCacheService(db_session, UNREACHABLE_REDIS)
+
+        snapshot = cache.get(1, "heatmap")
+
+        assert snapshot.source == SOURCE_BYPASS
+        assert snapshot.data["data"] == [{"weekday": "Tuesday", "hour": 12, "value": 40.0}]
+        assert snapshot.headers()["X-Analytics-Cache"] == "bypass"
+        assert cache.get(2, "heatmap").data is None
+        assert cache.get(2, "weekday_averages").data is None
+        assert cache.get(2, "peak_hours").data is None
+
+    def test_endpoints_answer_404_for_unknown_pools(self, client, auth_headers, db_session):
+        add_pool_with_readings(db_session, [])
+        for view in ("weekday-averages", "heatmap", "peak-hours", "trends", "percentile-bands"):
+            url = f"/api/v1/analytics/{view}"
+            assert client.get(url, params={"pool_id": 1}, headers=auth_headers).status_code == 200
+            assert client.get(url, params={"pool_id": 2}, headers=auth_headers).status_code == 404, view
+
+    def test_slot_patches_match_full_recompute(self, db_session):
+        monday = datetime(2026, 3, 2, tzinfo=timezone.utc)
+        add_pool_with_readings(db_session, [
+            (monday + timedelta(days=day, hours=hour), 10 * day + hour)
+            for day in range(10) for hour in (8, 12, 17)
+        ])
+        cache = AnalyticsCacheService(db_session, UNREACHABLE_REDIS)
+        cached = {(view, str(params)): cache.compute(1, view, **params) for view, params in DEFAULT_VIEWS}
+
+        new_readings = [
+            (monday + timedelta(days=10, hours=12, minutes=5), 95),  # new week, existing slot
+            (monday + timedelta(days=10, hours=19), 3),  # new hour
+        ]
+        store(db_session, new_readings)
+        slots = {(timestamp.date(), timestamp.hour) for timestamp, _ in new_readings}
+
+        for view, params, patch in cache.slot_patches(1, slots):
+            assert patch(cached[(view, str(params))]) == cache.compute(1, view, **params), view
+
+    def test_new_readings_invalidate_covering_variants(self):
+        tuesday = date(2026, 3, 10)
+
+        assert _covers({"start_date": "2026-03-01"}, tuesday)
+        assert not _covers({"start_date": "2026-03-01", "end_date": "2026-03-09"}, tuesday)
+        assert _covers({"weekday": "Tuesday"}, tuesday)
+        assert not _covers({"weekday": "Monday"}, tuesday)
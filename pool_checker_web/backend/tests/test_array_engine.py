@@ -0,0 +1,149 @@
+import random
+import threading
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from app.config import settings
+from app.models.pool import Pool
+from app.schemas.visitor import ScrapeReading
+from app.services.analytics_service import AnalyticsService
+from app.services.column_store import ColumnStore
+from app.services.visitor_service import VisitorService
+
+pytest.importorskip("numpy")
+
+from app.services.array_engine import ArrayEngine  # noqa: E402
+
+START = datetime(2026, 1, 5, 4, 0, tzinfo=timezone.utc)
+
+
+def random_readings(count):
+    rng = random.Random(7)
+    return [
+        ScrapeReading(
+            pool_id=1, visitor_count=rng.randint(0, 150),
+            timestamp=START + timedelta(days=rng.randrange(70), minutes=10 * rng.randrange(120))
+        )
+        for _ in range(count)
+    ]
+
+
+def dump(value):
+    if isinstance(value, list):
+        return [dump(item) for item in value]
+    return value.model_dump() if hasattr(value, "model_dump") else value
+
+
+class TestArrayEngine:
+    def test_matches_rollup_analytics(self, db_session, monkeypatch):
+        db_session.add(Pool(id=1, name="City", url="http://x", element_id="E1", timezone="Europe/Zurich"))
+        db_session.commit()
+        readings = random_readings(1500)
+        service = VisitorService(db_session)
+        service.bulk_insert_readings(readings[:1000])
+
+        sql = AnalyticsService(db_session)
+        monkeypatch.setattr(settings, "ANALYTICS_ENGINE", "numpy")
+        arrays = AnalyticsService(db_session)
+        arrays.engine = ArrayEngine()
+        assert sql.engine is None
+
+        def compare():
+            window = {"start_date": date(2026, 2, 1), "end_date": date(2026, 2, 28)}
+            for method, kwargs in [
+                ("get_weekday_averages", {}),
+                ("get_heatmap_data", window),
+                ("get_daily_summary", {}),
+                ("get_trends", {"period": "weekly"}),
+                ("get_trends", {"period": "monthly", **window}),
+                ("get_peak_hours", {}),
+                ("get_peak_hours", {"weekday": "Saturday"}),
+            ]:
+                assert dump(getattr(arrays, method)(1, **kwargs)) == dump(getattr(sql, method)(1, **kwargs)), method
+            now = datetime(2026, 3, 2, 12, 0, tzinfo=timezone.utc)
+            assert dump(arrays.get_bundle(1, now=now)) == dump(sql.get_bundle(1, now=now))
+            assert vars(arrays.summarize(1, weekday="Monday", hour=9)) == {
+                key: value for key, value in sql.summarize(1, weekday="Monday", hour=9)._asdict().items()
+            }
+
+        compare()
+        # New readings are appended on the next call
+        service.bulk_insert_readings(readings[1000:])
+        compare()
+        assert arrays.engine.series(db_session, 1).size == len({r.timestamp for r in readings})
+
+    def test_batches_pools_like_rollup_analytics(self, db_session, monkeypatch):
+        for pool_id in (1, 2):
+            db_session.add(Pool(
+                id=pool_id, name=f"Pool {pool_id}", url="http://x", element_id=f"E{pool_id}", timezone="Europe/Zurich"
+            ))
+        db_session.commit()
+        readings = random_readings(1200)
+        service = VisitorService(db_session)
+        service.bulk_insert_readings(readings[:600])
+        service.bulk_insert_readings([reading.model_copy(update={"pool_id": 2}) for reading in readings[600:]])
+
+        sql = AnalyticsService(db_session)
+        monkeypatch.setattr(settings, "ANALYTICS_ENGINE", "numpy")
+        arrays = AnalyticsService(db_session)
+        arrays.engine = ArrayEngine()
+        now = datetime(2026, 3, 2, 12, 0, tzinfo=timezone.utc)
+
+        loads = []
+        load_new_many = arrays.engine._load_new_many
+
+        def record_load(db, pools):
+            loads.append(sorted(pools))
+            load_new_many(db, pools)
+
+        monkeypatch.setattr(arrays.engine, "_load_new_many", record_load)
+        assert dump(arrays.get_bundles([1, 2], now=now)) == dump(sql.get_bundles([1, 2], now=now))
+        assert dump(arrays.compare_pools([1, 2])) == dump(sql.compare_pools([1, 2]))
+        # Both pools are checked and loaded together
+        assert loads[0] == [1, 2]
+        assert arrays.engine.series(db_session, 2).size == len({r.timestamp for r in readings[600:]})
+
+    def test_maps_column_store(self, db_session, tmp_path):
+        db_session.add(Pool(id=1, name="City", url="http://x", element_id="E1", timezone="Europe/Zurich"))
+        db_session.commit()
+        readings = random_readings(1000)
+        service = VisitorService(db_session)
+        store = ColumnStore(str(tmp_path))
+        mapped, loaded = ArrayEngine(store), ArrayEngine()
+        assert loaded.store is None
+
+        for batch in (readings[:600], readings[600:]):
+            service.bulk_insert_readings(batch)
+            store.sync(db_session, 1)
+            assert [column.tolist() for column in mapped.series(db_session, 1).columns()] == [
+                column.tolist() for column in loaded.series(db_session, 1).columns()
+            ]
+
+        # Compaction reorders rows by timestamp; the aggregates stay the same
+        store.compact(db_session, 1)
+        assert mapped.series(db_session, 1).generation == 1
+        assert vars(mapped.summarize(db_session, 1)) == vars(loaded.summarize(db_session, 1))
+        assert [vars(row) for row in mapped.days(db_session, 1)] == [vars(row) for row in loaded.days(db_session, 1)]
+
+    def test_loading_one_pool_does_not_block_others(self, db_session, monkeypatch):
+        engine = ArrayEngine()
+        load_new = engine._load_new
+        loading, release = threading.Event(), threading.Event()
+
+        def slow_load(db, pool_id, series):
+            if pool_id == 1:
+                loading.set()
+                release.wait(5)
+            load_new(db, pool_id, series)
+
+        monkeypatch.setattr(engine, "_load_new", slow_load)
+        thread = threading.Thread(target=engine.series, args=(db_session, 1))
+        thread.start()
+        try:
+            assert loading.wait(5)
+            assert engine.series(db_session, 2).size == 0
+            assert thread.is_alive()
+        finally:
+            release.set()
+            thread.join()
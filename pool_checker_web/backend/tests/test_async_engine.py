@@ -0,0 +1,89 @@
+import asyncio
+
+import httpx
+
+from celery_app import async_engine
+from celery_app.async_engine import AsyncScrapeEngine
+from celery_app.fetching import group_pools_by_target
+from celery_app.http_fetcher import STRATEGY_HTTP, STRATEGY_JSON, STRATEGY_SELENIUM
+from celery_app.tasks.scraper_tasks import batch_pool_ids
+from tests.conftest import make_pool
+
+
+def results_by_pool(outcomes):
+    results = {}
+    for outcome in outcomes:
+        results.update(outcome.results)
+    return results
+
+
+class TestAsyncScrapeEngine:
+    def test_scrapes_http_and_json_groups(self, fake_pool_site):
+        page = fake_pool_site.url("/static.html")
+        api = fake_pool_site.url("/api/occupancy")
+        pools = [
+            make_pool(1, page, "SSD-4_visitornumber", fetch_strategy=STRATEGY_HTTP),
+            make_pool(2, page, "SSD-7_visitornumber", fetch_strategy=STRATEGY_HTTP),
+            make_pool(3, fake_pool_site.url("/city.html"), "x", fetch_strategy=STRATEGY_JSON,
+                      data_url=api, json_path="$.facilities[1].currentVisitors"),
+        ]
+
+        outcomes = AsyncScrapeEngine().scrape(group_pools_by_target(pools))
+
+        assert results_by_pool(outcomes) == {
+            1: (123, STRATEGY_HTTP), 2: (45, STRATEGY_HTTP), 3: (45, STRATEGY_JSON)
+        }
+        assert sorted(fake_pool_site.requests) == ["/api/occupancy", "/static.html"]
+        assert "fetch_ms" in outcomes[0].timer.as_dict()
+
+    def test_respects_per_host_limit(self):
+        state = {"active": 0, "peak": 0}
+
+        async def handler(request):
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+            await asyncio.sleep(0.02)
+            state["active"] -= 1
+            return httpx.Response(200, text='<span id="n">5</span>')
+
+        pools = [
+            make_pool(i, f"http://pools.test/{i}.html", "n", fetch_strategy=STRATEGY_HTTP)
+            for i in range(1, 9)
+        ]
+        engine = AsyncScrapeEngine(concurrency=8, per_host=2, transport=httpx.MockTransport(handler))
+
+        outcomes = engine.scrape(group_pools_by_target(pools))
+
+        assert all(count == 5 for count, _ in results_by_pool(outcomes).values())
+        assert state["peak"] == 2
+
+    def test_failed_fetches_fall_back_to_browser_tabs(self, fake_pool_site, monkeypatch):
+        opened = []
+
+        def fake_tabs(pages, timeout, timer):
+            opened.append([url for url, _, _ in pages])
+            return [{element_id: 9 for element_id in element_ids} for _, element_ids, _ in pages]
+
+        monkeypatch.setattr(async_engine, "fetch_pages_in_tabs", fake_tabs)
+        fake_pool_site.api_enabled = False
+        city = fake_pool_site.url("/city.html")
+        pools = [
+            make_pool(1, city, "SSD-4_visitornumber", fetch_strategy=STRATEGY_JSON,
+                      data_url=fake_pool_site.url("/api/occupancy"), json_path="$.facilities[0].currentVisitors"),
+            make_pool(2, fake_pool_site.url("/other.html"), "SSD-4_visitornumber"),
+        ]
+
+        outcomes = AsyncScrapeEngine(tabs_per_browser=4).scrape(group_pools_by_target(pools))
+
+        assert results_by_pool(outcomes) == {1: (9, STRATEGY_SELENIUM), 2: (9, STRATEGY_SELENIUM)}
+        # The selenium pool loads while the API is tried; the fallback needs a second round
+        assert opened == [[fake_pool_site.url("/other.html")], [city]]
+
+
+class TestBatching:
+    def test_batches_keep_fetch_groups_together(self):
+        pools = [make_pool(i, f"http://x/{i // 2}.html", "n") for i in range(6)]
+
+        batches = batch_pool_ids(group_pools_by_target(pools), batch_size=3)
+
+        assert batches == [[0, 1], [2, 3], [4, 5]]
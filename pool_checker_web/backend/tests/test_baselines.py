@@ -0,0 +1,57 @@
+from datetime import datetime, timedelta, timezone
+
+from app.models.pool import Pool
+from app.schemas.visitor import ScrapeReading
+from app.services.analytics_service import AnalyticsService
+from app.services.baseline_service import BaselineCurve, BaselineService
+from app.services.visitor_service import VisitorService
+
+MONDAY_MORNING = datetime(2026, 3, 2, 7, 0, tzinfo=timezone.utc)
+
+
+def add_pool(db_session):
+    db_session.add(Pool(id=1, name="City", url="http://x", element_id="E1", timezone="UTC"))
+    db_session.commit()
+
+
+class TestBaselines:
+    def test_curve_ranges_take_two_lookups(self):
+        curve = BaselineCurve.empty()
+        curve.add({7 * 60: [10, 30], 7 * 60 + 20: [50], 9 * 60: [2]})
+        curve.add({5 * 60: [99], 8 * 60: [20]})  # before opening: ignored
+
+        assert curve.up_to(6 * 60) == (0, 0, None, None)
+        assert curve.up_to(7 * 60 + 30) == (90, 3, 10, 50)
+        assert curve.up_to(23 * 60) == (112, 5, 2, 50)  # after closing: the whole day
+        assert curve.window(7 * 60 + 10, 8 * 60) == (70, 2)
+        assert curve.up_to(5 * 60) == (0, 0, None, None)  # before opening
+
+    def test_ingest_updates_curves_for_now_vs_typical(self, db_session):
+        add_pool(db_session)
+        service = VisitorService(db_session)
+        for week, counts in enumerate([[10, 20], [30, 40]]):
+            start = MONDAY_MORNING + timedelta(weeks=week)
+            service.bulk_insert_readings([
+                ScrapeReading(pool_id=1, visitor_count=count, timestamp=start + timedelta(minutes=10 * i))
+                for i, count in enumerate(counts)
+            ])
+        # Already stored, and before opening: neither changes the curve
+        service.bulk_insert_readings([
+            ScrapeReading(pool_id=1, visitor_count=10, timestamp=MONDAY_MORNING),
+            ScrapeReading(pool_id=1, visitor_count=500, timestamp=MONDAY_MORNING.replace(hour=5)),
+        ])
+
+        analytics = AnalyticsService(db_session)
+        now = MONDAY_MORNING + timedelta(weeks=1, minutes=15)
+        average = analytics.get_weekday_average_up_to_now(1, now=now)
+        assert (average.average_visitors, average.min_visitors, average.max_visitors) == (25.0, 10, 40)
+        assert (average.weekday, average.current_time, average.sample_count) == ("Monday", "07:15", 4)
+
+        compared = analytics.get_now_vs_typical(1, now=now)
+        assert (compared.current_visitors, compared.typical_visitors, compared.sample_count) == (40, 25.0, 4)
+        assert (compared.ratio, compared.status) == (1.6, "busier")
+        assert analytics.get_now_vs_typical(1, now=now + timedelta(hours=3)).status == "unknown"
+
+        curve = BaselineService(db_session).get_curve(1, 0)
+        assert BaselineService(db_session).rebuild(1) == 1
+        assert BaselineService(db_session).get_curve(1, 0).sums == curve.sums
@@ -0,0 +1,128 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+from app.models.pool import Pool
+from app.schemas.visitor import ScrapeReading
+from app.services.best_time_service import BestTimeIndex, BestTimeService, CrowdCurve, SparseTable
+from app.services.visitor_service import VisitorService
+
+# A Monday, 06:00 UTC
+MONDAY = datetime(2026, 3, 2, 6, 0, tzinfo=timezone.utc)
+
+
+class CounterRedis:
+    """The Redis counter commands the best-time index uses, kept in memory."""
+
+    def __init__(self):
+        self.values = {}
+
+    def pipeline(self):
+        return self
+
+    def execute(self):
+        pass
+
+    def incr(self, key):
+        self.values[key] = self.values.get(key, 0) + 1
+
+    def mget(self, keys):
+        return [self.values.get(key) for key in keys]
+
+
+class TestBestTime:
+    def test_sparse_table_matches_scan(self):
+        rng = random.Random(3)
+        values = [rng.randint(0, 50) for _ in range(70)]
+        table = SparseTable(values)
+        for _ in range(200):
+            first = rng.randrange(len(values))
+            last = rng.randrange(first, len(values))
+            i = table.argmin(first, last)
+            assert values[i] == min(values[first:last + 1]) and first <= i <= last
+
+    def test_quietest_window_skips_unknown_slots(self):
+        # 15-minute slots from 17:00
+        curve = CrowdCurve(17 * 60, 15, [40, 30, 10, 20, None, 5, 5, 50])
+
+        assert curve.quietest(17 * 60, 18 * 60, 30) == (17 * 60 + 30, 15.0)
+        assert curve.quietest(17 * 60, 19 * 60, 30) == (18 * 60 + 15, 5.0)
+        # A window containing the unknown slot never wins
+        assert curve.quietest(17 * 60 + 45, 19 * 60, 45) == (18 * 60 + 15, 20.0)
+        assert curve.quietest(18 * 60, 18 * 60 + 15, 30) is None
+
+    def test_finds_quietest_window_across_pools_and_days(self, db_session):
+        for pool_id in (1, 2):
+            db_session.add(Pool(id=pool_id, name=f"Pool {pool_id}", url="http://x", element_id="E1", timezone="UTC"))
+        db_session.commit()
+        crowds = {1: [60, 60, 10, 10, 60, 60], 2: [30, 30, 30, 30, 30, 30]}
+        VisitorService(db_session).bulk_insert_readings([
+            ScrapeReading(
+                pool_id=pool_id, visitor_count=count,
+                timestamp=MONDAY + timedelta(days=day, hours=11, minutes=15 * slot)
+            )
+            for pool_id, counts in crowds.items()
+            for day in (0, 1)
+            for slot, count in enumerate(counts)
+        ])
+
+        service = BestTimeService(db_session, BestTimeIndex())
+        best = service.find_quietest([1, 2, 3], "17:00", "18:30", 30, days=7, now=MONDAY)
+
+        assert [(w.pool_id, w.weekday, w.start_time, w.end_time, w.expected_visitors) for w in best.windows] == [
+            (1, "Monday", "17:30", "18:00", 10.0),
+            (1, "Tuesday", "17:30", "18:00", 10.0),
+            (2, "Monday", "17:00", "17:30", 30.0),
+            (2, "Tuesday", "17:00", "17:30", 30.0),
+        ]
+        # Past windows of today are left out
+        later = service.find_quietest([1], "17:00", "18:30", 30, now=MONDAY + timedelta(hours=11, minutes=50))
+        assert [(w.weekday, w.start_time) for w in later.windows] == [("Tuesday", "17:30"), ("Monday", "18:00")]
+
+    def test_endpoint_rejects_invalid_time_ranges(self, client, auth_headers):
+        for params, detail in [
+            ({"start_time": "25:00"}, "Times must be HH:MM between 00:00 and 23:59"),
+            ({"end_time": "07:99"}, "Times must be HH:MM between 00:00 and 23:59"),
+            ({"start_time": "noon"}, "Times must be HH:MM between 00:00 and 23:59"),
+            ({"start_time": "17:00", "end_time": "18:00", "duration_minutes": 90},
+             "The time range is shorter than the duration"),
+        ]:
+            response = client.get(
+                "/api/v1/analytics/best-times", params={"pool_ids": 1, **params}, headers=auth_headers
+            )
+            assert response.status_code == 400
+            assert response.json()["detail"] == detail
+
+        response = client.get(
+            "/api/v1/analytics/best-times",
+            params={"pool_ids": 1, "start_time": "17:00", "end_time": "23:59"}, headers=auth_headers
+        )
+        assert response.status_code == 200
+
+    def test_new_readings_reload_index_in_other_processes(self, db_session):
+        db_session.add(Pool(id=1, name="City", url="http://x", element_id="E1", timezone="UTC"))
+        db_session.commit()
+        service = VisitorService(db_session)
+        service.bulk_insert_readings([
+            ScrapeReading(
+                pool_id=1, visitor_count=count, timestamp=MONDAY + timedelta(hours=11, minutes=15 * slot)
+            )
+            for slot, count in enumerate([10, 10, 50, 50])
+        ])
+        shared = CounterRedis()
+        api_index, worker_index = BestTimeIndex(shared), BestTimeIndex(shared)
+
+        def quietest():
+            best_times = BestTimeService(db_session, api_index)
+            return best_times.find_quietest([1], "17:00", "18:00", 30, days=1, now=MONDAY).windows[0].start_time
+
+        assert quietest() == "17:00"
+        # A week later the early slots are crowded; the curve moves within the TTL
+        service.bulk_insert_readings([
+            ScrapeReading(
+                pool_id=1, visitor_count=count, timestamp=MONDAY + timedelta(days=7, hours=11, minutes=15 * slot)
+            )
+            for slot, count in enumerate([200, 200, 0, 0])
+        ])
+        assert quietest() == "17:00"
+        worker_index.invalidate([1])
+        assert quietest() == "17:30"
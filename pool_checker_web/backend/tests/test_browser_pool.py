@@ -0,0 +1,111 @@
+import threading
+
+import pytest
+
+from celery_app.browser_pool import BrowserPool, BrowserPoolTimeout
+
+
+class FakeDriver:
+    def __init__(self):
+        self.alive = True
+        self.quit_called = False
+
+    def execute_script(self, script):
+        if not self.alive:
+            raise RuntimeError("browser crashed")
+        return 1
+
+    def quit(self):
+        self.quit_called = True
+
+
+class FakeLauncher:
+    def __init__(self):
+        self.drivers = []
+
+    def __call__(self):
+        driver = FakeDriver()
+        self.drivers.append(driver)
+        return driver
+
+
+class TestBrowserPool:
+    def test_reuses_warm_browser(self):
+        launcher = FakeLauncher()
+        pool = BrowserPool(size=1, max_pages=10, max_rss_mb=None, launcher=launcher)
+
+        for _ in range(5):
+            with pool.lease() as driver:
+                assert driver is launcher.drivers[0]
+
+        stats = pool.stats()
+        assert stats["launches"] == 1
+        assert stats["leases"] == 5
+        assert stats["pages_served"] == 5
+
+    def test_recycles_after_max_pages(self):
+        launcher = FakeLauncher()
+        pool = BrowserPool(size=1, max_pages=2, max_rss_mb=None, launcher=launcher)
+
+        for _ in range(4):
+            with pool.lease():
+                pass
+
+        stats = pool.stats()
+        assert stats["launches"] == 2
+        assert stats["recycles"]["max_pages"] == 2
+        assert all(d.quit_called for d in launcher.drivers)
+
+    def test_replaces_unhealthy_browser_on_lease(self):
+        launcher = FakeLauncher()
+        pool = BrowserPool(size=1, max_pages=10, max_rss_mb=None, launcher=launcher)
+
+        with pool.lease():
+            pass
+        launcher.drivers[0].alive = False
+
+        with pool.lease() as driver:
+            assert driver is launcher.drivers[1]
+
+        stats = pool.stats()
+        assert stats["recycles"]["unhealthy"] == 1
+        assert stats["browsers"] == 1
+
+    def test_discards_browser_that_died_during_lease(self):
+        launcher = FakeLauncher()
+        pool = BrowserPool(size=1, max_pages=10, max_rss_mb=None, launcher=launcher)
+
+        with pytest.raises(ValueError):
+            with pool.lease() as driver:
+                driver.alive = False
+                raise ValueError("page failed")
+
+        assert pool.stats()["browsers"] == 0
+        assert pool.stats()["recycles"]["unhealthy"] == 1
+
+    def test_lease_times_out_when_exhausted(self):
+        pool = BrowserPool(size=1, max_rss_mb=None, lease_timeout=0.05, launcher=FakeLauncher())
+
+        with pool.lease():
+            with pytest.raises(BrowserPoolTimeout):
+                with pool.lease():
+                    pass
+
+        assert pool.stats()["lease_timeouts"] == 1
+
+    def test_waiter_gets_released_browser(self):
+        launcher = FakeLauncher()
+        pool = BrowserPool(size=1, max_rss_mb=None, lease_timeout=5, launcher=launcher)
+        leased = []
+
+        def worker():
+            with pool.lease() as driver:
+                leased.append(driver)
+
+        with pool.lease():
+            thread = threading.Thread(target=worker)
+            thread.start()
+        thread.join()
+
+        assert leased == [launcher.drivers[0]]
+        assert pool.stats()["launches"] == 1
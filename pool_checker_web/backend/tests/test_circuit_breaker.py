@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta, timezone
+
+from app.config import settings
+from app.services.circuit_breaker_service import (
+    STATE_CLOSED, STATE_HALF_OPEN, STATE_OPEN, BreakerState
+)
+
+NOW = datetime(2026, 3, 10, 12, 0, tzinfo=timezone.utc)
+BASE_COOLDOWN = timedelta(minutes=settings.BREAKER_BASE_COOLDOWN_MINUTES)
+
+
+def tripped_breaker() -> BreakerState:
+    state = BreakerState()
+    for _ in range(settings.BREAKER_FAILURE_THRESHOLD):
+        state.on_failure(NOW, "Failed to fetch visitor count", duration_ms=1500)
+    return state
+
+
+class TestBreakerState:
+    def test_opens_after_consecutive_failures(self):
+        state = BreakerState()
+        for _ in range(settings.BREAKER_FAILURE_THRESHOLD - 1):
+            state.on_failure(NOW, "timeout")
+        assert state.state == STATE_CLOSED
+        assert state.try_dispatch(NOW)
+
+        state.on_failure(NOW, "timeout")
+        assert state.state == STATE_OPEN
+        assert state.open_until == NOW + BASE_COOLDOWN
+        assert state.is_blocking(NOW)
+        assert not state.try_dispatch(NOW + BASE_COOLDOWN / 2)
+
+    def test_success_resets_failure_count(self):
+        state = BreakerState()
+        for _ in range(settings.BREAKER_FAILURE_THRESHOLD - 1):
+            state.on_failure(NOW, "timeout")
+        state.on_success(NOW)
+        state.on_failure(NOW, "timeout")
+
+        assert state.state == STATE_CLOSED
+        assert state.consecutive_failures == 1
+
+    def test_half_open_allows_a_single_probe(self):
+        state = tripped_breaker()
+        after_cooldown = NOW + BASE_COOLDOWN
+
+        assert state.try_dispatch(after_cooldown)
+        assert state.state == STATE_HALF_OPEN
+        assert not state.try_dispatch(after_cooldown + timedelta(seconds=30))
+
+        # A probe that never reported back does not block the pool forever
+        assert state.try_dispatch(after_cooldown + BASE_COOLDOWN * 2)
+
+    def test_failed_probe_doubles_cooldown(self):
+        state = tripped_breaker()
+        probe_at = NOW + BASE_COOLDOWN
+        state.try_dispatch(probe_at)
+        state.on_failure(probe_at, "timeout")
+
+        assert state.state == STATE_OPEN
+        assert state.trips == 2
+        assert state.open_until == probe_at + BASE_COOLDOWN * 2
+
+        for _ in range(10):
+            probe_at = state.open_until
+            state.try_dispatch(probe_at)
+            state.on_failure(probe_at, "timeout")
+        assert state.cooldown_seconds == settings.BREAKER_MAX_COOLDOWN_MINUTES * 60
+
+    def test_successful_probe_closes(self):
+        state = tripped_breaker()
+        probe_at = NOW + BASE_COOLDOWN
+        state.try_dispatch(probe_at)
+        state.on_success(probe_at)
+
+        assert state.state == STATE_CLOSED
+        assert state.consecutive_failures == 0
+        assert not state.is_blocking(probe_at)
+
+    def test_round_trips_through_redis_hash(self):
+        state = tripped_breaker()
+        restored = BreakerState.from_hash(state.to_hash())
+
+        status = restored.to_status(7)
+        assert status.state == STATE_OPEN
+        assert status.open_until == state.open_until
+        assert status.last_error == "Failed to fetch visitor count"
+        assert status.failed_time_ms == 1500 * settings.BREAKER_FAILURE_THRESHOLD
@@ -0,0 +1,54 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.models.pool import Pool
+from app.models.visitor import VisitorRecord
+from app.schemas.visitor import ScrapeReading
+from app.services.column_store import ColumnStore
+from app.services.visitor_service import VisitorService
+
+START = datetime(2026, 3, 2, 5, 0, tzinfo=timezone.utc)
+
+
+def readings(count, seed):
+    rng = random.Random(seed)
+    return [
+        ScrapeReading(
+            pool_id=1, visitor_count=rng.randint(0, 120),
+            timestamp=START + timedelta(days=rng.randrange(30), minutes=10 * rng.randrange(90))
+        )
+        for _ in range(count)
+    ]
+
+
+@pytest.fixture
+def pool(db_session):
+    db_session.add(Pool(id=1, name="City", url="http://x", element_id="E1", timezone="Europe/Zurich"))
+    db_session.commit()
+
+
+class TestColumnStore:
+    def test_sync_check_and_compact(self, db_session, pool, tmp_path):
+        store = ColumnStore(str(tmp_path))
+        service = VisitorService(db_session)
+        service.bulk_insert_readings(readings(300, seed=1))
+        assert store.sync(db_session, 1) == db_session.query(VisitorRecord).count()
+        assert store.sync(db_session, 1) == 0
+        assert store.check(db_session, 1)["consistent"]
+
+        service.bulk_insert_readings(readings(200, seed=2))
+        assert not store.check(db_session, 1)["consistent"]
+        store.sync(db_session, 1)
+        assert store.check(db_session, 1)["consistent"]
+
+        # Compaction rewrites rows that changed in the database since they were synced
+        db_session.query(VisitorRecord).filter(VisitorRecord.id == 5).update({"visitor_count": 999})
+        db_session.commit()
+        assert not store.check(db_session, 1)["consistent"]
+        rows = store.compact(db_session, 1)
+        report = store.check(db_session, 1)
+        assert report["consistent"] and report["generation"] == 1 and report["stored_rows"] == rows
+        timestamps = store.read_column(1, "timestamp")
+        assert list(timestamps) == sorted(timestamps)
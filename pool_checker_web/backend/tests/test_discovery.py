@@ -0,0 +1,156 @@
+import json
+import os
+import shutil
+
+import pytest
+
+from app.models.pool import Pool
+from celery_app.discovery import (
+    DiscoveredEndpoint, discover_data_endpoint, match_response_body,
+    parse_network_log, select_endpoint
+)
+from celery_app.http_fetcher import STRATEGY_DISCOVER
+from celery_app.readiness import ScrapeTimer
+from celery_app import fetching
+from celery_app.async_engine import AsyncScrapeEngine
+from celery_app.fetching import group_pools_by_target
+from celery_app.tasks import scraper_tasks
+
+
+def log_entry(method, params):
+    return {"message": json.dumps({"message": {"method": method, "params": params}})}
+
+
+def network_log(page_url, api_url):
+    return [
+        log_entry("Network.requestWillBeSent", {"requestId": "1", "request": {"url": page_url, "method": "GET"}}),
+        log_entry("Network.responseReceived", {
+            "requestId": "1", "type": "Document", "response": {"url": page_url, "status": 200}
+        }),
+        log_entry("Network.requestWillBeSent", {"requestId": "2", "request": {"url": api_url, "method": "GET"}}),
+        log_entry("Network.responseReceived", {
+            "requestId": "2", "type": "Fetch", "response": {"url": api_url, "status": 200}
+        }),
+        log_entry("Network.requestWillBeSent", {"requestId": "3", "request": {"url": api_url, "method": "POST"}}),
+        log_entry("Network.responseReceived", {
+            "requestId": "3", "type": "XHR", "response": {"url": api_url, "status": 200}
+        }),
+    ]
+
+
+API_BODY = json.dumps({
+    "capacity": 400,
+    "facilities": [
+        {"id": "SSD-7", "currentVisitors": 45},
+        {"id": "SSD-4", "currentVisitors": 123},
+    ],
+})
+
+
+class TestEndpointSelection:
+    def test_parse_network_log_keeps_replayable_requests(self):
+        requests = parse_network_log(network_log("http://x/city.html", "http://x/api"))
+        assert [r["request_id"] for r in requests] == ["1", "2"]
+
+    def test_selects_json_endpoint_and_path(self):
+        requests = parse_network_log(network_log("http://x/city.html", "http://x/api"))
+        bodies = {"1": "<span id='SSD-4_visitornumber'>-</span>", "2": API_BODY}
+
+        endpoint = select_endpoint(requests, bodies, 123, "SSD-4_visitornumber", "http://x/city.html")
+
+        assert endpoint.url == "http://x/api"
+        assert endpoint.json_path == "$.facilities[1].currentVisitors"
+
+    def test_prefers_entry_whose_id_matches_element(self):
+        body = json.dumps({"a": {"id": "SSD-7", "count": 9}, "b": {"id": "SSD-4", "count": 9}})
+        assert match_response_body(body, 9, "SSD-4_visitornumber") == (True, "$.b.count")
+
+    def test_ambiguous_numbers_are_rejected(self):
+        body = json.dumps({"x": 9, "y": [9]})
+        assert match_response_body(body, 9, "SSD-4_visitornumber") == (False, None)
+
+    def test_html_fragment_endpoint(self):
+        assert match_response_body(
+            "<div><b id='SSD-4_visitornumber'>123</b></div>", 123, "SSD-4_visitornumber"
+        ) == (True, None)
+
+
+class TestDiscoveredEndpointScraping:
+    def make_pool(self, site):
+        return Pool(
+            id=1,
+            name="City",
+            url=site.url("/city.html"),
+            element_id="SSD-4_visitornumber",
+            fetch_strategy=STRATEGY_DISCOVER,
+            data_url=site.url("/api/occupancy"),
+            json_path="$.facilities[0].currentVisitors",
+            ready_timeout_seconds=5,
+        )
+
+    def test_calls_saved_endpoint_without_browser(self, fake_pool_site, monkeypatch):
+        def fail_discovery(*args, **kwargs):
+            raise AssertionError("discovery should not run")
+
+        monkeypatch.setattr(fetching, "discover_data_endpoint", fail_discovery)
+        pool = self.make_pool(fake_pool_site)
+
+        assert fetching.fetch_pool_visitor_count(pool, ScrapeTimer()) == (123, STRATEGY_DISCOVER)
+
+    def test_rediscovers_when_endpoint_stops_returning_data(self, fake_pool_site, monkeypatch):
+        fake_pool_site.api_enabled = False
+        new_url = fake_pool_site.url("/api/v2/occupancy")
+
+        def fake_discovery(url, element_id, timeout):
+            return 130, DiscoveredEndpoint(new_url, 130, json_path="$.current")
+
+        monkeypatch.setattr(fetching, "discover_data_endpoint", fake_discovery)
+        monkeypatch.setattr(fetching, "discovery_allowed", lambda pool_id: True)
+        pool = self.make_pool(fake_pool_site)
+
+        assert fetching.fetch_pool_visitor_count(pool, ScrapeTimer()) == (130, STRATEGY_DISCOVER)
+        assert pool.data_url == new_url
+        assert pool.json_path == "$.current"
+        assert pool.endpoint_discovered_at is not None
+
+    @pytest.mark.parametrize("engine", ["sync", "async"])
+    def test_queued_scrape_saves_rediscovered_endpoint(self, engine, db_session, fake_pool_site, monkeypatch):
+        fake_pool_site.api_enabled = False
+        new_url = fake_pool_site.url("/api/v2/occupancy")
+        queued = []
+
+        def fake_discovery(url, element_id, timeout):
+            return 130, DiscoveredEndpoint(new_url, 130, json_path="$.current")
+
+        monkeypatch.setattr(fetching, "discover_data_endpoint", fake_discovery)
+        monkeypatch.setattr(fetching, "discovery_allowed", lambda pool_id: True)
+        # Stream and local ingest only publish the readings
+        monkeypatch.setattr(scraper_tasks, "publish_readings", lambda readings: queued.extend(readings) or ["1-0"])
+        pool = self.make_pool(fake_pool_site)
+        db_session.add(pool)
+        db_session.commit()
+
+        if engine == "sync":
+            results = scraper_tasks.scrape_pools(db_session, [pool])
+        else:
+            outcome, = AsyncScrapeEngine().scrape(group_pools_by_target([pool]))
+            results = scraper_tasks.store_scrape_results(db_session, outcome.pools, outcome.results, outcome.timer)
+
+        assert results[0]["ingest"] == scraper_tasks.INGEST_QUEUED
+        assert [reading.visitor_count for reading in queued] == [130]
+        db_session.rollback()
+        assert db_session.get(Pool, 1).data_url == new_url
+
+
+@pytest.mark.skipif(
+    not shutil.which("chromedriver") and not os.path.exists(os.environ.get("CHROMEDRIVER_PATH", "")),
+    reason="chromedriver is not installed"
+)
+def test_discovers_endpoint_in_real_browser(fake_pool_site):
+    visitor_count, endpoint = discover_data_endpoint(
+        fake_pool_site.url("/city.html"), "SSD-4_visitornumber", timeout=10
+    )
+
+    assert visitor_count == 123
+    assert endpoint.url.startswith(fake_pool_site.url("/api/occupancy"))
+    assert endpoint.json_path == "$.facilities[0].currentVisitors"
@@ -0,0 +1,74 @@
+import csv
+import gzip
+import io
+import json
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from app.models.pool import Pool
+from app.schemas.visitor import ScrapeReading, VisitorRecordFilter
+from app.services.export_service import ExportService, pa, pq
+from app.services.visitor_service import VisitorService
+from tests.conftest import TestingSessionLocal
+
+START = datetime(2026, 3, 9, 6, 0, tzinfo=timezone.utc)
+
+
+def add_readings(db_session):
+    db_session.add(Pool(id=1, name="City", url="http://x", element_id="E1", timezone="Europe/Zurich"))
+    db_session.commit()
+    VisitorService(db_session).bulk_insert_readings([
+        ScrapeReading(pool_id=1, visitor_count=i, timestamp=START + timedelta(minutes=10 * i))
+        for i in range(25)
+    ])
+
+
+class TestExport:
+    def test_streams_csv_in_chunks(self, db_session):
+        add_readings(db_session)
+        service = ExportService(TestingSessionLocal, chunk_rows=10)
+        chunks = list(service.stream(VisitorRecordFilter(pool_id=1)))
+        assert len(chunks) == 3
+
+        rows = list(csv.DictReader(io.StringIO(b"".join(chunks).decode())))
+        assert [int(row["visitor_count"]) for row in rows] == list(range(25))
+        assert rows[0]["timestamp"] == "2026-03-09T06:00:00+00:00"
+        assert (rows[0]["local_date"], rows[0]["local_hour"], rows[0]["weekday"]) == ("2026-03-09", "7", "Monday")
+
+    def test_gzipped_ndjson_with_filters(self, db_session):
+        add_readings(db_session)
+        service = ExportService(TestingSessionLocal, chunk_rows=4)
+        filters = VisitorRecordFilter(pool_id=1, start_hour=8, end_hour=8)
+        data = gzip.decompress(b"".join(service.stream(filters, "ndjson", gzip=True)))
+        records = [json.loads(line) for line in data.decode().splitlines()]
+        assert [record["visitor_count"] for record in records] == list(range(6, 12))
+        assert service.filename(filters, "ndjson", gzip=True) == "visitors_pool-1.ndjson.gz"
+
+        empty = b"".join(service.stream(VisitorRecordFilter(pool_id=2)))
+        assert empty.decode().strip() == "id,pool_id,timestamp,local_date,local_hour,weekday,week_number,visitor_count"
+
+    def test_columnar_exports_have_typed_monthly_row_groups(self, db_session):
+        if pa is None:
+            pytest.skip("pyarrow is not installed")
+        db_session.add(Pool(id=1, name="City", url="http://x", element_id="E1", timezone="Europe/Zurich"))
+        db_session.add(Pool(id=2, name="Lake", url="http://y", element_id="E2", timezone="Europe/Zurich"))
+        db_session.commit()
+        VisitorService(db_session).bulk_insert_readings([
+            ScrapeReading(pool_id=pool_id, visitor_count=day, timestamp=START + timedelta(days=day))
+            for pool_id in (1, 2) for day in range(0, 70, 7)
+        ])
+        service = ExportService(TestingSessionLocal, chunk_rows=3)
+        filters = VisitorRecordFilter(pool_ids=[2], end_date=date(2026, 5, 1))
+
+        parquet = pq.ParquetFile(io.BytesIO(b"".join(service.stream(filters, "parquet"))))
+        assert parquet.metadata.num_row_groups == 2  # March and April
+        table = parquet.read()
+        assert table.schema.field("timestamp").type == pa.timestamp("us", tz="UTC")
+        assert table.schema.field("visitor_count").type == pa.int32()
+        assert set(table.column("pool_id").to_pylist()) == {2}
+        assert table.column("visitor_count").to_pylist() == list(range(0, 56, 7))
+
+        arrow = pa.ipc.open_file(io.BytesIO(b"".join(service.stream(filters, "arrow", gzip=True))))
+        assert arrow.num_record_batches == 2
+        assert arrow.read_all().to_pylist() == table.to_pylist()
@@ -0,0 +1,74 @@
+from celery_app import fetching
+from celery_app.fetching import fetch_group_visitor_counts, group_pools_by_target
+from celery_app.http_fetcher import STRATEGY_HTTP, STRATEGY_JSON, STRATEGY_SELENIUM
+from tests.conftest import make_pool
+
+
+class TestGrouping:
+    def test_groups_pools_by_fetch_target(self):
+        pools = [
+            make_pool(1, "http://x/a.html", "A_visitornumber"),
+            make_pool(2, "http://x/b.html", "B_visitornumber"),
+            make_pool(3, "http://x/a.html", "C_visitornumber"),
+            make_pool(4, "http://x/a.html", "D_visitornumber", fetch_strategy=STRATEGY_HTTP),
+        ]
+
+        groups = group_pools_by_target(pools)
+
+        assert [[pool.id for pool in group] for group in groups] == [[1, 3], [2], [4]]
+
+    def test_json_pools_group_by_data_url(self):
+        pools = [
+            make_pool(1, "http://x/a.html", "A", fetch_strategy=STRATEGY_JSON,
+                      data_url="http://x/api", json_path="$.a"),
+            make_pool(2, "http://x/b.html", "B", fetch_strategy=STRATEGY_JSON,
+                      data_url="http://x/api", json_path="$.b"),
+        ]
+
+        assert len(group_pools_by_target(pools)) == 1
+
+
+class TestSharedFetch:
+    def test_one_request_for_all_pools_on_a_page(self, fake_pool_site):
+        url = fake_pool_site.url("/static.html")
+        pools = [
+            make_pool(1, url, "SSD-4_visitornumber", fetch_strategy=STRATEGY_HTTP),
+            make_pool(2, url, "SSD-7_visitornumber", fetch_strategy=STRATEGY_HTTP),
+        ]
+
+        results = fetch_group_visitor_counts(pools)
+
+        assert results == {1: (123, STRATEGY_HTTP), 2: (45, STRATEGY_HTTP)}
+        assert fake_pool_site.requests == ["/static.html"]
+
+    def test_one_request_for_all_pools_on_an_endpoint(self, fake_pool_site):
+        url = fake_pool_site.url("/api/occupancy")
+        pools = [
+            make_pool(pool_id, fake_pool_site.url("/city.html"), "x", fetch_strategy=STRATEGY_JSON,
+                      data_url=url, json_path=f"$.facilities[{index}].currentVisitors")
+            for index, pool_id in enumerate([1, 2])
+        ]
+
+        results = fetch_group_visitor_counts(pools)
+
+        assert results == {1: (123, STRATEGY_JSON), 2: (45, STRATEGY_JSON)}
+        assert len(fake_pool_site.requests) == 1
+
+    def test_falls_back_to_selenium_for_unreadable_pools(self, fake_pool_site, monkeypatch):
+        loaded = []
+
+        def fake_browser_fetch(url, element_ids, timeout, block_resources, timer):
+            loaded.append((url, element_ids))
+            return {element_id: 7 for element_id in element_ids}
+
+        monkeypatch.setattr(fetching, "fetch_visitor_counts", fake_browser_fetch)
+        url = fake_pool_site.url("/static.html")
+        pools = [
+            make_pool(1, url, "SSD-4_visitornumber", fetch_strategy=STRATEGY_HTTP),
+            make_pool(2, url, "missing", fetch_strategy=STRATEGY_HTTP),
+        ]
+
+        results = fetch_group_visitor_counts(pools)
+
+        assert results == {1: (123, STRATEGY_HTTP), 2: (7, STRATEGY_SELENIUM)}
+        assert loaded == [(url, ["missing"])]
@@ -0,0 +1,62 @@
+import httpx
+import pytest
+
+from celery_app.http_fetcher import HttpFetcher, extract_element_text, extract_json_path
+
+
+POOL_PAGE = """
+<html><body>
+  <div id="SSD-4">
+    <span class="label">Visitors</span>
+    <span id="SSD-4_visitornumber"><b>123</b> people</span>
+  </div>
+  <img id="logo" src="logo.png">
+</body></html>
+"""
+
+
+def make_fetcher(routes):
+    def handler(request):
+        body = routes.get(request.url.path)
+        if body is None:
+            return httpx.Response(404)
+        if isinstance(body, str):
+            return httpx.Response(200, text=body)
+        return httpx.Response(200, json=body)
+
+    return HttpFetcher(httpx.Client(transport=httpx.MockTransport(handler)))
+
+
+class TestExtraction:
+    def test_element_text_includes_nested_tags(self):
+        assert extract_element_text(POOL_PAGE, "SSD-4_visitornumber") == "123 people"
+
+    def test_missing_element(self):
+        assert extract_element_text(POOL_PAGE, "nope") is None
+
+    def test_void_element(self):
+        assert extract_element_text(POOL_PAGE, "logo") == ""
+
+    def test_json_path(self):
+        data = {"pools": [{"id": "a", "current": 5}, {"id": "b", "current": "17"}]}
+        assert extract_json_path(data, "$.pools[1].current") == "17"
+        assert extract_json_path(data, "pools.0.current") == 5
+
+    def test_json_path_missing(self):
+        with pytest.raises(KeyError):
+            extract_json_path({"a": 1}, "$.b")
+
+
+class TestHttpFetcher:
+    def test_fetch_html(self):
+        fetcher = make_fetcher({"/city.html": POOL_PAGE})
+        assert fetcher.fetch_html("http://pool.test/city.html", "SSD-4_visitornumber") == 123
+
+    def test_fetch_json(self):
+        fetcher = make_fetcher({"/api": {"data": {"visitors": "42"}}})
+        assert fetcher.fetch_json("http://pool.test/api", "$.data.visitors") == 42
+
+    def test_http_error_returns_none(self):
+        fetcher = make_fetcher({})
+        assert fetcher.fetch_html("http://pool.test/missing", "x") is None
+        assert fetcher.fetch_json("http://pool.test/missing", "$.x") is None
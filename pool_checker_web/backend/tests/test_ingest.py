@@ -0,0 +1,81 @@
+import time
+from datetime import datetime, timedelta
+
+import pytest
+import pytz
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.models.visitor import VisitorRecord
+from app.schemas.visitor import ScrapeReading
+from celery_app import ingest
+from celery_app.ingest import IngestConsumer, LocalQueue
+from tests.conftest import TestingSessionLocal
+
+START = pytz.timezone("Europe/Zurich").localize(datetime(2026, 3, 10, 12, 0))
+
+
+@pytest.fixture(autouse=True)
+def no_analytics_events(monkeypatch):
+    # There is no Celery broker to send "new readings" events to here
+    monkeypatch.setattr(settings, "ANALYTICS_REALTIME_UPDATES", False)
+
+
+def readings(count, pool_id=1):
+    return [
+        ScrapeReading(pool_id=pool_id, visitor_count=100 + i, timestamp=START + timedelta(minutes=i))
+        for i in range(count)
+    ]
+
+
+class TestIngestConsumer:
+    def test_writes_batches_and_skips_stored_readings(self, db_session):
+        queue = LocalQueue()
+        consumer = IngestConsumer(queue, TestingSessionLocal, batch_size=3, max_latency=0.05)
+        queue.publish(readings(5))
+        queue.publish(readings(2))  # redelivered duplicates
+
+        consumer.drain()
+
+        assert db_session.query(VisitorRecord).count() == 5
+        assert consumer.stats() == {"batches": 3, "inserted": 5, "failures": 0}
+        assert queue.backlog() == 0
+
+    def test_only_new_readings_are_applied(self, db_session, monkeypatch):
+        emitted, synced = [], []
+        monkeypatch.setattr(ingest, "emit_readings_stored", lambda stored: emitted.append(stored))
+        monkeypatch.setattr(ingest, "sync_column_store", lambda db, stored: synced.append(stored))
+        queue = LocalQueue()
+        consumer = IngestConsumer(queue, TestingSessionLocal, batch_size=10, max_latency=0.01)
+        queue.publish(readings(3))
+        consumer.drain()
+        queue.publish(readings(5))  # two redelivered, three new
+
+        consumer.drain()
+
+        new = [reading.timestamp for reading in readings(5)[3:]]
+        assert [reading.timestamp for reading in emitted[-1]] == new
+        assert [reading.timestamp for reading in synced[-1]] == new
+
+    def test_flushes_partial_batch_after_max_latency(self, db_session):
+        queue = LocalQueue()
+        consumer = IngestConsumer(queue, TestingSessionLocal, batch_size=100, max_latency=0.05)
+        queue.publish(readings(3))
+
+        started = time.monotonic()
+        batch = consumer.collect(idle_block=1.0)
+
+        assert len(batch) == 3
+        assert time.monotonic() - started < 0.5
+
+    def test_failed_write_keeps_readings_queued(self, db_session):
+        broken = sessionmaker(bind=create_engine("sqlite:////nonexistent/dir/pool.db"))
+        queue = LocalQueue()
+        queue.publish(readings(4))
+
+        IngestConsumer(queue, broken, batch_size=10, max_latency=0.01).drain()
+        assert queue.backlog() == 4
+
+        IngestConsumer(queue, TestingSessionLocal, batch_size=10, max_latency=0.01).drain()
+        assert db_session.query(VisitorRecord).count() == 4
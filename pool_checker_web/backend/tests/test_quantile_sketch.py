@@ -0,0 +1,83 @@
+import math
+import random
+from datetime import date, datetime, timedelta, timezone
+
+from app.models.pool import Pool
+from app.models.rollup import VisitorHourlyRollup
+from app.schemas.visitor import ScrapeReading
+from app.services.analytics_service import AnalyticsService
+from app.services.quantile_sketch import QuantileSketch, merge_sketches
+from app.services.rollup_service import RollupService
+from app.services.visitor_service import VisitorService
+
+MONDAY_NOON = datetime(2026, 3, 2, 12, tzinfo=timezone.utc)
+
+
+def exact_quantile(values, q):
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+class TestQuantileSketch:
+    def test_exact_for_few_distinct_counts(self):
+        values = [random.Random(1).randint(0, 60) for _ in range(500)]
+        sketch = QuantileSketch()
+        for value in values:
+            sketch.add(value)
+
+        assert sketch.count == 500
+        for q in (0.1, 0.25, 0.5, 0.75, 0.9):
+            assert sketch.quantile(q) == exact_quantile(values, q)
+        assert QuantileSketch.from_json(sketch.to_json()).centroids == sketch.centroids
+
+    def test_merge_matches_single_sketch_and_stays_small(self):
+        rng = random.Random(2)
+        parts = [[rng.randint(0, 1000) for _ in range(2000)] for _ in range(5)]
+        everything = QuantileSketch(compression=50)
+        for value in sum(parts, []):
+            everything.add(value)
+        merged = QuantileSketch(compression=50)
+        for part in parts:
+            sketch = QuantileSketch(compression=50)
+            for value in part:
+                sketch.add(value)
+            merged.merge(sketch)
+
+        assert len(merged.centroids) <= 50
+        assert merged.count == everything.count == 10000
+        values = sum(parts, [])
+        for q in (0.1, 0.5, 0.9):
+            # Within 3% of the value range of the exact quantile
+            assert abs(merged.quantile(q) - exact_quantile(values, q)) < 30
+            assert abs(everything.quantile(q) - exact_quantile(values, q)) < 30
+
+    def test_rollups_keep_sketches_for_percentiles(self, db_session):
+        db_session.add(Pool(id=1, name="City", url="http://x", element_id="E1", timezone="UTC"))
+        db_session.commit()
+        counts = [[10, 20, 30], [40, 50, 60]]
+        service = VisitorService(db_session)
+        for week, week_counts in enumerate(counts):
+            service.bulk_insert_readings([
+                ScrapeReading(
+                    pool_id=1, visitor_count=count,
+                    timestamp=MONDAY_NOON + timedelta(weeks=week, minutes=10 * i)
+                )
+                for i, count in enumerate(week_counts)
+            ])
+
+        stored = {row.local_date: row.visitor_sketch for row in db_session.query(VisitorHourlyRollup).all()}
+        assert merge_sketches(stored.values()).centroids == [[float(c), 1.0] for c in [10, 20, 30, 40, 50, 60]]
+
+        analytics = AnalyticsService(db_session)
+        heatmap = analytics.get_percentile_heatmap(1, percentile=50)
+        assert [(cell.weekday, cell.hour, cell.value) for cell in heatmap.data] == [("Monday", 12, 30)]
+        band = analytics.get_percentile_bands(1, weekday="Monday").data[0]
+        assert (band.hour, band.p10, band.p50, band.p90, band.sample_count) == (12, 10, 30, 60, 6)
+
+        # Date ranges merge only the sketches of their days
+        second_week = analytics.get_percentile_bands(1, start_date=date(2026, 3, 9)).data[0]
+        assert (second_week.p10, second_week.p90) == (40, 60)
+
+        RollupService(db_session).rebuild(1)
+        rebuilt = {row.local_date: row.visitor_sketch for row in db_session.query(VisitorHourlyRollup).all()}
+        assert rebuilt == stored
@@ -0,0 +1,262 @@
+from datetime import date, datetime, timedelta, timezone
+
+import pytz
+from sqlalchemy import event
+
+from app.models.pool import Pool
+from app.models.rollup import VisitorHourlyRollup
+from app.models.visitor import VisitorRecord
+from app.schemas.visitor import ScrapeReading, VisitorRecordFilter
+from app.services.analytics_service import AnalyticsService
+from app.services.rollup_service import RollupService
+from app.services.visitor_service import VisitorService
+
+ZURICH = pytz.timezone("Europe/Zurich")
+
+
+def add_pool(db_session):
+    pool = Pool(id=1, name="City", url="http://x/a.html", element_id="E1", timezone="Europe/Zurich")
+    db_session.add(pool)
+    db_session.commit()
+    return pool
+
+
+def readings(day, hour, counts):
+    # In UTC, as SQLite returns stored timestamps without their offset
+    start = ZURICH.localize(datetime.combine(day, datetime.min.time()).replace(hour=hour))
+    start = start.astimezone(timezone.utc)
+    return [
+        ScrapeReading(pool_id=1, visitor_count=count, timestamp=start + timedelta(minutes=10 * i))
+        for i, count in enumerate(counts)
+    ]
+
+
+def stored_rollups(db_session):
+    return {
+        (rollup.local_date, rollup.hour): (
+            rollup.reading_count, rollup.visitor_sum, rollup.visitor_min,
+            rollup.visitor_max, rollup.visitor_sum_squares
+        )
+        for rollup in db_session.query(VisitorHourlyRollup).all()
+    }
+
+
+class TestRollups:
+    def test_ingest_updates_rollups_incrementally(self, db_session):
+        add_pool(db_session)
+        service = VisitorService(db_session)
+        tuesday = date(2026, 3, 10)
+
+        service.bulk_insert_readings(readings(tuesday, 12, [10, 20]))
+        service.bulk_insert_readings(readings(tuesday, 12, [10, 20, 60]))  # two already stored
+
+        assert stored_rollups(db_session) == {(tuesday, 12): (3, 90, 10, 60, 4100)}
+
+    def test_rebuild_matches_incremental_rollups(self, db_session):
+        add_pool(db_session)
+        service = VisitorService(db_session)
+        for day in (date(2026, 3, 9), date(2026, 3, 10)):
+            for hour in (7, 12, 23):
+                service.bulk_insert_readings(readings(day, hour, [hour, hour * 2, 5]))
+        incremental = stored_rollups(db_session)
+
+        rebuilt = RollupService(db_session).rebuild(1)
+
+        assert rebuilt == 6
+        assert stored_rollups(db_session) == incremental
+        # 23:xx local is already the next day in UTC, but stays on its local date
+        assert (date(2026, 3, 9), 23) in incremental
+
+    def test_rebuild_limited_to_date_range(self, db_session):
+        add_pool(db_session)
+        service = VisitorService(db_session)
+        service.bulk_insert_readings(readings(date(2026, 3, 9), 12, [10]))
+        service.bulk_insert_readings(readings(date(2026, 3, 10), 12, [20]))
+        db_session.query(VisitorHourlyRollup).delete()
+        db_session.commit()
+
+        RollupService(db_session).rebuild(1, start_date=date(2026, 3, 10))
+
+        assert stored_rollups(db_session) == {(date(2026, 3, 10), 12): (1, 20, 20, 20, 400)}
+
+    def test_analytics_aggregate_rollups(self, db_session):
+        add_pool(db_session)
+        service = VisitorService(db_session)
+        service.bulk_insert_readings(readings(date(2026, 3, 3), 12, [10, 30]))
+        service.bulk_insert_readings(readings(date(2026, 3, 10), 12, [50]))
+        service.bulk_insert_readings(readings(date(2026, 3, 10), 18, [5]))
+        service.bulk_insert_readings(readings(date(2026, 3, 10), 4, [99]))  # before opening
+        analytics = AnalyticsService(db_session)
+
+        averages = analytics.get_weekday_averages(1)
+        assert [(a.weekday, a.hour, a.average_visitors, a.sample_count) for a in averages] == [
+            ("Tuesday", 12, 30.0, 3), ("Tuesday", 18, 5.0, 1)
+        ]
+
+        latest_week = analytics.get_weekday_averages(1, start_date=date(2026, 3, 10))
+        assert [a.average_visitors for a in latest_week] == [50.0, 5.0]
+
+        daily = analytics.get_daily_summary(1)
+        assert [(d.date, d.min_visitors, d.max_visitors, d.total_readings) for d in daily] == [
+            (date(2026, 3, 10), 5, 99, 3), (date(2026, 3, 3), 10, 30, 2)
+        ]
+        assert daily[1].std_visitors == 10.0
+
+        peaks = analytics.get_peak_hours(1, weekday="Tuesday")
+        assert peaks["peak_hour"] == 12 and peaks["quietest_hour"] == 18
+
+        trends = analytics.get_trends(1, "weekly")
+        assert [(p.period, p.peak_visitors, p.total_readings) for p in trends.data] == [
+            ("2026-W10", 30, 2), ("2026-W11", 99, 3)
+        ]
+
+    def test_bundle_matches_separate_views(self, db_session):
+        add_pool(db_session)
+        service = VisitorService(db_session)
+        for day, hour, counts in [
+            (date(2026, 3, 3), 12, [10, 30]), (date(2026, 3, 7), 9, [40, 45]),
+            (date(2026, 3, 10), 12, [50]), (date(2026, 3, 10), 4, [99]), (date(2026, 4, 2), 20, [7, 8])
+        ]:
+            service.bulk_insert_readings(readings(day, hour, counts))
+        analytics = AnalyticsService(db_session)
+        now = datetime(2026, 4, 7, 16, 0, tzinfo=timezone.utc)
+        window = {"start_date": date(2026, 3, 5), "end_date": date(2026, 4, 30)}
+
+        bundle = analytics.get_bundle(1, period="monthly", weekday="Tuesday", now=now, **window)
+        assert bundle.heatmap == analytics.get_heatmap_data(1, **window)
+        assert bundle.weekday_averages == analytics.get_weekday_averages(1, **window)
+        assert bundle.peak_hours == analytics.get_peak_hours(1, weekday="Tuesday", **window)
+        assert bundle.trends == analytics.get_trends(1, "monthly", **window)
+        assert bundle.daily_summary == analytics.get_daily_summary(1, **window)
+        assert bundle.weekday_average_now == analytics.get_weekday_average_up_to_now(1, now=now)
+
+        partial = analytics.get_bundle(1, sections=["trends"])
+        assert partial.trends == analytics.get_trends(1) and partial.heatmap is None
+        assert analytics.get_bundle(2) is None
+
+    def test_bundle_queries_no_more_than_separate_views(self, db_session):
+        add_pool(db_session)
+        VisitorService(db_session).bulk_insert_readings(readings(date(2026, 3, 10), 12, [10, 30]))
+        analytics = AnalyticsService(db_session)
+        statements = []
+
+        def record(connection, cursor, statement, *args):
+            statements.append(statement)
+
+        def count(call):
+            statements.clear()
+            event.listen(db_session.get_bind(), "before_cursor_execute", record)
+            call()
+            event.remove(db_session.get_bind(), "before_cursor_execute", record)
+            return len(statements)
+
+        separate = count(lambda: (analytics.get_heatmap_data(1), analytics.get_trends(1)))
+        assert count(lambda: analytics.get_bundle(1, sections=["heatmap", "trends"])) <= separate
+        # Pool and its daily rollup groups only
+        assert count(lambda: analytics.get_bundle(1, sections=["trends"])) == 2
+
+    def test_multi_pool_bundles_and_comparison(self, db_session):
+        add_pool(db_session)
+        db_session.add(Pool(id=2, name="Lake", url="http://x/b.html", element_id="E2", timezone="Europe/Zurich"))
+        db_session.commit()
+        service = VisitorService(db_session)
+        service.bulk_insert_readings(readings(date(2026, 3, 10), 12, [10, 30]))
+        service.bulk_insert_readings(readings(date(2026, 3, 11), 18, [60]))
+        lake = [reading.model_copy(update={"pool_id": 2}) for reading in readings(date(2026, 3, 10), 9, [5, 7])]
+        service.bulk_insert_readings(lake)
+        analytics = AnalyticsService(db_session)
+        now = datetime(2026, 3, 17, 12, 0, tzinfo=timezone.utc)
+
+        statements = []
+
+        def record(connection, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(db_session.get_bind(), "before_cursor_execute", record)
+        bundles = analytics.get_bundles([2, 3, 1, 2], now=now)
+        event.remove(db_session.get_bind(), "before_cursor_execute", record)
+        # Pools, their weekday-hour and daily rollup groups, and their baseline curves
+        assert len(statements) == 4
+        assert [bundle.pool_id for bundle in bundles] == [2, 1]
+        assert bundles == [analytics.get_bundle(2, now=now), analytics.get_bundle(1, now=now)]
+
+        comparison = analytics.compare_pools([1, 2], weekday="Tuesday")
+        assert comparison.hours == list(analytics.pool_hours) and len(comparison.weekdays) == 7
+        city, lake = comparison.pools
+        tuesday, noon = comparison.weekdays.index("Tuesday"), comparison.hours.index(12)
+        assert city.heatmap[tuesday][noon] == 20.0 and lake.heatmap[tuesday][noon] is None
+        assert lake.heatmap[tuesday][comparison.hours.index(9)] == 6.0
+        assert city.hourly_averages[comparison.hours.index(18)] is None  # Wednesday only
+        assert (city.peak_hour, lake.peak_hour) == (12, 9)
+        assert (comparison.min_value, comparison.max_value) == (6.0, 60.0)
+
+    def test_records_are_bucketed_in_pool_time(self, db_session):
+        add_pool(db_session)
+        service = VisitorService(db_session)
+        # 00:30 on a Monday in Zurich is still Sunday in UTC
+        service.bulk_insert_readings(readings(date(2026, 3, 2), 0, [7, 9]))
+
+        record = db_session.query(VisitorRecord).order_by(VisitorRecord.timestamp).first()
+        assert (record.local_date, record.local_hour, record.local_minute) == (date(2026, 3, 2), 0, 0)
+        assert (record.iso_weekday, record.weekday) == (1, "Monday")
+
+        night = VisitorRecordFilter(pool_id=1, weekday="Monday", start_hour=0, end_hour=0)
+        assert [r.visitor_count for r in service.get_filtered(night)] == [9, 7]
+        sunday = VisitorRecordFilter(pool_id=1, end_date=date(2026, 3, 1))
+        assert service.get_paginated(sunday).total == 0
+
+    def test_cursor_pages_match_offset_pages(self, db_session):
+        add_pool(db_session)
+        service = VisitorService(db_session)
+        for day in (date(2026, 3, 9), date(2026, 3, 10), date(2026, 3, 11)):
+            for hour in (8, 12, 19):
+                service.bulk_insert_readings(readings(day, hour, [hour, day.day, 3, 4]))
+        afternoon = {"pool_id": 1, "start_hour": 12, "limit": 5}
+
+        pages, cursor = [], None
+        while True:
+            page = service.get_paginated(VisitorRecordFilter(cursor=cursor, **afternoon))
+            pages.append([record.id for record in page.records])
+            assert (page.total, page.total_exact) == (24, True)
+            cursor = page.next_cursor
+            assert page.has_more == (cursor is not None)
+            if not cursor:
+                break
+        offset_pages = [
+            [record.id for record in service.get_filtered(VisitorRecordFilter(offset=offset, **afternoon))]
+            for offset in range(0, 24, 5)
+        ]
+        assert pages == offset_pages and len(pages[-1]) == 4
+
+        monday = VisitorRecordFilter(pool_id=1, weekday="monday", end_hour=8)
+        assert service.count_filtered(monday) == (4, True)
+
+    def test_count_is_inexact_until_rollups_are_backfilled(self, db_session):
+        add_pool(db_session)
+        service = VisitorService(db_session)
+        for day in (date(2026, 3, 9), date(2026, 3, 10)):
+            service.bulk_insert_readings(readings(day, 12, [1, 2, 3]))
+        # History stored before migration 008, whose rollup table starts empty
+        db_session.query(VisitorHourlyRollup).delete()
+        db_session.query(Pool).update({"rollups_backfilled": False})
+        db_session.add(Pool(id=2, name="Lake", url="http://x/b.html", element_id="E2"))
+        db_session.commit()
+        everything = VisitorRecordFilter(pool_id=1)
+        assert service.count_filtered(everything) == (0, False)
+        assert service.count_filtered(VisitorRecordFilter()) == (0, False)
+        assert service.count_filtered(VisitorRecordFilter(pool_id=2)) == (0, True)
+
+        # New readings get rollups, older ones still do not
+        service.bulk_insert_readings(readings(date(2026, 3, 10), 15, [4, 5]))
+        assert service.count_filtered(everything) == (2, False)
+
+        RollupService(db_session).rebuild(1, start_date=date(2026, 3, 10))
+        assert service.count_filtered(everything) == (5, False)
+        RollupService(db_session).rebuild(1)
+        assert service.count_filtered(everything) == (8, True)
+        assert service.count_filtered(VisitorRecordFilter(pool_ids=[1, 2])) == (8, True)
+
+    def test_invalid_cursor_is_rejected(self, client, auth_headers):
+        response = client.get("/api/v1/visitors/paginated", params={"cursor": "not-a-cursor"}, headers=auth_headers)
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Invalid cursor"
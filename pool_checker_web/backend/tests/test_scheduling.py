@@ -0,0 +1,169 @@
+from datetime import datetime, timedelta, timezone
+
+import pytz
+
+from app.models.change_profile import PoolChangeProfile
+from app.models.pool import Pool
+from app.models.visitor import VisitorRecord
+from app.services.change_rate_service import ChangeRateService
+from celery_app.scheduling import (
+    as_utc, choose_interval, claim_due_pools, group_due_pools, next_due_at,
+    schedule_offset_seconds
+)
+
+ZURICH = pytz.timezone("Europe/Zurich")
+
+
+def make_pool(pool_id, url="http://x/a.html", **kwargs):
+    defaults = {
+        "name": f"Pool {pool_id}",
+        "element_id": f"E{pool_id}",
+        "timezone": "Europe/Zurich",
+        "scrape_start_time": "06:00",
+        "scrape_end_time": "22:00",
+        "scrape_interval_minutes": 10,
+        "is_active": True,
+    }
+    defaults.update(kwargs)
+    return Pool(id=pool_id, url=url, **defaults)
+
+
+def local(*args):
+    return ZURICH.localize(datetime(*args)).astimezone(timezone.utc)
+
+
+class TestNextDueAt:
+    def test_slots_follow_interval_and_offset(self):
+        pool = make_pool(1)
+
+        due = next_due_at(pool, local(2026, 3, 10, 12, 4), offset_seconds=90)
+
+        assert due == local(2026, 3, 10, 12, 11, 30)
+
+    def test_closed_pool_waits_for_next_window(self):
+        pool = make_pool(1)
+
+        assert next_due_at(pool, local(2026, 3, 10, 21, 59), offset_seconds=90) == local(2026, 3, 11, 6, 1, 30)
+        assert next_due_at(pool, local(2026, 3, 10, 3, 0), offset_seconds=90) == local(2026, 3, 10, 6, 1, 30)
+
+    def test_window_is_local_across_dst_change(self):
+        pool = make_pool(1)
+
+        # Zurich switches to summer time on 2026-03-29
+        assert next_due_at(pool, local(2026, 3, 28, 23, 0), 0) == local(2026, 3, 29, 6, 0)
+        assert next_due_at(pool, local(2026, 3, 29, 23, 0), 0) == local(2026, 3, 30, 6, 0)
+
+    def test_pools_on_one_page_share_offsets(self):
+        same_page = [make_pool(1), make_pool(2)]
+        other_page = make_pool(3, url="http://x/b.html")
+
+        assert schedule_offset_seconds(same_page[0]) == schedule_offset_seconds(same_page[1])
+        assert 0 <= schedule_offset_seconds(other_page) < 600
+
+
+class TestClaimDuePools:
+    def test_claims_due_pools_and_advances_them(self, db_session):
+        due_pool = make_pool(1)
+        slot = next_due_at(due_pool, local(2026, 3, 10, 12, 0))
+        now = slot - timedelta(seconds=30)
+        due_pool.next_scrape_at = slot
+        later_pool = make_pool(2, url="http://x/b.html", next_scrape_at=now + timedelta(minutes=5))
+        inactive_pool = make_pool(3, is_active=False, next_scrape_at=now)
+        db_session.add_all([due_pool, later_pool, inactive_pool])
+        db_session.commit()
+
+        due, _ = claim_due_pools(db_session, now, now + timedelta(seconds=60))
+
+        assert [(pool.id, due_at) for pool, due_at in due] == [(1, slot)]
+        assert as_utc(due_pool.next_scrape_at) == slot + timedelta(minutes=10)
+
+    def test_missed_slots_run_once_now(self, db_session):
+        now = local(2026, 3, 10, 12, 0)
+        pool = make_pool(1, next_scrape_at=now - timedelta(hours=3))
+        db_session.add(pool)
+        db_session.commit()
+
+        due, _ = claim_due_pools(db_session, now, now + timedelta(seconds=60))
+
+        assert due == [(pool, now)]
+        assert now < as_utc(pool.next_scrape_at) <= now + timedelta(minutes=10)
+
+    def test_stale_slot_is_not_dispatched_while_closed(self, db_session):
+        # Last evening's slot, seen by the first scheduler run of the night
+        now = local(2026, 3, 10, 23, 30)
+        pool = make_pool(1, next_scrape_at=local(2026, 3, 10, 21, 50))
+        db_session.add(pool)
+        db_session.commit()
+
+        due, _ = claim_due_pools(db_session, now, now + timedelta(seconds=60))
+
+        assert due == []
+        assert as_utc(pool.next_scrape_at) == next_due_at(pool, local(2026, 3, 11, 6, 0) - timedelta(seconds=1))
+
+    def test_shared_pages_are_dispatched_together(self, db_session):
+        now = local(2026, 3, 10, 12, 0)
+        pools = [make_pool(1, next_scrape_at=now), make_pool(2, next_scrape_at=now)]
+        db_session.add_all(pools)
+        db_session.commit()
+
+        due, _ = claim_due_pools(db_session, now, now + timedelta(seconds=60))
+        groups = group_due_pools(due)
+
+        assert [[pool.id for pool in group] for _, group in groups] == [[1, 2]]
+
+
+def make_adaptive_pool(pool_id, **kwargs):
+    return make_pool(
+        pool_id, adaptive_scheduling=True, min_scrape_interval_minutes=5,
+        max_scrape_interval_minutes=30, **kwargs
+    )
+
+
+class TestAdaptiveScheduling:
+    def test_interval_follows_change_rate_within_bounds(self):
+        pool = make_adaptive_pool(1)
+
+        # Target is 5 visitors of change between scrapes
+        assert choose_interval(pool, 0.25, None).interval_minutes == 20
+        assert choose_interval(pool, 0.25, 2.0).interval_minutes == 5
+        assert choose_interval(pool, 0.0, 0.0).interval_minutes == 30
+        assert choose_interval(pool, None, None).reason == "no_data"
+
+    def test_savings_are_relative_to_fixed_interval(self):
+        decision = choose_interval(make_adaptive_pool(1), 0.0, None)
+
+        assert decision.reason == "slower"
+        assert decision.scrapes_saved == 2.0
+
+    def test_profile_is_learned_from_visitor_records(self, db_session):
+        pool = make_adaptive_pool(1)
+        db_session.add(pool)
+        start = local(2026, 3, 9, 7, 0)  # a Monday
+        for minute, count in [(0, 10), (10, 10), (20, 10), (600, 40), (610, 100)]:
+            db_session.add(VisitorRecord(
+                pool_id=1, timestamp=start + timedelta(minutes=minute),
+                weekday="Monday", visitor_count=count
+            ))
+        db_session.commit()
+
+        profile = ChangeRateService(db_session).compute_profile(pool, start - timedelta(days=1))
+
+        assert profile[(0, 14)] == (0.0, 2)  # 07:00 slot, flat
+        assert profile[(0, 34)] == (6.0, 1)  # 17:00 slot, after-work rush
+
+    def test_claim_uses_learned_profile(self, db_session):
+        pool = make_adaptive_pool(1)
+        slot = next_due_at(pool, local(2026, 3, 9, 7, 0))
+        pool.next_scrape_at = slot
+        db_session.add(pool)
+        weekday = slot.astimezone(ZURICH).weekday()
+        minute_of_day = slot.astimezone(ZURICH).hour * 60 + slot.astimezone(ZURICH).minute
+        db_session.add(PoolChangeProfile(
+            pool_id=1, weekday=weekday, slot=minute_of_day // 30, change_rate=0.0, samples=12
+        ))
+        db_session.commit()
+
+        due, decisions = claim_due_pools(db_session, slot, slot + timedelta(seconds=60))
+
+        assert [decision.interval_minutes for decision in decisions] == [30]
+        assert as_utc(pool.next_scrape_at) == slot + timedelta(minutes=30)
@@ -0,0 +1,85 @@
+from selenium.common.exceptions import NoSuchElementException
+
+from app.config import settings
+from app.services.scrape_metrics_service import ScrapeMetricsService
+from celery_app.readiness import parse_visitor_count, visitor_count_present
+
+
+class ListRedis:
+    """The Redis list commands the metrics service uses, kept in memory."""
+
+    def __init__(self):
+        self.lists = {}
+
+    def pipeline(self):
+        return self
+
+    def execute(self):
+        pass
+
+    def lpush(self, key, value):
+        self.lists.setdefault(key, []).insert(0, value)
+
+    def ltrim(self, key, start, end):
+        self.lists[key] = self.lists.get(key, [])[start:end + 1]
+
+    def lrange(self, key, start, end):
+        return self.lists.get(key, [])[start:end + 1]
+
+
+class FakeElement:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeDriver:
+    def __init__(self, elements):
+        self.elements = elements
+
+    def find_element(self, by, value):
+        if value not in self.elements:
+            raise NoSuchElementException(value)
+        return self.elements[value]
+
+
+class TestReadiness:
+    def test_parses_counts(self):
+        assert parse_visitor_count("42") == 42
+        assert parse_visitor_count(" 1'234 Personen ") == 1234
+        assert parse_visitor_count("geschlossen") is None
+        assert parse_visitor_count("") is None
+        assert parse_visitor_count(None) is None
+
+    def test_waits_for_numeric_element(self):
+        condition = visitor_count_present("count")
+        assert condition(FakeDriver({})) is None
+        assert condition(FakeDriver({"count": FakeElement("...")})) is None
+
+        element = FakeElement(" 57 ")
+        assert condition(FakeDriver({"count": element})) is element
+
+
+class TestScrapeMetricsService:
+    def test_summarizes_phase_percentiles(self):
+        service = ScrapeMetricsService(ListRedis())
+        for value in range(1, 11):
+            service.record(1, {"navigate_ms": float(value), "total_ms": value * 10.0}, success=value % 5 != 0)
+
+        summary = service.get_summary(1, recent_limit=3)
+        assert summary.sample_count == 10
+        assert summary.success_rate == 0.8
+        navigate = next(phase for phase in summary.phases if phase.phase == "navigate_ms")
+        assert (navigate.count, navigate.p50_ms, navigate.p95_ms, navigate.max_ms) == (10, 5.0, 10.0, 10.0)
+        assert [sample.timings["navigate_ms"] for sample in summary.recent] == [10.0, 9.0, 8.0]
+        assert service.get_summary(2).sample_count == 0
+
+    def test_keeps_only_newest_samples(self, monkeypatch):
+        monkeypatch.setattr(settings, "SCRAPE_TIMING_HISTORY", 5)
+        service = ScrapeMetricsService(ListRedis())
+        for value in range(8):
+            service.record(1, {"total_ms": float(value)}, success=False, error="timeout")
+
+        summary = service.get_summary(1)
+        assert summary.sample_count == 5
+        assert summary.success_rate == 0.0
+        assert summary.phases[0].max_ms == 7.0 and summary.phases[0].p50_ms == 5.0
@@ -0,0 +1,70 @@
+import statistics
+from datetime import datetime, timedelta, timezone
+
+from app.config import settings
+from app.models.pool import Pool
+from app.models.slot_stats import PoolSlotStats
+from app.schemas.visitor import ScrapeReading
+from app.services.slot_stats_service import (
+    KIND_RECENT, SlotStatsService, add_reading, recent_mean, stddev
+)
+from app.services.visitor_service import VisitorService
+
+MONDAY_NOON = datetime(2026, 3, 2, 12, tzinfo=timezone.utc)
+
+
+def empty_slot():
+    return PoolSlotStats(count=0, mean=0.0, m2=0.0, decayed_sum=0.0, decayed_weight=0.0)
+
+
+class TestSlotStats:
+    def test_welford_matches_batch_statistics(self):
+        counts = [12, 40, 33, 7, 51, 28]
+        stats = empty_slot()
+        for week, count in enumerate(counts):
+            add_reading(stats, MONDAY_NOON + timedelta(weeks=week), count)
+
+        assert stats.count == len(counts)
+        assert abs(stats.mean - statistics.mean(counts)) < 1e-9
+        assert abs(stddev(stats) - statistics.stdev(counts)) < 1e-9
+
+    def test_recent_mean_halves_weight_per_half_life(self):
+        stats = empty_slot()
+        half_life = timedelta(days=settings.ONLINE_STATS_HALF_LIFE_DAYS)
+        add_reading(stats, MONDAY_NOON, 100)
+        add_reading(stats, MONDAY_NOON + half_life, 10)
+
+        # weights 0.5 and 1
+        assert abs(recent_mean(stats) - (0.5 * 100 + 10) / 1.5) < 1e-9
+        assert stats.mean == 55
+
+        # Order of arrival does not matter
+        late = empty_slot()
+        add_reading(late, MONDAY_NOON + half_life, 10)
+        add_reading(late, MONDAY_NOON, 100)
+        assert abs(recent_mean(late) - recent_mean(stats)) < 1e-9
+
+    def test_ingest_updates_slots_and_serves_heatmaps(self, db_session):
+        db_session.add(Pool(id=1, name="City", url="http://x", element_id="E1", timezone="UTC"))
+        db_session.commit()
+        service = VisitorService(db_session)
+        counts = [20, 30, 40, 80]
+        for week, count in enumerate(counts):
+            service.bulk_insert_readings([
+                ScrapeReading(pool_id=1, visitor_count=count, timestamp=MONDAY_NOON + timedelta(weeks=week))
+            ])
+        service.bulk_insert_readings([
+            ScrapeReading(pool_id=1, visitor_count=20, timestamp=MONDAY_NOON)  # already stored
+        ])
+        online = {(row.weekday, row.slot): row.count for row in db_session.query(PoolSlotStats).all()}
+
+        heatmap = SlotStatsService(db_session).get_heatmap(1, KIND_RECENT)
+
+        cell = heatmap.data[0]
+        assert (cell.weekday, cell.start_time, cell.samples, cell.typical) == ("Monday", "12:00", 4, 42.5)
+        assert cell.value == cell.recent and cell.trend > 0
+
+        assert SlotStatsService(db_session).rebuild(1) == 1
+        rebuilt = db_session.query(PoolSlotStats).one()
+        assert {(rebuilt.weekday, rebuilt.slot): rebuilt.count} == online
+        assert round(recent_mean(rebuilt), 1) == cell.recent
@@ -101,12 +101,75 @@ export interface WeekdayAverageUpToNow {
 	sample_count: number;
 }
 
+export interface PeakHours {
+	peak_hour: number | null;
+	quietest_hour: number | null;
+	by_hour: { hour: number; average: number; max: number }[];
+}
+
+export type AnalyticsSection =
+	| 'heatmap'
+	| 'weekday_averages'
+	| 'peak_hours'
+	| 'trends'
+	| 'daily_summary'
+	| 'weekday_average_now';
+
+export interface AnalyticsBundle {
+	pool_id: number;
+	pool_name: string;
+	heatmap: HeatmapData | null;
+	weekday_averages: WeekdayAverage[] | null;
+	peak_hours: PeakHours | null;
+	trends: TrendData | null;
+	daily_summary: DailySummary[] | null;
+	weekday_average_now: WeekdayAverageUpToNow | null;
+}
+
+export interface ComparedPool {
+	pool_id: number;
+	pool_name: string;
+	heatmap: (number | null)[][];
+	hourly_averages: (number | null)[];
+	peak_hour: number | null;
+	quietest_hour: number | null;
+}
+
+export interface PoolComparison {
+	weekdays: string[];
+	hours: number[];
+	weekday: string | null;
+	min_value: number;
+	max_value: number;
+	pools: ComparedPool[];
+}
+
+export interface BestTimeWindow {
+	pool_id: number;
+	pool_name: string;
+	date: string;
+	weekday: string;
+	start_time: string;
+	end_time: string;
+	expected_visitors: number;
+}
+
+export interface BestTimes {
+	start_time: string;
+	end_time: string;
+	duration_minutes: number;
+	slot_minutes: number;
+	windows: BestTimeWindow[];
+}
+
 export interface PaginatedVisitorResponse {
 	records: VisitorRecord[];
 	total: number;
+	total_exact: boolean;
 	limit: number;
 	offset: number;
 	has_more: boolean;
+	next_cursor: string | null;
 }
 
 export interface Token {
@@ -311,6 +374,94 @@ class ApiClient {
 		return this.handleResponse<WeekdayAverageUpToNow>(response);
 	}
 
+	async getAnalyticsBundle(poolId: number, options?: {
+		sections?: AnalyticsSection[];
+		period?: 'weekly' | 'monthly';
+		weekday?: string;
+	}): Promise<AnalyticsBundle> {
+		const params = new URLSearchParams({ pool_id: String(poolId) });
+		options?.sections?.forEach((section) => params.append('sections', section));
+		if (options?.period) params.append('period', options.period);
+		if (options?.weekday) params.append('weekday', options.weekday);
+
+		const response = await fetch(`${API_V1}/analytics/bundle?${params}`, {
+			headers: this.getHeaders()
+		});
+		return this.handleResponse<AnalyticsBundle>(response);
+	}
+
+	async getAnalyticsBundles(poolIds: number[], options?: {
+		sections?: AnalyticsSection[];
+		period?: 'weekly' | 'monthly';
+		weekday?: string;
+	}): Promise<AnalyticsBundle[]> {
+		const params = new URLSearchParams();
+		poolIds.forEach((id) => params.append('pool_ids', String(id)));
+		options?.sections?.forEach((section) => params.append('sections', section));
+		if (options?.period) params.append('period', options.period);
+		if (options?.weekday) params.append('weekday', options.weekday);
+
+		const response = await fetch(`${API_V1}/analytics/bundles?${params}`, {
+			headers: this.getHeaders()
+		});
+		return this.handleResponse<AnalyticsBundle[]>(response);
+	}
+
+	async comparePools(poolIds: number[], weekday?: string): Promise<PoolComparison> {
+		const params = new URLSearchParams();
+		poolIds.forEach((id) => params.append('pool_ids', String(id)));
+		if (weekday) params.append('weekday', weekday);
+
+		const response = await fetch(`${API_V1}/analytics/compare?${params}`, {
+			headers: this.getHeaders()
+		});
+		return this.handleResponse<PoolComparison>(response);
+	}
+
+	async getBestTimes(poolIds: number[], options?: {
+		start_time?: string;
+		end_time?: string;
+		duration_minutes?: number;
+		days?: number;
+		limit?: number;
+	}): Promise<BestTimes> {
+		const params = new URLSearchParams();
+		poolIds.forEach((id) => params.append('pool_ids', String(id)));
+		if (options) {
+			Object.entries(options).forEach(([key, value]) => {
+				if (value !== undefined) params.append(key, String(value));
+			});
+		}
+
+		const response = await fetch(`${API_V1}/analytics/best-times?${params}`, {
+			headers: this.getHeaders()
+		});
+		return this.handleResponse<BestTimes>(response);
+	}
+
+	async exportVisitors(params?: {
+		pool_id?: number;
+		start_date?: string;
+		end_date?: string;
+		weekday?: string;
+		format?: 'csv' | 'ndjson';
+		gzip?: boolean;
+	}): Promise<Blob> {
+		const searchParams = new URLSearchParams();
+		if (params) {
+			Object.entries(params).forEach(([key, value]) => {
+				if (value !== undefined) searchParams.append(key, String(value));
+			});
+		}
+		const response = await fetch(`${API_V1}/visitors/export?${searchParams}`, {
+			headers: this.getHeaders()
+		});
+		if (!response.ok) {
+			throw new Error(`HTTP error: ${response.status}`);
+		}
+		return response.blob();
+	}
+
 	async getVisitorsPaginated(params?: {
 		pool_id?: number;
 		start_date?: string;
@@ -318,6 +469,7 @@ class ApiClient {
 		weekday?: string;
 		limit?: number;
 		offset?: number;
+		cursor?: string;
 	}): Promise<PaginatedVisitorResponse> {
 		const searchParams = new URLSearchParams();
 		if (params) {